@@ -0,0 +1,75 @@
+"""
+Бенчмарк: регистрация пачки посылок — по одной (`RegistryParcelUseCase`, транзакция
+и два INSERT на посылку) против `BulkRegistryParcelUseCase` (одна транзакция и по одному
+многострочному INSERT в outbox_events и parcel_view на пачку).
+
+Запускается на файловой SQLite, чтобы каждая фиксация транзакции доходила до диска.
+На MySQL разница больше: к ней добавляются сетевые round-trip и fsync redo-лога на каждый коммит.
+Печатает пропускную способность в посылках в секунду.
+
+    PYTHONPATH=. python3 benchmarks/bench_bulk_registry.py
+"""
+import asyncio
+import os
+import tempfile
+import time
+from uuid import uuid4
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import src.parcel_service.infrastructure.repository  # noqa: F401 — регистрация репозиториев
+from src.parcel_service.application.use_cases.parcels.bulk_registry_parcel import BulkRegistryParcelUseCase
+from src.parcel_service.application.use_cases.parcels.registry_parcel import RegistryParcelUseCase
+from src.parcel_service.domain.dto.dto_create_parcel import ParcelBulkData, ParcelData
+from src.parcel_service.infrastructure.db.sql.engine import create_session_factory
+from src.parcel_service.infrastructure.db.sql.models import Base
+from src.parcel_service.infrastructure.repository.factory import RepositoryFactory
+from src.parcel_service.infrastructure.repository.registry import RepositoryRegistry
+from src.parcel_service.infrastructure.unitofwork.uow import UnitOfWork
+
+SESSION_ID = "bench-bulk"
+BATCH_SIZE = 500
+BATCHES = 4
+
+
+def _items(count: int) -> tuple:
+    return tuple(
+        ParcelData(
+            parcel_id=str(uuid4()), session_id=SESSION_ID, name=f"bench-{i}",
+            weight_kg=1.0, type_id=1, cost_adjustment_usd=10.0
+        )
+        for i in range(count)
+    )
+
+
+async def main() -> None:
+    logger.remove()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            session_factory = create_session_factory(engine)
+            repo_factory = RepositoryFactory(RepositoryRegistry.get())
+
+            single = RegistryParcelUseCase()
+            started = time.perf_counter()
+            for _ in range(BATCHES):
+                for item in _items(BATCH_SIZE):
+                    await single(item, UnitOfWork(session_factory, repo_factory))
+            elapsed = time.perf_counter() - started
+            print(f"{'one by one':>12}: {BATCHES * BATCH_SIZE / elapsed:10.1f} parcels/s")
+
+            bulk = BulkRegistryParcelUseCase()
+            started = time.perf_counter()
+            for _ in range(BATCHES):
+                await bulk(ParcelBulkData(session_id=SESSION_ID, items=_items(BATCH_SIZE)), UnitOfWork(session_factory, repo_factory))
+            elapsed = time.perf_counter() - started
+            print(f"{'bulk':>12}: {BATCHES * BATCH_SIZE / elapsed:10.1f} parcels/s (batch={BATCH_SIZE})")
+        finally:
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
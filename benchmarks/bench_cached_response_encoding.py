@@ -0,0 +1,119 @@
+"""
+Бенчмарк: сборка ответа списка посылок (страница из 100 элементов) при промахе
+и попадании в кеш — через Pydantic-модели против готового orjson-тела.
+
+Вариант «до» повторяет прежний путь роутера вместе с обработкой ответа FastAPI
+(serialize_response по response_model и JSONResponse):
+    - промах: ParcelDetailResponse на каждый элемент, JSON для кеша, затем повторная
+      валидация и сериализация ответа;
+    - попадание: json.loads из кеша, пересборка ParcelListResponse и снова сериализация.
+Вариант «после»: тело кодируется один раз (encode_parcel_list), при попадании строка
+из кеша отдаётся как есть в Response.
+
+    PYTHONPATH=. python3 benchmarks/bench_cached_response_encoding.py
+"""
+import asyncio
+import json
+import time
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from src.parcel_service.api.encoders.parcel import encode_parcel_list, json_response
+from src.parcel_service.api.schemas.parcel import ParcelDetailResponse, ParcelListResponse
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelDetailQueryList, ParcelDetailResult
+
+ITEMS = 100
+REPEATS = 2000
+RESPONSE_FIELD = create_model_field(name="Response_get_all_parcels", type_=ParcelListResponse, mode="serialization")
+
+
+def _page() -> ParcelDetailQueryList:
+    items = [
+        ParcelDetailResult(
+            parcel_id=f"00000000-0000-0000-0000-{i:012d}",
+            name=f"Посылка номер {i}",
+            weight_kg=Decimal("1.25"),
+            type_id=i % 3 + 1,
+            cost_adjustment_usd=Decimal("49.90"),
+            delivery_price_rub=Decimal("350.00") if i % 2 else None,
+        )
+        for i in range(ITEMS)
+    ]
+    return ParcelDetailQueryList(items=items, total=ITEMS * 10, next_cursor="cursor", has_more=True)
+
+
+def _build_models(result: ParcelDetailQueryList) -> ParcelListResponse:
+    return ParcelListResponse(
+        items=[
+            ParcelDetailResponse(
+                parcel_id=item.parcel_id,
+                name=item.name,
+                weight_kg=item.weight_kg,
+                type_id=item.type_id,
+                cost_adjustment_usd=item.cost_adjustment_usd,
+                delivery_price_rub=str(item.delivery_price_rub) if item.delivery_price_rub is not None else "Не рассчитано",
+            )
+            for item in result.items
+        ],
+        total=result.total,
+        next_cursor=result.next_cursor,
+        has_more=result.has_more,
+    )
+
+
+async def _fastapi_render(response: ParcelListResponse) -> bytes:
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=response)
+    return JSONResponse(content=content).body
+
+
+async def before_miss(result: ParcelDetailQueryList) -> bytes:
+    response = _build_models(result)
+    json.dumps(response.model_dump())  # значение для кеша
+    return await _fastapi_render(_build_models(result))
+
+
+async def before_hit(cached: str) -> bytes:
+    data = json.loads(cached)
+    response = ParcelListResponse(items=[ParcelDetailResponse(**item) for item in data["items"]],
+                                  total=data["total"], next_cursor=data["next_cursor"], has_more=data["has_more"])
+    return await _fastapi_render(response)
+
+
+async def after_miss(result: ParcelDetailQueryList) -> bytes:
+    return json_response(encode_parcel_list(result)).body
+
+
+async def after_hit(cached: str) -> bytes:
+    return json_response(cached).body
+
+
+async def _measure(func, arg) -> float:
+    await func(arg)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        await func(arg)
+    return (time.perf_counter() - start) / REPEATS * 1e6
+
+
+async def main() -> None:
+    result = _page()
+    cached_before = json.dumps(_build_models(result).model_dump())
+    cached_after = encode_parcel_list(result)
+
+    assert json.loads(await before_hit(cached_before)) == json.loads(await after_hit(cached_after))
+
+    print(f"Страница из {ITEMS} элементов, {REPEATS} повторов, мкс на ответ")
+    for title, before, after, before_arg, after_arg in (
+        ("промах", before_miss, after_miss, result, result),
+        ("попадание", before_hit, after_hit, cached_before, cached_after),
+    ):
+        t_before = await _measure(before, before_arg)
+        t_after = await _measure(after, after_arg)
+        print(f"{title:>10}: до={t_before:9.1f}  после={t_after:9.1f}  ускорение x{t_before / t_after:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
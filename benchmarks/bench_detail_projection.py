@@ -0,0 +1,116 @@
+"""
+Бенчмарк: страница из 1000 карточек посылок — загрузка ORM-сущностей Parcel
+с копированием полей в ParcelDetailResult против выборки только нужных колонок
+(ParcelCombinedRepository._parcel_detail_columns) и сборки DTO из кортежей строк.
+
+Вариант «до»: select(Parcel) — identity map, отслеживание изменений, все колонки
+(включая updated_at и company_id). Вариант «после»: select(*columns) — строки без сессии.
+Для каждого варианта печатает CPU-время и пик аллокаций на запрос (tracemalloc).
+
+    PYTHONPATH=. python3 benchmarks/bench_detail_projection.py
+"""
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from src.parcel_service.domain.constants.parcel import NOT_CALCULATED
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelDetailResult
+from src.parcel_service.infrastructure.db.sql.models import Base, Parcel, ParcelType
+from src.parcel_service.infrastructure.repository.parcel_combine import ParcelCombinedRepository
+
+ROWS = 1000
+REPEATS = 50
+SESSION_ID = "bench-session"
+
+
+def _fill(conn) -> list:
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    conn.execute(insert(ParcelType), [{"id": i, "name": f"type-{i}"} for i in (1, 2, 3)])
+    rows = [
+        {
+            "id": f"{i:036d}",
+            "session_id": SESSION_ID,
+            "name": f"Посылка {i}",
+            "weight_kg": 1.5,
+            "type_id": i % 3 + 1,
+            "cost_adjustment_usd": 10.0,
+            "delivery_price_rub": None if i % 2 else 350.0,
+            "created_at": created,
+            "updated_at": created,
+        }
+        for i in range(ROWS)
+    ]
+    conn.execute(insert(Parcel), rows)
+    return [row["id"] for row in rows]
+
+
+def before(session: Session, ids: list) -> list:
+    parcels = session.execute(select(Parcel).where(Parcel.id.in_(ids))).scalars().all()
+    items = [
+        ParcelDetailResult(
+            parcel_id=parcel.id,
+            name=parcel.name,
+            weight_kg=parcel.weight_kg,
+            type_id=parcel.type_id,
+            cost_adjustment_usd=parcel.cost_adjustment_usd,
+            delivery_price_rub=parcel.delivery_price_rub if parcel.delivery_price_rub is not None else "Not calculated",
+        )
+        for parcel in parcels
+    ]
+    session.close()
+    return items
+
+
+def after(session: Session, ids: list) -> list:
+    stmt = select(*ParcelCombinedRepository._parcel_detail_columns()).where(Parcel.id.in_(ids))
+    items = [
+        ParcelDetailResult(
+            parcel_id, name, weight_kg, type_id, cost_adjustment_usd,
+            delivery_price_rub if delivery_price_rub is not None else NOT_CALCULATED
+        )
+        for parcel_id, _, name, weight_kg, type_id, cost_adjustment_usd, delivery_price_rub in session.execute(stmt)
+    ]
+    session.close()
+    return items
+
+
+def _measure(engine, func, ids) -> tuple:
+    with Session(engine) as session:
+        assert len(func(session, ids)) == ROWS
+
+    start = time.process_time()
+    for _ in range(REPEATS):
+        with Session(engine) as session:
+            func(session, ids)
+    cpu_ms = (time.process_time() - start) / REPEATS * 1000
+
+    with Session(engine) as session:
+        tracemalloc.start()
+        func(session, ids)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return cpu_ms, peak / 1024
+
+
+def main() -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        ids = _fill(conn)
+
+    print(f"Страница из {ROWS} карточек, {REPEATS} повторов")
+    results = {}
+    for title, func in (("ORM-сущности", before), ("проекция колонок", after)):
+        results[title] = _measure(engine, func, ids)
+        cpu_ms, peak_kib = results[title]
+        print(f"{title:>17}: CPU={cpu_ms:7.2f} мс  пик памяти={peak_kib:8.1f} КиБ")
+
+    (cpu_b, peak_b), (cpu_a, peak_a) = results.values()
+    print(f"{'итого':>17}: CPU x{cpu_b / cpu_a:.1f}, пик памяти x{peak_b / peak_a:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Бенчмарк: конкурентные одиночные регистрации посылок — транзакция на каждый запрос
+против групповой фиксации (`GroupCommitWriter`: пачка до max_batch регистраций,
+одна транзакция и один коммит на пачку).
+
+Запускается на файловой SQLite: коммит с записью на диск — тот же потолок пропускной
+способности, что и fsync redo-лога InnoDB. Печатает пропускную способность, p95 задержки
+регистрации (до ответа, то есть после коммита) и число коммитов.
+
+    PYTHONPATH=. python3 benchmarks/bench_group_commit.py
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import List, Optional
+from uuid import uuid4
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import src.parcel_service.infrastructure.repository  # noqa: F401 — регистрация репозиториев
+from src.parcel_service.application.use_cases.parcels.registry_parcel import RegistryParcelUseCase
+from src.parcel_service.domain.dto.dto_create_parcel import ParcelData, RegistryParcelDeps
+from src.parcel_service.infrastructure.db.sql.engine import create_session_factory
+from src.parcel_service.infrastructure.db.sql.models import Base
+from src.parcel_service.infrastructure.repository.factory import RepositoryFactory
+from src.parcel_service.infrastructure.repository.registry import RepositoryRegistry
+from src.parcel_service.infrastructure.unitofwork.group_commit import GroupCommitWriter
+from src.parcel_service.infrastructure.unitofwork.uow import UnitOfWork
+
+WORKERS = 32
+REGISTRATIONS_PER_WORKER = 50
+MAX_BATCH = 100
+MAX_DELAY = 0.002
+
+
+async def _run(path: str, name: str, group_commit: bool) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"timeout": 60})
+    commits = []
+    event.listen(engine.sync_engine, "commit", lambda conn: commits.append(1))
+    session_factory = create_session_factory(engine)
+    repo_factory = RepositoryFactory(RepositoryRegistry.get())
+    make_uow = lambda: UnitOfWork(session_factory, repo_factory)
+
+    writer: Optional[GroupCommitWriter] = None
+    if group_commit:
+        writer = GroupCommitWriter(uow_factory=make_uow, max_batch=MAX_BATCH, max_delay=MAX_DELAY)
+        writer.start()
+    deps = RegistryParcelDeps(group_commit=writer)
+    use_case = RegistryParcelUseCase()
+    latencies: List[float] = []
+
+    async def worker(number: int) -> None:
+        for i in range(REGISTRATIONS_PER_WORKER):
+            dto = ParcelData(
+                parcel_id=str(uuid4()), session_id=f"bench-{number}", name=f"bench-{i}",
+                weight_kg=1.0, type_id=1, cost_adjustment_usd=10.0
+            )
+            started = time.perf_counter()
+            await use_case(dto, make_uow(), deps)
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(number) for number in range(WORKERS)))
+        elapsed = time.perf_counter() - started
+    finally:
+        if writer is not None:
+            await writer.stop()
+        await engine.dispose()
+
+    p95 = statistics.quantiles(latencies, n=20)[-1] * 1000
+    print(f"{name:>14}: {len(latencies) / elapsed:8.1f} registrations/s, p95={p95:.2f} ms, commits={len(commits)}")
+
+
+async def main() -> None:
+    logger.remove()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+        await _run(path, "per request", group_commit=False)
+        await _run(path, "group commit", group_commit=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
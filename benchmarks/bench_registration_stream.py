@@ -0,0 +1,165 @@
+"""
+Бенчмарк: одиночные регистрации посылок с записью outbox до ответа (direct) против
+буфера регистраций в Redis Stream (stream: XADD до ответа, перенос в БД пачками
+фоновой задачей `RegistrationStreamDrainer`).
+
+Запись идёт в файловую SQLite: коммит с записью на диск — тот же потолок, что и fsync
+redo-лога InnoDB во время всплеска регистраций. Печатает пропускную способность и p50/p99
+задержки регистрации (до ответа API), число коммитов и время, за которое перенос
+догоняет поток.
+
+Redis берётся из BENCH_REDIS_URL (например, redis://localhost:6379/15; ключ потока
+удаляется до и после прогона). Без BENCH_REDIS_URL используется поток в памяти процесса
+с имитацией сетевой задержки Redis (BENCH_REDIS_RTT_MS, по умолчанию 0.2 мс) —
+результаты в этом режиме ориентировочные.
+
+    PYTHONPATH=. python3 benchmarks/bench_registration_stream.py
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import List, Optional
+from uuid import uuid4
+
+from loguru import logger
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import src.parcel_service.infrastructure.repository  # noqa: F401 — регистрация репозиториев
+from src.parcel_service.application.use_cases.parcels.registry_parcel import RegistryParcelUseCase
+from src.parcel_service.domain.dto.dto_create_parcel import ParcelData, RegistryParcelDeps
+from src.parcel_service.infrastructure.db.sql.engine import create_session_factory
+from src.parcel_service.infrastructure.db.sql.models import Base, OutboxEvent
+from src.parcel_service.infrastructure.repository.factory import RepositoryFactory
+from src.parcel_service.infrastructure.repository.registry import RepositoryRegistry
+from src.parcel_service.infrastructure.unitofwork.registration_stream import RedisRegistrationStream, RegistrationStreamDrainer
+from src.parcel_service.infrastructure.unitofwork.uow import UnitOfWork
+from tests.parcel_service.integ.usecase.test_registration_stream import FakeStreamRedis
+
+WORKERS = 64
+REGISTRATIONS_PER_WORKER = 50
+STREAM_KEY = "bench:stream:registrations"
+BATCH_SIZE = 500
+RTT = float(os.getenv("BENCH_REDIS_RTT_MS", "0.2")) / 1000
+
+
+class InProcessStreamRedis(FakeStreamRedis):
+    """Поток в памяти процесса с задержкой сети на каждую команду и блокирующим чтением"""
+
+    async def eval(self, *args):
+        await asyncio.sleep(RTT)
+        return await super().eval(*args)
+
+    async def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        await asyncio.sleep(RTT)
+        response = await super().xreadgroup(group, consumer, streams, count, block)
+        if not response and block:
+            await asyncio.sleep(block / 1000)
+        return response
+
+    def pipeline(self, transaction=True):
+        pipe = super().pipeline(transaction)
+        execute = pipe.execute
+
+        async def delayed():
+            await asyncio.sleep(RTT)
+            return await execute()
+
+        pipe.execute = delayed
+        return pipe
+
+
+def _create_redis():
+    url = os.getenv("BENCH_REDIS_URL")
+    if url is None:
+        return InProcessStreamRedis(), f"in-process stream, RTT={RTT * 1000:.2f} ms"
+    import redis.asyncio as redis
+    return redis.Redis.from_url(url, decode_responses=True), url
+
+
+async def _run(path: str, name: str, stream: bool) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"timeout": 60})
+    commits = []
+    event.listen(engine.sync_engine, "commit", lambda conn: commits.append(1))
+    session_factory = create_session_factory(engine)
+    repo_factory = RepositoryFactory(RepositoryRegistry.get())
+    make_uow = lambda: UnitOfWork(session_factory, repo_factory)
+
+    redis = drainer = None
+    deps = RegistryParcelDeps()
+    if stream:
+        redis, source = _create_redis()
+        if not isinstance(redis, FakeStreamRedis):
+            await redis.delete(STREAM_KEY)
+        print(f"{'':>8}  redis: {source}")
+        deps = RegistryParcelDeps(registration_buffer=RedisRegistrationStream(redis, key=STREAM_KEY, maxlen=1_000_000))
+        drainer = RegistrationStreamDrainer(
+            client=redis, key=STREAM_KEY, group="bench", consumer="bench-1", uow_factory=make_uow,
+            batch_size=BATCH_SIZE, block_ms=50, isolation_level=RegistryParcelUseCase.isolation_level
+        )
+        drainer.start()
+
+    use_case = RegistryParcelUseCase()
+    latencies: List[float] = []
+
+    async def worker(number: int) -> None:
+        for i in range(REGISTRATIONS_PER_WORKER):
+            dto = ParcelData(
+                parcel_id=str(uuid4()), session_id=f"bench-{number}", name=f"bench-{i}",
+                weight_kg=1.0, type_id=1, cost_adjustment_usd=10.0
+            )
+            started = time.perf_counter()
+            await use_case(dto, make_uow(), deps)
+            latencies.append(time.perf_counter() - started)
+
+    total = WORKERS * REGISTRATIONS_PER_WORKER
+    drained_after: Optional[float] = None
+    try:
+        before = await _count(session_factory)
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(number) for number in range(WORKERS)))
+        elapsed = time.perf_counter() - started
+        if drainer is not None:
+            while await _count(session_factory) - before < total:
+                await asyncio.sleep(0.01)
+            drained_after = time.perf_counter() - started
+    finally:
+        if drainer is not None:
+            await drainer.stop()
+        if redis is not None and not isinstance(redis, FakeStreamRedis):
+            await redis.delete(STREAM_KEY)
+            await redis.aclose()
+        await engine.dispose()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    line = (
+        f"{name:>8}: {total / elapsed:8.1f} registrations/s, p50={quantiles[49] * 1000:.2f} ms, "
+        f"p99={quantiles[98] * 1000:.2f} ms, commits={len(commits)}"
+    )
+    if drained_after is not None:
+        line += f", all rows in DB after {drained_after * 1000:.0f} ms"
+    print(line)
+
+
+async def _count(session_factory) -> int:
+    async with session_factory() as session:
+        return (await session.execute(select(func.count()).select_from(OutboxEvent))).scalar_one()
+
+
+async def main() -> None:
+    logger.remove()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+        await _run(path, "direct", stream=False)
+        await _run(path, "stream", stream=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
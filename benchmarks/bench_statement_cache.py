@@ -0,0 +1,107 @@
+"""
+Бенчмарк: Python CPU на запрос страницы списка и подсчёта посылок — построение дерева
+`select()` на каждый вызов (как было) против выражений, построенных один раз на форму
+запроса (`StatementCache`), где меняются только значения bindparam.
+
+Запускается на SQLite in-memory с небольшой read-моделью: время выполнения SQL мало,
+поэтому разница — это построение выражения и вычисление ключа кеша компиляции.
+Печатает CPU-время процесса на запрос (process_time) и долю попаданий в кеш компиляции.
+
+    PYTHONPATH=. python3 benchmarks/bench_statement_cache.py
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, event, func, insert, or_, select
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelCursor
+from src.parcel_service.infrastructure.db.sql.models import Base, ParcelView
+from src.parcel_service.infrastructure.repository.parcel_combine import ParcelCombinedRepository
+
+SESSIONS = 20
+PARCELS_PER_SESSION = 50
+REQUESTS = 3000
+
+
+class RebuildingRepository(ParcelCombinedRepository):
+    """Прежняя реализация: выражение строится заново на каждый вызов, значения — литералами."""
+
+    async def count(self, session_id: str, has_delivery_price: bool = False, type_id: Optional[int] = None) -> int:
+        stmt = select(func.count()).select_from(ParcelView).where(*_filters(session_id, type_id, has_delivery_price))
+        return (await self._session.execute(stmt)).scalar_one()
+
+    async def list_page(self, session_id, limit, offset, type_id=None, has_delivery_price=False, after=None, fields=None):
+        if after is not None:
+            offset = 0
+        filters = _filters(session_id, type_id, has_delivery_price)
+        stmt = select(*self._list_columns(fields)).where(*filters)
+        if after is not None:
+            stmt = stmt.where(or_(
+                ParcelView.created_at > after.created_at,
+                and_(ParcelView.created_at == after.created_at, ParcelView.parcel_id > after.parcel_id),
+            ))
+        stmt = stmt.order_by(ParcelView.created_at, ParcelView.parcel_id).limit(limit + 1).offset(offset)
+        return (await self._session.execute(stmt)).all()
+
+
+def _filters(session_id, type_id, has_delivery_price):
+    filters = [ParcelView.session_id == session_id]
+    if type_id is not None:
+        filters.append(ParcelView.type_id == type_id)
+    if has_delivery_price:
+        filters.append(ParcelView.has_price == True)
+    return filters
+
+
+async def _fill(engine) -> None:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(ParcelView), [
+            {
+                "parcel_id": f"s{s}-p{i}", "session_id": f"session-{s}", "name": f"Parcel {i}",
+                "weight_kg": 1.0, "type_id": i % 3 + 1, "cost_adjustment_usd": 0.0,
+                "delivery_price_rub": None if i % 2 else 150.0, "has_price": not i % 2,
+                "created_at": start + timedelta(seconds=i), "updated_at": start,
+            }
+            for s in range(SESSIONS) for i in range(PARCELS_PER_SESSION)
+        ])
+
+
+async def _run(engine, name: str, repo_cls) -> None:
+    stats = []
+    listener = lambda conn, cursor, statement, parameters, context, executemany: stats.append(context.cache_hit)
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+
+    async with AsyncSession(engine) as session:
+        repo = repo_cls(session)
+        started = time.process_time()
+        for i in range(REQUESTS):
+            session_id = f"session-{i % SESSIONS}"
+            type_id = i % 3 + 1 if i % 2 else None
+            after = ParcelCursor(created_at=datetime(2025, 1, 1, tzinfo=timezone.utc), parcel_id="s0-p0") if i % 4 == 3 else None
+            await repo.list_page(session_id=session_id, limit=20, offset=i % 5, type_id=type_id, after=after)
+            await repo.count(session_id=session_id, type_id=type_id)
+        elapsed = time.process_time() - started
+
+    event.remove(engine.sync_engine, "before_cursor_execute", listener)
+    hits = sum(1 for stat in stats if stat is CacheStats.CACHE_HIT)
+    print(f"{name:>26}: {elapsed / REQUESTS * 1e6:8.1f} us CPU/request, compiled cache hits {hits}/{len(stats)}")
+
+
+async def main() -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    try:
+        await _fill(engine)
+        await _run(engine, "before (rebuilt select)", RebuildingRepository)
+        await _run(engine, "after (StatementCache)", ParcelCombinedRepository)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
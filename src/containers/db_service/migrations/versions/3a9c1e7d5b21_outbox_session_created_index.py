@@ -0,0 +1,28 @@
+"""outbox session/created index for keyset pagination
+
+Revision ID: 3a9c1e7d5b21
+Revises: 0f40642bc434
+Create Date: 2025-06-20 10:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a9c1e7d5b21'
+down_revision: Union[str, None] = '0f40642bc434'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_outbox_events_session_created', 'outbox_events', ['session_id', 'created_at', 'parcel_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_events_session_created', table_name='outbox_events')
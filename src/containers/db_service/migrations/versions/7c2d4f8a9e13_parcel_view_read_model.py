@@ -0,0 +1,68 @@
+"""parcel_view read model for session parcel lists
+
+Revision ID: 7c2d4f8a9e13
+Revises: 3a9c1e7d5b21
+Create Date: 2025-06-23 14:05:12.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2d4f8a9e13'
+down_revision: Union[str, None] = '3a9c1e7d5b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('parcel_view',
+    sa.Column('parcel_id', sa.String(length=36), nullable=False),
+    sa.Column('session_id', sa.String(length=36), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('weight_kg', sa.Float(), nullable=False),
+    sa.Column('type_id', sa.Integer(), nullable=False),
+    sa.Column('cost_adjustment_usd', sa.Float(), nullable=False),
+    sa.Column('delivery_price_rub', sa.Float(), nullable=True),
+    sa.Column('has_price', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('parcel_id')
+    )
+    op.create_index('ix_parcel_view_session_created', 'parcel_view',
+                    ['session_id', 'created_at', 'parcel_id', 'type_id', 'has_price'], unique=False)
+
+    # Backfill: посылки, уже обработанные воркером
+    op.execute("""
+        INSERT INTO parcel_view (parcel_id, session_id, name, weight_kg, type_id, cost_adjustment_usd,
+                                 delivery_price_rub, has_price, created_at, updated_at)
+        SELECT id, session_id, name, weight_kg, type_id, COALESCE(cost_adjustment_usd, 0),
+               delivery_price_rub, delivery_price_rub IS NOT NULL, created_at, updated_at
+        FROM parcels
+    """)
+
+    # Backfill: зарегистрированные посылки, ещё не дошедшие до воркера
+    op.execute("""
+        INSERT IGNORE INTO parcel_view (parcel_id, session_id, name, weight_kg, type_id, cost_adjustment_usd,
+                                        delivery_price_rub, has_price, created_at, updated_at)
+        SELECT o.parcel_id, o.session_id,
+               JSON_UNQUOTE(JSON_EXTRACT(o.payload, '$.name')),
+               CAST(JSON_EXTRACT(o.payload, '$.weight_kg') AS DOUBLE),
+               CAST(JSON_EXTRACT(o.payload, '$.type_id') AS UNSIGNED),
+               CAST(JSON_EXTRACT(o.payload, '$.cost_adjustment_usd') AS DOUBLE),
+               NULL, FALSE, o.created_at, o.created_at
+        FROM outbox_events o
+        WHERE o.event_type = 'parcel.registered'
+          AND o.parcel_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM parcels p WHERE p.id = o.parcel_id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parcel_view_session_created', table_name='parcel_view')
+    op.drop_table('parcel_view')
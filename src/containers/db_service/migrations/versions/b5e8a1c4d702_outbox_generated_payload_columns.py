@@ -0,0 +1,40 @@
+"""outbox generated payload columns
+
+Revision ID: b5e8a1c4d702
+Revises: 7c2d4f8a9e13
+Create Date: 2025-06-24 09:41:37.556120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e8a1c4d702'
+down_revision: Union[str, None] = '7c2d4f8a9e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # JSON_VALUE ... RETURNING отдаёт SQL NULL для JSON null (в отличие от JSON_EXTRACT),
+    # поэтому колонки корректно хранят нерассчитанную стоимость. parcel_id уже есть как обычная колонка.
+    op.add_column('outbox_events', sa.Column(
+        'type_id', sa.Integer(),
+        sa.Computed("JSON_VALUE(payload, '$.type_id' RETURNING SIGNED)", persisted=True),
+        nullable=True
+    ))
+    op.add_column('outbox_events', sa.Column(
+        'delivery_price_rub', sa.Float(),
+        sa.Computed("JSON_VALUE(payload, '$.delivery_price_rub' RETURNING DOUBLE)", persisted=True),
+        nullable=True
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('outbox_events', 'delivery_price_rub')
+    op.drop_column('outbox_events', 'type_id')
@@ -0,0 +1,30 @@
+"""drop outbox session/created index
+
+Revision ID: e4b7d2a91c58
+Revises: b5e8a1c4d702
+Create Date: 2025-06-26 11:20:53.471902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7d2a91c58'
+down_revision: Union[str, None] = 'b5e8a1c4d702'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Список и подсчёт читают parcel_view (7c2d4f8a9e13): выборок outbox по сессии больше нет,
+    # а индекс только удорожает вставки в outbox_events
+    op.drop_index('ix_outbox_events_session_created', table_name='outbox_events')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_outbox_events_session_created', 'outbox_events', ['session_id', 'created_at', 'parcel_id'], unique=False)
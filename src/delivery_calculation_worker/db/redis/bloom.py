@@ -0,0 +1,52 @@
+import hashlib
+import math
+from typing import Iterable, List
+
+import redis.asyncio as redis
+
+# Должны совпадать с CACHE_BLOOM_KEY / CACHE_BLOOM_CAPACITY / CACHE_BLOOM_ERROR_RATE parcel_service
+BLOOM_KEY = "bloom:parcels"
+BLOOM_CAPACITY = 1_000_000
+BLOOM_ERROR_RATE = 0.01
+
+BLOOM_SIZE_BITS = math.ceil(-BLOOM_CAPACITY * math.log(BLOOM_ERROR_RATE) / (math.log(2) ** 2))
+BLOOM_HASHES = max(1, round(BLOOM_SIZE_BITS / BLOOM_CAPACITY * math.log(2)))
+
+
+def bloom_positions(item: str, size_bits: int = BLOOM_SIZE_BITS, hashes: int = BLOOM_HASHES) -> List[int]:
+    """
+    Позиции битов элемента в фильтре Блума (алгоритм общий с parcel_service).
+
+    :param item: Элемент.
+    :type item: str
+    :param size_bits: Размер битовой карты.
+    :type size_bits: int
+    :param hashes: Количество хеш-функций.
+    :type hashes: int
+    :return: Номера битов.
+    :rtype: List[int]
+    """
+    digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return [(h1 + i * h2) % size_bits for i in range(hashes)]
+
+
+async def add_known_parcels(client: redis.Redis, parcel_ids: Iterable[str], key: str = BLOOM_KEY) -> None:
+    """
+    Добавляет parcel_id в фильтр Блума известных посылок parcel_service одним пайплайном.
+
+    :param client: Redis-клиент кеша.
+    :type client: redis.Redis
+    :param parcel_ids: Идентификаторы посылок.
+    :type parcel_ids: Iterable[str]
+    :param key: Ключ битовой карты.
+    :type key: str
+    """
+    positions = [position for parcel_id in parcel_ids if parcel_id for position in bloom_positions(parcel_id)]
+    if not positions:
+        return
+    async with client.pipeline(transaction=False) as pipe:
+        for position in positions:
+            pipe.setbit(key, position, 1)
+        await pipe.execute()
@@ -0,0 +1,73 @@
+import json
+import time
+from typing import Iterable
+
+import redis.asyncio as redis
+
+from src.delivery_calculation_worker.db.redis.generation import INVALIDATION_CHANNEL
+from src.delivery_calculation_worker.db.sql.models import Parcel
+
+# Должен совпадать с CACHE_DETAIL_TTL parcel_service
+ENTITY_TTL = 6 * 3600
+
+# Пространство имён карточек в локальном кеше parcel_service (CacheNamespace.PARCEL_DETAIL)
+ENTITY_NAMESPACE = "parcel_detail"
+
+# Подпись отсутствующей стоимости в теле карточки (NOT_CALCULATED parcel_service)
+NOT_CALCULATED = "Not calculated"
+
+
+def build_entity_key(session_id: str, parcel_id: str) -> str:
+    """
+    Формирует ключ карточки посылки (формат общий с parcel_service).
+
+    :param session_id: Идентификатор сессии владельца посылки.
+    :type session_id: str
+    :param parcel_id: Идентификатор посылки.
+    :type parcel_id: str
+    :return: Ключ в формате "cache:parcels:<session_id>:<parcel_id>".
+    :rtype: str
+    """
+    return f"cache:parcels:{session_id}:{parcel_id}"
+
+
+def encode_parcel_entity(parcel: Parcel) -> str:
+    """
+    Кодирует карточку посылки в JSON-тело ответа parcel_service (схема ParcelDetailResponse).
+
+    :param parcel: Посылка.
+    :type parcel: Parcel
+    :return: JSON-строка.
+    :rtype: str
+    """
+    return json.dumps({
+        "parcel_id": parcel.id,
+        "name": parcel.name,
+        "weight_kg": float(parcel.weight_kg),
+        "type_id": parcel.type_id,
+        "cost_adjustment_usd": float(parcel.cost_adjustment_usd or 0.0),
+        "delivery_price_rub": str(parcel.delivery_price_rub) if parcel.delivery_price_rub is not None else NOT_CALCULATED,
+    }, ensure_ascii=False, separators=(",", ":"))
+
+
+async def store_parcel_entities(client: redis.Redis, parcels: Iterable[Parcel], ttl: int = ENTITY_TTL) -> None:
+    """
+    Перезаписывает карточки посылок в кеше parcel_service одним пайплайном:
+    по одному ключу на посылку, в формате CacheLoader (`<expiry>;<delta>;<value>`).
+    Для каждой карточки публикуется сообщение инвалидации, чтобы процессы parcel_service
+    сбросили её из локального кеша.
+
+    :param client: Redis-клиент кеша.
+    :type client: redis.Redis
+    :param parcels: Посылки с актуальными данными.
+    :type parcels: Iterable[Parcel]
+    :param ttl: Срок жизни карточки в секундах.
+    :type ttl: int
+    """
+    expiry = time.time() + ttl
+    async with client.pipeline(transaction=False) as pipe:
+        for parcel in parcels:
+            key = build_entity_key(parcel.session_id, parcel.id)
+            pipe.set(key, f"{expiry:.3f};0.0000;{encode_parcel_entity(parcel)}", ex=ttl)
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps({"namespace": ENTITY_NAMESPACE, "key": key}))
+        await pipe.execute()
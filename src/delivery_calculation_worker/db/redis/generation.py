@@ -0,0 +1,66 @@
+import json
+from typing import Iterable
+
+import redis.asyncio as redis
+
+# Должен совпадать с CACHE_GENERATION_TTL parcel_service и превышать TTL кешируемых ответов
+GENERATION_TTL = 7 * 24 * 3600
+
+# Канал инвалидации локальных кешей parcel_service (CACHE_INVALIDATION_CHANNEL)
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Должен совпадать с DATABASE_READ_YOUR_WRITES_TTL parcel_service
+RECENT_WRITE_TTL = 5
+
+
+def build_generation_key(session_id: str) -> str:
+    """
+    Формирует ключ счётчика поколений кеша сессии (формат общий с parcel_service).
+
+    :param session_id: Идентификатор сессии.
+    :type session_id: str
+    :return: Ключ в формате "cache:gen:<session_id>".
+    :rtype: str
+    """
+    return f"cache:gen:{session_id}"
+
+
+def build_recent_write_key(session_id: str) -> str:
+    """
+    Формирует ключ маркера недавней записи сессии (формат общий с parcel_service).
+
+    :param session_id: Идентификатор сессии.
+    :type session_id: str
+    :return: Ключ в формате "db:written:<session_id>".
+    :rtype: str
+    """
+    return f"db:written:{session_id}"
+
+
+async def bump_session_generations(client: redis.Redis, session_ids: Iterable[str], ttl: int = GENERATION_TTL) -> None:
+    """
+    Увеличивает поколение кеша для каждой переданной сессии одним пайплайном,
+    после чего закешированные parcel_service страницы списков этих сессий не отдаются
+    (карточки посылок перезаписываются отдельно, см. `store_parcel_entities`).
+    Для каждой сессии публикуется сообщение инвалидации, чтобы процессы parcel_service
+    сбросили поколение из локального кеша, и ставится маркер недавней записи: пока он жив,
+    parcel_service читает посылки сессии с основного сервера, а не с отстающей реплики.
+
+    :param client: Redis-клиент кеша.
+    :type client: redis.Redis
+    :param session_ids: Идентификаторы сессий.
+    :type session_ids: Iterable[str]
+    :param ttl: Срок жизни счётчика в секундах.
+    :type ttl: int
+    """
+    sessions = {session_id for session_id in session_ids if session_id}
+    if not sessions:
+        return
+    async with client.pipeline(transaction=False) as pipe:
+        for session_id in sessions:
+            key = build_generation_key(session_id)
+            pipe.set(build_recent_write_key(session_id), "1", ex=RECENT_WRITE_TTL)
+            pipe.incr(key)
+            pipe.expire(key, ttl)
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps({"namespace": "generation", "key": session_id}))
+        await pipe.execute()
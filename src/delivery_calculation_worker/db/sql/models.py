@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import DateTime, Float, String
+from sqlalchemy import Boolean, DateTime, Float, Index, Integer, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -48,3 +48,41 @@ class Parcel(Base):
                                                  onupdate=lambda: datetime.now(timezone.utc))
 
 
+class ParcelView(Base):
+    """
+    Read-модель посылок сессии для списочных запросов.
+
+    Заполняется при регистрации посылки в одной транзакции с outbox-событием и обновляется
+    воркером расчёта при установке стоимости доставки. Заменяет объединение `parcels`
+    и `outbox_events` с извлечением полей из JSON.
+
+    :ivar parcel_id: Уникальный идентификатор посылки (UUID).
+    :ivar session_id: Идентификатор пользовательской сессии.
+    :ivar name: Название посылки.
+    :ivar weight_kg: Вес в килограммах.
+    :ivar type_id: Идентификатор типа посылки.
+    :ivar cost_adjustment_usd: Стоимость содержимого в долларах.
+    :ivar delivery_price_rub: Рассчитанная стоимость доставки в рублях (если рассчитана).
+    :ivar has_price: Рассчитана ли стоимость доставки.
+    :ivar created_at: Дата регистрации посылки.
+    :ivar updated_at: Дата последнего изменения.
+
+    :index ix_parcel_view_session_created: Индекс по session_id, created_at, parcel_id, type_id и has_price.
+    """
+    __tablename__ = "parcel_view"
+
+    parcel_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    session_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    weight_kg: Mapped[float] = mapped_column(Float, nullable=False)
+    type_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    cost_adjustment_usd: Mapped[float] = mapped_column(Float, nullable=False)
+    delivery_price_rub: Mapped[Optional[float]] = mapped_column(Float, nullable=True, default=None)
+    has_price: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                                                 onupdate=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("ix_parcel_view_session_created", "session_id", "created_at", "parcel_id", "type_id", "has_price"),
+    )
@@ -0,0 +1,16 @@
+# Тариф доставки. Формула общая с parcel_service (domain/services/pricing.py), который
+# рассчитывает стоимость при регистрации: при изменении тарифа она меняется в обоих сервисах
+WEIGHT_RATE_USD_PER_KG = 0.5
+COST_RATE = 0.01
+
+
+def calculate_delivery_price(weight_kg: float, cost_adjustment_usd: float, usd_to_rub: float) -> float:
+    """
+    Рассчитывает стоимость доставки посылки в рублях.
+
+    :param weight_kg: Вес посылки в килограммах.
+    :param cost_adjustment_usd: Стоимость содержимого в долларах США.
+    :param usd_to_rub: Курс USD → RUB.
+    :return: Стоимость доставки в рублях.
+    """
+    return (weight_kg * WEIGHT_RATE_USD_PER_KG + cost_adjustment_usd * COST_RATE) * usd_to_rub
@@ -4,10 +4,14 @@ from redis import Redis
 from abc import ABC, abstractmethod
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from sqlalchemy import update, insert, select
-from src.delivery_calculation_worker.db.sql.models import Parcel
+from src.delivery_calculation_worker.db.sql.models import Parcel, ParcelView
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
+from datetime import datetime, timezone
 from src.delivery_calculation_worker.services.currency import CurrencyService
+from src.delivery_calculation_worker.services.pricing import calculate_delivery_price
+from src.delivery_calculation_worker.db.redis.bloom import add_known_parcels
+from src.delivery_calculation_worker.db.redis.entity import store_parcel_entities
+from src.delivery_calculation_worker.db.redis.generation import bump_session_generations
 
 
 class BaseStrategy(ABC):
@@ -34,9 +38,85 @@ class BaseStrategy(ABC):
         """
         pass
 
+    async def sync_parcel_view(self, parcel: Parcel) -> None:
+        """
+        Переносит стоимость доставки посылки в read-модель `parcel_view`.
+
+        Если записи нет (посылка зарегистрирована до появления read-модели), она создаётся
+        из данных посылки. Изменения фиксируются вместе с транзакцией стратегии.
+
+        :param parcel: Посылка с актуальной стоимостью доставки.
+        """
+        now = datetime.now(timezone.utc)
+        result = await self.session.execute(
+            update(ParcelView)
+            .where(ParcelView.parcel_id == parcel.id)
+            .values(
+                delivery_price_rub=parcel.delivery_price_rub,
+                has_price=parcel.delivery_price_rub is not None,
+                updated_at=now
+            )
+        )
+        if result.rowcount:
+            return
+
+        self.session.add(ParcelView(
+            parcel_id=parcel.id,
+            session_id=parcel.session_id,
+            name=parcel.name,
+            weight_kg=parcel.weight_kg,
+            type_id=parcel.type_id,
+            cost_adjustment_usd=parcel.cost_adjustment_usd,
+            delivery_price_rub=parcel.delivery_price_rub,
+            has_price=parcel.delivery_price_rub is not None,
+            created_at=parcel.created_at or now,
+            updated_at=now
+        ))
+        logger.info("Parcel {} was missing in parcel_view — inserted.", parcel.id)
+
+    async def invalidate_sessions(self, session_ids: set) -> None:
+        """
+        Увеличивает поколение кеша сессий, посылки которых изменились.
+        Ошибка Redis не отменяет уже зафиксированные изменения и только логируется.
+
+        :param session_ids: Идентификаторы сессий.
+        """
+        try:
+            await bump_session_generations(self.redis, session_ids)
+        except Exception as e:
+            logger.warning("Could not bump cache generation for sessions {}: {}", session_ids, e)
+
+    async def refresh_entities(self, parcels: list) -> None:
+        """
+        Перезаписывает карточки изменённых посылок в кеше parcel_service (по ключу на посылку).
+        Ошибка Redis только логируется.
+
+        :param parcels: Посылки с актуальной стоимостью доставки.
+        """
+        try:
+            await store_parcel_entities(self.redis, parcels)
+        except Exception as e:
+            logger.warning("Could not refresh cached parcels {}: {}", [parcel.id for parcel in parcels], e)
+
+    async def remember_parcels(self, parcel_ids: set) -> None:
+        """
+        Добавляет посылки в фильтр Блума известных parcel_id (страховка на случай,
+        если parcel_service не смог добавить их при регистрации).
+        Ошибка Redis только логируется.
+
+        :param parcel_ids: Идентификаторы посылок.
+        """
+        try:
+            await add_known_parcels(self.redis, parcel_ids)
+        except Exception as e:
+            logger.warning("Could not add parcels {} to bloom filter: {}", parcel_ids, e)
+
 class ParcelRegisteredStrategy(BaseStrategy):
     """
     Стратегия обработки события 'parcel.registered' — расчёт цены доставки и сохранение посылки.
+
+    Если parcel_service уже рассчитал стоимость при регистрации (delivery_price_rub в payload),
+    она принимается как есть, без запроса курса.
     """
     def __init__(self, session, mongo_db, redis):
         super().__init__(session, mongo_db, redis)
@@ -50,25 +130,29 @@ class ParcelRegisteredStrategy(BaseStrategy):
             logger.warning("Empty payload in event")
             return
 
-        try:
-            usd_to_rub = await self.currency.get_usd_rate()
-        except Exception as e:
-            logger.warning("Could not fetch USD rate: {}", e)
-            usd_to_rub = None
-
         parcel_id = parcel_data["parcel_id"]
         weight = parcel_data["weight_kg"]
         cost_usd = parcel_data["cost_adjustment_usd"]
 
-        delivery_price = None
-        if usd_to_rub:
-            delivery_price = (weight * 0.5 + cost_usd * 0.01) * usd_to_rub
+        delivery_price = parcel_data.get("delivery_price_rub")
+        if delivery_price is None:
+            try:
+                usd_to_rub = await self.currency.get_usd_rate()
+            except Exception as e:
+                logger.warning("Could not fetch USD rate: {}", e)
+                usd_to_rub = None
+
+            if usd_to_rub:
+                delivery_price = calculate_delivery_price(weight, cost_usd, usd_to_rub)
+        else:
+            logger.debug("Using delivery price calculated at registration for parcel {}: {}", parcel_id, delivery_price)
 
         # Проверяем: если уже есть, то просто выходим
         result = await self.session.execute(select(Parcel).where(Parcel.id == parcel_id))
         parcel = result.scalar_one_or_none()
         if parcel is not None:
             logger.info("Parcel {} already exists — skipping insert.", parcel_id)
+            await self.remember_parcels({parcel_id})
             return
 
         # Вставляем новую посылку
@@ -82,9 +166,14 @@ class ParcelRegisteredStrategy(BaseStrategy):
             delivery_price_rub=delivery_price
         )
         self.session.add(new_parcel)
+        await self.sync_parcel_view(new_parcel)
         await self.session.commit()
         logger.info("Inserted new parcel {} with delivery price: {}", parcel_id, delivery_price)
 
+        await self.refresh_entities([new_parcel])
+        await self.invalidate_sessions({parcel_data["session_id"]})
+        await self.remember_parcels({parcel_id})
+
         # Запись в MongoDB лог, только если delivery_price посчитан
         if delivery_price is not None:
             log_doc = {
@@ -137,8 +226,9 @@ class ParcelRecalculateStrategy(BaseStrategy):
             weight = parcel.weight_kg
             cost_usd = parcel.cost_adjustment_usd
 
-            delivery_price = (weight * 0.5 + cost_usd * 0.01) * usd_to_rub
+            delivery_price = calculate_delivery_price(weight, cost_usd, usd_to_rub)
             parcel.delivery_price_rub = delivery_price
+            await self.sync_parcel_view(parcel)
 
             updated_count += 1
 
@@ -161,6 +251,9 @@ class ParcelRecalculateStrategy(BaseStrategy):
         await self.session.commit()
         logger.info("Recalculated and updated {} parcels.", updated_count)
 
+        await self.refresh_entities(parcels)
+        await self.invalidate_sessions({parcel.session_id for parcel in parcels})
+
 
 STRATEGY_REGISTRY: Dict[str, Type[BaseStrategy]] = {
     "parcel.registered": ParcelRegisteredStrategy,
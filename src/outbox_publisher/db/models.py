@@ -1,7 +1,9 @@
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import JSON, Boolean, DateTime, String
+from sqlalchemy import JSON, Boolean, Computed, DateTime, Float, Integer, String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 class Base(DeclarativeBase):
@@ -10,6 +12,32 @@ class Base(DeclarativeBase):
     """
     pass
 
+
+class JsonValue(ColumnElement):
+    """
+    Значение из JSON-колонки `payload` для генерируемых колонок: в MySQL —
+    `JSON_VALUE(payload, path RETURNING ...)`, как в миграции b5e8a1c4d702 (SQL NULL для JSON null),
+    в SQLite (тесты) — `json_extract`, у которого та же семантика для JSON null.
+
+    :ivar path: JSON-путь значения.
+    :ivar returning: Тип результата JSON_VALUE (например, SIGNED или DOUBLE).
+    """
+    inherit_cache = True
+
+    def __init__(self, path: str, returning: str):
+        self.path = path
+        self.returning = returning
+
+
+@compiles(JsonValue)
+def _compile_json_value(element: JsonValue, compiler, **kw) -> str:
+    return f"JSON_VALUE(payload, '{element.path}' RETURNING {element.returning})"
+
+
+@compiles(JsonValue, "sqlite")
+def _compile_json_value_sqlite(element: JsonValue, compiler, **kw) -> str:
+    return f"json_extract(payload, '{element.path}')"
+
 class OutboxEvent(Base):
     """
     Модель Outbox-события (реализация паттерна Outbox для надёжной публикации событий).
@@ -22,6 +50,8 @@ class OutboxEvent(Base):
     :ivar applied: Было ли событие уже обработано.
     :ivar created_at: Дата создания события.
     :ivar published_at: Дата публикации события во внешний брокер (если применимо).
+    :ivar type_id: Тип посылки из payload (хранимая генерируемая колонка).
+    :ivar delivery_price_rub: Стоимость доставки из payload (хранимая генерируемая колонка).
     """
     __tablename__ = "outbox_events"
 
@@ -33,3 +63,9 @@ class OutboxEvent(Base):
     applied: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     published_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    type_id: Mapped[Optional[int]] = mapped_column(
+        Integer, Computed(JsonValue("$.type_id", "SIGNED"), persisted=True), nullable=True
+    )
+    delivery_price_rub: Mapped[Optional[float]] = mapped_column(
+        Float, Computed(JsonValue("$.delivery_price_rub", "DOUBLE"), persisted=True), nullable=True
+    )
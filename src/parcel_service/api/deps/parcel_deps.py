@@ -1,6 +1,9 @@
 from src.parcel_service.domain.interfaces.usecase import IUseCase
 from src.parcel_service.application.use_cases.parcels.get_parcels_for_id import GetParcelsForIdUseCase
+from src.parcel_service.application.use_cases.parcels.get_parcels_batch import GetParcelsBatchUseCase
+from src.parcel_service.application.use_cases.parcels.export_parcels import ExportParcelsUseCase
 from src.parcel_service.application.use_cases.parcels.registry_parcel import RegistryParcelUseCase
+from src.parcel_service.application.use_cases.parcels.bulk_registry_parcel import BulkRegistryParcelUseCase
 from src.parcel_service.application.use_cases.parcels.get_parcels_list import GetParcelsListUseCase
 from src.parcel_service.application.use_cases.parcels.get_all_type_parcels import GetAllTypeParcelsUseCase
 from src.parcel_service.application.use_cases.parcels.bind_company import BindCompanyUseCase
@@ -16,6 +19,16 @@ def get_uc_registry() -> IUseCase:
     return RegistryParcelUseCase()
 
 
+def get_uc_bulk_registry() -> IUseCase:
+    """
+    Use case для массовой регистрации посылок.
+
+    :return: Экземпляр use case для массовой регистрации посылок.
+    :rtype: IUseCase
+    """
+    return BulkRegistryParcelUseCase()
+
+
 def get_uc_parcels_for_id() -> IUseCase:
     """
     Use case для получения информации о посылке по её ID.
@@ -26,6 +39,16 @@ def get_uc_parcels_for_id() -> IUseCase:
     return GetParcelsForIdUseCase()
 
 
+def get_uc_parcels_batch() -> IUseCase:
+    """
+    Use case для пакетного получения информации о посылках по списку ID.
+
+    :return: Экземпляр use case для пакетного получения посылок.
+    :rtype: IUseCase
+    """
+    return GetParcelsBatchUseCase()
+
+
 def get_uc_parcels_list_for_session_id() -> IUseCase:
     """
     Use case для получения списка посылок по session_id с поддержкой фильтрации и пагинации.
@@ -55,3 +78,12 @@ def get_uc_bind_compony() -> IUseCase:
     """
     return BindCompanyUseCase()
 
+
+def get_uc_export_parcels() -> IUseCase:
+    """
+    Use case для потоковой выгрузки всех посылок сессии.
+
+    :return: Экземпляр use case выгрузки посылок.
+    :rtype: IUseCase
+    """
+    return ExportParcelsUseCase()
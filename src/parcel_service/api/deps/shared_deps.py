@@ -1,12 +1,18 @@
-from typing import Callable
+from typing import Callable, Optional
 
+from fastapi import Header
 from redis.asyncio import Redis
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.parcel_service.core.config import CacheSettings
 from src.parcel_service.core.container import AppContainer
-from src.parcel_service.domain.interfaces.uow import IUnitOfWork
-from src.parcel_service.infrastructure.unitofwork.uow import UnitOfWork
+from src.parcel_service.domain.interfaces.cache import ICacheGeneration, IParcelFilter, IRecentWrites, IUsdRate
+from src.parcel_service.infrastructure.cache.loader import CacheLoader
+from src.parcel_service.infrastructure.cache.entity import ParcelEntityCache
+from src.parcel_service.infrastructure.cache.tiered import TieredCache
+from src.parcel_service.domain.interfaces.uow import IGroupCommit, IRegistrationBuffer, IUnitOfWork
+from src.parcel_service.infrastructure.unitofwork.uow import ReadOnlyUnitOfWork, UnitOfWork
 
 def build_session_cash_key(session_id: str = "*") -> str:
     """
@@ -67,6 +73,106 @@ def get_redis_cache() -> Redis:
     return AppContainer.redis_cash()
 
 
+def get_cache() -> TieredCache:
+    """
+    Получает двухуровневый кеш (локальный кеш процесса перед Redis).
+
+    :return: Двухуровневый кеш.
+    :rtype: TieredCache
+    """
+    return AppContainer.cache()
+
+
+def get_cache_loader() -> CacheLoader:
+    """
+    Получает загрузчик кеша (single-flight, раннее обновление, jitter TTL).
+
+    :return: Загрузчик кеша.
+    :rtype: CacheLoader
+    """
+    return AppContainer.cache_loader()
+
+
+def get_parcel_entities() -> ParcelEntityCache:
+    """
+    Получает кеш карточек посылок, общий для карточки, списка и пакетного запроса.
+
+    :return: Кеш карточек посылок.
+    :rtype: ParcelEntityCache
+    """
+    return AppContainer.parcel_entities()
+
+
+def get_cache_settings() -> CacheSettings:
+    """
+    Получает настройки кеширования (TTL записей).
+
+    :return: Настройки кеша.
+    :rtype: CacheSettings
+    """
+    return AppContainer.cache_settings()
+
+
+def get_cache_generation() -> ICacheGeneration:
+    """
+    Получает счётчик поколений кеша сессий.
+
+    :return: Счётчик поколений.
+    :rtype: ICacheGeneration
+    """
+    return AppContainer.cache_generation()
+
+
+def get_parcel_filter() -> IParcelFilter:
+    """
+    Получает фильтр Блума известных parcel_id.
+
+    :return: Фильтр известных посылок.
+    :rtype: IParcelFilter
+    """
+    return AppContainer.parcel_filter()
+
+
+def get_recent_writes() -> IRecentWrites:
+    """
+    Получает маркеры недавних записей сессий (read-your-writes при чтении с реплики).
+
+    :return: Маркеры недавних записей.
+    :rtype: IRecentWrites
+    """
+    return AppContainer.recent_writes()
+
+
+def get_usd_rate() -> IUsdRate:
+    """
+    Получает закешированный курс USD → RUB для расчёта стоимости доставки при регистрации.
+
+    :return: Закешированный курс.
+    :rtype: IUsdRate
+    """
+    return AppContainer.usd_rate()
+
+
+def get_group_commit() -> Optional[IGroupCommit]:
+    """
+    Получает групповую фиксацию регистраций посылок.
+
+    :return: Групповая фиксация или None, если она выключена.
+    :rtype: Optional[IGroupCommit]
+    """
+    return AppContainer.group_commit()
+
+
+def get_registration_buffer() -> Optional[IRegistrationBuffer]:
+    """
+    Получает буфер регистраций в Redis Stream.
+
+    :return: Буфер регистраций или None, если регистрации пишутся в БД напрямую.
+    :rtype: Optional[IRegistrationBuffer]
+    """
+    return AppContainer.registration_buffer()
+
+
 def get_mongo_db() -> AsyncIOMotorDatabase:
     """
     Получает экземпляр MongoDB клиента.
@@ -88,3 +194,26 @@ def get_uow() -> IUnitOfWork:
     repo_factory = AppContainer.repo_factory()
     return UnitOfWork(session_factory=session_factory, repository_factory=repo_factory)
 
+
+
+def get_read_uow(x_session_id: Optional[str] = Header(None)) -> IUnitOfWork:
+    """
+    Получает Unit of Work только для чтения: без коммита, на фабрике сессий чтения.
+
+    Если настроена реплика, сессия пользователя, недавно записывавшая данные,
+    читает с основного сервера. Проверка маркера выполняется только при первом
+    обращении к БД, поэтому ответы из кеша её не требуют.
+
+    :param x_session_id: Идентификатор сессии пользователя, из заголовка запроса.
+    :type x_session_id: Optional[str]
+    :return: Экземпляр Unit of Work для чтения.
+    :rtype: IUnitOfWork
+    """
+    replica = AppContainer.read_replica()
+    return ReadOnlyUnitOfWork(
+        session_factory=AppContainer.read_session_factory(),
+        repository_factory=AppContainer.repo_factory(),
+        primary_session_factory=AppContainer.session_factory() if replica else None,
+        recent_writes=AppContainer.recent_writes() if replica else None,
+        session_id=x_session_id
+    )
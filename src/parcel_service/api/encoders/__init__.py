@@ -0,0 +1,11 @@
+from .parcel import (
+    CSV_COLUMNS, CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE, NOT_CALCULATED, decode_parcel_id_page, encode_parcel_batch,
+    encode_parcel_csv, encode_parcel_detail, encode_parcel_id_page, encode_parcel_list, encode_parcel_ndjson,
+    encode_parcel_page, json_response, project_parcel_body
+)
+
+__all__ = [
+    "CSV_COLUMNS", "CSV_MEDIA_TYPE", "NDJSON_MEDIA_TYPE", "NOT_CALCULATED", "decode_parcel_id_page", "encode_parcel_batch",
+    "encode_parcel_csv", "encode_parcel_detail", "encode_parcel_id_page", "encode_parcel_list", "encode_parcel_ndjson",
+    "encode_parcel_page", "json_response", "project_parcel_body"
+]
@@ -0,0 +1,282 @@
+import csv
+import hashlib
+import io
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import orjson
+from fastapi import Response
+
+from src.parcel_service.domain.constants.parcel import NOT_CALCULATED
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelDetailQueryList, ParcelDetailResult
+
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+CSV_COLUMNS = ("parcel_id", "name", "weight_kg", "type_id", "cost_adjustment_usd", "delivery_price_rub")
+
+# Ответы сессии (карточка, список) клиент может хранить, но перед использованием
+# обязан перепроверить по ETag: при неизменных данных это ответ 304 без тела
+SESSION_CACHE_CONTROL = "private, no-cache"
+
+def _price(item: ParcelDetailResult) -> str:
+    return str(item.delivery_price_rub) if item.delivery_price_rub is not None else NOT_CALCULATED
+
+
+# Кодирование отдельных полей карточки для неполного набора полей (fields)
+_FIELD_ENCODERS: Dict[str, Callable[[ParcelDetailResult], Any]] = {
+    "parcel_id": lambda item: item.parcel_id,
+    "name": lambda item: item.name,
+    "weight_kg": lambda item: float(item.weight_kg),
+    "type_id": lambda item: item.type_id,
+    "cost_adjustment_usd": lambda item: float(item.cost_adjustment_usd),
+    "delivery_price_rub": _price,
+}
+
+
+def _detail_body(item: ParcelDetailResult, fields: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+    """
+    Тело карточки посылки в формате ParcelDetailResponse.
+
+    :param item: Результат UseCase по посылке.
+    :type item: ParcelDetailResult
+    :param fields: Поля карточки (None — все).
+    :type fields: Optional[Tuple[str, ...]]
+    :return: Словарь, готовый к сериализации.
+    :rtype: Dict[str, Any]
+    """
+    if fields is not None:
+        return {field: _FIELD_ENCODERS[field](item) for field in fields}
+    return {
+        "parcel_id": item.parcel_id,
+        "name": item.name,
+        "weight_kg": float(item.weight_kg),
+        "type_id": item.type_id,
+        "cost_adjustment_usd": float(item.cost_adjustment_usd),
+        "delivery_price_rub": _price(item),
+    }
+
+
+def encode_parcel_detail(item: ParcelDetailResult, fields: Optional[Tuple[str, ...]] = None) -> str:
+    """
+    Кодирует карточку посылки в итоговое JSON-тело ответа (схема ParcelDetailResponse).
+
+    Тело строится один раз без Pydantic-моделей: оно же кладётся в кеш
+    и отдаётся клиенту как есть.
+
+    :param item: Результат UseCase по посылке.
+    :type item: ParcelDetailResult
+    :param fields: Поля карточки (None — все).
+    :type fields: Optional[Tuple[str, ...]]
+    :return: JSON-строка.
+    :rtype: str
+    """
+    return orjson.dumps(_detail_body(item, fields)).decode()
+
+
+def encode_parcel_list(result: ParcelDetailQueryList, fields: Optional[Tuple[str, ...]] = None) -> str:
+    """
+    Кодирует страницу посылок в итоговое JSON-тело ответа (схема ParcelListResponse).
+
+    :param result: Результат UseCase списка посылок.
+    :type result: ParcelDetailQueryList
+    :param fields: Поля карточек (None — все).
+    :type fields: Optional[Tuple[str, ...]]
+    :return: JSON-строка.
+    :rtype: str
+    """
+    return encode_parcel_page(
+        [encode_parcel_detail(item, fields) for item in result.items], result.total, result.next_cursor, result.has_more
+    )
+
+
+def project_parcel_body(body: str, fields: Optional[Tuple[str, ...]]) -> str:
+    """
+    Оставляет в готовом JSON-теле карточки только поля `fields`.
+
+    :param body: JSON-тело карточки (схема ParcelDetailResponse).
+    :type body: str
+    :param fields: Поля карточки (None — тело возвращается как есть).
+    :type fields: Optional[Tuple[str, ...]]
+    :return: JSON-строка.
+    :rtype: str
+    """
+    if fields is None:
+        return body
+    data = orjson.loads(body)
+    return orjson.dumps({field: data[field] for field in fields}).decode()
+
+
+def encode_parcel_id_page(result: ParcelDetailQueryList) -> str:
+    """
+    Кодирует страницу посылок без карточек: только parcel_id в порядке выдачи
+    и поля пагинации. Карточки хранятся в кеше отдельно, по одной на посылку.
+
+    :param result: Результат UseCase списка посылок.
+    :type result: ParcelDetailQueryList
+    :return: JSON-строка.
+    :rtype: str
+    """
+    return orjson.dumps({
+        "ids": [item.parcel_id for item in result.items],
+        "total": result.total,
+        "next_cursor": result.next_cursor,
+        "has_more": result.has_more,
+    }).decode()
+
+
+def decode_parcel_id_page(payload: str) -> Dict[str, Any]:
+    """
+    Разбирает страницу, закодированную `encode_parcel_id_page`.
+
+    :param payload: JSON-строка.
+    :type payload: str
+    :return: Словарь с ключами ids, total, next_cursor, has_more.
+    :rtype: Dict[str, Any]
+    """
+    return orjson.loads(payload)
+
+
+def encode_parcel_page(items: List[str], total: Optional[int], next_cursor: Optional[str], has_more: bool) -> str:
+    """
+    Собирает тело страницы (схема ParcelListResponse) из уже закодированных карточек.
+
+    :param items: JSON-тела карточек в порядке выдачи.
+    :type items: List[str]
+    :param total: Общее количество записей (None, если не считалось).
+    :type total: Optional[int]
+    :param next_cursor: Курсор следующей страницы.
+    :type next_cursor: Optional[str]
+    :param has_more: Есть ли следующая страница.
+    :type has_more: bool
+    :return: JSON-строка.
+    :rtype: str
+    """
+    return (
+        '{"items":[' + ",".join(items) + "],"
+        '"total":' + orjson.dumps(total).decode() + ","
+        '"next_cursor":' + orjson.dumps(next_cursor).decode() + ","
+        '"has_more":' + orjson.dumps(has_more).decode() + "}"
+    )
+
+
+def encode_parcel_batch(items: List[str], not_found: List[str], access_denied: List[str]) -> str:
+    """
+    Собирает тело пакетного ответа (схема ParcelBatchResponse) из уже закодированных карточек.
+
+    Карточки берутся как есть из кеша или из `encode_parcel_detail`, без повторного разбора.
+
+    :param items: JSON-тела карточек в порядке запроса.
+    :type items: List[str]
+    :param not_found: Идентификаторы отсутствующих посылок.
+    :type not_found: List[str]
+    :param access_denied: Идентификаторы посылок других сессий.
+    :type access_denied: List[str]
+    :return: JSON-строка.
+    :rtype: str
+    """
+    return (
+        '{"items":[' + ",".join(items) + "],"
+        '"not_found":' + orjson.dumps(not_found).decode() + ","
+        '"access_denied":' + orjson.dumps(access_denied).decode() + "}"
+    )
+
+
+def encode_parcel_ndjson(items: List[ParcelDetailResult]) -> bytes:
+    """
+    Кодирует порцию посылок в NDJSON: по одной карточке (схема ParcelDetailResponse) на строку.
+
+    :param items: Посылки порции.
+    :type items: List[ParcelDetailResult]
+    :return: Байты порции, каждая строка завершается переводом строки.
+    :rtype: bytes
+    """
+    return b"".join(orjson.dumps(_detail_body(item), option=orjson.OPT_APPEND_NEWLINE) for item in items)
+
+
+def encode_parcel_csv(items: List[ParcelDetailResult], header: bool = False) -> bytes:
+    """
+    Кодирует порцию посылок в CSV (колонки CSV_COLUMNS).
+
+    :param items: Посылки порции.
+    :type items: List[ParcelDetailResult]
+    :param header: Добавить строку заголовка (для первой порции).
+    :type header: bool
+    :return: Байты порции в UTF-8.
+    :rtype: bytes
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(CSV_COLUMNS)
+    writer.writerows(
+        [body[column] for column in CSV_COLUMNS]
+        for body in map(_detail_body, items)
+    )
+    return buffer.getvalue().encode()
+
+
+def json_response(payload: str, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Оборачивает готовое JSON-тело в Response без повторной валидации и сериализации FastAPI.
+
+    :param payload: Закодированное JSON-тело.
+    :type payload: str
+    :param status_code: HTTP-статус ответа.
+    :type status_code: int
+    :param headers: Дополнительные заголовки ответа.
+    :type headers: Optional[Dict[str, str]]
+    :return: Ответ с телом как есть.
+    :rtype: Response
+    """
+    return Response(content=payload, status_code=status_code, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+def body_etag(payload: str) -> str:
+    """
+    Сильный ETag готового JSON-тела: хеш blake2b от его байтов. Тело собирается
+    из кешированных карточек, поэтому ETag меняется ровно тогда, когда меняется ответ.
+
+    :param payload: Закодированное JSON-тело.
+    :type payload: str
+    :return: ETag в кавычках.
+    :rtype: str
+    """
+    return f'"{hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Проверяет заголовок If-None-Match (слабое сравнение, RFC 9110: префикс W/ не учитывается).
+
+    :param if_none_match: Значение заголовка If-None-Match (список ETag через запятую или `*`).
+    :type if_none_match: Optional[str]
+    :param etag: ETag текущего ответа.
+    :type etag: str
+    :return: True, если у клиента актуальная версия.
+    :rtype: bool
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def conditional_json_response(payload: str, if_none_match: Optional[str]) -> Response:
+    """
+    Ответ на условный GET ответа сессии: 304 без тела, если ETag клиента совпадает
+    с ETag тела, иначе тело с ETag. В обоих случаях выставляются Cache-Control
+    (SESSION_CACHE_CONTROL) и `Vary: X-Session-Id`.
+
+    :param payload: Закодированное JSON-тело.
+    :type payload: str
+    :param if_none_match: Значение заголовка If-None-Match запроса.
+    :type if_none_match: Optional[str]
+    :return: Ответ 304 или 200.
+    :rtype: Response
+    """
+    etag = body_etag(payload)
+    headers = {"ETag": etag, "Cache-Control": SESSION_CACHE_CONTROL, "Vary": "X-Session-Id"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return json_response(payload, headers=headers)
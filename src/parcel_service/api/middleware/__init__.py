@@ -0,0 +1,31 @@
+from fastapi import FastAPI
+from loguru import logger
+
+from src.parcel_service.api.middleware.idempotency import IdempotencyMiddleware
+from src.parcel_service.core.config import Settings
+from src.parcel_service.core.container import AppContainer
+
+
+def register_middlewares(app: FastAPI, settings: Settings) -> None:
+    """
+    Регистрирует middleware приложения.
+
+    Включает:
+    - Идемпотентные запросы по заголовку Idempotency-Key (если включены)
+
+    :param app: FastAPI-приложение.
+    :type app: FastAPI
+    :param settings: Настройки приложения.
+    :type settings: Settings
+    """
+    logger.info("Reg middlewares")
+
+    if settings.idempotency.enabled:
+        app.add_middleware(
+            IdempotencyMiddleware,
+            store=AppContainer.idempotency_store(),
+            wait_timeout=settings.idempotency.wait_timeout,
+            poll_interval=settings.idempotency.poll_interval,
+            max_key_length=settings.idempotency.max_key_length
+        )
+        logger.info("Idempotency middleware enabled")
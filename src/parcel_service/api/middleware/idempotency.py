@@ -0,0 +1,246 @@
+import asyncio
+import hashlib
+import json
+from typing import List, Optional, Tuple
+
+from loguru import logger
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.parcel_service.core.metrics.metrics import IDEMPOTENCY_REQUESTS
+from src.parcel_service.infrastructure.cache.idempotency import IdempotencyRecord, RedisIdempotencyStore, build_idempotency_key
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "idempotent-replayed"
+
+# Заголовки, которые сервер выставляет заново при каждом ответе
+_SKIP_HEADERS = frozenset({"content-length", "date", "server"})
+
+
+class IdempotencyInProgress(Exception):
+    """
+    Запрос с тем же ключом ещё выполняется, ответ не получен за время ожидания.
+    """
+
+
+class IdempotencyKeyReused(Exception):
+    """
+    Ключ уже использован для запроса с другим телом или другим путём.
+    """
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI-middleware идемпотентных запросов по заголовку Idempotency-Key.
+
+    Первый запрос с ключом резервирует его в Redis (SET NX), выполняется и сохраняет
+    ответ на `ttl` хранилища; ответы 5xx не сохраняются, и резерв снимается, чтобы
+    повтор выполнился заново. Повтор с тем же ключом получает сохранённый ответ одним GET
+    (с заголовком `Idempotent-Replayed: true`), не доходя до обработчика. Конкурентный
+    дубликат ждёт ответа первого запроса до `wait_timeout`, затем получает 409.
+    Повтор ключа с другим телом запроса отклоняется с 422.
+
+    Ключ действует в пределах сессии (X-Session-Id), метода и пути. При недоступности
+    Redis запрос выполняется без защиты от повторов.
+
+    :param app: Следующее ASGI-приложение.
+    :type app: ASGIApp
+    :param store: Хранилище идемпотентных запросов.
+    :type store: RedisIdempotencyStore
+    :param wait_timeout: Максимальное ожидание ответа конкурентного запроса (сек).
+    :type wait_timeout: float
+    :param poll_interval: Интервал опроса Redis при ожидании (сек).
+    :type poll_interval: float
+    :param max_key_length: Максимальная длина ключа.
+    :type max_key_length: int
+    :param methods: Методы, для которых учитывается заголовок.
+    :type methods: Tuple[str, ...]
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            store: RedisIdempotencyStore,
+            wait_timeout: float = 10.0,
+            poll_interval: float = 0.05,
+            max_key_length: int = 255,
+            methods: Tuple[str, ...] = ("POST", "PATCH")
+    ) -> None:
+        self.app = app
+        self._store = store
+        self._wait_timeout = wait_timeout
+        self._poll_interval = poll_interval
+        self._max_key_length = max_key_length
+        self._methods = methods
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self._methods:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > self._max_key_length:
+            await _send_json(send, 400, f"Idempotency-Key must be 1-{self._max_key_length} characters")
+            return
+
+        body = await _read_body(receive)
+        if body is None:
+            # Клиент отключился, не дослав тело запроса
+            return
+        replay_receive = _replay(body, receive)
+        fingerprint = hashlib.blake2b(
+            b"\n".join((scope["method"].encode(), scope["path"].encode(), body)), digest_size=16
+        ).hexdigest()
+        redis_key = build_idempotency_key(headers.get("x-session-id") or "-", scope["method"], scope["path"], key)
+
+        try:
+            record = await self._acquire(redis_key, fingerprint)
+        except IdempotencyInProgress:
+            IDEMPOTENCY_REQUESTS.labels(result="in_progress").inc()
+            await _send_json(send, 409, "A request with this Idempotency-Key is still in progress")
+            return
+        except IdempotencyKeyReused:
+            IDEMPOTENCY_REQUESTS.labels(result="mismatch").inc()
+            await _send_json(send, 422, "Idempotency-Key was already used with a different request")
+            return
+        except Exception as e:
+            logger.warning("Хранилище идемпотентности недоступно | key={} error={}", redis_key, str(e))
+            IDEMPOTENCY_REQUESTS.labels(result="unavailable").inc()
+            await self.app(scope, replay_receive, send)
+            return
+
+        if record.completed:
+            IDEMPOTENCY_REQUESTS.labels(result="replayed").inc()
+            logger.debug("Повтор идемпотентного запроса | key={} status={}", redis_key, record.status)
+            await _send_record(send, record)
+            return
+
+        IDEMPOTENCY_REQUESTS.labels(result="executed").inc()
+        await self._execute(scope, replay_receive, send, redis_key, record)
+
+    async def _acquire(self, redis_key: str, fingerprint: str) -> IdempotencyRecord:
+        """
+        Резервирует ключ или возвращает сохранённый ответ, ожидая завершения
+        конкурентного запроса с тем же ключом.
+
+        :param redis_key: Ключ записи в Redis.
+        :type redis_key: str
+        :param fingerprint: Отпечаток текущего запроса.
+        :type fingerprint: str
+        :raises IdempotencyInProgress: Ответ конкурентного запроса не получен за wait_timeout.
+        :raises IdempotencyKeyReused: Ключ использован для другого запроса.
+        :return: Сохранённый ответ или резерв текущего запроса (незавершённая запись).
+        :rtype: IdempotencyRecord
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._wait_timeout
+        while True:
+            record = await self._store.get(redis_key)
+            if record is None:
+                reservation = await self._store.reserve(redis_key, fingerprint)
+                if reservation is not None:
+                    return reservation
+                # Резерв занят между GET и SET NX (или запись не читается): ждём, как и незавершённый ответ
+            elif record.fingerprint != fingerprint:
+                raise IdempotencyKeyReused()
+            elif record.completed:
+                return record
+            if loop.time() >= deadline:
+                raise IdempotencyInProgress()
+            await asyncio.sleep(self._poll_interval)
+
+    async def _execute(self, scope: Scope, receive: Receive, send: Send, redis_key: str, reservation: IdempotencyRecord) -> None:
+        """
+        Выполняет запрос, передавая ответ клиенту по мере отправки, и сохраняет его.
+        Если ответ не завершён или это 5xx, снимается резерв этого запроса (чужой не трогается).
+
+        :param scope: ASGI scope запроса.
+        :param receive: ASGI receive с уже прочитанным телом.
+        :param send: ASGI send клиента.
+        :param redis_key: Ключ записи в Redis.
+        :type redis_key: str
+        :param reservation: Резерв ключа текущим запросом.
+        :type reservation: IdempotencyRecord
+        """
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        finished = False
+
+        async def capture(message: Message) -> None:
+            nonlocal start, finished
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                finished = not message.get("more_body", False)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            try:
+                if start is not None and finished and start["status"] < 500:
+                    await self._store.complete(redis_key, IdempotencyRecord(
+                        fingerprint=reservation.fingerprint,
+                        status=start["status"],
+                        headers=tuple(
+                            (name.decode("latin-1"), value.decode("latin-1"))
+                            for name, value in start.get("headers", [])
+                            if name.decode("latin-1").lower() not in _SKIP_HEADERS
+                        ),
+                        body=b"".join(chunks)
+                    ))
+                else:
+                    await self._store.release(redis_key, reservation)
+            except Exception as e:
+                logger.warning("Не удалось сохранить идемпотентный ответ | key={} error={}", redis_key, str(e))
+
+
+async def _read_body(receive: Receive) -> Optional[bytes]:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _replay(body: bytes, receive: Receive) -> Receive:
+    """
+    Возвращает receive, отдающий уже прочитанное тело запроса, а затем — исходный receive
+    (сообщение об отключении клиента).
+    """
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+async def _send_record(send: Send, record: IdempotencyRecord) -> None:
+    headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record.headers]
+    headers.append((b"content-length", str(len(record.body)).encode()))
+    headers.append((REPLAYED_HEADER.encode(), b"true"))
+    await send({"type": "http.response.start", "status": record.status, "headers": headers})
+    await send({"type": "http.response.body", "body": record.body})
+
+
+async def _send_json(send: Send, status: int, message: str) -> None:
+    body = json.dumps({"message": message}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -1,11 +1,18 @@
 from fastapi import APIRouter
 
+from .batch_parcel import router as routers_batch_parcel
+from .bulk_parcel import router as routers_bulk_parcel
 from .create_parcel import router as routers_create_parcel
+from .export_parcel import router as routers_export_parcel
 from .get_parcel import router as routers_get_parcel
 from .bind_company import router as router_bind_company
 
 router = APIRouter(prefix="/parcels", tags=["Parcel"])
 
+# /batch и /export регистрируются раньше /{parcel_id}, иначе путь перехватит карточка посылки
+router.include_router(routers_batch_parcel)
+router.include_router(routers_export_parcel)
 router.include_router(routers_get_parcel)
 router.include_router(routers_create_parcel)
+router.include_router(routers_bulk_parcel)
 router.include_router(router_bind_company)
@@ -0,0 +1,115 @@
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, Query, Response
+from loguru import logger
+
+from src.parcel_service.api.deps.parcel_deps import get_uc_parcels_batch
+from src.parcel_service.api.deps.shared_deps import get_parcel_entities, get_parcel_filter, get_read_uow
+from src.parcel_service.api.encoders.parcel import encode_parcel_batch, json_response
+from src.parcel_service.api.routers.v1.parcel.entities import resolve_parcel_bodies
+from src.parcel_service.api.schemas.error import ErrorResponse
+from src.parcel_service.api.schemas.parcel import MAX_BATCH_IDS, ParcelBatchRequest, ParcelBatchResponse
+from src.parcel_service.domain.interfaces.cache import IParcelFilter
+from src.parcel_service.domain.interfaces.uow import IUnitOfWork
+from src.parcel_service.domain.interfaces.usecase import IUseCase
+from src.parcel_service.infrastructure.cache.entity import ParcelEntityCache
+
+router = APIRouter()
+
+_RESPONSES = {
+    200: {"model": ParcelBatchResponse, "description": "Parcels information received successfully"},
+    422: {"model": ErrorResponse, "description": "Validation error"},
+    500: {"model": ErrorResponse, "description": "Internal server error"},
+}
+
+
+async def _resolve_batch(
+    ids: List[UUID],
+    session_id: str,
+    uow: IUnitOfWork,
+    use_case: IUseCase,
+    entities: ParcelEntityCache,
+    parcel_filter: IParcelFilter
+) -> Response:
+    """
+    Собирает пакетный ответ: идентификаторы, которых точно нет по фильтру Блума, сразу
+    попадают в not_found; остальные карточки берутся из кеша карточек одним MGET,
+    промахи — одним вызовом UseCase с записью в кеш одним pipeline.
+
+    Кеш карточек общий с `GET /parcels/{parcel_id}` и списком посылок.
+    """
+    requested = list(dict.fromkeys(str(parcel_id) for parcel_id in ids))
+    known = await parcel_filter.might_contain_many(requested)
+    parcel_ids = [parcel_id for parcel_id, maybe in zip(requested, known) if maybe]
+    missing = {parcel_id for parcel_id, maybe in zip(requested, known) if not maybe}
+    logger.debug("Пакетный запрос | requested={} unknown={}", len(requested), len(missing))
+
+    bodies, not_found, access_denied = await resolve_parcel_bodies(parcel_ids, session_id, entities, uow, use_case)
+    missing.update(not_found)
+
+    items = [bodies[parcel_id] for parcel_id in parcel_ids if parcel_id in bodies]
+    not_found = [parcel_id for parcel_id in requested if parcel_id in missing]
+    return json_response(encode_parcel_batch(items, not_found, access_denied))
+
+
+@router.get(
+    path="/batch",
+    summary="Получить информацию о нескольких посылках",
+    response_model=ParcelBatchResponse,
+    responses=_RESPONSES,
+)
+async def get_parcels_batch(
+    ids: List[UUID] = Query(..., min_length=1, max_length=MAX_BATCH_IDS, description="ID посылок (повторяемый параметр)"),
+    x_session_id: str = Header(...),
+    uow: IUnitOfWork = Depends(get_read_uow),
+    use_case: IUseCase = Depends(get_uc_parcels_batch),
+    entities: ParcelEntityCache = Depends(get_parcel_entities),
+    parcel_filter: IParcelFilter = Depends(get_parcel_filter)
+) -> Response:
+    """
+    Возвращает карточки нескольких посылок сессии за один HTTP-запрос.
+
+    Вместо N запросов `GET /parcels/{parcel_id}` выполняется постоянное число обращений:
+    один MGET в Redis, при промахах — один IN-запрос к `parcels`, один к `outbox_events`
+    и один pipeline записи в кеш. Посылки других сессий и отсутствующие не дают ошибку
+    всего запроса, а перечисляются в `access_denied` и `not_found`.
+
+    :param ids: Идентификаторы посылок (до MAX_BATCH_IDS, повторы схлопываются).
+    :param x_session_id: Идентификатор сессии клиента (из заголовка запроса).
+    :param uow: UnitOfWork для получения доступа к репозиториям.
+    :param use_case: UseCase пакетного получения посылок.
+    :param entities: Кеш карточек посылок.
+    :param parcel_filter: Фильтр Блума известных parcel_id.
+    :return: Ответ с телом по схеме ParcelBatchResponse (карточки в порядке запроса).
+    """
+    return await _resolve_batch(ids, x_session_id, uow, use_case, entities, parcel_filter)
+
+
+@router.post(
+    path="/batch",
+    summary="Получить информацию о нескольких посылках (ID в теле запроса)",
+    response_model=ParcelBatchResponse,
+    responses=_RESPONSES,
+)
+async def post_parcels_batch(
+    body: ParcelBatchRequest,
+    x_session_id: str = Header(...),
+    uow: IUnitOfWork = Depends(get_read_uow),
+    use_case: IUseCase = Depends(get_uc_parcels_batch),
+    entities: ParcelEntityCache = Depends(get_parcel_entities),
+    parcel_filter: IParcelFilter = Depends(get_parcel_filter)
+) -> Response:
+    """
+    То же, что `GET /parcels/batch`, но список ID передаётся в теле запроса —
+    для длинных списков, не помещающихся в строку запроса.
+
+    :param body: Тело запроса со списком ID посылок.
+    :param x_session_id: Идентификатор сессии клиента (из заголовка запроса).
+    :param uow: UnitOfWork для получения доступа к репозиториям.
+    :param use_case: UseCase пакетного получения посылок.
+    :param entities: Кеш карточек посылок.
+    :param parcel_filter: Фильтр Блума известных parcel_id.
+    :return: Ответ с телом по схеме ParcelBatchResponse (карточки в порядке запроса).
+    """
+    return await _resolve_batch(body.ids, x_session_id, uow, use_case, entities, parcel_filter)
@@ -0,0 +1,118 @@
+from typing import List
+from uuid import uuid4
+from loguru import logger
+
+from fastapi import APIRouter, Body, Depends, Header
+
+from src.parcel_service.api.deps.parcel_deps import get_uc_bulk_registry
+from src.parcel_service.api.deps.shared_deps import (
+    get_cache_generation, get_parcel_entities, get_parcel_filter, get_recent_writes, get_uow, get_usd_rate
+)
+from src.parcel_service.api.encoders.parcel import encode_parcel_detail
+from src.parcel_service.api.schemas.error import ErrorResponse
+from src.parcel_service.api.schemas.parcel import MAX_BULK_PARCELS, ParcelBulkCreatedResponse, ParcelBulkItemResponse, ParcelCreateSchema
+from src.parcel_service.domain.dto.dto_create_parcel import ParcelBulkData, ParcelBulkResult, ParcelData, RegistryParcelDeps
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelDetailResult
+from src.parcel_service.domain.interfaces.cache import ICacheGeneration, IParcelFilter, IRecentWrites, IUsdRate
+from src.parcel_service.domain.interfaces.uow import IUnitOfWork
+from src.parcel_service.domain.interfaces.usecase import IUseCase
+from src.parcel_service.infrastructure.cache.entity import ParcelEntityCache
+
+router = APIRouter()
+
+
+@router.post(
+    path="/bulk",
+    summary="Зарегистрировать пачку посылок",
+    response_model=ParcelBulkCreatedResponse,
+    responses={
+        200: {"model": ParcelBulkCreatedResponse, "description": "Parcels successfully registered"},
+        409: {"model": ErrorResponse, "description": "Duplicate outbox event"},
+        422: {"model": ErrorResponse, "description": "Validation error"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    }
+)
+async def registry_parcels_bulk(
+        parcels: List[ParcelCreateSchema] = Body(..., min_length=1, max_length=MAX_BULK_PARCELS),
+        x_session_id: str = Header(...),
+        uow: IUnitOfWork = Depends(get_uow),
+        entities: ParcelEntityCache = Depends(get_parcel_entities),
+        generation: ICacheGeneration = Depends(get_cache_generation),
+        parcel_filter: IParcelFilter = Depends(get_parcel_filter),
+        recent_writes: IRecentWrites = Depends(get_recent_writes),
+        usd_rate: IUsdRate = Depends(get_usd_rate),
+        use_case: IUseCase = Depends(get_uc_bulk_registry)
+) -> ParcelBulkCreatedResponse:
+    """
+    Регистрирует пачку посылок (до MAX_BULK_PARCELS) одним запросом.
+
+    Все элементы проверяются по ParcelCreateSchema до записи: ошибка в любом из них
+    отклоняет запрос целиком с 422 (путь ошибки содержит индекс элемента). Outbox-события
+    и записи read-модели вставляются многострочными INSERT в одной транзакции, после
+    чего карточки всех посылок записываются в кеш карточек одним pipeline. Стоимость
+    доставки рассчитывается сразу, если в кеше есть курс USD → RUB.
+
+    :param parcels: Посылки в порядке регистрации.
+    :type parcels: List[ParcelCreateSchema]
+    :param x_session_id: Идентификатор сессии клиента (из заголовка запроса).
+    :type x_session_id: str
+    :param uow: Объект Unit of Work для транзакционного доступа к БД.
+    :type uow: IUnitOfWork
+    :param entities: Кеш карточек посылок.
+    :type entities: ParcelEntityCache
+    :param generation: Счётчик поколений кеша сессии.
+    :type generation: ICacheGeneration
+    :param parcel_filter: Фильтр Блума известных parcel_id.
+    :type parcel_filter: IParcelFilter
+    :param recent_writes: Маркеры недавних записей сессий.
+    :type recent_writes: IRecentWrites
+    :param usd_rate: Закешированный курс USD → RUB.
+    :type usd_rate: IUsdRate
+    :param use_case: UseCase массовой регистрации посылок.
+    :type use_case: IUseCase
+    :return: Результат по каждой посылке: индекс в запросе, parcel_id, сообщение и стоимость доставки.
+    :rtype: ParcelBulkCreatedResponse
+    """
+    items = tuple(
+        ParcelData(
+            parcel_id=str(uuid4()),
+            session_id=x_session_id,
+            name=parcel.name,
+            weight_kg=parcel.weight_kg,
+            type_id=parcel.type_id,
+            cost_adjustment_usd=parcel.cost_adjustment_usd
+        )
+        for parcel in parcels
+    )
+    logger.info("Начало массовой регистрации посылок | session_id={} count={}", x_session_id, len(items))
+
+    result: ParcelBulkResult = await use_case(
+        dto=ParcelBulkData(session_id=x_session_id, items=items),
+        uow=uow,
+        deps=RegistryParcelDeps(
+            generation=generation, parcel_filter=parcel_filter, recent_writes=recent_writes, usd_rate=usd_rate
+        )
+    )
+
+    # Карточки без рассчитанной стоимости перезапишет воркер после расчёта
+    try:
+        await entities.store_many(x_session_id, {
+            item.parcel_id: encode_parcel_detail(ParcelDetailResult(
+                parcel_id=item.parcel_id,
+                name=item.name,
+                weight_kg=item.weight_kg,
+                type_id=item.type_id,
+                cost_adjustment_usd=item.cost_adjustment_usd,
+                delivery_price_rub=registered.delivery_price_rub
+            ))
+            for item, registered in zip(items, result.items)
+        })
+    except Exception as e:
+        logger.warning("Ошибка пакетной записи карточек в кеш | session_id={} | {}", x_session_id, str(e))
+
+    return ParcelBulkCreatedResponse(items=[
+        ParcelBulkItemResponse(
+            index=index, parcel_id=item.parcel_id, message=item.message, delivery_price_rub=item.delivery_price_rub
+        )
+        for index, item in enumerate(result.items)
+    ])
@@ -1,17 +1,23 @@
-import json
+from typing import Optional
 from uuid import uuid4
 from loguru import logger
 
 from fastapi import APIRouter, Depends, Header
-from redis import Redis
 
 from src.parcel_service.api.deps.parcel_deps import get_uc_registry
-from src.parcel_service.api.deps.shared_deps import get_redis_cache, get_uow, build_redis_cache_key
+from src.parcel_service.api.deps.shared_deps import (
+    get_cache_generation, get_group_commit, get_parcel_entities, get_parcel_filter, get_recent_writes,
+    get_registration_buffer, get_uow, get_usd_rate
+)
+from src.parcel_service.api.encoders.parcel import encode_parcel_detail
 from src.parcel_service.api.schemas.parcel import ParcelCreatedResponse, ParcelCreateSchema
 from src.parcel_service.api.schemas.error import ErrorResponse
-from src.parcel_service.domain.dto.dto_create_parcel import ParcelData, ParcelResult
-from src.parcel_service.domain.interfaces.uow import IUnitOfWork
+from src.parcel_service.domain.dto.dto_create_parcel import ParcelData, ParcelResult, RegistryParcelDeps
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelDetailResult
+from src.parcel_service.domain.interfaces.cache import ICacheGeneration, IParcelFilter, IRecentWrites, IUsdRate
+from src.parcel_service.domain.interfaces.uow import IGroupCommit, IRegistrationBuffer, IUnitOfWork
 from src.parcel_service.domain.interfaces.usecase import IUseCase
+from src.parcel_service.infrastructure.cache.entity import ParcelEntityCache
 
 router = APIRouter()
 
@@ -30,14 +36,31 @@ async def registry_parcel(
         parcel: ParcelCreateSchema,
         x_session_id: str = Header(...),
         uow: IUnitOfWork = Depends(get_uow),
-        redis: Redis = Depends(get_redis_cache),
+        entities: ParcelEntityCache = Depends(get_parcel_entities),
+        generation: ICacheGeneration = Depends(get_cache_generation),
+        parcel_filter: IParcelFilter = Depends(get_parcel_filter),
+        recent_writes: IRecentWrites = Depends(get_recent_writes),
+        group_commit: Optional[IGroupCommit] = Depends(get_group_commit),
+        usd_rate: IUsdRate = Depends(get_usd_rate),
+        registration_buffer: Optional[IRegistrationBuffer] = Depends(get_registration_buffer),
         use_case: IUseCase = Depends(get_uc_registry)
 ) -> ParcelCreatedResponse:
     """
     Регистрирует новую посылку для клиента.
 
-    Создаёт уникальный parcel_id, сохраняет данные через UseCase, а затем кеширует входные данные
-    в Redis на 5 минут (TTL 300 сек), используя ключ в формате parcel:<session_id>:<parcel_id>.
+    Создаёт уникальный parcel_id, сохраняет данные через UseCase (он же помечает сессию
+    как недавно записывавшую, увеличивает поколение кеша сессии и добавляет parcel_id
+    в фильтр известных посылок), а затем кеширует карточку посылки
+    в кеше карточек (ключ cache:parcels:<session_id>:<parcel_id>). Если в кеше есть курс
+    USD → RUB, стоимость доставки рассчитывается сразу и возвращается в ответе; иначе
+    она приходит как null, и после расчёта карточку перезаписывает delivery_calculation_worker.
+
+    В режиме регистрации stream (APP_REGISTRATION_MODE) ответ отправляется сразу после
+    добавления регистрации в Redis Stream, а в БД её переносит фоновая задача; до переноса
+    карточка посылки отдаётся из кеша карточек.
+
+    Повторы запроса с тем же заголовком Idempotency-Key не доходят до обработчика:
+    IdempotencyMiddleware отдаёт сохранённый ответ первого запроса.
 
     :param parcel: Входные данные о посылке (имя, вес, тип, стоимость).
     :type parcel: ParcelCreateSchema
@@ -45,11 +68,23 @@ async def registry_parcel(
     :type x_session_id: str
     :param uow: Объект Unit of Work для транзакционного доступа к БД.
     :type uow: IUnitOfWork
-    :param redis: Redis-клиент для кеширования.
-    :type redis: Redis
+    :param entities: Кеш карточек посылок.
+    :type entities: ParcelEntityCache
+    :param generation: Счётчик поколений кеша сессии.
+    :type generation: ICacheGeneration
+    :param parcel_filter: Фильтр Блума известных parcel_id.
+    :type parcel_filter: IParcelFilter
+    :param recent_writes: Маркеры недавних записей сессий.
+    :type recent_writes: IRecentWrites
+    :param group_commit: Групповая фиксация регистраций (None — отдельная транзакция на запрос).
+    :type group_commit: Optional[IGroupCommit]
+    :param usd_rate: Закешированный курс USD → RUB.
+    :type usd_rate: IUsdRate
+    :param registration_buffer: Буфер регистраций в Redis Stream (None — запись в БД до ответа).
+    :type registration_buffer: Optional[IRegistrationBuffer]
     :param use_case: UseCase, реализующий бизнес-логику регистрации посылки.
     :type use_case: IUseCase
-    :return: Ответ с parcel_id и сообщением об успехе.
+    :return: Ответ с parcel_id, сообщением об успехе и стоимостью доставки (если рассчитана).
     :rtype: ParcelCreatedResponse
     """
 
@@ -65,21 +100,28 @@ async def registry_parcel(
     logger.info("Начало регистрации посылки | parcel_id={} session_id={}", dto_parcel.parcel_id, dto_parcel.session_id)
 
     # Вызов use case
-    result: ParcelResult = await use_case(dto=dto_parcel, uow=uow, deps=None)
-
-    # Кеширование DTO в Redis
-    cache_key = build_redis_cache_key("parcels", x_session_id, result.parcel_id)
+    result: ParcelResult = await use_case(dto=dto_parcel, uow=uow, deps=RegistryParcelDeps(
+        generation=generation, parcel_filter=parcel_filter, recent_writes=recent_writes,
+        group_commit=group_commit, usd_rate=usd_rate, registration_buffer=registration_buffer
+    ))
 
     # Обрабатываем кеш
     try:
         if result:
-            await redis.set(cache_key, json.dumps(dto_parcel.to_payload()), ex=60)
-            logger.debug(f"[Redis] Set: {cache_key} -> {dto_parcel}")
+            # Без рассчитанной стоимости карточку перезапишет воркер после расчёта
+            detail = ParcelDetailResult(
+                parcel_id=dto_parcel.parcel_id,
+                name=dto_parcel.name,
+                weight_kg=dto_parcel.weight_kg,
+                type_id=dto_parcel.type_id,
+                cost_adjustment_usd=dto_parcel.cost_adjustment_usd,
+                delivery_price_rub=result.delivery_price_rub
+            )
+            await entities.store(x_session_id, result.parcel_id, encode_parcel_detail(detail))
+            logger.debug("[Cache] Set: parcel_id={} -> {}", result.parcel_id, dto_parcel)
     except Exception as e:
-        logger.warning("Ошибка при установке кеша Redis | key={cache_key} | {error}", cache_key=cache_key, error=e)
+        logger.warning("Ошибка при установке кеша Redis | parcel_id={} | {}", result.parcel_id, e)
 
-    return ParcelCreatedResponse(parcel_id=result.parcel_id, message=result.message)
-
-
-    # Индепотентность обеспечем в middelware так как нам нужно чтобы при ошибке не было дубликатов хоть
-    # мы частично защетилиись но лучше обеспечивать такое через indepotency key !!!
\ No newline at end of file
+    return ParcelCreatedResponse(
+        parcel_id=result.parcel_id, message=result.message, delivery_price_rub=result.delivery_price_rub
+    )
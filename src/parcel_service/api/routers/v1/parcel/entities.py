@@ -0,0 +1,64 @@
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from src.parcel_service.api.encoders.parcel import encode_parcel_detail
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelBatchQuery, ParcelBatchResult
+from src.parcel_service.domain.interfaces.uow import IUnitOfWork
+from src.parcel_service.domain.interfaces.usecase import IUseCase
+from src.parcel_service.infrastructure.cache.entity import ParcelEntityCache
+
+
+async def resolve_parcel_bodies(
+    parcel_ids: List[str],
+    session_id: str,
+    entities: ParcelEntityCache,
+    uow: IUnitOfWork,
+    use_case: IUseCase,
+    known: Optional[Dict[str, str]] = None
+) -> Tuple[Dict[str, str], List[str], List[str]]:
+    """
+    Собирает JSON-тела карточек посылок сессии: уже известные (`known`) берутся как есть,
+    остальные — одним MGET из кеша карточек, промахи — одним вызовом пакетного UseCase
+    (IN-запросы к parcels и outbox_events) и записываются в кеш одним pipeline.
+
+    Ошибки Redis только логируются: недоступный кеш означает чтение из БД.
+
+    :param parcel_ids: Идентификаторы посылок без повторов.
+    :type parcel_ids: List[str]
+    :param session_id: Идентификатор сессии.
+    :type session_id: str
+    :param entities: Кеш карточек посылок.
+    :type entities: ParcelEntityCache
+    :param uow: UnitOfWork для пакетного UseCase.
+    :type uow: IUnitOfWork
+    :param use_case: UseCase пакетного получения посылок.
+    :type use_case: IUseCase
+    :param known: Карточки, уже закодированные в текущем запросе.
+    :type known: Optional[Dict[str, str]]
+    :return: Кортеж (JSON-тела по parcel_id, отсутствующие, посылки других сессий).
+    :rtype: Tuple[Dict[str, str], List[str], List[str]]
+    """
+    bodies: Dict[str, str] = dict(known or {})
+    lookup = [parcel_id for parcel_id in parcel_ids if parcel_id not in bodies]
+    if lookup:
+        try:
+            bodies.update(await entities.get_many(session_id, lookup))
+        except Exception as e:
+            logger.warning("Ошибка пакетного чтения карточек из кеша | session_id={} | {}", session_id, str(e))
+
+    misses = [parcel_id for parcel_id in parcel_ids if parcel_id not in bodies]
+    logger.debug("Карточки посылок | requested={} hits={} misses={}", len(parcel_ids), len(parcel_ids) - len(misses), len(misses))
+    if not misses:
+        return bodies, [], []
+
+    result: ParcelBatchResult = await use_case(
+        dto=ParcelBatchQuery(parcel_ids=misses, session_id=session_id), uow=uow, deps=None
+    )
+    fresh = {item.parcel_id: encode_parcel_detail(item) for item in result.items}
+    bodies.update(fresh)
+    try:
+        await entities.store_many(session_id, fresh)
+    except Exception as e:
+        logger.warning("Ошибка пакетной записи карточек в кеш | session_id={} | {}", session_id, str(e))
+    return bodies, result.not_found, result.access_denied
@@ -0,0 +1,90 @@
+from typing import AsyncIterator, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from loguru import logger
+
+from src.parcel_service.api.deps.parcel_deps import get_uc_export_parcels
+from src.parcel_service.api.deps.shared_deps import get_read_uow
+from src.parcel_service.api.encoders.parcel import CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE, encode_parcel_csv, encode_parcel_ndjson
+from src.parcel_service.api.schemas.error import ErrorResponse
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelDetailResult, ParcelExportQuery
+from src.parcel_service.domain.interfaces.uow import IUnitOfWork
+from src.parcel_service.domain.interfaces.usecase import IUseCase
+
+router = APIRouter()
+
+# Строк в одной порции: читается из БД, кодируется и отправляется клиенту за раз
+EXPORT_CHUNK_SIZE = 1000
+
+
+@router.get(
+    path="/export",
+    summary="Выгрузить все посылки сессии (NDJSON или CSV)",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {NDJSON_MEDIA_TYPE: {}, CSV_MEDIA_TYPE: {}},
+            "description": "Parcels stream",
+        },
+        422: {"model": ErrorResponse, "description": "Validation error"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    }
+)
+async def export_parcels(
+    request: Request,
+    x_session_id: str = Header(...),
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="Формат выгрузки"),
+    type_id: Optional[int] = Query(None),
+    has_delivery_price: bool = Query(False),
+    uow: IUnitOfWork = Depends(get_read_uow),
+    use_case: IUseCase = Depends(get_uc_export_parcels)
+) -> StreamingResponse:
+    """
+    Потоково выгружает все посылки сессии одним ответом вместо постраничного обхода `/parcels/all`.
+
+    Строки читаются серверным курсором порциями по EXPORT_CHUNK_SIZE, каждая порция
+    кодируется и сразу отправляется клиенту: потребление памяти не зависит от числа посылок.
+    Если клиент отключился, чтение прекращается и запрос к БД отменяется.
+    Порядок выдачи — (created_at, parcel_id), как у списка посылок.
+
+    :param request: Текущий запрос (проверка отключения клиента).
+    :param x_session_id: Идентификатор сессии пользователя, из заголовка запроса.
+    :param export_format: Формат: `ndjson` (карточка ParcelDetailResponse на строку) или `csv`.
+    :param type_id: Фильтрация по ID типа посылки (опционально).
+    :param has_delivery_price: Только посылки с рассчитанной стоимостью доставки.
+    :param uow: Объект UnitOfWork.
+    :param use_case: UseCase потоковой выгрузки посылок.
+    :return: Потоковый ответ с посылками сессии.
+    """
+    dto = ParcelExportQuery(
+        session_id=x_session_id,
+        type_id=type_id,
+        has_delivery_price=has_delivery_price,
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+    chunks: AsyncIterator[List[ParcelDetailResult]] = await use_case(dto=dto, uow=uow, deps=None)
+
+    async def body() -> AsyncIterator[bytes]:
+        header = export_format == "csv"
+        try:
+            async for items in chunks:
+                yield encode_parcel_csv(items, header=header) if export_format == "csv" else encode_parcel_ndjson(items)
+                header = False
+                if await request.is_disconnected():
+                    logger.info("Клиент отключился во время выгрузки | session_id={}", x_session_id)
+                    break
+            else:
+                if header:
+                    # Пустая выгрузка в CSV — только заголовок
+                    yield encode_parcel_csv([], header=True)
+        finally:
+            # Закрывает серверный курсор и Unit of Work, в том числе при отмене
+            await chunks.aclose()
+
+    extension = "csv" if export_format == "csv" else "ndjson"
+    return StreamingResponse(
+        body(),
+        media_type=CSV_MEDIA_TYPE if export_format == "csv" else NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="parcels.{extension}"'}
+    )
@@ -1,30 +1,58 @@
 import json
 from uuid import UUID
-from typing import Optional, List
+from typing import Dict, Optional, List
 
-from fastapi import APIRouter, Depends, Header, Query
+from fastapi import APIRouter, Depends, Header, Query, Response
 from loguru import logger
-from redis import Redis
 
-from src.parcel_service.api.deps.parcel_deps import get_uc_parcels_for_id, get_uc_parcels_list_for_session_id, get_uc_parcels_all_types
-from src.parcel_service.api.deps.shared_deps import get_redis_cache, get_uow, build_redis_cache_key
-from src.parcel_service.api.schemas.parcel import ParcelDetailResponse, ParcelListResponse
+from src.parcel_service.api.deps.parcel_deps import (
+    get_uc_parcels_batch, get_uc_parcels_for_id, get_uc_parcels_list_for_session_id, get_uc_parcels_all_types
+)
+from src.parcel_service.api.deps.shared_deps import (
+    get_cache, get_cache_generation, get_cache_loader, get_cache_settings, get_parcel_entities, get_parcel_filter, get_read_uow,
+    build_redis_cache_key
+)
+from src.parcel_service.api.encoders.parcel import (
+    conditional_json_response, decode_parcel_id_page, encode_parcel_detail, encode_parcel_id_page, encode_parcel_list,
+    encode_parcel_page, project_parcel_body
+)
+from src.parcel_service.api.routers.v1.parcel.entities import resolve_parcel_bodies
+from src.parcel_service.api.schemas.parcel import ParcelDetailResponse, ParcelListResponse, parse_parcel_fields
 from src.parcel_service.api.schemas.parcel_types import ParcelTypeResponse
-from src.parcel_service.domain.dto.dto_parcel_query import ParcelDetailQuery, ParcelDetailResult, ParcelQueryList
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelDetailQuery, ParcelDetailQueryList, ParcelDetailResult, ParcelQueryList
 from src.parcel_service.domain.dto.dto_parcel_type import ParcelType
 from src.parcel_service.domain.interfaces.uow import IUnitOfWork
 from src.parcel_service.domain.interfaces.usecase import IUseCase
+from src.parcel_service.infrastructure.cache.entity import ParcelEntityCache, build_missing_key
+from src.parcel_service.infrastructure.cache.loader import CacheLoader
+from src.parcel_service.infrastructure.cache.tiered import TieredCache
 from src.parcel_service.api.schemas.error import ErrorResponse
+from src.parcel_service.core.config import CacheSettings
+from src.parcel_service.domain.constants.cache import CacheNamespace
+from src.parcel_service.domain.exceptions.domain_error import ParcelNotFoundError
+from src.parcel_service.domain.interfaces.cache import ICacheGeneration, IParcelFilter
 
 router = APIRouter()
 
+
+async def _remember_missing(cache: TieredCache, key: str, ttl: int) -> None:
+    """
+    Запоминает отсутствующую посылку в отрицательном кеше. Ошибка Redis только логируется.
+    """
+    try:
+        await cache.set(CacheNamespace.PARCEL_MISSING.value, key, "1", ttl=ttl)
+    except Exception as e:
+        logger.warning("Ошибка записи отрицательного кеша | key={} | error={}", key, str(e))
+
 @router.get(
     path="/all",
     summary="Получить список посылок пользователя",
     response_model=ParcelListResponse,
     responses={
         200: {"model": ParcelListResponse, "description": "Successful response"},
-        422: {"model": ErrorResponse, "description": "Validation error"},
+        304: {"description": "Not modified (If-None-Match matches ETag)"},
+        400: {"model": ErrorResponse, "description": "Invalid cursor"},
+        422: {"model": ErrorResponse, "description": "Validation error or unknown fields"},
         500: {"model": ErrorResponse, "description": "Internal error"}
     }
 )
@@ -34,15 +62,40 @@ async def get_all_parcels(
     has_delivery_price: bool = Query(True),
     limit: int = Query(default=20, ge=1),
     offset: int = Query(default=0, ge=0),
-    redis: Redis = Depends(get_redis_cache),
-    uow: IUnitOfWork = Depends(get_uow),
-    use_case: IUseCase = Depends(get_uc_parcels_list_for_session_id)
-) -> ParcelListResponse:
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы из поля next_cursor"),
+    total: bool = Query(True, description="Считать общее количество (false — только has_more)"),
+    fields: Optional[str] = Query(None, description="Поля карточек через запятую, например parcel_id,delivery_price_rub"),
+    if_none_match: Optional[str] = Header(None),
+    cache_loader: CacheLoader = Depends(get_cache_loader),
+    generation: ICacheGeneration = Depends(get_cache_generation),
+    cache_settings: CacheSettings = Depends(get_cache_settings),
+    entities: ParcelEntityCache = Depends(get_parcel_entities),
+    uow: IUnitOfWork = Depends(get_read_uow),
+    use_case: IUseCase = Depends(get_uc_parcels_list_for_session_id),
+    batch_use_case: IUseCase = Depends(get_uc_parcels_batch)
+) -> Response:
     """
     Получение списка всех посылок, зарегистрированных в текущей сессии.
 
     Поддерживается фильтрация по типу посылки и по наличию рассчитанной стоимости доставки.
-    Реализована пагинация: лимит и смещение (limit и offset).
+    Реализована пагинация: лимит и смещение (limit и offset) либо keyset-курсор (cursor).
+    Порядок выдачи стабилен: (created_at, parcel_id). Если передан cursor, offset игнорируется,
+    а стоимость любой страницы не зависит от её номера.
+
+    Для каждой страницы кешируется только упорядоченный список parcel_id и поля пагинации.
+    Ключ включает поколение кеша сессии, которое увеличивается при регистрации посылки
+    и при расчёте её стоимости, поэтому устаревшие страницы не отдаются.
+    Конкурентные промахи по одному ключу объединяются: страницу вычисляет один запрос.
+
+    Карточки берутся из кеша карточек (общего с `GET /parcels/{parcel_id}`) одним MGET,
+    из БД читаются только отсутствующие. Вычисление страницы прогревает карточки всех её посылок.
+    Тело ответа склеивается из готовых JSON-тел карточек без повторной сериализации.
+
+    Параметр `fields` ограничивает поля карточек (parcel_id возвращается всегда): из БД
+    читаются только эти колонки, а страница кешируется целиком под ключом с набором полей.
+
+    Ответ несёт сильный ETag (хеш собранного тела). Клиент, опрашивающий список, передаёт его
+    в If-None-Match и при неизменных данных получает 304 без тела.
 
     :param x_session_id: Идентификатор сессии пользователя, из заголовка запроса.
     :type x_session_id: str
@@ -59,8 +112,30 @@ async def get_all_parcels(
     :param offset: Смещение относительно начала выборки (по умолчанию 0).
     :type offset: int
 
-    :param redis: Redis-клиент для кеша.
-    :type redis: Redis
+    :param cursor: Непрозрачный курсор из `next_cursor` предыдущей страницы (опционально).
+    :type cursor: Optional[str]
+
+    :param total: Считать ли общее количество записей. При false поле total не заполняется,
+        а наличие следующей страницы отражает has_more.
+    :type total: bool
+
+    :param fields: Поля карточек через запятую (по схеме ParcelDetailResponse), по умолчанию — все.
+    :type fields: Optional[str]
+
+    :param if_none_match: ETag из предыдущего ответа (заголовок If-None-Match).
+    :type if_none_match: Optional[str]
+
+    :param cache_loader: Загрузчик кеша (single-flight, раннее обновление).
+    :type cache_loader: CacheLoader
+
+    :param generation: Счётчик поколений кеша сессии.
+    :type generation: ICacheGeneration
+
+    :param cache_settings: Настройки кеширования (TTL).
+    :type cache_settings: CacheSettings
+
+    :param entities: Кеш карточек посылок.
+    :type entities: ParcelEntityCache
 
     :param uow: Объект UnitOfWork.
     :type uow: IUnitOfWork
@@ -68,78 +143,70 @@ async def get_all_parcels(
     :param use_case: UseCase для получения списка посылок.
     :type use_case: IUseCase
 
-    :returns: Список посылок пользователя с пагинацией.
-    :rtype: ParcelListResponse
+    :param batch_use_case: UseCase пакетного получения карточек, отсутствующих в кеше.
+    :type batch_use_case: IUseCase
+
+    :returns: Список посылок пользователя с пагинацией (тело по схеме ParcelListResponse).
+    :rtype: Response
 
-    :raises HTTPException 422: Ошибка валидации входных параметров.
+    :raises HTTPException 400: Некорректный курсор.
+    :raises HTTPException 422: Ошибка валидации входных параметров или неизвестные поля в fields.
     :raises HTTPException 500: Системная ошибка.
     """
 
-    # смотрим в кеш если есть то сразу отдаем
-    cache_key = f"parcels:{x_session_id}:offset={offset}:limit={limit}:type={type_id}:has_price={has_delivery_price}"
-
-    cached = await redis.get(cache_key)
-    logger.debug(f"[Redis] Get: {cache_key} -> {cached}")
+    selected = parse_parcel_fields(fields)
+    current = await generation.get(x_session_id)
+    cache_key = (
+        f"parcels:{x_session_id}:g={current}:offset={offset}:cursor={cursor}:limit={limit}:type={type_id}"
+        f":has_price={has_delivery_price}:total={total}:fields={','.join(selected) if selected else 'all'}"
+    )
 
-    if cached:
-        data = json.loads(cached)
-        logger.debug(f"Найдено в кеше | key={cache_key} | data={data}: {data}")
-        return ParcelListResponse(items=data["items"], total=data["total"])
-
-    dto = ParcelQueryList(
-        session_id=x_session_id,
-        type_id=type_id,
-        limit=limit,
-        offset=offset,
-        has_delivery_price=has_delivery_price
+    # Карточки, закодированные при вычислении страницы в этом запросе
+    fresh: Dict[str, str] = {}
+
+    async def compute() -> str:
+        dto = ParcelQueryList(
+            session_id=x_session_id,
+            type_id=type_id,
+            limit=limit,
+            offset=offset,
+            has_delivery_price=has_delivery_price,
+            cursor=cursor,
+            with_total=total,
+            fields=selected
+        )
+
+        result: ParcelDetailQueryList = await use_case(dto=dto, uow=uow, deps=None)
+        logger.debug("result: {}", result)
+        if selected is not None:
+            # Неполные карточки не попадают в кеш карточек: страница кешируется целиком
+            return encode_parcel_list(result, selected)
+
+        # Страница прогревает карточки: следующий GET /parcels/{parcel_id} попадёт в кеш
+        fresh.update({item.parcel_id: encode_parcel_detail(item) for item in result.items})
+        try:
+            await entities.store_many(x_session_id, fresh)
+        except Exception as e:
+            logger.warning("Ошибка записи карточек страницы в кеш | session_id={} | {}", x_session_id, str(e))
+        return encode_parcel_id_page(result)
+
+    # Кешируем любую страницу: смена поколения делает её недостижимой.
+    # При промахе страницу считает один запрос, остальные ждут его результат.
+    payload = await cache_loader.get_or_compute(
+        namespace=CacheNamespace.PARCEL_LIST.value,
+        key=cache_key,
+        ttl=cache_settings.list_ttl,
+        compute=compute
     )
+    if selected is not None:
+        return conditional_json_response(payload, if_none_match)
 
-    result: ParcelListResponse = await use_case(dto=dto, uow=uow, deps=None)
-    logger.debug("result: {}", result)
-
-    # Только первую страницу кешируем
-    if offset == 0:
-        items = []
-        for item in result.items:
-            delivery_price = (
-                str(item.delivery_price_rub)
-                if item.delivery_price_rub is not None
-                else "Не рассчитано"
-            )
-            response_model = ParcelDetailResponse(
-                parcel_id=item.parcel_id,
-                name=item.name,
-                weight_kg=item.weight_kg,
-                type_id=item.type_id,
-                cost_adjustment_usd=item.cost_adjustment_usd,
-                delivery_price_rub=delivery_price
-            )
-            items.append(response_model.model_dump())
-
-        to_cache = json.dumps({
-            "items": items,
-            "total": result.total
-        })
-        await redis.set(cache_key, to_cache, ex=300)  # Кеш 5 минута
-        logger.debug(f"Кеш установлен : {cache_key} -> {to_cache}")
-
-    return ParcelListResponse(
-        items=[
-            ParcelDetailResponse(
-                parcel_id=item.parcel_id,
-                name=item.name,
-                weight_kg=item.weight_kg,
-                type_id=item.type_id,
-                cost_adjustment_usd=item.cost_adjustment_usd,
-                delivery_price_rub=(
-                    str(item.delivery_price_rub)
-                    if item.delivery_price_rub is not None
-                    else "Не рассчитано"
-                )
-            )
-            for item in result.items
-        ],
-        total=result.total
+    page = decode_parcel_id_page(payload)
+
+    bodies, _, _ = await resolve_parcel_bodies(page["ids"], x_session_id, entities, uow, batch_use_case, known=fresh)
+    items = [bodies[parcel_id] for parcel_id in page["ids"] if parcel_id in bodies]
+    return conditional_json_response(
+        encode_parcel_page(items, page["total"], page["next_cursor"], page["has_more"]), if_none_match
     )
 
 @router.get(
@@ -148,8 +215,10 @@ async def get_all_parcels(
     response_model=ParcelDetailResponse,
     responses={
         200: {"model": ParcelDetailResponse, "description": "Parcel information received successfully"},
+        304: {"description": "Not modified (If-None-Match matches ETag)"},
         404: {"model": ErrorResponse, "description": "Parcel not found"},
         403: {"model": ErrorResponse, "description": "Access Denied"},
+        422: {"model": ErrorResponse, "description": "Unknown fields"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 
@@ -157,69 +226,69 @@ async def get_all_parcels(
 async def get_parcel_detail(
     parcel_id: UUID,
     x_session_id: str = Header(...),
-    uow: IUnitOfWork = Depends(get_uow),
+    fields: Optional[str] = Query(None, description="Поля карточки через запятую, например parcel_id,delivery_price_rub"),
+    if_none_match: Optional[str] = Header(None),
+    uow: IUnitOfWork = Depends(get_read_uow),
     use_case: IUseCase = Depends(get_uc_parcels_for_id),
-    redis: Redis = Depends(get_redis_cache)
-) -> ParcelDetailResponse:
+    cache: TieredCache = Depends(get_cache),
+    entities: ParcelEntityCache = Depends(get_parcel_entities),
+    parcel_filter: IParcelFilter = Depends(get_parcel_filter),
+    cache_settings: CacheSettings = Depends(get_cache_settings)
+) -> Response:
     """
     Возвращает детальную информацию о посылке по её идентификатору.
 
-    Сначала выполняется попытка получения данных из Redis-кеша. Если данные найдены,
+    Идентификаторы, которых точно нет (по фильтру Блума известных посылок), сразу получают 404
+    без обращения к кешу карточек и БД. Идентификаторы, прошедшие фильтр, но не найденные,
+    на короткое время запоминаются в отрицательном кеше.
+
+    Сначала выполняется попытка получения данных из кеша карточек (локальный кеш процесса, затем Redis),
+    общего со списком посылок и пакетным запросом. Если данные найдены,
     они возвращаются напрямую без обращения к базе данных. Если данных в кеше нет —
-    выполняется запрос к бизнес-логике и базе данных, результат сохраняется в Redis.
+    выполняется запрос к бизнес-логике и базе данных (один на все конкурентные запросы
+    этого ключа), результат сохраняется в Redis.
+    После расчёта стоимости delivery_calculation_worker перезаписывает запись карточки.
+    Кешируется и возвращается готовое JSON-тело ответа. Параметр `fields` оставляет в нём
+    только указанные поля (parcel_id — всегда); в кеше при этом хранится полная карточка.
+
+    Ответ несёт сильный ETag (хеш тела). Если If-None-Match совпадает с ним, возвращается 304
+    без тела: клиент, ожидающий расчёта стоимости, получает тело только после её изменения.
 
     :param parcel_id: Уникальный идентификатор посылки (UUID).
     :param x_session_id: Идентификатор сессии клиента (из заголовка запроса).
+    :param fields: Поля карточки через запятую (по схеме ParcelDetailResponse), по умолчанию — все.
+    :param if_none_match: ETag из предыдущего ответа (заголовок If-None-Match).
     :param uow: UnitOfWork для получения доступа к репозиториям.
     :param use_case: UseCase, обрабатывающий запрос получения данных о посылке.
-    :param redis: Redis-клиент для кеширования.
-    :return: Объект ParcelDetailResponse с полной информацией о посылке.
+    :param cache: Двухуровневый кеш (отрицательный кеш отсутствующих посылок).
+    :param entities: Кеш карточек посылок (single-flight, раннее обновление).
+    :param parcel_filter: Фильтр Блума известных parcel_id.
+    :param cache_settings: Настройки кеширования (TTL).
+    :return: Ответ с телом по схеме ParcelDetailResponse.
     :raises ParcelNotFoundError: Если посылка не найдена в базе данных.
     """
 
-    # Сначала проверяем кеш
-    cache_key = build_redis_cache_key("parcels", x_session_id, str(parcel_id))
-
-    cached = await redis.get(cache_key)
-    logger.debug(f"Проверка кеша | key={cache_key}")
+    selected = parse_parcel_fields(fields)
+    if not await parcel_filter.might_contain(str(parcel_id)):
+        logger.debug("Посылка отсечена фильтром Блума | parcel_id={}", parcel_id)
+        raise ParcelNotFoundError()
 
-    if cached:
-        try:
-            data = json.loads(cached)
-            logger.debug(f"Найдено в кеше | key={cache_key} | data={data}")
-            return ParcelDetailResponse(
-                parcel_id=data["parcel_id"],
-                name=data["name"],
-                weight_kg=data["weight_kg"],
-                type_id=data["type_id"],
-                cost_adjustment_usd=data["cost_adjustment_usd"],
-                delivery_price_rub=str(data["delivery_price_rub"]) if data["delivery_price_rub"] is not None  else "Не рассчитано"
-            )
-        except Exception as e:
-            logger.warning("Ошибка декодирования JSON из кеша | key={} | error={}", cache_key, str(e))
-    logger.debug(f"Данные не найдены в кеше | key={cache_key}")
+    missing_key = build_missing_key(str(parcel_id))
 
-    # Потом идем в БД
-    data_dto = ParcelDetailQuery(parcel_id=str(parcel_id), session_id=x_session_id)
-    result: ParcelDetailResult = await use_case(dto=data_dto, uow=uow, deps=None)
-
-    response = ParcelDetailResponse(
-        parcel_id=result.parcel_id,
-        name=result.name,
-        weight_kg=result.weight_kg,
-        type_id=result.type_id,
-        cost_adjustment_usd=result.cost_adjustment_usd,
-        delivery_price_rub=str(result.delivery_price_rub) if result.delivery_price_rub is not None else "Не рассчитано"
-    )
+    async def compute() -> str:
+        if await cache.get(CacheNamespace.PARCEL_MISSING.value, missing_key) is not None:
+            raise ParcelNotFoundError()
 
-    # Сохранение результат в кеш
-    try:
-        await redis.set(cache_key, response.model_dump_json(), ex=300)  # TTL = 5 минут
-        logger.debug(f"Сохранено в кеш | key={cache_key}")
-    except Exception as e:
-        logger.warning("Ошибка при сохранении в Redis | key={} | error={}", cache_key, str(e))
+        data_dto = ParcelDetailQuery(parcel_id=str(parcel_id), session_id=x_session_id)
+        try:
+            result: ParcelDetailResult = await use_case(dto=data_dto, uow=uow, deps=None)
+        except ParcelNotFoundError:
+            await _remember_missing(cache, missing_key, cache_settings.negative_ttl)
+            raise
+        return encode_parcel_detail(result)
 
-    return response
+    payload = await entities.get_or_compute(x_session_id, str(parcel_id), compute)
+    return conditional_json_response(project_parcel_body(payload, selected), if_none_match)
 
 @router.get(
     path="/parcels-types/",
@@ -232,20 +301,30 @@ async def get_parcel_detail(
 
 )
 async def get_parcel_types(
-    uow: IUnitOfWork = Depends(get_uow),
-    redis: Redis = Depends(get_redis_cache),
+    response: Response,
+    uow: IUnitOfWork = Depends(get_read_uow),
+    cache: TieredCache = Depends(get_cache),
+    cache_settings: CacheSettings = Depends(get_cache_settings),
     use_case: IUseCase = Depends(get_uc_parcels_all_types)
 ) -> List[ParcelTypeResponse]:
     """
     Получение всех доступных типов посылок (одежда, электроника, разное).
 
-    Типы хранятся в отдельной таблице в БД. Данные кешируются в Redis на 5 минут.
+    Типы хранятся в отдельной таблице в БД. Данные кешируются в Redis и в локальном кеше процесса.
+    Справочник меняется только миграциями, поэтому ответ разрешено кешировать клиентам
+    и промежуточным прокси на CACHE_TYPES_TTL (Cache-Control: public, max-age).
+
+    :param response: Ответ (заголовок Cache-Control).
+    :type response: Response
 
     :param uow: Объект UnitOfWork для доступа к данным.
     :type uow: IUnitOfWork
 
-    :param redis: Redis-клиент для кеширования.
-    :type redis: Redis
+    :param cache: Двухуровневый кеш (локальный кеш процесса перед Redis).
+    :type cache: TieredCache
+
+    :param cache_settings: Настройки кеширования (TTL).
+    :type cache_settings: CacheSettings
 
     :param use_case: UseCase, предоставляющий список типов.
     :type use_case: IUseCase
@@ -256,11 +335,13 @@ async def get_parcel_types(
     :raises HTTPException 500: Ошибка при получении данных.
     """
 
+    response.headers["Cache-Control"] = f"public, max-age={cache_settings.types_ttl}"
+
     # Сначала проверяем кеш
     cache_key = build_redis_cache_key("parcel_types","all")
 
     # Проверка кэша
-    cached = await redis.get(cache_key)
+    cached = await cache.get(CacheNamespace.PARCEL_TYPES.value, cache_key)
     if cached:
         try:
             types_data = json.loads(cached)
@@ -272,12 +353,12 @@ async def get_parcel_types(
 
     # Обращение к use case
     result: List[ParcelType] = await use_case(dto=None, uow=uow, deps=None)
-    response = [ParcelTypeResponse(id=pt.id, name=pt.name) for pt in result]
+    items = [ParcelTypeResponse(id=pt.id, name=pt.name) for pt in result]
 
     try:
-        await redis.set(cache_key, json.dumps([r.model_dump() for r in response]), ex=300) # TTL = 5 минут
+        await cache.set(CacheNamespace.PARCEL_TYPES.value, cache_key, json.dumps([r.model_dump() for r in items]), ttl=cache_settings.types_ttl)
         logger.debug(f"Сохранено в кеш | key={cache_key}")
     except Exception as e:
         logger.warning("Ошибка при сохранении в Redis | key={} | error={}", cache_key, str(e))
 
-    return response
\ No newline at end of file
+    return items
\ No newline at end of file
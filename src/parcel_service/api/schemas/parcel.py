@@ -1,8 +1,14 @@
 import re
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator, conint
 
+from src.parcel_service.domain.exceptions.domain_error import InvalidFieldsError
+
+MAX_BATCH_IDS = 100
+MAX_BULK_PARCELS = 500
+
 class ParcelCreateSchema(BaseModel):
     name: str = Field(..., min_length=2, max_length=255, description="Название посылки")
     weight_kg: float = Field(0.01, ge=0.01, le=100.0, description="Вес в килограммах (от 0.01 до 100)")
@@ -33,6 +39,16 @@ class ParcelCreateSchema(BaseModel):
 class ParcelCreatedResponse(BaseModel):
     parcel_id: str
     message: str
+    delivery_price_rub: Optional[float] = None
+
+class ParcelBulkItemResponse(BaseModel):
+    index: int
+    parcel_id: str
+    message: str
+    delivery_price_rub: Optional[float] = None
+
+class ParcelBulkCreatedResponse(BaseModel):
+    items: List[ParcelBulkItemResponse]
 
 class ParcelDetailResponse(BaseModel):
     parcel_id: str
@@ -42,6 +58,43 @@ class ParcelDetailResponse(BaseModel):
     cost_adjustment_usd: float
     delivery_price_rub: Optional[float | str]
 
+# Поля карточки, доступные в параметре fields (в порядке схемы)
+PARCEL_FIELDS: Tuple[str, ...] = tuple(ParcelDetailResponse.model_fields)
+
+def parse_parcel_fields(raw: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Разбирает параметр `fields` (поля через запятую) и проверяет их по схеме ParcelDetailResponse.
+
+    parcel_id добавляется всегда, поля упорядочиваются как в схеме, поэтому одинаковые
+    наборы дают одинаковый ключ кеша.
+
+    :param raw: Значение параметра или None.
+    :type raw: Optional[str]
+    :raises InvalidFieldsError: Если запрошены поля, которых нет в схеме.
+    :return: Выбранные поля или None, если нужны все.
+    :rtype: Optional[Tuple[str, ...]]
+    """
+    if raw is None or not raw.strip():
+        return None
+    requested = {field.strip() for field in raw.split(",") if field.strip()}
+    unknown = sorted(requested.difference(PARCEL_FIELDS))
+    if unknown:
+        raise InvalidFieldsError(unknown)
+    requested.add("parcel_id")
+    if len(requested) == len(PARCEL_FIELDS):
+        return None
+    return tuple(field for field in PARCEL_FIELDS if field in requested)
+
 class ParcelListResponse(BaseModel):
     items: List[ParcelDetailResponse]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+class ParcelBatchRequest(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=MAX_BATCH_IDS, description="ID посылок")
+
+class ParcelBatchResponse(BaseModel):
+    items: List[ParcelDetailResponse]
+    not_found: List[str] = []
+    access_denied: List[str] = []
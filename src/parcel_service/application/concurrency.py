@@ -0,0 +1,30 @@
+import asyncio
+from typing import Any, Awaitable, List
+
+
+async def gather_or_cancel(*aws: Awaitable[Any]) -> List[Any]:
+    """
+    Выполняет корутины конкурентно и возвращает их результаты в порядке передачи.
+
+    В отличие от `asyncio.gather`, при первой ошибке остальные задачи отменяются
+    и дожидаются завершения, а исключение пробрасывается как есть (без ExceptionGroup).
+    Отмена вызывающей задачи также отменяет все дочерние: ни одна задача
+    не переживает вызов.
+
+    :param aws: Корутины.
+    :type aws: Awaitable[Any]
+    :return: Результаты в порядке передачи.
+    :rtype: List[Any]
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in tasks:
+            if task in done and task.exception() is not None:
+                raise task.exception()
+        return [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,5 +1,6 @@
 from loguru import logger
 from src.parcel_service.domain.interfaces.uow import IUnitOfWork
+from src.parcel_service.domain.constants.db import IsolationLevel
 from src.parcel_service.domain.interfaces.usecase import IUseCase, TDeps
 
 from src.parcel_service.domain.interfaces.repository import IParcelRepository
@@ -13,6 +14,9 @@ class BindCompanyUseCase(IUseCase[BindCompanyData, BindCompanyResult, None]):
     UseCase для привязки компании к посылке, если она ещё не привязана.
     """
 
+    # Проверка и привязка под SELECT ... FOR UPDATE должны видеть одно состояние посылки
+    isolation_level = IsolationLevel.REPEATABLE_READ
+
     async def __call__(self, dto: BindCompanyData, uow: IUnitOfWork, deps: TDeps = None) -> BindCompanyResult:
         """
         Выполняет привязку компании к посылке.
@@ -31,7 +35,7 @@ class BindCompanyUseCase(IUseCase[BindCompanyData, BindCompanyResult, None]):
         logger.info("BindCompanyUseCase started | parcel_id={} company_id={}", dto.parcel_id, dto.company_id)
 
         try:
-            async with uow:
+            async with uow.isolation(self.isolation_level):
 
                 repo_parcel = await uow.get_repo(IParcelRepository)
                 result = await repo_parcel.bind_company_if_unset(parcel_id=dto.parcel_id, company_id=dto.company_id)
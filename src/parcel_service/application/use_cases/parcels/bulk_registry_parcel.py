@@ -0,0 +1,115 @@
+import json
+from datetime import datetime, timezone
+from typing import List, Optional
+from loguru import logger
+
+from src.parcel_service.application.use_cases.parcels.registry_parcel import (
+    build_outbox_row, build_view_row, bump_generation, mark_written, read_usd_rate, with_delivery_price
+)
+from src.parcel_service.domain.constants.db import IsolationLevel
+from src.parcel_service.domain.dto.dto_create_parcel import ParcelBulkData, ParcelBulkResult, ParcelResult, RegistryParcelDeps
+from src.parcel_service.domain.interfaces.cache import IParcelFilter
+from src.parcel_service.domain.interfaces.repository import IOutboxEventRepository, IParcelViewRepository
+from src.parcel_service.domain.interfaces.uow import IUnitOfWork
+from src.parcel_service.domain.interfaces.usecase import IUseCase
+
+from src.parcel_service.domain.exceptions.domain_error import OutboxDuplicateError, OutboxPersistenceError
+
+
+class BulkRegistryParcelUseCase(IUseCase[ParcelBulkData, ParcelBulkResult, Optional[RegistryParcelDeps]]):
+    """
+    UseCase массовой регистрации посылок одной сессии.
+
+    Все outbox-события регистрации и записи read-модели `parcel_view` вставляются
+    двумя многострочными INSERT в одной транзакции: пачка регистрируется целиком или
+    не регистрируется вовсе. После фиксации, как и при одиночной регистрации, сессия
+    помечается как недавно записывавшая, все parcel_id добавляются в фильтр Блума одним
+    вызовом, а поколение кеша сессии увеличивается один раз на пачку. Стоимость доставки
+    рассчитывается при регистрации по курсу, прочитанному один раз на пачку.
+
+    :param dto: Посылки и идентификатор сессии.
+    :type dto: ParcelBulkData
+    :param uow: Единица работы (Unit of Work) для управления транзакцией и получения репозиториев.
+    :type uow: IUnitOfWork
+    :param deps: Курс, счётчик поколений кеша, фильтр известных посылок и маркеры записей (опционально).
+    :type deps: Optional[RegistryParcelDeps]
+    :return: Результаты регистрации в порядке запроса.
+    :rtype: ParcelBulkResult
+    """
+
+    # Только вставки по новым ключам, как у одиночной регистрации
+    isolation_level = IsolationLevel.READ_COMMITTED
+
+    async def __call__(self, dto: ParcelBulkData, uow: IUnitOfWork, deps: Optional[RegistryParcelDeps] = None) -> ParcelBulkResult:
+        logger.info("Начало массовой регистрации посылок | session_id={} count={}", dto.session_id, len(dto.items))
+
+        try:
+            items = dto.items
+            if deps is not None and deps.usd_rate is not None:
+                usd_to_rub = await read_usd_rate(deps.usd_rate)
+                items = tuple(with_delivery_price(item, usd_to_rub) for item in items)
+
+            created_at = datetime.now(timezone.utc)
+            outbox_rows = []
+            view_rows = []
+            for item in items:
+                outbox_row = build_outbox_row(item, created_at)
+
+                # Валидация сериализуемости
+                json.dumps(outbox_row["payload"])
+
+                outbox_rows.append(outbox_row)
+                view_rows.append(build_view_row(item, created_at))
+
+            async with uow.isolation(self.isolation_level):
+                repo_outbox = await uow.get_repo(repo_type=IOutboxEventRepository)
+                await repo_outbox.add_many(outbox_rows)
+
+                repo_view = await uow.get_repo(repo_type=IParcelViewRepository)
+                await repo_view.add_many(view_rows)
+
+            logger.info("События Outbox успешно добавлены | session_id={} count={}", dto.session_id, len(outbox_rows))
+
+            parcel_ids = [item.parcel_id for item in items]
+            # Маркер ставится до увеличения поколения: пересчёт списка не должен читать отстающую реплику
+            if deps is not None and deps.recent_writes is not None:
+                await mark_written(deps.recent_writes, dto.session_id)
+            if deps is not None and deps.parcel_filter is not None:
+                await self._remember_parcels(deps.parcel_filter, parcel_ids)
+            if deps is not None and deps.generation is not None:
+                await bump_generation(deps.generation, dto.session_id)
+            return ParcelBulkResult(items=tuple(
+                ParcelResult(parcel_id=item.parcel_id, delivery_price_rub=item.delivery_price_rub) for item in items
+            ))
+
+        except OutboxDuplicateError:
+            logger.warning("Событие пачки уже существует | session_id={}", dto.session_id)
+            raise
+
+        except OutboxPersistenceError:
+            logger.error("Ошибка базы данных при массовой регистрации | session_id={}", dto.session_id)
+            raise
+
+        except (TypeError, ValueError) as validation_err:
+            logger.warning("Некорректный payload в пачке | session_id={} error={}", dto.session_id, str(validation_err))
+            raise
+
+        except Exception as e:
+            logger.error("Непредвиденная ошибка при массовой регистрации | session_id={} error={}", dto.session_id, str(e))
+            raise
+
+    @staticmethod
+    async def _remember_parcels(parcel_filter: IParcelFilter, parcel_ids: List[str]) -> None:
+        """
+        Добавляет parcel_id пачки в фильтр известных посылок одним вызовом. Ошибка только
+        логируется: воркер повторно добавит посылки при обработке событий регистрации.
+
+        :param parcel_filter: Фильтр известных посылок.
+        :type parcel_filter: IParcelFilter
+        :param parcel_ids: Идентификаторы посылок.
+        :type parcel_ids: List[str]
+        """
+        try:
+            await parcel_filter.add_many(parcel_ids)
+        except Exception as e:
+            logger.warning("Не удалось добавить пачку в фильтр Блума | count={} error={}", len(parcel_ids), str(e))
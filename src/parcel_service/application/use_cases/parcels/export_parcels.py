@@ -0,0 +1,56 @@
+import asyncio
+from typing import AsyncIterator, List
+
+from loguru import logger
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelDetailResult, ParcelExportQuery
+from src.parcel_service.domain.interfaces.repository import IParcelCombinedRepository
+from src.parcel_service.domain.interfaces.uow import IUnitOfWork
+from src.parcel_service.domain.constants.db import IsolationLevel
+from src.parcel_service.domain.interfaces.usecase import IUseCase, TDeps
+
+
+class ExportParcelsUseCase(IUseCase[ParcelExportQuery, AsyncIterator[List[ParcelDetailResult]], None]):
+    """
+    UseCase потоковой выгрузки всех посылок сессии.
+
+    Возвращает асинхронный итератор порций: Unit of Work открывается при чтении первой
+    порции и закрывается после последней, поэтому итератор должен быть дочитан
+    или закрыт вызывающим кодом. Строки читаются серверным курсором, в памяти
+    находится не больше одной порции.
+
+    :param dto: Параметры выгрузки (session_id, фильтры, размер порции).
+    :param uow: Юнит работы, через который получаются репозитории.
+    :param deps: Не используется в данном UseCase.
+    :return: Асинхронный итератор списков ParcelDetailResult.
+    """
+
+    # Длинное чтение курсором: снимок REPEATABLE READ удерживал бы историю undo
+    isolation_level = IsolationLevel.READ_COMMITTED
+
+    async def __call__(self, dto: ParcelExportQuery, uow: IUnitOfWork, deps: TDeps = None) -> AsyncIterator[List[ParcelDetailResult]]:
+        return self._chunks(dto, uow)
+
+    @staticmethod
+    async def _chunks(dto: ParcelExportQuery, uow: IUnitOfWork) -> AsyncIterator[List[ParcelDetailResult]]:
+        exported = 0
+        try:
+            async with uow.isolation(ExportParcelsUseCase.isolation_level):
+                repo_combine = await uow.get_repo(IParcelCombinedRepository)
+                async for rows in repo_combine.stream_rows(
+                    session_id=dto.session_id,
+                    chunk_size=dto.chunk_size,
+                    type_id=dto.type_id,
+                    has_delivery_price=dto.has_delivery_price
+                ):
+                    exported += len(rows)
+                    yield [
+                        ParcelDetailResult(parcel_id, name, float(weight_kg or 0.0), type_id, cost_adjustment_usd, delivery_price_rub)
+                        for parcel_id, _, name, weight_kg, type_id, cost_adjustment_usd, delivery_price_rub in rows
+                    ]
+            logger.info("Выгрузка посылок завершена | session_id={} parcels={}", dto.session_id, exported)
+        except (asyncio.CancelledError, GeneratorExit):
+            logger.info("Выгрузка посылок прервана | session_id={} exported={}", dto.session_id, exported)
+            raise
+        except Exception as e:
+            logger.exception("Ошибка выгрузки посылок | session_id={} exported={} | {}", dto.session_id, exported, str(e))
+            raise
@@ -2,6 +2,7 @@ from typing import List
 from loguru import logger
 from src.parcel_service.domain.interfaces.repository import IParcelTypeRepository
 from src.parcel_service.domain.interfaces.uow import IUnitOfWork
+from src.parcel_service.domain.constants.db import IsolationLevel
 from src.parcel_service.domain.interfaces.usecase import IUseCase, TDeps
 from src.parcel_service.domain.dto.dto_parcel_type import ParcelType
 
@@ -11,9 +12,12 @@ class GetAllTypeParcelsUseCase(IUseCase[None, List[ParcelType], None]):
     UseCase для получения всех типов посылок.
     """
 
+    # Справочник только читается
+    isolation_level = IsolationLevel.READ_COMMITTED
+
     async def __call__(self, dto: None, uow: IUnitOfWork, deps: TDeps = None) -> List[ParcelType]:
         try:
-            async with uow:
+            async with uow.isolation(self.isolation_level):
                 repo = await uow.get_repo(IParcelTypeRepository)
                 logger.debug("Получение всех типов посылок из репозитория")
 
@@ -0,0 +1,76 @@
+from typing import Dict, List
+
+from loguru import logger
+from sqlalchemy import Row
+from src.parcel_service.application.concurrency import gather_or_cancel
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelBatchQuery, ParcelBatchResult, ParcelDetailResult
+from src.parcel_service.domain.interfaces.repository import IParcelCombinedRepository
+from src.parcel_service.domain.interfaces.uow import IUnitOfWork
+from src.parcel_service.domain.constants.db import IsolationLevel
+from src.parcel_service.domain.constants.parcel import NOT_CALCULATED
+from src.parcel_service.domain.interfaces.usecase import IUseCase, TDeps
+
+
+class GetParcelsBatchUseCase(IUseCase[ParcelBatchQuery, ParcelBatchResult, None]):
+    """
+    UseCase для получения карточек нескольких посылок за постоянное число запросов.
+
+    Все посылки читаются одним IN-запросом к `parcels` и, конкурентно с ним на отдельном
+    соединении, одним IN-запросом к `outbox_events` (событие регистрации ещё не обработанных
+    воркером посылок); при наличии в обоих источниках берётся строка из `parcels`. Выбираются только колонки
+    карточки, и `ParcelDetailResult` строится прямо из кортежей строк, без ORM-сущностей.
+    Принадлежность сессии проверяется для каждой посылки отдельно: чужие и отсутствующие
+    не прерывают ответ, а возвращаются списками `access_denied` и `not_found`.
+
+    :param dto: Идентификаторы посылок и session_id.
+    :param uow: Юнит работы, через который получаются репозитории.
+    :param deps: Не используется в данном UseCase.
+    :return: Найденные карточки в порядке запроса и списки отказов.
+    :raises Exception: При любых ошибках выполнения логируется и пробрасывается дальше.
+    """
+
+    # Чтение без снимка и gap-блокировок
+    isolation_level = IsolationLevel.READ_COMMITTED
+
+    async def __call__(self, dto: ParcelBatchQuery, uow: IUnitOfWork, deps: TDeps = None) -> ParcelBatchResult:
+        try:
+            async with uow.isolation(self.isolation_level):
+                repo_combine = await uow.get_repo(IParcelCombinedRepository)
+
+                async def load_outbox() -> List[Row]:
+                    async with uow.read_only(IParcelCombinedRepository) as reader:
+                        return await reader.get_outbox_details_by_parcel_ids(dto.parcel_ids)
+
+                # Оба IN-запроса независимы — выполняются конкурентно на разных соединениях
+                from_parcels, from_outbox = await gather_or_cancel(
+                    repo_combine.get_parcel_details_by_ids(dto.parcel_ids), load_outbox()
+                )
+                logger.debug("Пакетный запрос | parcels={} outbox={} requested={}", len(from_parcels), len(from_outbox), len(dto.parcel_ids))
+                # Обработанная посылка в parcels приоритетнее события регистрации
+                rows: Dict[str, Row] = {row.parcel_id: row for row in from_outbox}
+                rows.update((row.parcel_id, row) for row in from_parcels)
+
+            items: List[ParcelDetailResult] = []
+            not_found: List[str] = []
+            access_denied: List[str] = []
+            for parcel_id in dto.parcel_ids:
+                row = rows.get(parcel_id)
+                if row is None:
+                    not_found.append(parcel_id)
+                    continue
+                _, session_id, name, weight_kg, type_id, cost_adjustment_usd, delivery_price_rub = row
+                if session_id != dto.session_id:
+                    access_denied.append(parcel_id)
+                    continue
+                items.append(ParcelDetailResult(
+                    parcel_id, name, weight_kg, type_id, cost_adjustment_usd,
+                    delivery_price_rub if delivery_price_rub is not None else NOT_CALCULATED
+                ))
+
+            if access_denied:
+                logger.warning("Доступ к посылкам запрещён | session_id={} parcel_ids={}", dto.session_id, access_denied)
+            return ParcelBatchResult(items=items, not_found=not_found, access_denied=access_denied)
+
+        except Exception as e:
+            logger.exception("Непредвиденная ошибка при пакетном получении посылок | session_id={} | {}", dto.session_id, str(e))
+            raise
@@ -1,96 +1,97 @@
+from typing import List, Optional
+
 from loguru import logger
+from sqlalchemy import Row
+from src.parcel_service.application.concurrency import gather_or_cancel
 from src.parcel_service.domain.interfaces.uow import IUnitOfWork
+from src.parcel_service.domain.constants.db import IsolationLevel
+from src.parcel_service.domain.constants.parcel import NOT_CALCULATED
 from src.parcel_service.domain.interfaces.usecase import IUseCase, TDeps
 from src.parcel_service.domain.interfaces.repository import IParcelCombinedRepository
-from src.parcel_service.domain.dto.dto_parcel_query import ParcelQueryList, ParcelDetailQueryList, ParcelDetailResult
+from src.parcel_service.domain.exceptions.domain_error import InvalidCursorError
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelCursor, ParcelQueryList, ParcelDetailQueryList, ParcelDetailResult
 
 
 class GetParcelsListUseCase(IUseCase[ParcelQueryList, ParcelDetailQueryList, None]):
     """
     UseCase для получения списка посылок по session_id с возможностью фильтрации и пагинации.
 
+    Страница и общее количество — независимые запросы, поэтому они выполняются конкурентно:
+    страница через основную сессию, подсчёт — через отдельное соединение для чтения
+    (`uow.read_only`). Задержка определяется более медленным из двух запросов, а не их суммой;
+    при ошибке одного второй отменяется. В режиме `with_total=False` подсчёт не выполняется,
+    а наличие следующей страницы определяется по выборке `limit + 1`.
+    При заданном `fields` из БД читаются только эти поля.
+
     :param dto: Объект запроса, содержащий session_id, offset, limit, фильтры и пр.
     :param uow: Юнит работы, через который получаются репозитории.
     :param deps: Не используется в данном UseCase.
-    :return: Список посылок и их общее количество в виде ParcelDetailQueryList.
+    :return: Список посылок, их общее количество и курсор следующей страницы в виде ParcelDetailQueryList.
+    :raises InvalidCursorError: Если передан повреждённый курсор.
     :raises Exception: При любых ошибках выполнения логируется и пробрасывается дальше.
     """
 
+    # Чтение без снимка и gap-блокировок: страница и подсчёт не обязаны быть согласованы
+    isolation_level = IsolationLevel.READ_COMMITTED
+
     async def __call__(self, dto: ParcelQueryList, uow: IUnitOfWork, deps: TDeps = None) -> ParcelDetailQueryList:
         try:
-            async with uow:
+            after = ParcelCursor.decode(dto.cursor) if dto.cursor else None
+
+            async with uow.isolation(self.isolation_level):
                 repo_combine = await uow.get_repo(IParcelCombinedRepository)
                 logger.debug("Получен репозиторий ParcelCombinedRepository")
 
-                # Получаем ID + source по пагинации
-                ids_with_source = await repo_combine.list_paginated(
-                    session_id=dto.session_id,
-                    limit=dto.limit,
-                    offset=dto.offset,
-                    type_id=dto.type_id
-                )
-                logger.info("Получено %s ID из пагинации", len(ids_with_source))
-
-                # Получаем общее количество уникальных записей с учётом фильтра
-                total = await repo_combine.count(
-                    session_id=dto.session_id,
-                    has_delivery_price=dto.has_delivery_price,
-                    type_id=dto.type_id
-                )
-                logger.info("Общее количество подходящих записей: %s", total)
-
-                # Разделяем ID по источникам
-                parcel_ids = [pid for pid, src in ids_with_source if src == "parcel"]
-                outbox_ids = [pid for pid, src in ids_with_source if src == "outbox"]
-
-                # Получаем записи
-                parcels = await repo_combine.get_parcels_by_ids(parcel_ids)
-                outboxes = await repo_combine.get_outbox_by_parcel_ids(outbox_ids)
-
-                # Преобразуем в DTO
-                parcel_map = {
-                    p.id: ParcelDetailResult(
-                        parcel_id=p.id,
-                        name=p.name,
-                        weight_kg=p.weight_kg,
-                        type_id=p.type_id,
-                        cost_adjustment_usd=p.cost_adjustment_usd,
-                        delivery_price_rub=(
-                            p.delivery_price_rub if p.delivery_price_rub is not None
-                            else ("Не рассчитано" if not dto.has_delivery_price else None)
-                        )
+                async def load_page() -> List[Row]:
+                    return await repo_combine.list_page(
+                        session_id=dto.session_id,
+                        limit=dto.limit,
+                        offset=dto.offset,
+                        type_id=dto.type_id,
+                        has_delivery_price=dto.has_delivery_price,
+                        after=after,
+                        fields=dto.fields
                     )
-                    for p in parcels
-                    if not dto.has_delivery_price or p.delivery_price_rub is not None
-                }
-
-                outbox_map = {
-                    o.parcel_id: ParcelDetailResult(
-                        parcel_id=o.parcel_id,
-                        name=o.payload.get("name"),
-                        weight_kg=float(o.payload.get("weight_kg", 0.0)),
-                        type_id=o.payload.get("type_id"),
-                        cost_adjustment_usd=o.payload.get("cost_adjustment_usd"),
-                        delivery_price_rub=(
-                            o.payload.get("delivery_price_rub")
-                            if o.payload.get("delivery_price_rub") is not None
-                            else ("Не рассчитано" if not dto.has_delivery_price else None)
+
+                async def load_total() -> Optional[int]:
+                    if not dto.with_total:
+                        return None
+                    async with uow.read_only(IParcelCombinedRepository) as reader:
+                        return await reader.count(
+                            session_id=dto.session_id,
+                            has_delivery_price=dto.has_delivery_price,
+                            type_id=dto.type_id
                         )
+
+                # Страница и подсчёт не зависят друг от друга — выполняются конкурентно
+                rows, total = await gather_or_cancel(load_page(), load_total())
+                logger.info("Получено {} строк страницы, общее количество: {}", len(rows), total)
+
+                has_more = len(rows) > dto.limit
+                rows = rows[:dto.limit]
+
+                # Преобразуем в DTO прямо из кортежей строк
+                not_calculated = NOT_CALCULATED if not dto.has_delivery_price else None
+                items = [
+                    ParcelDetailResult(
+                        parcel_id, name, float(weight_kg or 0.0), type_id, cost_adjustment_usd,
+                        delivery_price_rub if delivery_price_rub is not None else not_calculated
                     )
-                    for o in outboxes
-                    if not dto.has_delivery_price or o.payload.get("delivery_price_rub") is not None
-                }
-
-                # Объединяем и возвращаем
-                result_map = {**parcel_map, **outbox_map}
-                ordered_results = [
-                    result_map[pid] for pid, _ in ids_with_source if pid in result_map
+                    for parcel_id, _, name, weight_kg, type_id, cost_adjustment_usd, delivery_price_rub, *_ in rows
                 ]
-                logger.debug("result_map: {}", result_map)
+                logger.debug("items: {}", items)
+
+                # Есть следующая страница — отдаём позицию последней записи
+                next_cursor = None
+                if has_more:
+                    next_cursor = ParcelCursor(created_at=rows[-1].created_at, parcel_id=rows[-1].parcel_id).encode()
 
-                return ParcelDetailQueryList(items=ordered_results, total=total)
+                return ParcelDetailQueryList(items=items, total=total, next_cursor=next_cursor, has_more=has_more)
+
+        except InvalidCursorError:
+            logger.warning("Передан некорректный курсор пагинации | session_id={}", dto.session_id)
+            raise
         except Exception as e:
             # Можно логировать здесь
-            logger.exception("Не удалось получить список посылок: %s", str(e))
+            logger.exception("Не удалось получить список посылок: {}", str(e))
             raise
-
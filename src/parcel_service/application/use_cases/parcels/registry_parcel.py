@@ -1,56 +1,211 @@
 import json
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
 from uuid import uuid4
 from loguru import logger
 
-from src.parcel_service.domain.dto.dto_create_parcel import ParcelData, ParcelResult
-from src.parcel_service.domain.interfaces.repository import IOutboxEventRepository
-from src.parcel_service.domain.interfaces.uow import IUnitOfWork
-from src.parcel_service.domain.interfaces.usecase import IUseCase, TDeps
-from src.parcel_service.infrastructure.db.sql.models import OutboxEvent
+from src.parcel_service.domain.dto.dto_create_parcel import ParcelData, ParcelResult, RegistryParcelDeps
+from src.parcel_service.domain.interfaces.cache import ICacheGeneration, IParcelFilter, IRecentWrites, IUsdRate
+from src.parcel_service.domain.interfaces.repository import IOutboxEventRepository, IParcelViewRepository
+from src.parcel_service.domain.interfaces.uow import IRegistrationBuffer, IUnitOfWork
+from src.parcel_service.domain.constants.db import IsolationLevel
+from src.parcel_service.domain.constants.events import EventType
+from src.parcel_service.domain.interfaces.usecase import IUseCase
+from src.parcel_service.domain.services.pricing import calculate_delivery_price
+from src.parcel_service.infrastructure.db.sql.models import OutboxEvent, ParcelView
 
-from src.parcel_service.domain.exceptions.domain_error import OutboxDuplicateError, OutboxPersistenceError
+from src.parcel_service.domain.exceptions.domain_error import OutboxDuplicateError, OutboxPersistenceError, RegistrationBufferFull
 
 
-class RegistryParcelUseCase(IUseCase[ParcelData, ParcelResult, None]):
+def with_delivery_price(dto: ParcelData, usd_to_rub: Optional[float]) -> ParcelData:
+    """
+    Дополняет данные посылки стоимостью доставки, рассчитанной по курсу.
+
+    :param dto: Данные о посылке.
+    :type dto: ParcelData
+    :param usd_to_rub: Курс USD → RUB (None — курса нет, стоимость рассчитает воркер).
+    :type usd_to_rub: Optional[float]
+    :return: Данные о посылке со стоимостью доставки или исходные данные.
+    :rtype: ParcelData
+    """
+    if usd_to_rub is None or dto.delivery_price_rub is not None:
+        return dto
+    return replace(dto, delivery_price_rub=calculate_delivery_price(dto.weight_kg, dto.cost_adjustment_usd, usd_to_rub))
+
+
+def build_outbox_row(dto: ParcelData, created_at: datetime) -> Dict[str, Any]:
+    """
+    Формирует значения колонок outbox-события регистрации посылки.
+
+    :param dto: Данные о посылке.
+    :type dto: ParcelData
+    :param created_at: Время регистрации.
+    :type created_at: datetime
+    :return: Значения колонок OutboxEvent.
+    :rtype: Dict[str, Any]
+    """
+    return {
+        "id": str(uuid4()),
+        "parcel_id": dto.parcel_id,
+        "session_id": dto.session_id,
+        "event_type": EventType.PARCEL_REGISTERED.value,
+        "payload": dto.to_payload(),
+        "created_at": created_at,
+    }
+
+
+def build_view_row(dto: ParcelData, created_at: datetime) -> Dict[str, Any]:
+    """
+    Формирует значения колонок записи read-модели `parcel_view` для новой посылки.
+
+    :param dto: Данные о посылке.
+    :type dto: ParcelData
+    :param created_at: Время регистрации.
+    :type created_at: datetime
+    :return: Значения колонок ParcelView.
+    :rtype: Dict[str, Any]
+    """
+    return {
+        "parcel_id": dto.parcel_id,
+        "session_id": dto.session_id,
+        "name": dto.name,
+        "weight_kg": dto.weight_kg,
+        "type_id": dto.type_id,
+        "cost_adjustment_usd": dto.cost_adjustment_usd,
+        "delivery_price_rub": dto.delivery_price_rub,
+        "has_price": dto.delivery_price_rub is not None,
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+async def read_usd_rate(usd_rate: IUsdRate) -> Optional[float]:
+    """
+    Читает закешированный курс USD → RUB. Ошибка Redis не мешает регистрации:
+    она только логируется, и стоимость рассчитает воркер.
+
+    :param usd_rate: Закешированный курс.
+    :type usd_rate: IUsdRate
+    :return: Курс или None, если его нет или Redis недоступен.
+    :rtype: Optional[float]
+    """
+    try:
+        return await usd_rate.get()
+    except Exception as e:
+        logger.warning("Не удалось прочитать курс USD | error={}", str(e))
+        return None
+
+
+async def mark_written(recent_writes: IRecentWrites, session_id: str) -> None:
+    """
+    Помечает сессию как недавно записывавшую данные. Ошибка Redis только логируется.
+
+    :param recent_writes: Маркеры недавних записей сессий.
+    :type recent_writes: IRecentWrites
+    :param session_id: Идентификатор сессии.
+    :type session_id: str
+    """
+    try:
+        await recent_writes.mark(session_id)
+    except Exception as e:
+        logger.warning("Не удалось пометить запись сессии | session_id={} error={}", session_id, str(e))
+
+
+async def bump_generation(generation: ICacheGeneration, session_id: str) -> None:
+    """
+    Увеличивает поколение кеша сессии. Ошибка Redis не отменяет уже зафиксированную
+    регистрацию и только логируется.
+
+    :param generation: Счётчик поколений кеша.
+    :type generation: ICacheGeneration
+    :param session_id: Идентификатор сессии.
+    :type session_id: str
+    """
+    try:
+        value = await generation.bump(session_id)
+        logger.debug("Поколение кеша сессии увеличено | session_id={} generation={}", session_id, value)
+    except Exception as e:
+        logger.warning("Не удалось увеличить поколение кеша | session_id={} error={}", session_id, str(e))
+
+
+class RegistryParcelUseCase(IUseCase[ParcelData, ParcelResult, Optional[RegistryParcelDeps]]):
     """
     UseCase для регистрации новой посылки и записи события в Outbox.
 
+    Если в кеше есть актуальный курс USD → RUB, стоимость доставки рассчитывается сразу:
+    она попадает в payload события, в read-модель и в результат, а воркер принимает её
+    без повторного расчёта. Без курса стоимость, как и раньше, рассчитает воркер.
     Сохраняет информацию о новой посылке в виде события в таблице Outbox, чтобы затем передать
-    данные в другие сервисы через брокер сообщений.
+    данные в другие сервисы через брокер сообщений. В той же транзакции добавляется запись
+    read-модели `parcel_view`, из которой читается список посылок. Если передана групповая
+    фиксация, обе записи уходят в общую транзакцию с конкурентными регистрациями,
+    и UseCase ждёт её коммита. После фиксации транзакции сессия помечается как недавно
+    записывавшая (её чтения идут на основной сервер, пока реплика не догонит его), увеличивается поколение кеша сессии, чтобы закешированные
+    списки перестали отдаваться, и parcel_id добавляется в фильтр Блума известных посылок.
+
+    Если передан буфер регистраций, обе записи добавляются в него, и UseCase возвращает
+    результат, не дожидаясь БД: записи переносит фоновая задача, которая после коммита
+    сама ставит маркер записи и увеличивает поколение кеша. Если буфер заполнен
+    или недоступен, регистрация записывается в БД, как без буфера.
 
     :param dto: Данные о посылке.
     :type dto: ParcelData
     :param uow: Единица работы (Unit of Work) для управления транзакцией и получения репозиториев.
     :type uow: IUnitOfWork
-    :param deps: Зависимости (не используются в данном UseCase).
-    :type deps: None
-    :return: Результат с `parcel_id`.
+    :param deps: Курс, буфер регистраций, групповая фиксация, счётчик поколений кеша, фильтр известных посылок и маркеры записей (опционально).
+    :type deps: Optional[RegistryParcelDeps]
+    :return: Результат с `parcel_id` и стоимостью доставки, если она рассчитана.
     :rtype: ParcelResult
     """
 
-    async def __call__(self, dto: ParcelData , uow: IUnitOfWork, deps: TDeps = None) -> ParcelResult:
+    # Только вставки по новым ключам: gap-блокировки REPEATABLE READ лишь мешают параллельным регистрациям
+    isolation_level = IsolationLevel.READ_COMMITTED
+
+    async def __call__(self, dto: ParcelData , uow: IUnitOfWork, deps: Optional[RegistryParcelDeps] = None) -> ParcelResult:
         logger.info("Начало регистрации посылки | parcel_id={} session_id={}", dto.parcel_id, dto.session_id)
 
         try:
+            if deps is not None and deps.usd_rate is not None:
+                dto = with_delivery_price(dto, await read_usd_rate(deps.usd_rate))
+
             payload = dto.to_payload()
 
             # Валидация сериализуемости
             json.dumps(payload)
 
-            outbox_event = OutboxEvent(
-                id = str(uuid4()),
-                parcel_id = dto.parcel_id,
-                session_id = dto.session_id,
-                event_type = "parcel.registered",
-                payload = dto.to_payload()
-            )
+            created_at = datetime.now(timezone.utc)
+            outbox_row = build_outbox_row(dto, created_at)
+            view_row = build_view_row(dto, created_at)
 
-            async with uow:
-                repo_outbox = await uow.get_repo(repo_type=IOutboxEventRepository)
-                await repo_outbox.add(outbox_event)
+            buffered = False
+            if deps is not None and deps.registration_buffer is not None:
+                buffered = await self._append_to_buffer(deps.registration_buffer, outbox_row, view_row, dto.parcel_id)
 
-            logger.info("Событие Outbox успешно добавлено | parcel_id={}", dto.parcel_id)
-            return ParcelResult(parcel_id=dto.parcel_id)
+            if buffered:
+                logger.info("Регистрация добавлена в буфер | parcel_id={}", dto.parcel_id)
+            elif deps is not None and deps.group_commit is not None:
+                # Ждёт фиксации общей транзакции пачки конкурентных регистраций
+                await deps.group_commit.submit(outbox_row, view_row)
+                logger.info("Событие Outbox успешно добавлено | parcel_id={}", dto.parcel_id)
+            else:
+                async with uow.isolation(self.isolation_level):
+                    repo_outbox = await uow.get_repo(repo_type=IOutboxEventRepository)
+                    await repo_outbox.add(OutboxEvent(**outbox_row))
+
+                    repo_view = await uow.get_repo(repo_type=IParcelViewRepository)
+                    await repo_view.add(ParcelView(**view_row))
+                logger.info("Событие Outbox успешно добавлено | parcel_id={}", dto.parcel_id)
+
+            # Буферизованной регистрации ещё нет в БД: маркер и поколение обновит перенос после коммита.
+            # Маркер ставится до увеличения поколения: пересчёт списка не должен читать отстающую реплику
+            if not buffered and deps is not None and deps.recent_writes is not None:
+                await mark_written(deps.recent_writes, dto.session_id)
+            if deps is not None and deps.parcel_filter is not None:
+                await self._remember_parcel(deps.parcel_filter, dto.parcel_id)
+            if not buffered and deps is not None and deps.generation is not None:
+                await bump_generation(deps.generation, dto.session_id)
+            return ParcelResult(parcel_id=dto.parcel_id, delivery_price_rub=dto.delivery_price_rub)
 
         except OutboxDuplicateError:
             logger.warning("Событие уже существует | parcel_id={}", dto.parcel_id)
@@ -67,3 +222,50 @@ class RegistryParcelUseCase(IUseCase[ParcelData, ParcelResult, None]):
         except Exception as e:
             logger.error("Непредвиденная ошибка при регистрации посылки | parcel_id={} error={}", dto.parcel_id, str(e))
             raise
+
+    @staticmethod
+    async def _append_to_buffer(
+            buffer: IRegistrationBuffer,
+            outbox_row: Dict[str, Any],
+            view_row: Dict[str, Any],
+            parcel_id: str
+    ) -> bool:
+        """
+        Добавляет регистрацию в буфер. Если буфер заполнен или недоступен, регистрация
+        записывается в БД напрямую, поэтому ошибка только логируется.
+
+        :param buffer: Буфер регистраций.
+        :type buffer: IRegistrationBuffer
+        :param outbox_row: Значения колонок outbox-события регистрации.
+        :type outbox_row: Dict[str, Any]
+        :param view_row: Значения колонок записи read-модели `parcel_view`.
+        :type view_row: Dict[str, Any]
+        :param parcel_id: Идентификатор посылки.
+        :type parcel_id: str
+        :return: True, если регистрация добавлена в буфер.
+        :rtype: bool
+        """
+        try:
+            await buffer.append(outbox_row, view_row)
+            return True
+        except RegistrationBufferFull:
+            logger.warning("Буфер регистраций заполнен, запись в БД | parcel_id={}", parcel_id)
+        except Exception as e:
+            logger.warning("Буфер регистраций недоступен, запись в БД | parcel_id={} error={}", parcel_id, str(e))
+        return False
+
+    @staticmethod
+    async def _remember_parcel(parcel_filter: IParcelFilter, parcel_id: str) -> None:
+        """
+        Добавляет parcel_id в фильтр известных посылок. Ошибка только логируется:
+        воркер повторно добавит посылку при обработке события регистрации.
+
+        :param parcel_filter: Фильтр известных посылок.
+        :type parcel_filter: IParcelFilter
+        :param parcel_id: Идентификатор посылки.
+        :type parcel_id: str
+        """
+        try:
+            await parcel_filter.add_many([parcel_id])
+        except Exception as e:
+            logger.warning("Не удалось добавить посылку в фильтр Блума | parcel_id={} error={}", parcel_id, str(e))
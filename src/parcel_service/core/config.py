@@ -1,9 +1,11 @@
 from pathlib import Path
-from typing import Type
+from typing import Dict, Optional, Type
 
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from src.parcel_service.domain.constants.db import RegistrationMode
+
 BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
 
 
@@ -59,10 +61,14 @@ class AppSettings(BaseSettings):
     :vartype api_version: str
     :ivar debug: Флаг режима отладки.
     :vartype debug: bool
+    :ivar registration_mode: Режим записи одиночной регистрации посылки (direct — транзакция
+        до ответа, stream — через Redis Stream с переносом в БД фоновой задачей).
+    :vartype registration_mode: RegistrationMode
     """
     model_config = SettingsConfigDict(extra="ignore", env_prefix="APP_")
     api_version: str = "v1"
     debug: bool = False
+    registration_mode: RegistrationMode = RegistrationMode.DIRECT
 
 class DatabaseSettings(BaseSettings):
     """
@@ -90,6 +96,20 @@ class DatabaseSettings(BaseSettings):
     :vartype pool_recycle: int
     :ivar isolation_level: Уровень изоляции транзакций.
     :vartype isolation_level: str
+    :ivar read_host: Адрес реплики для чтения (None — чтение с основного сервера).
+    :vartype read_host: Optional[str]
+    :ivar read_port: Порт реплики (None — как у основного сервера).
+    :vartype read_port: Optional[int]
+    :ivar read_isolation_level: Уровень изоляции транзакций чтения (None — как у основного сервера).
+    :vartype read_isolation_level: Optional[str]
+    :ivar read_your_writes_ttl: Сколько секунд после записи сессия читает с основного сервера (задержка реплики).
+    :vartype read_your_writes_ttl: int
+    :ivar group_commit_enabled: Фиксировать конкурентные регистрации посылок общими транзакциями.
+    :vartype group_commit_enabled: bool
+    :ivar group_commit_max_batch: Максимум регистраций в одной групповой транзакции.
+    :vartype group_commit_max_batch: int
+    :ivar group_commit_max_delay_ms: Максимальное ожидание пополнения пачки (мс).
+    :vartype group_commit_max_delay_ms: float
     """
     model_config = SettingsConfigDict(extra="ignore", env_prefix="DATABASE_")
     type: str
@@ -103,6 +123,13 @@ class DatabaseSettings(BaseSettings):
     pool_timeout: int = 30
     pool_recycle: int = 1800
     isolation_level: str = "REPEATABLE READ"
+    read_host: Optional[str] = None
+    read_port: Optional[int] = None
+    read_isolation_level: Optional[str] = "READ COMMITTED"
+    read_your_writes_ttl: int = 5
+    group_commit_enabled: bool = False
+    group_commit_max_batch: int = 100
+    group_commit_max_delay_ms: float = 5.0
 
 class RedisSettings(BaseSettings):
     """
@@ -129,6 +156,144 @@ class RedisSettings(BaseSettings):
     retry_on_timeout: bool = True
     health_check_interval: int = 30
 
+class LocalCachePolicySettings(BaseModel):
+    """
+    Политика локального (in-process) кеша для пространства имён.
+
+    :ivar ttl: Время жизни записи (сек), 0 — не кешировать локально.
+    :vartype ttl: float
+    :ivar max_size: Максимальное количество записей (LRU-вытеснение).
+    :vartype max_size: int
+    """
+    ttl: float
+    max_size: int
+
+class CacheSettings(BaseSettings):
+    """
+    Настройки кеширования ответов API в Redis и локальном кеше процесса.
+
+    :ivar list_ttl: TTL страниц списка посылок (сек).
+    :vartype list_ttl: int
+    :ivar detail_ttl: TTL карточки посылки (сек).
+    :vartype detail_ttl: int
+    :ivar types_ttl: TTL справочника типов посылок (сек).
+    :vartype types_ttl: int
+    :ivar generation_ttl: TTL счётчика поколений сессии (сек), должен превышать TTL записей.
+    :vartype generation_ttl: int
+    :ivar local_enabled: Включён ли локальный кеш перед Redis.
+    :vartype local_enabled: bool
+    :ivar local_ttl: TTL локального кеша по умолчанию (сек).
+    :vartype local_ttl: float
+    :ivar local_max_size: Размер пространства имён локального кеша по умолчанию.
+    :vartype local_max_size: int
+    :ivar local_policies: Политики локального кеша по пространствам имён (JSON в CACHE_LOCAL_POLICIES).
+    :vartype local_policies: Dict[str, LocalCachePolicySettings]
+    :ivar invalidation_channel: Канал Redis pub/sub для инвалидации локального кеша.
+    :vartype invalidation_channel: str
+    :ivar ttl_jitter: Доля случайного уменьшения TTL записей (0..1).
+    :vartype ttl_jitter: float
+    :ivar xfetch_beta: Коэффициент вероятностного раннего обновления (0 — выключено).
+    :vartype xfetch_beta: float
+    :ivar lock_ttl_ms: Срок жизни блокировки вычисления значения между процессами (мс).
+    :vartype lock_ttl_ms: int
+    :ivar lock_wait_timeout: Максимальное ожидание значения, вычисляемого другим процессом (сек).
+    :vartype lock_wait_timeout: float
+    :ivar lock_poll_interval: Интервал опроса Redis при ожидании значения (сек).
+    :vartype lock_poll_interval: float
+    :ivar negative_ttl: TTL записи об отсутствующей посылке (сек).
+    :vartype negative_ttl: int
+    :ivar bloom_enabled: Отсекать неизвестные parcel_id фильтром Блума до обращения к БД.
+    :vartype bloom_enabled: bool
+    :ivar bloom_key: Ключ Redis с битовой картой фильтра.
+    :vartype bloom_key: str
+    :ivar bloom_capacity: Ожидаемое количество посылок, под которое рассчитан фильтр.
+    :vartype bloom_capacity: int
+    :ivar bloom_error_rate: Допустимая доля ложноположительных ответов фильтра.
+    :vartype bloom_error_rate: float
+    :ivar bloom_refresh_interval: Период обновления локального снимка фильтра (сек).
+    :vartype bloom_refresh_interval: float
+    """
+    model_config = SettingsConfigDict(extra="ignore", env_prefix="CACHE_")
+    list_ttl: int = 6 * 3600
+    detail_ttl: int = 6 * 3600
+    types_ttl: int = 24 * 3600
+    generation_ttl: int = 7 * 24 * 3600
+    local_enabled: bool = True
+    local_ttl: float = 30
+    local_max_size: int = 1000
+    local_policies: Dict[str, LocalCachePolicySettings] = {
+        "parcel_types": LocalCachePolicySettings(ttl=300, max_size=8),
+        "parcel_detail": LocalCachePolicySettings(ttl=60, max_size=5000),
+        "parcel_list": LocalCachePolicySettings(ttl=30, max_size=2000),
+        "generation": LocalCachePolicySettings(ttl=5, max_size=10000),
+        "parcel_missing": LocalCachePolicySettings(ttl=10, max_size=10000),
+    }
+    invalidation_channel: str = "cache:invalidate"
+    ttl_jitter: float = 0.1
+    xfetch_beta: float = 1.0
+    lock_ttl_ms: int = 5000
+    lock_wait_timeout: float = 5.0
+    lock_poll_interval: float = 0.05
+    negative_ttl: int = 30
+    bloom_enabled: bool = True
+    bloom_key: str = "bloom:parcels"
+    bloom_capacity: int = 1_000_000
+    bloom_error_rate: float = 0.01
+    bloom_refresh_interval: float = 30.0
+
+class IdempotencySettings(BaseSettings):
+    """
+    Настройки идемпотентных запросов по заголовку Idempotency-Key.
+
+    :ivar enabled: Учитывать ли заголовок Idempotency-Key.
+    :vartype enabled: bool
+    :ivar ttl: Срок хранения ответа для повторов (сек).
+    :vartype ttl: int
+    :ivar lock_ttl: Срок резерва ключа на время выполнения запроса (сек).
+    :vartype lock_ttl: int
+    :ivar wait_timeout: Максимальное ожидание ответа конкурентного запроса с тем же ключом (сек).
+    :vartype wait_timeout: float
+    :ivar poll_interval: Интервал опроса Redis при ожидании ответа (сек).
+    :vartype poll_interval: float
+    :ivar max_key_length: Максимальная длина ключа.
+    :vartype max_key_length: int
+    """
+    model_config = SettingsConfigDict(extra="ignore", env_prefix="IDEMPOTENCY_")
+    enabled: bool = True
+    ttl: int = 24 * 3600
+    lock_ttl: int = 30
+    wait_timeout: float = 10.0
+    poll_interval: float = 0.05
+    max_key_length: int = 255
+
+class RegistrationStreamSettings(BaseSettings):
+    """
+    Настройки буфера регистраций в Redis Stream (APP_REGISTRATION_MODE=stream).
+
+    :ivar key: Ключ потока регистраций.
+    :vartype key: str
+    :ivar maxlen: Максимум не перенесённых в БД регистраций; при заполнении регистрации пишутся напрямую.
+    :vartype maxlen: int
+    :ivar group: Группа потребителей, переносящих регистрации в БД.
+    :vartype group: str
+    :ivar consumer: Имя потребителя процесса (None — "<hostname>-<pid>").
+    :vartype consumer: Optional[str]
+    :ivar batch_size: Максимум регистраций в одной транзакции переноса.
+    :vartype batch_size: int
+    :ivar block_ms: Ожидание новых записей одним XREADGROUP (мс), меньше таймаута сокета Redis.
+    :vartype block_ms: int
+    :ivar claim_idle_ms: Через сколько мс неподтверждённые записи упавшего процесса забирает другой.
+    :vartype claim_idle_ms: int
+    """
+    model_config = SettingsConfigDict(extra="ignore", env_prefix="REGISTRATION_STREAM_")
+    key: str = "stream:registrations"
+    maxlen: int = 1_000_000
+    group: str = "outbox-writers"
+    consumer: Optional[str] = None
+    batch_size: int = 500
+    block_ms: int = 200
+    claim_idle_ms: int = 30_000
+
 class MongoDbSettings(BaseSettings):
     """
     Настройки подключения к MongoDB.
@@ -159,6 +324,12 @@ class Settings(BaseModel):
     :vartype database: DatabaseSettings
     :ivar redis: Настройки Redis.
     :vartype redis: RedisSettings
+    :ivar cache: Настройки кеширования.
+    :vartype cache: CacheSettings
+    :ivar idempotency: Настройки идемпотентных запросов.
+    :vartype idempotency: IdempotencySettings
+    :ivar registration_stream: Настройки буфера регистраций в Redis Stream.
+    :vartype registration_stream: RegistrationStreamSettings
     :ivar mongo: Настройки MongoDB.
     :vartype mongo: MongoDbSettings
     """
@@ -168,6 +339,9 @@ class Settings(BaseModel):
     logging: LoggingSettings
     database: DatabaseSettings
     redis: RedisSettings
+    cache: CacheSettings
+    idempotency: IdempotencySettings
+    registration_stream: RegistrationStreamSettings
     mongo: MongoDbSettings
 
     @classmethod
@@ -185,6 +359,9 @@ class Settings(BaseModel):
             "database": DatabaseSettings,
             "mongo": MongoDbSettings,
             "redis": RedisSettings,
+            "cache": CacheSettings,
+            "idempotency": IdempotencySettings,
+            "registration_stream": RegistrationStreamSettings,
         }
 
         kwargs = {key: model() for key, model in field_models.items()}
@@ -1,16 +1,35 @@
-from typing import Callable
+from typing import Callable, Optional, Tuple
 
 import redis.asyncio as redis
 from fastapi import FastAPI
 from sqlalchemy.ext.asyncio import AsyncSession
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
-from src.parcel_service.core.config import Settings
-from src.parcel_service.domain.interfaces.repository import IRepositoryFactory
+from src.parcel_service.application.use_cases.parcels.registry_parcel import RegistryParcelUseCase
+from src.parcel_service.core.config import CacheSettings, Settings
+from src.parcel_service.domain.interfaces.cache import ICacheGeneration, IParcelFilter, IRecentWrites, IUsdRate
+from src.parcel_service.domain.interfaces.repository import IParcelViewRepository, IRepositoryFactory
+from src.parcel_service.domain.constants.db import RegistrationMode
+from src.parcel_service.domain.interfaces.uow import IGroupCommit, IRegistrationBuffer
+from src.parcel_service.infrastructure.cache.bloom import AllowAllParcelFilter, BloomParameters, ChunkLoader, RedisBloomFilter
+from src.parcel_service.infrastructure.cache.generation import RedisCacheGeneration
+from src.parcel_service.infrastructure.cache.idempotency import RedisIdempotencyStore
+from src.parcel_service.infrastructure.cache.invalidation import CacheInvalidationListener
+from src.parcel_service.infrastructure.cache.loader import CacheLoader
+from src.parcel_service.infrastructure.cache.entity import ParcelEntityCache
+from src.parcel_service.infrastructure.cache.local import LocalCache, LocalCachePolicy
+from src.parcel_service.infrastructure.cache.recent_writes import RedisRecentWrites
+from src.parcel_service.infrastructure.cache.usd_rate import RedisUsdRate
+from src.parcel_service.infrastructure.cache.tiered import TieredCache
 from src.parcel_service.infrastructure.db.redis.redis import create_redis_pool
-from src.parcel_service.infrastructure.db.sql.engine import create_db_engine, create_session_factory
+from src.parcel_service.infrastructure.db.sql.engine import create_db_engine, create_read_engine, create_session_factory
 from src.parcel_service.infrastructure.repository.factory import RepositoryFactory
 from src.parcel_service.infrastructure.repository.registry import RepositoryRegistry
+from src.parcel_service.infrastructure.unitofwork.group_commit import GroupCommitWriter
+from src.parcel_service.infrastructure.unitofwork.registration_stream import (
+    RedisRegistrationStream, RegistrationStreamDrainer, default_consumer_name
+)
+from src.parcel_service.infrastructure.unitofwork.uow import UnitOfWork
 
 
 class AppContainer:
@@ -18,7 +37,7 @@ class AppContainer:
     Контейнер приложения, инициализирующий и предоставляющий доступ к общим зависимостям.
 
     Используется для хранения и извлечения общих компонентов, таких как:
-    - SQLAlchemy engine и session factory
+    - SQLAlchemy engine и session factory (основной сервер и чтение)
     - MongoDB клиент
     - Redis клиенты
     - Фабрика репозиториев
@@ -50,10 +69,92 @@ class AppContainer:
         app.state.app_settings = settings.app
         app.state.db_engine = create_db_engine(db_settings=settings.database, debug=settings.app.debug)
         app.state.async_session_factory = create_session_factory(engine=app.state.db_engine)
+        app.state.db_read_engine = create_read_engine(
+            db_settings=settings.database,
+            primary=app.state.db_engine,
+            debug=settings.app.debug
+        )
+        app.state.async_read_session_factory = create_session_factory(engine=app.state.db_read_engine)
+        app.state.read_replica = bool(settings.database.read_host)
         app.state.repo_factory = RepositoryFactory(RepositoryRegistry.get())
         app.state.mongo_db = AsyncIOMotorClient(settings.mongo.uri)[settings.mongo.db_name]
         app.state.redis_session = create_redis_pool(settings.redis, db=0)
         app.state.redis_cash = create_redis_pool(settings.redis, db=1)
+        app.state.cache_settings = settings.cache
+        app.state.local_cache = create_local_cache(settings.cache)
+        app.state.cache = TieredCache(
+            client=app.state.redis_cash,
+            local=app.state.local_cache,
+            channel=settings.cache.invalidation_channel
+        )
+        app.state.cache_loader = CacheLoader(
+            cache=app.state.cache,
+            ttl_jitter=settings.cache.ttl_jitter,
+            xfetch_beta=settings.cache.xfetch_beta,
+            lock_ttl_ms=settings.cache.lock_ttl_ms,
+            lock_wait_timeout=settings.cache.lock_wait_timeout,
+            lock_poll_interval=settings.cache.lock_poll_interval
+        )
+        app.state.parcel_entities = ParcelEntityCache(loader=app.state.cache_loader, ttl=settings.cache.detail_ttl)
+        app.state.cache_invalidation = CacheInvalidationListener(
+            client=app.state.redis_cash,
+            channel=settings.cache.invalidation_channel,
+            local=app.state.local_cache
+        )
+        app.state.cache_generation = RedisCacheGeneration(
+            client=app.state.redis_cash,
+            ttl=settings.cache.generation_ttl,
+            local=app.state.local_cache,
+            channel=settings.cache.invalidation_channel
+        )
+        app.state.parcel_filter = create_parcel_filter(settings, app.state.redis_cash)
+        app.state.recent_writes = RedisRecentWrites(
+            client=app.state.redis_cash,
+            ttl=settings.database.read_your_writes_ttl
+        )
+        app.state.usd_rate = RedisUsdRate(client=app.state.redis_cash)
+        app.state.idempotency_store = RedisIdempotencyStore(
+            client=app.state.redis_cash,
+            ttl=settings.idempotency.ttl,
+            lock_ttl=settings.idempotency.lock_ttl
+        )
+        app.state.group_commit = create_group_commit(
+            settings, app.state.async_session_factory, app.state.repo_factory
+        )
+        app.state.registration_buffer, app.state.registration_drainer = create_registration_stream(
+            settings,
+            app.state.redis_cash,
+            app.state.async_session_factory,
+            app.state.repo_factory,
+            app.state.cache_generation,
+            app.state.recent_writes,
+            app.state.cache
+        )
+
+    @classmethod
+    async def startup(cls) -> None:
+        """
+        Запускает фоновые задачи приложения: подписку на инвалидацию локального кеша,
+        построение/обновление фильтра Блума известных посылок, групповую фиксацию
+        регистраций (если включена) и перенос регистраций из Redis Stream (в режиме stream).
+
+        :raises RuntimeError: Если контейнер не был инициализирован.
+        """
+        if cls._app is None:
+            raise RuntimeError("App is not initialized")
+
+        if cls._app.state.cache_settings.local_enabled:
+            cls._app.state.cache_invalidation.start()
+
+        parcel_filter = cls._app.state.parcel_filter
+        if isinstance(parcel_filter, RedisBloomFilter):
+            parcel_filter.start(parcel_id_chunks(cls.session_factory(), cls.repo_factory()))
+
+        if cls._app.state.group_commit is not None:
+            cls._app.state.group_commit.start()
+
+        if cls._app.state.registration_drainer is not None:
+            cls._app.state.registration_drainer.start()
 
     @classmethod
     async def shutdown(cls) -> None:
@@ -65,9 +166,26 @@ class AppContainer:
         if cls._app is None:
             raise RuntimeError("App is not initialized")
 
+        # Регистрации из очереди дописываются, пока соединения с БД ещё открыты
+        if getattr(cls._app.state, "group_commit", None) is not None:
+            await cls._app.state.group_commit.stop()
+
+        # Текущая пачка из потока фиксируется до закрытия соединений; остальное дождётся в Redis
+        if getattr(cls._app.state, "registration_drainer", None) is not None:
+            await cls._app.state.registration_drainer.stop()
+
+        if hasattr(cls._app.state, "cache_invalidation"):
+            await cls._app.state.cache_invalidation.stop()
+
+        if isinstance(getattr(cls._app.state, "parcel_filter", None), RedisBloomFilter):
+            await cls._app.state.parcel_filter.stop()
+
         if hasattr(cls._app.state, "thread_executor"):
             cls._app.state.thread_executor.shutdown(wait=True)
 
+        if getattr(cls._app.state, "read_replica", False):
+            await cls._app.state.db_read_engine.dispose()
+
         if hasattr(cls._app.state, "db_engine"):
             await cls._app.state.db_engine.dispose()
 
@@ -120,6 +238,134 @@ class AppContainer:
             raise RuntimeError("Redis cache is not initialized")
         return cls.get().state.redis_cash
 
+    @classmethod
+    def cache_settings(cls) -> CacheSettings:
+        """
+        Возвращает настройки кеширования.
+
+        :return: Настройки кеша.
+        :rtype: CacheSettings
+        """
+        if cls.get().state.cache_settings is None:
+            raise RuntimeError("Cache settings are not initialized")
+        return cls.get().state.cache_settings
+
+    @classmethod
+    def cache(cls) -> TieredCache:
+        """
+        Возвращает двухуровневый кеш (локальный кеш процесса перед Redis).
+
+        :return: Двухуровневый кеш.
+        :rtype: TieredCache
+        """
+        if cls.get().state.cache is None:
+            raise RuntimeError("Cache is not initialized")
+        return cls.get().state.cache
+
+    @classmethod
+    def cache_loader(cls) -> CacheLoader:
+        """
+        Возвращает загрузчик кеша с защитой от cache stampede.
+
+        :return: Загрузчик кеша.
+        :rtype: CacheLoader
+        """
+        if cls.get().state.cache_loader is None:
+            raise RuntimeError("Cache loader is not initialized")
+        return cls.get().state.cache_loader
+
+    @classmethod
+    def parcel_entities(cls) -> ParcelEntityCache:
+        """
+        Возвращает кеш карточек посылок.
+
+        :return: Кеш карточек посылок.
+        :rtype: ParcelEntityCache
+        """
+        if cls.get().state.parcel_entities is None:
+            raise RuntimeError("Parcel entity cache is not initialized")
+        return cls.get().state.parcel_entities
+
+    @classmethod
+    def cache_generation(cls) -> ICacheGeneration:
+        """
+        Возвращает счётчик поколений кеша сессий.
+
+        :return: Счётчик поколений.
+        :rtype: ICacheGeneration
+        """
+        if cls.get().state.cache_generation is None:
+            raise RuntimeError("Cache generation is not initialized")
+        return cls.get().state.cache_generation
+
+    @classmethod
+    def parcel_filter(cls) -> IParcelFilter:
+        """
+        Возвращает фильтр Блума известных parcel_id.
+
+        :return: Фильтр известных посылок.
+        :rtype: IParcelFilter
+        """
+        if cls.get().state.parcel_filter is None:
+            raise RuntimeError("Parcel filter is not initialized")
+        return cls.get().state.parcel_filter
+
+    @classmethod
+    def recent_writes(cls) -> IRecentWrites:
+        """
+        Возвращает маркеры недавних записей сессий.
+
+        :return: Маркеры недавних записей.
+        :rtype: IRecentWrites
+        """
+        if cls.get().state.recent_writes is None:
+            raise RuntimeError("Recent writes are not initialized")
+        return cls.get().state.recent_writes
+
+    @classmethod
+    def usd_rate(cls) -> IUsdRate:
+        """
+        Возвращает закешированный курс USD → RUB для расчёта стоимости доставки.
+
+        :return: Закешированный курс.
+        :rtype: IUsdRate
+        """
+        if cls.get().state.usd_rate is None:
+            raise RuntimeError("USD rate is not initialized")
+        return cls.get().state.usd_rate
+
+    @classmethod
+    def idempotency_store(cls) -> RedisIdempotencyStore:
+        """
+        Возвращает хранилище идемпотентных запросов.
+
+        :return: Хранилище идемпотентных запросов.
+        :rtype: RedisIdempotencyStore
+        """
+        if cls.get().state.idempotency_store is None:
+            raise RuntimeError("Idempotency store is not initialized")
+        return cls.get().state.idempotency_store
+
+    @classmethod
+    def group_commit(cls) -> Optional[IGroupCommit]:
+        """
+        Возвращает групповую фиксацию регистраций посылок.
+
+        :return: Групповая фиксация или None, если она выключена.
+        :rtype: Optional[IGroupCommit]
+        """
+        return cls.get().state.group_commit
+
+    @classmethod
+    def registration_buffer(cls) -> Optional[IRegistrationBuffer]:
+        """
+        Возвращает буфер регистраций в Redis Stream.
+
+        :return: Буфер регистраций или None, если регистрации пишутся в БД напрямую.
+        :rtype: Optional[IRegistrationBuffer]
+        """
+        return cls.get().state.registration_buffer
+
     @classmethod
     def repo_factory(cls) -> IRepositoryFactory:
         """
@@ -144,6 +390,179 @@ class AppContainer:
             raise RuntimeError("Session factory is not initialized")
         return cls.get().state.async_session_factory
 
+    @classmethod
+    def read_session_factory(cls) -> Callable[[], AsyncSession]:
+        """
+        Возвращает фабрику SQLAlchemy-сессий для чтения (реплика или основной сервер
+        с облегчённым уровнем изоляции).
+
+        :return: Фабрика сессий для чтения.
+        :rtype: Callable[[], AsyncSession]
+        """
+        if cls.get().state.async_read_session_factory is None:
+            raise RuntimeError("Read session factory is not initialized")
+        return cls.get().state.async_read_session_factory
+
+    @classmethod
+    def read_replica(cls) -> bool:
+        """
+        Настроена ли отдельная реплика для чтения.
+
+        :return: True, если чтение идёт с реплики.
+        :rtype: bool
+        """
+        return bool(getattr(cls.get().state, "read_replica", False))
+
+def create_local_cache(settings: CacheSettings) -> LocalCache:
+    """
+    Создаёт локальный кеш процесса по настройкам. При выключенном локальном кеше
+    все пространства имён получают нулевой TTL, и записи в нём не сохраняются.
+
+    :param settings: Настройки кеширования.
+    :type settings: CacheSettings
+    :return: Локальный кеш.
+    :rtype: LocalCache
+    """
+    if not settings.local_enabled:
+        return LocalCache(policies={}, default=LocalCachePolicy(ttl=0, max_size=0))
+
+    return LocalCache(
+        policies={
+            namespace: LocalCachePolicy(ttl=policy.ttl, max_size=policy.max_size)
+            for namespace, policy in settings.local_policies.items()
+        },
+        default=LocalCachePolicy(ttl=settings.local_ttl, max_size=settings.local_max_size)
+    )
+
+def create_parcel_filter(settings: Settings, client: redis.Redis) -> IParcelFilter:
+    """
+    Создаёт фильтр Блума известных посылок по настройкам кеша. При выключенном фильтре
+    возвращается заглушка, пропускающая все идентификаторы.
+
+    :param settings: Настройки приложения.
+    :type settings: Settings
+    :param client: Redis-клиент кеша.
+    :type client: redis.Redis
+    :return: Фильтр известных посылок.
+    :rtype: IParcelFilter
+    """
+    if not settings.cache.bloom_enabled:
+        return AllowAllParcelFilter()
+
+    return RedisBloomFilter(
+        client=client,
+        raw_client=create_redis_pool(settings.redis, db=1, decode_responses=False),
+        key=settings.cache.bloom_key,
+        params=BloomParameters.for_capacity(settings.cache.bloom_capacity, settings.cache.bloom_error_rate),
+        refresh_interval=settings.cache.bloom_refresh_interval
+    )
+
+def create_group_commit(
+        settings: Settings,
+        session_factory: Callable[[], AsyncSession],
+        repo_factory: IRepositoryFactory
+) -> Optional[GroupCommitWriter]:
+    """
+    Создаёт групповую фиксацию регистраций посылок по настройкам базы данных.
+    Транзакции пачек используют уровень изоляции RegistryParcelUseCase.
+
+    :param settings: Настройки приложения.
+    :type settings: Settings
+    :param session_factory: Фабрика SQLAlchemy-сессий основного сервера.
+    :type session_factory: Callable[[], AsyncSession]
+    :param repo_factory: Фабрика репозиториев.
+    :type repo_factory: IRepositoryFactory
+    :return: Групповая фиксация или None, если она выключена.
+    :rtype: Optional[GroupCommitWriter]
+    """
+    if not settings.database.group_commit_enabled:
+        return None
+
+    return GroupCommitWriter(
+        uow_factory=lambda: UnitOfWork(session_factory=session_factory, repository_factory=repo_factory),
+        max_batch=settings.database.group_commit_max_batch,
+        max_delay=settings.database.group_commit_max_delay_ms / 1000,
+        isolation_level=RegistryParcelUseCase.isolation_level
+    )
+
+def create_registration_stream(
+        settings: Settings,
+        client: redis.Redis,
+        session_factory: Callable[[], AsyncSession],
+        repo_factory: IRepositoryFactory,
+        generation: ICacheGeneration,
+        recent_writes: IRecentWrites,
+        cache: TieredCache
+) -> Tuple[Optional[RedisRegistrationStream], Optional[RegistrationStreamDrainer]]:
+    """
+    Создаёт буфер регистраций в Redis Stream и перенос из него в БД для режима
+    регистрации stream. Перенос получает отдельный пул Redis: XREADGROUP с BLOCK
+    не должен занимать соединения кеша. Транзакции переноса используют уровень
+    изоляции RegistryParcelUseCase.
+
+    :param settings: Настройки приложения.
+    :type settings: Settings
+    :param client: Redis-клиент кеша.
+    :type client: redis.Redis
+    :param session_factory: Фабрика SQLAlchemy-сессий основного сервера.
+    :type session_factory: Callable[[], AsyncSession]
+    :param repo_factory: Фабрика репозиториев.
+    :type repo_factory: IRepositoryFactory
+    :param generation: Счётчик поколений кеша сессий.
+    :type generation: ICacheGeneration
+    :param recent_writes: Маркеры недавних записей сессий.
+    :type recent_writes: IRecentWrites
+    :param cache: Двухуровневый кеш (перенос снимает отрицательный кеш с записанных посылок).
+    :type cache: TieredCache
+    :return: Буфер и перенос или (None, None), если регистрации пишутся в БД напрямую.
+    :rtype: Tuple[Optional[RedisRegistrationStream], Optional[RegistrationStreamDrainer]]
+    """
+    if settings.app.registration_mode != RegistrationMode.STREAM:
+        return None, None
+
+    stream = settings.registration_stream
+    buffer = RedisRegistrationStream(client=client, key=stream.key, maxlen=stream.maxlen)
+    drainer = RegistrationStreamDrainer(
+        client=create_redis_pool(settings.redis, db=1),
+        key=stream.key,
+        group=stream.group,
+        consumer=stream.consumer or default_consumer_name(),
+        uow_factory=lambda: UnitOfWork(session_factory=session_factory, repository_factory=repo_factory),
+        batch_size=stream.batch_size,
+        block_ms=stream.block_ms,
+        claim_idle_ms=stream.claim_idle_ms,
+        isolation_level=RegistryParcelUseCase.isolation_level,
+        generation=generation,
+        recent_writes=recent_writes,
+        cache=cache
+    )
+    return buffer, drainer
+
+def parcel_id_chunks(
+        session_factory: Callable[[], AsyncSession],
+        repo_factory: IRepositoryFactory,
+        chunk_size: int = 10_000
+) -> ChunkLoader:
+    """
+    Источник известных parcel_id для построения фильтра Блума: порции из read-модели
+    `parcel_view`, каждая в отдельной короткой транзакции.
+
+    :param session_factory: Фабрика SQLAlchemy-сессий.
+    :type session_factory: Callable[[], AsyncSession]
+    :param repo_factory: Фабрика репозиториев.
+    :type repo_factory: IRepositoryFactory
+    :param chunk_size: Размер порции.
+    :type chunk_size: int
+    :return: Функция загрузки порции после переданного parcel_id.
+    :rtype: ChunkLoader
+    """
+    async def load(after):
+        async with UnitOfWork(session_factory=session_factory, repository_factory=repo_factory) as uow:
+            repo_view = await uow.get_repo(IParcelViewRepository)
+            return await repo_view.ids_after(after, chunk_size)
+
+    return load
+
 def register_container(app: FastAPI, settings:Settings) -> None:
     """
     Регистрирует все зависимости в контейнере приложения.
@@ -10,7 +10,9 @@ from src.parcel_service.domain.exceptions.domain_error import (
     OutboxPersistenceError,
     OutboxDuplicateError,
     ParcelAlreadyExistsError,
-    CompanyNotFoundError
+    CompanyNotFoundError,
+    InvalidCursorError,
+    InvalidFieldsError
 )
 
 domain_status_map = {
@@ -20,6 +22,8 @@ domain_status_map = {
     ParcelNotFoundError: 404,
     ParcelAlreadyExistsError:409,
     OutboxDuplicateError: 409,
+    InvalidCursorError: 400,
+    InvalidFieldsError: 422,
     OutboxPersistenceError: 500,  # можно также 503, если это transient error
 }
 
@@ -29,4 +29,70 @@ IN_PROGRESS_REQUESTS = Gauge(
     "http_requests_in_progress",
     "Number of HTTP requests currently being processed",
     ["method", "path"]
-)
\ No newline at end of file
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by namespace, tier (local/redis) and result (hit/miss)",
+    ["namespace", "tier", "result"]
+)
+
+CACHE_HIT_RATIO = Gauge(
+    "cache_hit_ratio",
+    "Cache hit ratio by namespace and tier since process start",
+    ["namespace", "tier"]
+)
+
+SQL_STATEMENT_CACHE = Counter(
+    "sql_statement_cache_total",
+    "Pre-built SQL statement lookups by statement and result (hit/miss)",
+    ["statement", "result"]
+)
+
+SQL_COMPILED_CACHE = Counter(
+    "sql_compiled_cache_total",
+    "SQLAlchemy compiled cache lookups by result (cache_hit/cache_miss/caching_disabled/no_cache_key)",
+    ["result"]
+)
+
+GROUP_COMMIT_BATCH_SIZE = Histogram(
+    name="group_commit_batch_size",
+    documentation="Registrations written per group-commit transaction",
+    buckets=[1, 2, 5, 10, 20, 50, 100, 200, 500]
+)
+
+GROUP_COMMIT_FLUSH_DURATION = Histogram(
+    name="group_commit_flush_duration_seconds",
+    documentation="Duration of a group-commit transaction (INSERT + COMMIT) in seconds",
+    labelnames=["result"],
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1]
+)
+
+GROUP_COMMIT_WAIT = Histogram(
+    name="group_commit_wait_seconds",
+    documentation="Time from enqueueing a registration to its commit, in seconds",
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1]
+)
+
+IDEMPOTENCY_REQUESTS = Counter(
+    "idempotency_requests_total",
+    "Requests with Idempotency-Key by result (executed/replayed/in_progress/mismatch/unavailable)",
+    ["result"]
+)
+
+REGISTRATION_STREAM_APPENDS = Counter(
+    "registration_stream_appends_total",
+    "Registrations offered to the Redis Stream buffer by result (buffered/full/error)",
+    ["result"]
+)
+
+REGISTRATION_STREAM_BATCH_SIZE = Histogram(
+    name="registration_stream_batch_size",
+    documentation="Registrations moved from the Redis Stream to the database per transaction",
+    buckets=[1, 5, 10, 50, 100, 200, 500, 1000, 2000]
+)
+
+REGISTRATION_STREAM_LAG = Histogram(
+    name="registration_stream_lag_seconds",
+    documentation="Time from appending a registration to the Redis Stream to its commit, in seconds",
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+)
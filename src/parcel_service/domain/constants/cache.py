@@ -0,0 +1,25 @@
+from enum import Enum
+
+class CacheNamespace(str, Enum):
+    """
+    Пространства имён кеша. Для каждого задаётся своя политика локального кеша
+    (TTL и размер) и считаются отдельные метрики попаданий.
+
+    Attributes
+    --------
+    PARCEL_TYPES : str
+        Справочник типов посылок (`"parcel_types"`).
+    PARCEL_DETAIL : str
+        Карточки посылок (`"parcel_detail"`).
+    PARCEL_LIST : str
+        Страницы списка посылок сессии (`"parcel_list"`).
+    GENERATION : str
+        Поколения кеша сессий (`"generation"`).
+    PARCEL_MISSING : str
+        Отрицательный кеш: parcel_id, которых нет в БД (`"parcel_missing"`).
+    """
+    PARCEL_TYPES = "parcel_types"
+    PARCEL_DETAIL = "parcel_detail"
+    PARCEL_LIST = "parcel_list"
+    GENERATION = "generation"
+    PARCEL_MISSING = "parcel_missing"
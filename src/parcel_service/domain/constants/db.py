@@ -0,0 +1,33 @@
+from enum import Enum
+
+class IsolationLevel(str, Enum):
+    """
+    Уровни изоляции транзакций, которые UseCase может запросить у Unit of Work.
+
+    Attributes
+    --------
+    READ_COMMITTED : str
+        Чтение зафиксированных данных без gap-блокировок (`"READ COMMITTED"`).
+    REPEATABLE_READ : str
+        Снимок на всю транзакцию, блокировки диапазонов (`"REPEATABLE READ"`).
+    SERIALIZABLE : str
+        Полная сериализация транзакций (`"SERIALIZABLE"`).
+    """
+    READ_COMMITTED = "READ COMMITTED"
+    REPEATABLE_READ = "REPEATABLE READ"
+    SERIALIZABLE = "SERIALIZABLE"
+
+class RegistrationMode(str, Enum):
+    """
+    Режимы записи одиночной регистрации посылки.
+
+    Attributes
+    --------
+    DIRECT : str
+        Outbox-событие и запись read-модели фиксируются до ответа API (`"direct"`).
+    STREAM : str
+        Регистрация добавляется в Redis Stream, а в БД её пачками переносит
+        фоновая задача (`"stream"`).
+    """
+    DIRECT = "direct"
+    STREAM = "stream"
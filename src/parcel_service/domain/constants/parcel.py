@@ -0,0 +1,3 @@
+# Подпись стоимости доставки, которая ещё не рассчитана: одна для списка, карточки и пачки,
+# чтобы все они отдавали одинаковое тело карточки
+NOT_CALCULATED = "Not calculated"
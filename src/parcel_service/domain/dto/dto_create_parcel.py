@@ -1,4 +1,8 @@
 from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from src.parcel_service.domain.interfaces.cache import ICacheGeneration, IParcelFilter, IRecentWrites, IUsdRate
+from src.parcel_service.domain.interfaces.uow import IGroupCommit, IRegistrationBuffer
 
 @dataclass(frozen=True, slots=True)
 class ParcelData:
@@ -55,6 +59,57 @@ class ParcelResult:
     :type parcel_id: str
     :param message: Сообщение об успешной регистрации.
     :type message: str
+    :param delivery_price_rub: Стоимость доставки, рассчитанная при регистрации (None — её рассчитает воркер).
+    :type delivery_price_rub: Optional[float]
     """
     parcel_id: str
-    message: str = "Parcel registered"
\ No newline at end of file
+    message: str = "Parcel registered"
+    delivery_price_rub: Optional[float] = None
+@dataclass(frozen=True, slots=True)
+class ParcelBulkData:
+    """
+    Пачка посылок одной сессии для массовой регистрации.
+
+    :param session_id: Идентификатор сессии, от имени которой регистрируются посылки.
+    :type session_id: str
+    :param items: Посылки в порядке запроса.
+    :type items: Tuple[ParcelData, ...]
+    """
+    session_id: str
+    items: Tuple[ParcelData, ...]
+
+@dataclass(frozen=True, slots=True)
+class ParcelBulkResult:
+    """
+    Результат массовой регистрации: по результату на каждую посылку, в порядке запроса.
+
+    :param items: Результаты регистрации посылок.
+    :type items: Tuple[ParcelResult, ...]
+    """
+    items: Tuple[ParcelResult, ...]
+
+@dataclass(frozen=True, slots=True)
+class RegistryParcelDeps:
+    """
+    Внешние зависимости регистрации посылки: курс для расчёта стоимости, групповая
+    фиксация записи и компоненты, вызываемые после фиксации транзакции.
+
+    :param generation: Счётчик поколений кеша сессии.
+    :type generation: Optional[ICacheGeneration]
+    :param parcel_filter: Фильтр Блума известных parcel_id.
+    :type parcel_filter: Optional[IParcelFilter]
+    :param recent_writes: Маркеры недавних записей сессий (чтение своих записей при работе с репликой).
+    :type recent_writes: Optional[IRecentWrites]
+    :param group_commit: Групповая фиксация (None — отдельная транзакция через Unit of Work).
+    :type group_commit: Optional[IGroupCommit]
+    :param usd_rate: Закешированный курс USD → RUB (None — стоимость рассчитает воркер).
+    :type usd_rate: Optional[IUsdRate]
+    :param registration_buffer: Буфер регистраций (None — запись в БД до ответа).
+    :type registration_buffer: Optional[IRegistrationBuffer]
+    """
+    generation: Optional[ICacheGeneration] = None
+    parcel_filter: Optional[IParcelFilter] = None
+    recent_writes: Optional[IRecentWrites] = None
+    group_commit: Optional[IGroupCommit] = None
+    usd_rate: Optional[IUsdRate] = None
+    registration_buffer: Optional[IRegistrationBuffer] = None
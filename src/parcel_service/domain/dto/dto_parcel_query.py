@@ -1,6 +1,12 @@
-from typing import List
+import json
+import base64
+import binascii
+from datetime import datetime
+from typing import List, Optional, Tuple
 from dataclasses import dataclass
 
+from src.parcel_service.domain.exceptions.domain_error import InvalidCursorError
+
 
 @dataclass(frozen=True, slots=True)
 class ParcelDetailQuery:
@@ -55,12 +61,22 @@ class ParcelQueryList:
     :type offset: int
     :param has_delivery_price: Фильтр по наличию рассчитанной стоимости доставки.
     :type has_delivery_price: bool
+    :param cursor: Непрозрачный курсор keyset-пагинации (если передан, offset не используется).
+    :type cursor: Optional[str]
+    :param with_total: Считать ли общее количество записей (False — только признак has_more).
+    :type with_total: bool
+    :param fields: Поля карточки, которые нужно выбрать (None — все). Остальные поля
+        в результате остаются пустыми.
+    :type fields: Optional[Tuple[str, ...]]
     """
     session_id: str
     type_id: int
     limit: int
     offset: int
     has_delivery_price: bool = False
+    cursor: Optional[str] = None
+    with_total: bool = True
+    fields: Optional[Tuple[str, ...]] = None
 
 @dataclass(frozen=True, slots=True)
 class ParcelDetailQueryList:
@@ -69,8 +85,105 @@ class ParcelDetailQueryList:
 
     :param items: Список посылок с полной информацией.
     :type items: List[ParcelDetailResult]
-    :param total: Общее количество посылок, подходящих под условия запроса.
-    :type total: int
+    :param total: Общее количество посылок, подходящих под условия запроса (None, если не считалось).
+    :type total: Optional[int]
+    :param next_cursor: Курсор следующей страницы или None, если страница последняя.
+    :type next_cursor: Optional[str]
+    :param has_more: Есть ли записи после текущей страницы.
+    :type has_more: bool
+    """
+    items: List[ParcelDetailResult]
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+@dataclass(frozen=True, slots=True)
+class ParcelBatchQuery:
+    """
+    Запрос карточек нескольких посылок одной сессии.
+
+    :param parcel_ids: Идентификаторы посылок (без повторов, в порядке запроса).
+    :type parcel_ids: List[str]
+    :param session_id: Идентификатор пользовательской сессии.
+    :type session_id: str
+    """
+    parcel_ids: List[str]
+    session_id: str
+
+@dataclass(frozen=True, slots=True)
+class ParcelBatchResult:
+    """
+    Ответ на пакетный запрос карточек посылок.
+
+    :param items: Найденные посылки сессии в порядке запроса.
+    :type items: List[ParcelDetailResult]
+    :param not_found: Идентификаторы, которых нет ни в parcels, ни в outbox.
+    :type not_found: List[str]
+    :param access_denied: Идентификаторы посылок других сессий.
+    :type access_denied: List[str]
     """
     items: List[ParcelDetailResult]
-    total: int
+    not_found: List[str]
+    access_denied: List[str]
+
+@dataclass(frozen=True, slots=True)
+class ParcelExportQuery:
+    """
+    Запрос потоковой выгрузки всех посылок сессии.
+
+    :param session_id: Идентификатор пользовательской сессии.
+    :type session_id: str
+    :param type_id: Фильтр по типу посылки.
+    :type type_id: Optional[int]
+    :param has_delivery_price: Только посылки с рассчитанной стоимостью доставки.
+    :type has_delivery_price: bool
+    :param chunk_size: Размер порции, читаемой из БД и кодируемой за раз.
+    :type chunk_size: int
+    """
+    session_id: str
+    type_id: Optional[int] = None
+    has_delivery_price: bool = False
+    chunk_size: int = 1000
+
+@dataclass(frozen=True, slots=True)
+class ParcelCursor:
+    """
+    Позиция keyset-пагинации: последняя выданная запись в порядке (created_at, parcel_id).
+
+    Клиенту передаётся в виде непрозрачной base64url-строки.
+
+    :param created_at: Дата создания последней записи страницы.
+    :type created_at: datetime
+    :param parcel_id: Идентификатор последней записи страницы.
+    :type parcel_id: str
+    """
+    created_at: datetime
+    parcel_id: str
+
+    def encode(self) -> str:
+        """
+        Кодирует позицию в непрозрачную строку курсора.
+
+        :return: base64url-строка без паддинга.
+        :rtype: str
+        """
+        raw = json.dumps([self.created_at.isoformat(), self.parcel_id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "ParcelCursor":
+        """
+        Восстанавливает позицию из строки курсора.
+
+        :param cursor: Строка, ранее полученная из `encode`.
+        :type cursor: str
+        :raises InvalidCursorError: Если курсор повреждён или имеет неверный формат.
+        :return: Позиция keyset-пагинации.
+        :rtype: ParcelCursor
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, parcel_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return cls(created_at=datetime.fromisoformat(created_at), parcel_id=str(parcel_id))
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+            raise InvalidCursorError() from e
@@ -1,3 +1,6 @@
+from typing import List
+
+
 class DomainError(Exception):
     """
     Базовое доменное исключение.
@@ -48,6 +51,13 @@ class OutboxDuplicateError(DomainError):
     def __init__(self, message: str = "Duplicate OutboxEvent detected"):
         super().__init__(message)
 
+class RegistrationBufferFull(DomainError):
+    """
+    Буфер регистраций заполнен: регистрация записывается в БД напрямую.
+    """
+    def __init__(self, message: str = "Registration buffer is full"):
+        super().__init__(message)
+
 class OutboxPersistenceError(DomainError):
     """
     Ошибка при сохранении события в Outbox (например, ошибка БД).
@@ -60,4 +70,21 @@ class CompanyNotFoundError(DomainError):
     Исключение, возникающее, если посылка не найдена.
     """
     def __init__(self):
-        super().__init__("Transport company not found")
\ No newline at end of file
+        super().__init__("Transport company not found")
+
+class InvalidCursorError(DomainError):
+    """
+    Исключение, возникающее, если передан повреждённый курсор пагинации.
+    """
+    def __init__(self):
+        super().__init__("Invalid pagination cursor")
+
+class InvalidFieldsError(DomainError):
+    """
+    Исключение, возникающее, если в параметре fields запрошены неизвестные поля.
+
+    :param fields: Неизвестные поля.
+    :type fields: List[str]
+    """
+    def __init__(self, fields: List[str]):
+        super().__init__(f"Unknown fields: {', '.join(fields)}")
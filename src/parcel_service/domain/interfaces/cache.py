@@ -0,0 +1,129 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional
+
+
+class ICacheGeneration(ABC):
+    """
+    Интерфейс счётчика поколений кеша пользовательской сессии.
+
+    Номер поколения входит в ключи кеша страниц списков посылок сессии:
+    увеличение счётчика делает все ранее сохранённые страницы недостижимыми,
+    и они вытесняются по TTL. Карточки посылок от поколения не зависят
+    и перезаписываются по одной.
+    """
+
+    @abstractmethod
+    async def get(self, session_id: str) -> int:
+        """
+        Возвращает текущее поколение кеша сессии.
+
+        :param session_id: Идентификатор сессии.
+        :type session_id: str
+        :return: Номер поколения (0, если сессия ещё не изменялась).
+        :rtype: int
+        """
+        pass
+
+    @abstractmethod
+    async def bump(self, session_id: str) -> int:
+        """
+        Увеличивает поколение кеша сессии после изменения её посылок.
+
+        :param session_id: Идентификатор сессии.
+        :type session_id: str
+        :return: Новый номер поколения.
+        :rtype: int
+        """
+        pass
+
+
+class IParcelFilter(ABC):
+    """
+    Интерфейс вероятностного множества известных parcel_id (фильтр Блума).
+
+    Ответ «нет» точный: такой посылки никогда не регистрировали, и к БД можно не обращаться.
+    Ответ «возможно» требует обычной проверки. Пока фильтр не построен, на любой
+    идентификатор отвечается «возможно».
+    """
+
+    @abstractmethod
+    async def add_many(self, parcel_ids: Iterable[str]) -> None:
+        """
+        Добавляет идентификаторы посылок в фильтр.
+
+        :param parcel_ids: Идентификаторы посылок.
+        :type parcel_ids: Iterable[str]
+        """
+        pass
+
+    @abstractmethod
+    async def might_contain_many(self, parcel_ids: List[str]) -> List[bool]:
+        """
+        Проверяет идентификаторы посылок.
+
+        :param parcel_ids: Идентификаторы посылок.
+        :type parcel_ids: List[str]
+        :return: Для каждого идентификатора: False — точно неизвестен, True — возможно известен.
+        :rtype: List[bool]
+        """
+        pass
+
+    async def might_contain(self, parcel_id: str) -> bool:
+        """
+        Проверяет один идентификатор посылки.
+
+        :param parcel_id: Идентификатор посылки.
+        :type parcel_id: str
+        :return: False — точно неизвестен, True — возможно известен.
+        :rtype: bool
+        """
+        return (await self.might_contain_many([parcel_id]))[0]
+
+
+class IRecentWrites(ABC):
+    """
+    Интерфейс недавних записей сессий (read-your-writes при чтении с реплики).
+
+    После записи сессия на короткое время помечается, и её чтения направляются
+    на основной сервер, пока реплика не догонит его.
+    """
+
+    @abstractmethod
+    async def mark(self, session_id: str) -> None:
+        """
+        Помечает, что сессия только что изменила данные.
+
+        :param session_id: Идентификатор сессии.
+        :type session_id: str
+        """
+        pass
+
+    @abstractmethod
+    async def is_recent(self, session_id: str) -> bool:
+        """
+        Проверяет, изменяла ли сессия данные в пределах задержки реплики.
+
+        :param session_id: Идентификатор сессии.
+        :type session_id: str
+        :return: True, если читать нужно с основного сервера.
+        :rtype: bool
+        """
+        pass
+
+
+class IUsdRate(ABC):
+    """
+    Интерфейс закешированного курса USD → RUB, по которому рассчитывается стоимость доставки.
+
+    Курс только читается: загружает его с сайта ЦБ РФ и кеширует delivery_calculation_worker.
+    """
+
+    @abstractmethod
+    async def get(self) -> Optional[float]:
+        """
+        Возвращает актуальный курс, если он есть в кеше.
+
+        :return: Курс USD → RUB или None, если актуального курса нет.
+        :rtype: Optional[float]
+        """
+        pass
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Protocol, Type, TypeVar, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Protocol, Sequence, Type, TypeVar, Tuple
 
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.parcel_service.infrastructure.db.sql.models import OutboxEvent, Parcel, ParcelType
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelCursor
+from src.parcel_service.infrastructure.db.sql.models import OutboxEvent, Parcel, ParcelType, ParcelView
 
 
 class IBaseRepository(ABC):
@@ -107,6 +109,16 @@ class IOutboxEventRepository(IBaseRepository):
         """
         pass
 
+    @abstractmethod
+    async def add_many(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """
+        Добавляет пачку событий в Outbox одним многострочным INSERT.
+
+        :param rows: Значения колонок событий.
+        :type rows: Sequence[Dict[str, Any]]
+        """
+        pass
+
     @abstractmethod
     async def get_by_id(self, parcel_id: str) -> OutboxEvent:
         """
@@ -119,48 +131,135 @@ class IOutboxEventRepository(IBaseRepository):
          """
         pass
 
+class IParcelViewRepository(IBaseRepository):
+    """
+    Интерфейс репозитория read-модели посылок `parcel_view`.
+    """
+
+    @abstractmethod
+    async def add(self, view: ParcelView) -> None:
+        """
+        Добавляет запись read-модели для новой посылки.
+
+        :param view: Запись read-модели.
+        :type view: ParcelView
+        """
+        pass
+
+    @abstractmethod
+    async def add_many(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """
+        Добавляет записи read-модели для пачки новых посылок одним многострочным INSERT.
+
+        :param rows: Значения колонок записей.
+        :type rows: Sequence[Dict[str, Any]]
+        """
+        pass
+
+    @abstractmethod
+    async def exists(self, parcel_id: str) -> bool:
+        """
+        Проверяет, есть ли запись read-модели посылки.
+
+        :param parcel_id: Идентификатор посылки.
+        :type parcel_id: str
+        :return: True, если запись есть.
+        :rtype: bool
+        """
+        pass
+
+    @abstractmethod
+    async def ids_after(self, after: Optional[str], limit: int) -> List[str]:
+        """
+        Возвращает порцию идентификаторов посылок в порядке parcel_id (keyset).
+
+        :param after: Последний parcel_id предыдущей порции (None — с начала).
+        :type after: Optional[str]
+        :param limit: Размер порции.
+        :type limit: int
+        :return: Идентификаторы посылок.
+        :rtype: List[str]
+        """
+        pass
+
 class IParcelCombinedRepository(IBaseRepository):
     """
      Интерфейс агрегированного репозитория для работы с посылками и связанными сущностями Outbox Parcel.
      """
 
     @abstractmethod
-    async def list_paginated(self,session_id: str, limit: int, offset: int, type_id: Optional[int]=None) -> List[Tuple[str, str]]:
+    async def list_page(
+            self,
+            session_id: str,
+            limit: int,
+            offset: int,
+            type_id: Optional[int] = None,
+            has_delivery_price: bool = False,
+            after: Optional[ParcelCursor] = None,
+            fields: Optional[Tuple[str, ...]] = None
+    ) -> List[Row]:
         """
-        Получает постраничный список ID посылок и их типов по session_id.
+        Получает страницу посылок со всеми полями по session_id в порядке (created_at, parcel_id)
+        одним запросом. Общее количество считает `count`.
+
+        Возвращает до `limit + 1` строк: наличие лишней строки означает, что есть следующая страница.
 
         :param session_id: Идентификатор сессии.
         :type session_id: str
         :param limit: Кол-во записей на странице.
         :type limit: int
-        :param offset: Смещение (offset) от начала.
+        :param offset: Смещение (offset) от начала, игнорируется при переданном `after`.
         :type offset: int
-        :return: Список кортежей (parcel_id, type_name).
-        :rtype: List[Tuple[str, str]]
+        :param type_id: Фильтр по типу посылки.
+        :type type_id: Optional[int]
+        :param has_delivery_price: Только посылки с рассчитанной стоимостью доставки.
+        :type has_delivery_price: bool
+        :param after: Позиция keyset-пагинации, после которой начинается страница.
+        :type after: Optional[ParcelCursor]
+        :param fields: Поля карточки для выборки (None — все, остальные поля — NULL).
+        :type fields: Optional[Tuple[str, ...]]
+        :return: Строки страницы.
+        :rtype: List[Row]
         """
         pass
 
     @abstractmethod
-    async def get_parcels_by_ids(self, ids: List[str]) -> List[Parcel]:
+    async def get_parcel_details_by_ids(self, ids: List[str]) -> List[Row]:
         """
-        Получает список посылок по их ID.
+        Получает карточки посылок из `parcels` по их ID, без загрузки ORM-сущностей.
 
         :param ids: Список идентификаторов посылок.
         :type ids: List[str]
-        :return: Список объектов Parcel.
-        :rtype: List[Parcel]
+        :return: Строки (parcel_id, session_id, name, weight_kg, type_id, cost_adjustment_usd, delivery_price_rub).
+        :rtype: List[Row]
         """
         pass
 
     @abstractmethod
-    async def get_outbox_by_parcel_ids(self, ids: List[str]) -> List[OutboxEvent]:
+    async def get_detail(self, parcel_id: str, session_id: str) -> Optional[Row]:
         """
-        Получает события Outbox по списку ID посылок.
+        Находит посылку по parcel_id в `parcels`, а если её там ещё нет — в событии регистрации
+        outbox, одним запросом. Принадлежность сессии вычисляется в том же запросе.
+
+        :param parcel_id: Идентификатор посылки.
+        :type parcel_id: str
+        :param session_id: Идентификатор сессии, запрашивающей посылку.
+        :type session_id: str
+        :return: Строка с колонками priority, owned, parcel_id, session_id, name, weight_kg, type_id,
+            cost_adjustment_usd, delivery_price_rub или None, если посылка не найдена.
+        :rtype: Optional[Row]
+        """
+        pass
+
+    @abstractmethod
+    async def get_outbox_details_by_parcel_ids(self, ids: List[str]) -> List[Row]:
+        """
+        Получает карточки посылок из событий регистрации Outbox по списку ID посылок.
 
         :param ids: Список идентификаторов посылок.
         :type ids: List[str]
-        :return: Список объектов OutboxEvent.
-        :rtype: List[OutboxEvent]
+        :return: Строки (parcel_id, session_id, name, weight_kg, type_id, cost_adjustment_usd, delivery_price_rub).
+        :rtype: List[Row]
         """
         pass
 
@@ -176,6 +275,31 @@ class IParcelCombinedRepository(IBaseRepository):
         """
         pass
 
+    @abstractmethod
+    def stream_rows(
+            self,
+            session_id: str,
+            chunk_size: int,
+            type_id: Optional[int] = None,
+            has_delivery_price: bool = False
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Потоково читает все посылки сессии порциями в порядке (created_at, parcel_id),
+        не загружая выборку в память целиком.
+
+        :param session_id: Идентификатор сессии.
+        :type session_id: str
+        :param chunk_size: Размер порции (строк).
+        :type chunk_size: int
+        :param type_id: Фильтр по типу посылки.
+        :type type_id: Optional[int]
+        :param has_delivery_price: Только посылки с рассчитанной стоимостью доставки.
+        :type has_delivery_price: bool
+        :return: Асинхронный итератор порций строк.
+        :rtype: AsyncIterator[Sequence[Row]]
+        """
+        pass
+
 class IParcelTypeRepository(IBaseRepository):
     """
     Интерфейс репозитория для работы с типами посылок.
@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Type
+from typing import Any, AsyncContextManager, Callable, Dict, Optional, Type
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.parcel_service.domain.constants.db import IsolationLevel
 from src.parcel_service.domain.interfaces.repository import IRepositoryFactory, TRepo
 
 
@@ -34,6 +35,40 @@ class IUnitOfWork(ABC):
         """
         pass
 
+    @abstractmethod
+    def read_only(self, repo_type: Type[TRepo]) -> AsyncContextManager[TRepo]:
+        """
+        Возвращает репозиторий на отдельной сессии (отдельном соединении из пула) для чтения.
+
+        Такие репозитории не участвуют в транзакции Unit of Work и не фиксируют изменений,
+        поэтому независимые запросы через них можно выполнять конкурентно
+        с запросами основной сессии и друг с другом. Соединение возвращается в пул
+        при выходе из контекста.
+
+        :param repo_type: Тип запрашиваемого интерфейса репозитория.
+        :type repo_type: Type[TRepo]
+        :return: Асинхронный контекстный менеджер с экземпляром репозитория.
+        :rtype: AsyncContextManager[TRepo]
+        """
+        pass
+
+    @abstractmethod
+    def isolation(self, level: Optional[IsolationLevel]) -> "IUnitOfWork":
+        """
+        Задаёт уровень изоляции для следующей транзакции Unit of Work.
+
+        Применяется при входе в контекст к соединению сессии (и к сессиям `read_only`
+        внутри него) и действует до выхода из контекста. None — уровень engine по умолчанию.
+
+        Пример: `async with uow.isolation(IsolationLevel.READ_COMMITTED): ...`
+
+        :param level: Уровень изоляции.
+        :type level: Optional[IsolationLevel]
+        :return: Этот же экземпляр IUnitOfWork.
+        :rtype: IUnitOfWork
+        """
+        pass
+
     @abstractmethod
     async def __aenter__(self) -> "IUnitOfWork":
         """
@@ -69,4 +104,45 @@ class IUnitOfWork(ABC):
         """
         Откатывает транзакцию.
         """
-        pass
\ No newline at end of file
+        pass
+
+
+class IGroupCommit(ABC):
+    """
+    Групповая фиксация регистраций: записи нескольких конкурентных запросов
+    вставляются одной транзакцией, чтобы один коммит (fsync) приходился на пачку.
+    """
+
+    @abstractmethod
+    async def submit(self, outbox_row: Dict[str, Any], view_row: Dict[str, Any]) -> None:
+        """
+        Ставит регистрацию в очередь и ждёт фиксации транзакции, в которую она попала.
+
+        :param outbox_row: Значения колонок outbox-события регистрации.
+        :type outbox_row: Dict[str, Any]
+        :param view_row: Значения колонок записи read-модели `parcel_view`.
+        :type view_row: Dict[str, Any]
+        :raises Exception: Ошибка записи этой регистрации (транзакция откатана).
+        """
+        pass
+
+
+class IRegistrationBuffer(ABC):
+    """
+    Буфер регистраций: запись принимается сразу, а в БД её пачками переносит
+    фоновая задача. Сглаживает всплески записи, не увеличивая задержку ответа API.
+    """
+
+    @abstractmethod
+    async def append(self, outbox_row: Dict[str, Any], view_row: Dict[str, Any]) -> None:
+        """
+        Добавляет регистрацию в буфер.
+
+        :param outbox_row: Значения колонок outbox-события регистрации.
+        :type outbox_row: Dict[str, Any]
+        :param view_row: Значения колонок записи read-модели `parcel_view`.
+        :type view_row: Dict[str, Any]
+        :raises RegistrationBufferFull: Буфер заполнен, регистрацию нужно записать напрямую.
+        :raises Exception: Буфер недоступен.
+        """
+        pass
@@ -1,6 +1,7 @@
 from abc import ABC
-from typing import Generic, TypeVar
+from typing import ClassVar, Generic, Optional, TypeVar
 
+from src.parcel_service.domain.constants.db import IsolationLevel
 from src.parcel_service.domain.interfaces.uow import IUnitOfWork
 
 Input = TypeVar("Input")
@@ -12,12 +13,18 @@ class IUseCase(ABC, Generic[Input, Output, TDeps]):
     Интерфейс для реализации бизнес-логики (Use Case) в системе.
 
     Поддерживает передачу входных данных, зависимостей и Unit of Work для работы с БД.
+    UseCase объявляет нужный ему уровень изоляции в `isolation_level` и открывает
+    транзакцию через `uow.isolation(self.isolation_level)`; None — уровень engine по умолчанию.
 
     :param Input: Тип входных данных.
     :param Output: Тип возвращаемого результата.
     :param TDeps: Тип внешних зависимостей (например, брокеры, API, кэш и т.д.).
+    :cvar isolation_level: Уровень изоляции транзакций UseCase.
+    :vartype isolation_level: Optional[IsolationLevel]
     """
 
+    isolation_level: ClassVar[Optional[IsolationLevel]] = None
+
     async def __call__(self, dto: Input, uow: IUnitOfWork, deps: TDeps) -> Output:
         """
         Выполняет бизнес-логику use case.
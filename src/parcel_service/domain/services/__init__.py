@@ -0,0 +1 @@
+from .pricing import calculate_delivery_price
@@ -0,0 +1,20 @@
+# Тариф доставки. Формула общая с delivery_calculation_worker (services/pricing.py):
+# при изменении тарифа она меняется в обоих сервисах одновременно
+WEIGHT_RATE_USD_PER_KG = 0.5
+COST_RATE = 0.01
+
+
+def calculate_delivery_price(weight_kg: float, cost_adjustment_usd: float, usd_to_rub: float) -> float:
+    """
+    Рассчитывает стоимость доставки посылки в рублях.
+
+    :param weight_kg: Вес посылки в килограммах.
+    :type weight_kg: float
+    :param cost_adjustment_usd: Стоимость содержимого в долларах США.
+    :type cost_adjustment_usd: float
+    :param usd_to_rub: Курс USD → RUB.
+    :type usd_to_rub: float
+    :return: Стоимость доставки в рублях.
+    :rtype: float
+    """
+    return (weight_kg * WEIGHT_RATE_USD_PER_KG + cost_adjustment_usd * COST_RATE) * usd_to_rub
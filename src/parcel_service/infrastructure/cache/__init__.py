@@ -0,0 +1,10 @@
+from .local import LocalCache, LocalCachePolicy
+from .tiered import TieredCache
+from .invalidation import CacheInvalidationListener, encode_invalidation
+from .generation import RedisCacheGeneration, build_generation_key
+from .loader import CacheEntry, CacheLoader
+from .bloom import AllowAllParcelFilter, BloomParameters, RedisBloomFilter
+from .entity import ParcelEntityCache, build_entity_key, build_missing_key
+from .recent_writes import RedisRecentWrites, build_recent_write_key
+from .idempotency import IdempotencyRecord, RedisIdempotencyStore, build_idempotency_key
+from .usd_rate import RedisUsdRate, USD_RATE_KEY
@@ -0,0 +1,270 @@
+import asyncio
+import hashlib
+import math
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, List, Optional
+from uuid import uuid4
+
+import redis.asyncio as redis
+from loguru import logger
+
+from src.parcel_service.domain.interfaces.cache import IParcelFilter
+
+# Загрузка очередной порции известных parcel_id после переданного (keyset по parcel_id)
+ChunkLoader = Callable[[Optional[str]], Awaitable[List[str]]]
+
+
+@dataclass(frozen=True, slots=True)
+class BloomParameters:
+    """
+    Размер битовой карты и число хеш-функций фильтра Блума.
+
+    Формат позиций общий с delivery_calculation_worker: при изменении алгоритма
+    его нужно менять в обоих сервисах одновременно.
+
+    :param size_bits: Размер битовой карты (бит).
+    :type size_bits: int
+    :param hashes: Количество хеш-функций.
+    :type hashes: int
+    """
+    size_bits: int
+    hashes: int
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomParameters":
+        """
+        Рассчитывает оптимальные параметры для ожидаемого числа элементов и доли ложных срабатываний.
+
+        :param capacity: Ожидаемое количество элементов.
+        :type capacity: int
+        :param error_rate: Допустимая доля ложноположительных ответов.
+        :type error_rate: float
+        :return: Параметры фильтра.
+        :rtype: BloomParameters
+        """
+        size_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        hashes = max(1, round(size_bits / capacity * math.log(2)))
+        return cls(size_bits=size_bits, hashes=hashes)
+
+    def positions(self, item: str) -> List[int]:
+        """
+        Позиции битов элемента (двойное хеширование по blake2b).
+
+        :param item: Элемент.
+        :type item: str
+        :return: Номера битов.
+        :rtype: List[int]
+        """
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size_bits for i in range(self.hashes)]
+
+
+class RedisBloomFilter(IParcelFilter):
+    """
+    Фильтр Блума известных parcel_id на битовой карте Redis (SETBIT/GETBIT,
+    без модуля RedisBloom) с локальным снимком в процессе.
+
+    - Положительный ответ снимка не требует обращения к Redis.
+    - Отрицательный ответ снимка перепроверяется в Redis одним pipeline: снимок мог
+      устареть, а посылку мог только что зарегистрировать другой процесс.
+    - Пока фильтр не построен (нет маркера готовности или пропала битовая карта),
+      а также при ошибках Redis отвечает «возможно» — запрос идёт обычным путём.
+
+    Фильтр строится один раз из БД (`ensure_built`) под блокировкой Redis, затем
+    пополняется регистрацией посылок и воркером.
+
+    :param client: Redis-клиент кеша (decode_responses=True).
+    :type client: redis.Redis
+    :param raw_client: Redis-клиент той же базы без декодирования ответов (для чтения битовой карты).
+    :type raw_client: redis.Redis
+    :param key: Ключ битовой карты.
+    :type key: str
+    :param params: Параметры фильтра.
+    :type params: BloomParameters
+    :param refresh_interval: Период обновления локального снимка (сек).
+    :type refresh_interval: float
+    :param build_lock_ttl: Срок жизни блокировки построения (сек).
+    :type build_lock_ttl: int
+    """
+
+    def __init__(
+            self,
+            client: redis.Redis,
+            raw_client: redis.Redis,
+            key: str,
+            params: BloomParameters,
+            refresh_interval: float = 30.0,
+            build_lock_ttl: int = 600
+    ) -> None:
+        self._client = client
+        self._raw_client = raw_client
+        self._key = key
+        self._ready_key = f"{key}:ready"
+        self._build_lock_key = f"{key}:build"
+        self._params = params
+        self._refresh_interval = refresh_interval
+        self._build_lock_ttl = build_lock_ttl
+        self._snapshot: Optional[bytearray] = None
+        self._ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        """
+        Построен ли фильтр (по состоянию на последнее обновление).
+
+        :return: True, если фильтр отвечает точными «нет».
+        :rtype: bool
+        """
+        return self._ready
+
+    async def add_many(self, parcel_ids: Iterable[str]) -> None:
+        positions = [position for parcel_id in parcel_ids for position in self._params.positions(parcel_id)]
+        if not positions:
+            return
+        async with self._client.pipeline(transaction=False) as pipe:
+            for position in positions:
+                pipe.setbit(self._key, position, 1)
+            await pipe.execute()
+        if self._snapshot is not None:
+            for position in positions:
+                self._set_local(position)
+
+    async def might_contain_many(self, parcel_ids: List[str]) -> List[bool]:
+        if not self._ready:
+            return [True] * len(parcel_ids)
+
+        result = [True] * len(parcel_ids)
+        unsure = {}
+        for index, parcel_id in enumerate(parcel_ids):
+            positions = self._params.positions(parcel_id)
+            if self._snapshot is None or not all(self._get_local(position) for position in positions):
+                unsure[index] = positions
+        if not unsure:
+            return result
+
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.exists(self._key, self._ready_key)
+                for positions in unsure.values():
+                    for position in positions:
+                        pipe.getbit(self._key, position)
+                replies = await pipe.execute()
+        except Exception as e:
+            logger.warning("Фильтр Блума недоступен, пропускаем проверку | error={}", str(e))
+            return result
+
+        if replies[0] != 2:
+            logger.warning("Фильтр Блума пропал из Redis, проверка отключена до перестроения | key={}", self._key)
+            self._ready = False
+            return result
+
+        bits = iter(replies[1:])
+        for index, positions in unsure.items():
+            result[index] = all([next(bits) for _ in positions])
+        return result
+
+    async def refresh(self) -> None:
+        """
+        Перечитывает маркер готовности и битовую карту в локальный снимок.
+        """
+        ready = await self._client.exists(self._ready_key)
+        raw = await self._raw_client.get(self._key) if ready else None
+        if ready and raw is None:
+            # Битовая карта вытеснена или удалена: без неё ответы «нет» были бы ложными
+            await self._client.delete(self._ready_key)
+            ready = False
+        self._snapshot = bytearray(raw) if raw is not None else None
+        self._ready = bool(ready)
+
+    async def ensure_built(self, load_chunk: ChunkLoader) -> bool:
+        """
+        Строит фильтр по всем известным parcel_id, если он ещё не построен.
+        Строит только один процесс (SET NX), остальные дожидаются маркера готовности при обновлении.
+
+        :param load_chunk: Загрузка порции parcel_id после переданного (None — с начала).
+        :type load_chunk: ChunkLoader
+        :return: True, если фильтр готов.
+        :rtype: bool
+        """
+        if await self._client.exists(self._ready_key):
+            return True
+
+        token = str(uuid4())
+        if not await self._client.set(self._build_lock_key, token, nx=True, ex=self._build_lock_ttl):
+            return False
+
+        try:
+            added, after = 0, None
+            while True:
+                parcel_ids = await load_chunk(after)
+                if not parcel_ids:
+                    break
+                await self.add_many(parcel_ids)
+                added += len(parcel_ids)
+                after = parcel_ids[-1]
+            await self._client.set(self._ready_key, "1")
+            logger.info("Фильтр Блума построен | key={} parcels={}", self._key, added)
+            return True
+        finally:
+            if await self._client.get(self._build_lock_key) == token:
+                await self._client.delete(self._build_lock_key)
+
+    def start(self, load_chunk: ChunkLoader) -> None:
+        """
+        Запускает фоновую задачу: построение фильтра (при необходимости) и периодическое
+        обновление локального снимка.
+
+        :param load_chunk: Загрузка порции parcel_id для построения.
+        :type load_chunk: ChunkLoader
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(load_chunk), name="parcel-bloom-refresh")
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновую задачу.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self, load_chunk: ChunkLoader) -> None:
+        while True:
+            try:
+                await self.ensure_built(load_chunk)
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Ошибка обновления фильтра Блума | key={} error={}", self._key, str(e))
+            await asyncio.sleep(self._refresh_interval)
+
+    def _get_local(self, position: int) -> bool:
+        byte = position >> 3
+        return byte < len(self._snapshot) and bool(self._snapshot[byte] & (0x80 >> (position & 7)))
+
+    def _set_local(self, position: int) -> None:
+        byte = position >> 3
+        if byte >= len(self._snapshot):
+            self._snapshot.extend(bytes(byte - len(self._snapshot) + 1))
+        self._snapshot[byte] |= 0x80 >> (position & 7)
+
+
+class AllowAllParcelFilter(IParcelFilter):
+    """
+    Фильтр-заглушка при выключенном фильтре Блума: на любой parcel_id отвечает «возможно».
+    """
+
+    async def add_many(self, parcel_ids: Iterable[str]) -> None:
+        return None
+
+    async def might_contain_many(self, parcel_ids: List[str]) -> List[bool]:
+        return [True] * len(parcel_ids)
@@ -0,0 +1,119 @@
+from typing import Awaitable, Callable, Dict, List
+
+from src.parcel_service.domain.constants.cache import CacheNamespace
+from src.parcel_service.infrastructure.cache.loader import CacheLoader
+
+
+def build_entity_key(session_id: str, parcel_id: str) -> str:
+    """
+    Формирует ключ карточки посылки (формат общий с delivery_calculation_worker).
+
+    :param session_id: Идентификатор сессии владельца посылки.
+    :type session_id: str
+    :param parcel_id: Идентификатор посылки.
+    :type parcel_id: str
+    :return: Ключ в формате "cache:parcels:<session_id>:<parcel_id>".
+    :rtype: str
+    """
+    return f"cache:parcels:{session_id}:{parcel_id}"
+
+
+def build_missing_key(parcel_id: str) -> str:
+    """
+    Формирует ключ отрицательного кеша отсутствующей посылки. Префикс отделён от ключей
+    карточек: сессия из заголовка X-Session-Id произвольна и не должна с ним совпасть.
+
+    :param parcel_id: Идентификатор посылки.
+    :type parcel_id: str
+    :return: Ключ в формате "cache:missing:parcels:<parcel_id>".
+    :rtype: str
+    """
+    return f"cache:missing:parcels:{parcel_id}"
+
+
+class ParcelEntityCache:
+    """
+    Кеш карточек посылок: одна запись на посылку, общая для карточки, списка
+    и пакетного запроса.
+
+    Значение — готовое JSON-тело карточки (схема ParcelDetailResponse) в формате CacheLoader.
+    Ключ не зависит от поколения сессии: при изменении посылки перезаписывается только
+    её запись (при регистрации — parcel_service, после расчёта стоимости —
+    delivery_calculation_worker). Сессия входит в ключ, поэтому чужая посылка —
+    всегда промах, и принадлежность проверяет UseCase.
+
+    :param loader: Загрузчик кеша.
+    :type loader: CacheLoader
+    :param ttl: TTL карточки (сек).
+    :type ttl: int
+    """
+
+    def __init__(self, loader: CacheLoader, ttl: int) -> None:
+        self._loader = loader
+        self._ttl = ttl
+        self._namespace = CacheNamespace.PARCEL_DETAIL.value
+
+    async def get_or_compute(self, session_id: str, parcel_id: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """
+        Возвращает карточку из кеша или вычисляет её (single-flight, раннее обновление).
+
+        :param session_id: Идентификатор сессии.
+        :type session_id: str
+        :param parcel_id: Идентификатор посылки.
+        :type parcel_id: str
+        :param compute: Корутина-фабрика, возвращающая JSON-тело карточки.
+        :type compute: Callable[[], Awaitable[str]]
+        :return: JSON-тело карточки.
+        :rtype: str
+        """
+        return await self._loader.get_or_compute(
+            namespace=self._namespace,
+            key=build_entity_key(session_id, parcel_id),
+            ttl=self._ttl,
+            compute=compute
+        )
+
+    async def get_many(self, session_id: str, parcel_ids: List[str]) -> Dict[str, str]:
+        """
+        Читает карточки посылок сессии одним MGET (после локального кеша).
+
+        :param session_id: Идентификатор сессии.
+        :type session_id: str
+        :param parcel_ids: Идентификаторы посылок.
+        :type parcel_ids: List[str]
+        :return: JSON-тела найденных карточек по parcel_id.
+        :rtype: Dict[str, str]
+        """
+        keys = {build_entity_key(session_id, parcel_id): parcel_id for parcel_id in parcel_ids}
+        found = await self._loader.get_many(self._namespace, list(keys))
+        return {keys[key]: body for key, body in found.items()}
+
+    async def store(self, session_id: str, parcel_id: str, body: str) -> None:
+        """
+        Записывает карточку посылки.
+
+        :param session_id: Идентификатор сессии.
+        :type session_id: str
+        :param parcel_id: Идентификатор посылки.
+        :type parcel_id: str
+        :param body: JSON-тело карточки.
+        :type body: str
+        """
+        await self._loader.store(self._namespace, build_entity_key(session_id, parcel_id), body, ttl=self._ttl)
+
+    async def store_many(self, session_id: str, bodies: Dict[str, str]) -> None:
+        """
+        Записывает карточки посылок сессии одним pipeline.
+
+        :param session_id: Идентификатор сессии.
+        :type session_id: str
+        :param bodies: JSON-тела карточек по parcel_id.
+        :type bodies: Dict[str, str]
+        """
+        if not bodies:
+            return
+        await self._loader.store_many(
+            self._namespace,
+            {build_entity_key(session_id, parcel_id): body for parcel_id, body in bodies.items()},
+            ttl=self._ttl
+        )
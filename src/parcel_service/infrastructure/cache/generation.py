@@ -0,0 +1,98 @@
+from typing import Optional
+
+import redis.asyncio as redis
+
+from src.parcel_service.domain.constants.cache import CacheNamespace
+from src.parcel_service.domain.interfaces.cache import ICacheGeneration
+from src.parcel_service.infrastructure.cache.invalidation import encode_invalidation
+from src.parcel_service.infrastructure.cache.local import LocalCache
+
+
+def build_generation_key(session_id: str) -> str:
+    """
+    Формирует ключ счётчика поколений кеша сессии.
+
+    Формат ключа общий с delivery_calculation_worker, который также увеличивает счётчик.
+
+    :param session_id: Идентификатор сессии.
+    :type session_id: str
+    :return: Ключ в формате "cache:gen:<session_id>".
+    :rtype: str
+    """
+    return f"cache:gen:{session_id}"
+
+
+class RedisCacheGeneration(ICacheGeneration):
+    """
+    Счётчик поколений кеша сессии в Redis.
+
+    Срок жизни счётчика продлевается при каждом увеличении и должен превышать TTL
+    кешируемых записей: иначе после истечения счётчик вернётся к 0, и станут видны
+    ещё живые записи нулевого поколения.
+
+    При переданном локальном кеше значение читается из него (пространство `generation`),
+    а увеличение публикует сообщение инвалидации для остальных процессов.
+
+    :param client: Redis-клиент кеша.
+    :type client: redis.Redis
+    :param ttl: Срок жизни счётчика в секундах.
+    :type ttl: int
+    :param local: Локальный кеш процесса (опционально).
+    :type local: Optional[LocalCache]
+    :param channel: Канал pub/sub для сообщений инвалидации.
+    :type channel: Optional[str]
+    """
+
+    def __init__(
+            self,
+            client: redis.Redis,
+            ttl: int,
+            local: Optional[LocalCache] = None,
+            channel: Optional[str] = None
+    ) -> None:
+        self._client = client
+        self._ttl = ttl
+        self._local = local
+        self._channel = channel
+
+    async def get(self, session_id: str) -> int:
+        """
+        Возвращает текущее поколение кеша сессии.
+
+        :param session_id: Идентификатор сессии.
+        :type session_id: str
+        :return: Номер поколения (0, если счётчика нет).
+        :rtype: int
+        """
+        if self._local is not None:
+            cached = self._local.get(CacheNamespace.GENERATION.value, session_id)
+            if cached is not None:
+                return cached
+
+        value = await self._client.get(build_generation_key(session_id))
+        generation = int(value) if value else 0
+
+        if self._local is not None:
+            self._local.set(CacheNamespace.GENERATION.value, session_id, generation)
+        return generation
+
+    async def bump(self, session_id: str) -> int:
+        """
+        Атомарно увеличивает поколение кеша сессии и продлевает срок жизни счётчика.
+
+        :param session_id: Идентификатор сессии.
+        :type session_id: str
+        :return: Новый номер поколения.
+        :rtype: int
+        """
+        key = build_generation_key(session_id)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            pipe.expire(key, self._ttl)
+            if self._channel:
+                pipe.publish(self._channel, encode_invalidation(CacheNamespace.GENERATION.value, session_id))
+            generation = int((await pipe.execute())[0])
+
+        if self._local is not None:
+            self._local.set(CacheNamespace.GENERATION.value, session_id, generation)
+        return generation
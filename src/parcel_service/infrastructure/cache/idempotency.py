@@ -0,0 +1,135 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from uuid import uuid4
+
+import redis.asyncio as redis
+
+# Резерв снимает только запрос, который его поставил (сравнение и удаление атомарно)
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def build_idempotency_key(session_id: str, method: str, path: str, key: str) -> str:
+    """
+    Формирует ключ записи идемпотентного запроса: ключ клиента действует только
+    в пределах его сессии и конкретного метода и пути.
+
+    :param session_id: Идентификатор сессии ("-", если заголовка нет).
+    :type session_id: str
+    :param method: HTTP-метод.
+    :type method: str
+    :param path: Путь запроса.
+    :type path: str
+    :param key: Значение заголовка Idempotency-Key.
+    :type key: str
+    :return: Ключ в формате "idempotency:<session_id>:<method>:<path>:<key>".
+    :rtype: str
+    """
+    return f"idempotency:{session_id}:{method}:{path}:{key}"
+
+
+@dataclass(frozen=True, slots=True)
+class IdempotencyRecord:
+    """
+    Запись идемпотентного запроса: резерв на время выполнения или сохранённый ответ.
+
+    :param fingerprint: Отпечаток запроса (метод, путь, тело), с которым использован ключ.
+    :type fingerprint: str
+    :param status: HTTP-статус сохранённого ответа (None — запрос ещё выполняется).
+    :type status: Optional[int]
+    :param headers: Заголовки сохранённого ответа.
+    :type headers: Tuple[Tuple[str, str], ...]
+    :param body: Тело сохранённого ответа.
+    :type body: bytes
+    :param token: Токен резерва: отличает резерв одного запроса от резерва следующего после истечения TTL.
+    :type token: Optional[str]
+    """
+    fingerprint: str
+    status: Optional[int] = None
+    headers: Tuple[Tuple[str, str], ...] = ()
+    body: bytes = b""
+    token: Optional[str] = None
+
+    @property
+    def completed(self) -> bool:
+        return self.status is not None
+
+    def encode(self) -> str:
+        """
+        Кодирует запись в JSON-строку для Redis (тело — в base64).
+
+        :return: JSON-строка.
+        :rtype: str
+        """
+        return json.dumps({
+            "fingerprint": self.fingerprint,
+            "status": self.status,
+            "headers": [list(header) for header in self.headers],
+            "body": base64.b64encode(self.body).decode("ascii"),
+            "token": self.token,
+        }, separators=(",", ":"))
+
+    @classmethod
+    def decode(cls, raw: str) -> "IdempotencyRecord":
+        """
+        Восстанавливает запись из JSON-строки.
+
+        :param raw: JSON-строка из Redis.
+        :type raw: str
+        :return: Запись идемпотентного запроса.
+        :rtype: IdempotencyRecord
+        """
+        data = json.loads(raw)
+        return cls(
+            fingerprint=data["fingerprint"],
+            status=data["status"],
+            headers=tuple((name, value) for name, value in data["headers"]),
+            body=base64.b64decode(data["body"]),
+            token=data.get("token"),
+        )
+
+
+class RedisIdempotencyStore:
+    """
+    Хранилище идемпотентных запросов в Redis.
+
+    Первый запрос резервирует ключ через SET NX с коротким TTL (`lock_ttl`): если процесс
+    упадёт, резерв истечёт, и повтор клиента выполнится заново. Готовый ответ
+    перезаписывает резерв с TTL хранения (`ttl`). Резерв несёт токен и снимается
+    сравнением с удалением: если обработчик пережил `lock_ttl` и ключ зарезервировал
+    следующий запрос, снятие первого резерва не удалит чужой.
+
+    :param client: Redis-клиент кеша.
+    :type client: redis.Redis
+    :param ttl: Срок хранения ответа в секундах.
+    :type ttl: int
+    :param lock_ttl: Срок жизни резерва выполняющегося запроса в секундах.
+    :type lock_ttl: int
+    """
+
+    def __init__(self, client: redis.Redis, ttl: int, lock_ttl: int) -> None:
+        self._client = client
+        self._ttl = ttl
+        self._lock_ttl = lock_ttl
+
+    async def get(self, key: str) -> Optional[IdempotencyRecord]:
+        raw = await self._client.get(key)
+        return IdempotencyRecord.decode(raw) if raw is not None else None
+
+    async def reserve(self, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        reservation = IdempotencyRecord(fingerprint, token=uuid4().hex)
+        if await self._client.set(key, reservation.encode(), nx=True, ex=self._lock_ttl):
+            return reservation
+        return None
+
+    async def complete(self, key: str, record: IdempotencyRecord) -> None:
+        await self._client.set(key, record.encode(), ex=self._ttl)
+
+    async def release(self, key: str, reservation: IdempotencyRecord) -> None:
+        await self._client.eval(_RELEASE_SCRIPT, 1, key, reservation.encode())
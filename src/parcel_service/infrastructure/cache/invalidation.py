@@ -0,0 +1,113 @@
+import asyncio
+import json
+from typing import Optional
+
+import redis.asyncio as redis
+from loguru import logger
+
+from src.parcel_service.infrastructure.cache.local import LocalCache
+
+
+def encode_invalidation(namespace: str, key: str) -> str:
+    """
+    Формирует сообщение инвалидации для канала pub/sub.
+
+    Формат общий с delivery_calculation_worker.
+
+    :param namespace: Пространство имён локального кеша.
+    :type namespace: str
+    :param key: Ключ записи.
+    :type key: str
+    :return: JSON-сообщение.
+    :rtype: str
+    """
+    return json.dumps({"namespace": namespace, "key": key})
+
+
+class CacheInvalidationListener:
+    """
+    Подписчик канала инвалидации: удаляет из локального кеша записи, изменённые
+    другими процессами (воркерами uvicorn и delivery_calculation_worker).
+
+    После (пере)подключения локальный кеш очищается целиком, так как сообщения,
+    пришедшие во время разрыва, потеряны.
+
+    :param client: Redis-клиент кеша.
+    :type client: redis.Redis
+    :param channel: Канал инвалидации.
+    :type channel: str
+    :param local: Локальный кеш процесса.
+    :type local: LocalCache
+    :param poll_timeout: Таймаут ожидания сообщения (сек), меньше socket_timeout клиента.
+    :type poll_timeout: float
+    :param retry_delay: Пауза перед переподключением после ошибки (сек).
+    :type retry_delay: float
+    """
+
+    def __init__(
+            self,
+            client: redis.Redis,
+            channel: str,
+            local: LocalCache,
+            poll_timeout: float = 1.0,
+            retry_delay: float = 1.0
+    ) -> None:
+        self._client = client
+        self._channel = channel
+        self._local = local
+        self._poll_timeout = poll_timeout
+        self._retry_delay = retry_delay
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        Запускает фоновую задачу подписки в текущем event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="cache-invalidation-listener")
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновую задачу подписки.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def handle(self, data: str) -> None:
+        """
+        Применяет сообщение инвалидации к локальному кешу.
+
+        :param data: JSON-сообщение из канала.
+        :type data: str
+        """
+        try:
+            message = json.loads(data)
+            self._local.delete(message["namespace"], message["key"])
+        except (TypeError, ValueError, KeyError) as e:
+            logger.warning("Некорректное сообщение инвалидации | data={} error={}", data, str(e))
+
+    async def _run(self) -> None:
+        while True:
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self._channel)
+                self._local.clear()
+                logger.info("Подписка на инвалидацию локального кеша | channel={}", self._channel)
+                while True:
+                    message = await pubsub.get_message(timeout=self._poll_timeout)
+                    if message is not None:
+                        self.handle(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Ошибка подписки на инвалидацию кеша | channel={} error={}", self._channel, str(e))
+                self._local.clear()
+                await asyncio.sleep(self._retry_delay)
+            finally:
+                await pubsub.aclose()
@@ -0,0 +1,294 @@
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+from loguru import logger
+
+from src.parcel_service.infrastructure.cache.tiered import TieredCache
+
+# Снимает блокировку только владелец (сравнение токена и удаление атомарно)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class CacheEntry:
+    """
+    Закешированное значение с метаданными для вероятностного раннего обновления (XFetch).
+
+    :param value: Значение.
+    :type value: str
+    :param expiry: Момент логического истечения (unix time, сек).
+    :type expiry: float
+    :param delta: Время вычисления значения (сек).
+    :type delta: float
+    """
+    value: str
+    expiry: float
+    delta: float
+
+    def encode(self) -> str:
+        """
+        Сериализует запись в строку `<expiry>;<delta>;<value>`.
+
+        :return: Строка для хранения в кеше.
+        :rtype: str
+        """
+        return f"{self.expiry:.3f};{self.delta:.4f};{self.value}"
+
+    @classmethod
+    def decode(cls, raw: str) -> Optional["CacheEntry"]:
+        """
+        Разбирает строку из кеша. Значения без заголовка (старый формат) считаются промахом.
+
+        :param raw: Строка из кеша.
+        :type raw: str
+        :return: Запись или None.
+        :rtype: Optional[CacheEntry]
+        """
+        try:
+            expiry, delta, value = raw.split(";", 2)
+            return cls(value=value, expiry=float(expiry), delta=float(delta))
+        except (AttributeError, ValueError):
+            return None
+
+    def should_refresh(self, beta: float, now: float) -> bool:
+        """
+        XFetch: решает, обновить ли значение заранее. Вероятность растёт по мере приближения
+        к истечению и пропорциональна времени вычисления, поэтому популярные ключи
+        пересчитываются одним запросом до того, как истекут у всех сразу.
+
+        :param beta: Коэффициент агрессивности (1.0 — стандартный, 0 — выключено).
+        :type beta: float
+        :param now: Текущее время (unix time, сек).
+        :type now: float
+        :return: True, если пора обновлять.
+        :rtype: bool
+        """
+        if beta <= 0 or self.delta <= 0:
+            return now >= self.expiry
+        return now - self.delta * beta * math.log(1.0 - random.random()) >= self.expiry
+
+
+class CacheLoader:
+    """
+    Чтение через кеш с вычислением при промахе и защитой от cache stampede.
+
+    - Single-flight в процессе: конкурентные промахи по одному ключу ждут одну asyncio-задачу.
+    - Single-flight между процессами: вычисляет владелец короткой блокировки Redis
+      (`SET lock:<key> NX PX`), остальные ждут появления значения в Redis; если за время
+      ожидания значение не появилось, вычисляют сами.
+    - XFetch: значение может быть пересчитано заранее одним запросом, остальные в это время
+      получают текущее значение без ожидания.
+    - Jitter TTL: срок жизни случайно уменьшается в пределах доли `ttl_jitter`, чтобы ключи,
+      записанные одновременно, не истекали одновременно.
+
+    :param cache: Двухуровневый кеш.
+    :type cache: TieredCache
+    :param ttl_jitter: Доля случайного уменьшения TTL (0..1).
+    :type ttl_jitter: float
+    :param xfetch_beta: Коэффициент XFetch (0 — без раннего обновления).
+    :type xfetch_beta: float
+    :param lock_ttl_ms: Срок жизни блокировки вычисления (мс).
+    :type lock_ttl_ms: int
+    :param lock_wait_timeout: Максимальное ожидание значения от другого процесса (сек).
+    :type lock_wait_timeout: float
+    :param lock_poll_interval: Интервал опроса Redis при ожидании (сек).
+    :type lock_poll_interval: float
+    """
+
+    def __init__(
+            self,
+            cache: TieredCache,
+            ttl_jitter: float = 0.1,
+            xfetch_beta: float = 1.0,
+            lock_ttl_ms: int = 5000,
+            lock_wait_timeout: float = 5.0,
+            lock_poll_interval: float = 0.05
+    ) -> None:
+        self._cache = cache
+        self._ttl_jitter = ttl_jitter
+        self._xfetch_beta = xfetch_beta
+        self._lock_ttl_ms = lock_ttl_ms
+        self._lock_wait_timeout = lock_wait_timeout
+        self._lock_poll_interval = lock_poll_interval
+        self._flights: Dict[str, asyncio.Task] = {}
+
+    async def get_or_compute(
+            self,
+            namespace: str,
+            key: str,
+            ttl: int,
+            compute: Callable[[], Awaitable[str]]
+    ) -> str:
+        """
+        Возвращает значение из кеша или вычисляет его одним вызывающим на ключ.
+
+        Исключение из `compute` получают все ожидающие этого вычисления.
+
+        :param namespace: Пространство имён кеша.
+        :type namespace: str
+        :param key: Ключ Redis.
+        :type key: str
+        :param ttl: Базовый TTL (сек).
+        :type ttl: int
+        :param compute: Корутина-фабрика, вычисляющая значение.
+        :type compute: Callable[[], Awaitable[str]]
+        :return: Значение.
+        :rtype: str
+        """
+        raw = await self._cache.get(namespace, key)
+        entry = CacheEntry.decode(raw) if raw is not None else None
+
+        if entry is not None:
+            if not entry.should_refresh(self._xfetch_beta, time.time()):
+                return entry.value
+            # Раннее обновление: пересчитывает один, остальные отдают текущее значение
+            self._flight(namespace, key, ttl, compute, early=True)
+            return entry.value
+
+        return await asyncio.shield(self._flight(namespace, key, ttl, compute, early=False))
+
+    async def store(self, namespace: str, key: str, value: str, ttl: int, delta: float = 0.0) -> None:
+        """
+        Сохраняет значение в кеш в формате, понятном `get_or_compute`.
+
+        :param namespace: Пространство имён кеша.
+        :type namespace: str
+        :param key: Ключ Redis.
+        :type key: str
+        :param value: Значение.
+        :type value: str
+        :param ttl: Базовый TTL (сек), к нему применяется jitter.
+        :type ttl: int
+        :param delta: Время вычисления значения (сек).
+        :type delta: float
+        """
+        jittered = self._jittered(ttl)
+        entry = CacheEntry(value=value, expiry=time.time() + jittered, delta=delta)
+        await self._cache.set(namespace, key, entry.encode(), ttl=jittered)
+
+    async def get_many(self, namespace: str, keys: List[str]) -> Dict[str, str]:
+        """
+        Пакетное чтение записей, сохранённых через `get_or_compute`/`store`.
+
+        Раннее обновление не выполняется: значения отдаются до истечения TTL в Redis.
+        Записи старого формата считаются промахом.
+
+        :param namespace: Пространство имён кеша.
+        :type namespace: str
+        :param keys: Ключи Redis.
+        :type keys: List[str]
+        :return: Значения найденных ключей.
+        :rtype: Dict[str, str]
+        """
+        found: Dict[str, str] = {}
+        for key, raw in (await self._cache.get_many(namespace, keys)).items():
+            entry = CacheEntry.decode(raw)
+            if entry is not None:
+                found[key] = entry.value
+        return found
+
+    async def store_many(self, namespace: str, values: Dict[str, str], ttl: int) -> None:
+        """
+        Сохраняет несколько значений одним pipeline (TTL с jitter для каждого ключа).
+
+        :param namespace: Пространство имён кеша.
+        :type namespace: str
+        :param values: Значения по ключам Redis.
+        :type values: Dict[str, str]
+        :param ttl: Базовый TTL (сек).
+        :type ttl: int
+        """
+        now = time.time()
+        items = {}
+        for key, value in values.items():
+            jittered = self._jittered(ttl)
+            items[key] = (CacheEntry(value=value, expiry=now + jittered, delta=0.0).encode(), jittered)
+        await self._cache.set_many(namespace, items)
+
+    def _jittered(self, ttl: int) -> int:
+        return max(1, int(ttl * (1.0 - random.uniform(0.0, self._ttl_jitter))))
+
+    def _flight(
+            self,
+            namespace: str,
+            key: str,
+            ttl: int,
+            compute: Callable[[], Awaitable[str]],
+            early: bool
+    ) -> asyncio.Task:
+        # Фоновое раннее обновление не должно отвечать на промахи: у него своя очередь
+        flight_key = f"early:{key}" if early else key
+        task = self._flights.get(flight_key)
+        if task is not None:
+            return task
+
+        task = asyncio.create_task(self._fill(namespace, key, ttl, compute, early))
+        self._flights[flight_key] = task
+
+        def _done(t: asyncio.Task) -> None:
+            self._flights.pop(flight_key, None)
+            if t.cancelled():
+                return
+            # Забираем исключение, даже если все ожидающие отменились
+            error = t.exception()
+            if error is not None and early:
+                logger.warning("Раннее обновление кеша не удалось | key={} error={}", key, str(error))
+
+        task.add_done_callback(_done)
+        return task
+
+    async def _fill(
+            self,
+            namespace: str,
+            key: str,
+            ttl: int,
+            compute: Callable[[], Awaitable[str]],
+            early: bool
+    ) -> str:
+        client = self._cache.redis
+        lock_key = f"lock:{key}"
+        token = str(uuid4())
+
+        if not await client.set(lock_key, token, nx=True, px=self._lock_ttl_ms):
+            if early:
+                # Обновлением уже занят другой процесс
+                return ""
+            value = await self._wait_for_fill(namespace, key, lock_key)
+            if value is not None:
+                return value
+            logger.debug("Не дождались значения от другого процесса, вычисляем сами | key={}", key)
+            token = None
+
+        try:
+            started = time.perf_counter()
+            value = await compute()
+            await self.store(namespace, key, value, ttl, delta=time.perf_counter() - started)
+            return value
+        finally:
+            if token is not None:
+                await client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+    async def _wait_for_fill(self, namespace: str, key: str, lock_key: str) -> Optional[str]:
+        client = self._cache.redis
+        deadline = time.monotonic() + self._lock_wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self._lock_poll_interval)
+            raw = await client.get(key)
+            if raw is not None:
+                entry = CacheEntry.decode(raw)
+                if entry is not None:
+                    self._cache.local.set(namespace, key, raw)
+                    return entry.value
+            if not await client.exists(lock_key):
+                break
+        return None
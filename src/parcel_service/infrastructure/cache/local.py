@@ -0,0 +1,136 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class LocalCachePolicy:
+    """
+    Политика хранения пространства имён локального кеша.
+
+    :param ttl: Время жизни записи в секундах (0 — пространство не кешируется локально).
+    :type ttl: float
+    :param max_size: Максимальное количество записей, сверх него вытесняются давно не читавшиеся.
+    :type max_size: int
+    """
+    ttl: float
+    max_size: int
+
+
+class LocalCache:
+    """
+    Ограниченный in-process кеш с TTL и LRU-вытеснением, разделённый на пространства имён.
+
+    Не потокобезопасен и рассчитан на использование из одного event loop воркера uvicorn.
+    Согласованность между процессами обеспечивается сообщениями инвалидации и коротким TTL.
+
+    :param policies: Политики по пространствам имён.
+    :type policies: Dict[str, LocalCachePolicy]
+    :param default: Политика для пространств имён без явной настройки.
+    :type default: LocalCachePolicy
+    :param clock: Источник монотонного времени (для тестов).
+    :type clock: Callable[[], float]
+    """
+
+    def __init__(
+            self,
+            policies: Dict[str, LocalCachePolicy],
+            default: LocalCachePolicy,
+            clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._policies = policies
+        self._default = default
+        self._clock = clock
+        self._data: Dict[str, OrderedDict[str, Tuple[float, Any]]] = {}
+
+    def policy(self, namespace: str) -> LocalCachePolicy:
+        """
+        Возвращает политику пространства имён.
+
+        :param namespace: Пространство имён.
+        :type namespace: str
+        :return: Политика хранения.
+        :rtype: LocalCachePolicy
+        """
+        return self._policies.get(namespace, self._default)
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        Возвращает значение, если оно есть и не истекло, и отмечает его как недавно использованное.
+
+        :param namespace: Пространство имён.
+        :type namespace: str
+        :param key: Ключ.
+        :type key: str
+        :return: Значение или None.
+        :rtype: Optional[Any]
+        """
+        bucket = self._data.get(namespace)
+        if not bucket:
+            return None
+        entry = bucket.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del bucket[key]
+            return None
+        bucket.move_to_end(key)
+        return value
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        """
+        Сохраняет значение по политике пространства имён, вытесняя самые старые записи.
+
+        :param namespace: Пространство имён.
+        :type namespace: str
+        :param key: Ключ.
+        :type key: str
+        :param value: Значение.
+        :type value: Any
+        """
+        policy = self.policy(namespace)
+        if policy.ttl <= 0 or policy.max_size <= 0:
+            return
+        bucket = self._data.setdefault(namespace, OrderedDict())
+        bucket[key] = (self._clock() + policy.ttl, value)
+        bucket.move_to_end(key)
+        while len(bucket) > policy.max_size:
+            bucket.popitem(last=False)
+
+    def delete(self, namespace: str, key: str) -> None:
+        """
+        Удаляет запись.
+
+        :param namespace: Пространство имён.
+        :type namespace: str
+        :param key: Ключ.
+        :type key: str
+        """
+        bucket = self._data.get(namespace)
+        if bucket:
+            bucket.pop(key, None)
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        """
+        Очищает одно пространство имён или весь кеш.
+
+        :param namespace: Пространство имён (None — все).
+        :type namespace: Optional[str]
+        """
+        if namespace is None:
+            self._data.clear()
+        else:
+            self._data.pop(namespace, None)
+
+    def size(self, namespace: str) -> int:
+        """
+        Возвращает количество записей пространства имён (включая ещё не вычищенные истёкшие).
+
+        :param namespace: Пространство имён.
+        :type namespace: str
+        :return: Количество записей.
+        :rtype: int
+        """
+        return len(self._data.get(namespace, ()))
@@ -0,0 +1,41 @@
+import redis.asyncio as redis
+
+from src.parcel_service.domain.interfaces.cache import IRecentWrites
+
+
+def build_recent_write_key(session_id: str) -> str:
+    """
+    Формирует ключ маркера недавней записи сессии.
+
+    Формат ключа общий с delivery_calculation_worker, который также ставит маркер.
+
+    :param session_id: Идентификатор сессии.
+    :type session_id: str
+    :return: Ключ в формате "db:written:<session_id>".
+    :rtype: str
+    """
+    return f"db:written:{session_id}"
+
+
+class RedisRecentWrites(IRecentWrites):
+    """
+    Маркеры недавних записей сессий в Redis: ключ с TTL, равным допустимой задержке реплики.
+
+    Локальный кеш процесса не используется: маркер ставят другие процессы и воркер,
+    а устаревший ответ «записей не было» вернул бы сессии данные до её собственной записи.
+
+    :param client: Redis-клиент кеша.
+    :type client: redis.Redis
+    :param ttl: Срок жизни маркера в секундах.
+    :type ttl: int
+    """
+
+    def __init__(self, client: redis.Redis, ttl: int) -> None:
+        self._client = client
+        self._ttl = ttl
+
+    async def mark(self, session_id: str) -> None:
+        await self._client.set(build_recent_write_key(session_id), "1", ex=self._ttl)
+
+    async def is_recent(self, session_id: str) -> bool:
+        return bool(await self._client.exists(build_recent_write_key(session_id)))
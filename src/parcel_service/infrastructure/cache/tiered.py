@@ -0,0 +1,180 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from src.parcel_service.core.metrics.metrics import CACHE_HIT_RATIO, CACHE_REQUESTS
+from src.parcel_service.infrastructure.cache.invalidation import encode_invalidation
+from src.parcel_service.infrastructure.cache.local import LocalCache
+
+
+class TieredCache:
+    """
+    Двухуровневый кеш: локальный in-process (L1) перед Redis (L2).
+
+    Значения хранятся строками в обоих уровнях. Чтение сначала проверяет L1, при промахе
+    идёт в Redis и наполняет L1 по политике пространства имён. Изменяемые данные должны
+    либо иметь ключи, меняющиеся при изменении (поколение сессии), либо инвалидироваться
+    через `invalidate`, который рассылает сообщение всем процессам.
+
+    Для каждого пространства имён и уровня считаются попадания/промахи
+    (метрики `cache_requests_total` и `cache_hit_ratio`).
+
+    :param client: Redis-клиент кеша.
+    :type client: redis.Redis
+    :param local: Локальный кеш процесса.
+    :type local: LocalCache
+    :param channel: Канал pub/sub для сообщений инвалидации.
+    :type channel: str
+    """
+
+    def __init__(self, client: redis.Redis, local: LocalCache, channel: str) -> None:
+        self._client = client
+        self._local = local
+        self._channel = channel
+        self._stats: Dict[Tuple[str, str], list] = defaultdict(lambda: [0, 0])
+
+    @property
+    def redis(self) -> redis.Redis:
+        """
+        Redis-клиент второго уровня.
+
+        :return: Redis клиент.
+        :rtype: redis.Redis
+        """
+        return self._client
+
+    @property
+    def local(self) -> LocalCache:
+        """
+        Локальный кеш первого уровня.
+
+        :return: Локальный кеш.
+        :rtype: LocalCache
+        """
+        return self._local
+
+    def _record(self, namespace: str, tier: str, hit: bool) -> None:
+        stats = self._stats[(namespace, tier)]
+        stats[0 if hit else 1] += 1
+        CACHE_REQUESTS.labels(namespace, tier, "hit" if hit else "miss").inc()
+        CACHE_HIT_RATIO.labels(namespace, tier).set(stats[0] / (stats[0] + stats[1]))
+
+    async def get(self, namespace: str, key: str) -> Optional[str]:
+        """
+        Возвращает значение из L1, иначе из Redis (с наполнением L1).
+
+        :param namespace: Пространство имён.
+        :type namespace: str
+        :param key: Ключ Redis.
+        :type key: str
+        :return: Значение или None.
+        :rtype: Optional[str]
+        """
+        value = self._local.get(namespace, key)
+        self._record(namespace, "local", value is not None)
+        if value is not None:
+            return value
+
+        value = await self._client.get(key)
+        self._record(namespace, "redis", value is not None)
+        if value is not None:
+            self._local.set(namespace, key, value)
+        return value
+
+    async def set(self, namespace: str, key: str, value: str, ttl: int) -> None:
+        """
+        Сохраняет значение в Redis с TTL и в L1 по политике пространства имён.
+
+        :param namespace: Пространство имён.
+        :type namespace: str
+        :param key: Ключ Redis.
+        :type key: str
+        :param value: Значение.
+        :type value: str
+        :param ttl: TTL в Redis (сек).
+        :type ttl: int
+        """
+        await self._client.set(key, value, ex=ttl)
+        self._local.set(namespace, key, value)
+
+    async def get_many(self, namespace: str, keys: List[str]) -> Dict[str, str]:
+        """
+        Возвращает найденные значения по списку ключей: сначала из L1, остальные одним MGET.
+
+        :param namespace: Пространство имён.
+        :type namespace: str
+        :param keys: Ключи Redis.
+        :type keys: List[str]
+        :return: Найденные значения по ключам (промахи отсутствуют).
+        :rtype: Dict[str, str]
+        """
+        found: Dict[str, str] = {}
+        remote: List[str] = []
+        for key in keys:
+            value = self._local.get(namespace, key)
+            self._record(namespace, "local", value is not None)
+            if value is not None:
+                found[key] = value
+            else:
+                remote.append(key)
+
+        if remote:
+            for key, value in zip(remote, await self._client.mget(remote)):
+                self._record(namespace, "redis", value is not None)
+                if value is not None:
+                    found[key] = value
+                    self._local.set(namespace, key, value)
+        return found
+
+    async def set_many(self, namespace: str, items: Dict[str, Tuple[str, int]]) -> None:
+        """
+        Сохраняет несколько значений одним pipeline и в L1.
+
+        :param namespace: Пространство имён.
+        :type namespace: str
+        :param items: Значение и TTL (сек) по ключу.
+        :type items: Dict[str, Tuple[str, int]]
+        """
+        if not items:
+            return
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, (value, ttl) in items.items():
+                pipe.set(key, value, ex=ttl)
+            await pipe.execute()
+        for key, (value, _) in items.items():
+            self._local.set(namespace, key, value)
+
+    async def invalidate(self, namespace: str, key: str) -> None:
+        """
+        Удаляет запись из Redis и из L1 всех процессов.
+
+        :param namespace: Пространство имён.
+        :type namespace: str
+        :param key: Ключ Redis.
+        :type key: str
+        """
+        self._local.delete(namespace, key)
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.delete(key)
+            pipe.publish(self._channel, encode_invalidation(namespace, key))
+            await pipe.execute()
+
+    async def invalidate_many(self, namespace: str, keys: List[str]) -> None:
+        """
+        Удаляет несколько записей из Redis и из L1 всех процессов одним pipeline.
+
+        :param namespace: Пространство имён.
+        :type namespace: str
+        :param keys: Ключи Redis.
+        :type keys: List[str]
+        """
+        if not keys:
+            return
+        for key in keys:
+            self._local.delete(namespace, key)
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.delete(*keys)
+            for key in keys:
+                pipe.publish(self._channel, encode_invalidation(namespace, key))
+            await pipe.execute()
@@ -0,0 +1,31 @@
+from typing import Optional
+
+import redis.asyncio as redis
+
+from src.parcel_service.domain.interfaces.cache import IUsdRate
+
+# Ключ курса общий с delivery_calculation_worker (CurrencyService), который загружает
+# курс с сайта ЦБ РФ и хранит его с TTL: наличие ключа означает, что курс актуален
+USD_RATE_KEY = "usd_to_rub"
+
+
+class RedisUsdRate(IUsdRate):
+    """
+    Курс USD → RUB из кеша Redis, который ведёт delivery_calculation_worker.
+
+    Сервис не обращается к ЦБ РФ сам: если курса в кеше нет, стоимость доставки
+    рассчитает воркер после обработки события регистрации.
+
+    :param client: Redis-клиент кеша.
+    :type client: redis.Redis
+    """
+
+    def __init__(self, client: redis.Redis) -> None:
+        self._client = client
+
+    async def get(self) -> Optional[float]:
+        raw = await self._client.get(USD_RATE_KEY)
+        if not raw:
+            return None
+        rate = float(raw)
+        return rate if rate > 0 else None
@@ -1,3 +1,4 @@
+from typing import Optional
 from urllib.parse import urlparse, urlunparse
 
 import redis.asyncio as redis
@@ -6,7 +7,7 @@ from loguru import logger
 from src.parcel_service.core.config import RedisSettings
 
 
-def create_redis_pool(settings: RedisSettings, db:int) -> redis.Redis:
+def create_redis_pool(settings: RedisSettings, db:int, decode_responses: Optional[bool] = None) -> redis.Redis:
     """
     Создаёт пул соединений Redis с учётом настроек и номера базы данных.
 
@@ -14,6 +15,8 @@ def create_redis_pool(settings: RedisSettings, db:int) -> redis.Redis:
     :type settings: RedisSettings
     :param db: Номер базы данных Redis (например, 0, 1, 2...).
     :type db: int
+    :param decode_responses: Переопределение декодирования ответов (None — из настроек).
+    :type decode_responses: Optional[bool]
     :return: Асинхронный клиент Redis с созданным пулом соединений.
     :rtype: redis.Redis
     """
@@ -24,7 +27,7 @@ def create_redis_pool(settings: RedisSettings, db:int) -> redis.Redis:
     return redis.Redis.from_url(
         url = str(redis_url),
         max_connections = settings.max_connections,
-        decode_responses = settings.decode_responses,
+        decode_responses = settings.decode_responses if decode_responses is None else decode_responses,
         socket_timeout=settings.socket_timeout,
         retry_on_timeout=settings.retry_on_timeout,
         health_check_interval=settings.health_check_interval
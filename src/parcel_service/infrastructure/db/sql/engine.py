@@ -2,12 +2,14 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from src.parcel_service.core.config import DatabaseSettings
 
+from .statements import instrument_compiled_cache
 from .url_resolver import make_database_url
 
 
 def create_db_engine(db_settings: DatabaseSettings, debug: bool = False) -> AsyncEngine:
     """
     Создаёт асинхронный SQLAlchemy engine на основе переданных настроек.
+    Обращения к кешу компиляции запросов учитываются в метрике sql_compiled_cache_total.
 
     :param db_settings: Настройки подключения к базе данных (тип, URL, пул, таймауты и т.д.).
     :type db_settings: DatabaseSettings
@@ -37,7 +39,41 @@ def create_db_engine(db_settings: DatabaseSettings, debug: bool = False) -> Asyn
             "isolation_level": db_settings.isolation_level,
         })
 
-    return create_async_engine(db_url, connect_args=connect_args, **kwargs)
+    engine = create_async_engine(db_url, connect_args=connect_args, **kwargs)
+    instrument_compiled_cache(engine)
+    return engine
+
+
+def create_read_engine(db_settings: DatabaseSettings, primary: AsyncEngine, debug: bool = False) -> AsyncEngine:
+    """
+    Создаёт engine для запросов только на чтение.
+
+    Если задан адрес реплики (`read_host`), создаётся отдельный engine со своим пулом соединений.
+    Иначе чтение идёт на основной сервер через пул основного engine, но с уровнем изоляции
+    `read_isolation_level` (выставляется на соединение при выдаче из пула).
+
+    :param db_settings: Настройки подключения к базе данных.
+    :type db_settings: DatabaseSettings
+    :param primary: Engine основного сервера.
+    :type primary: AsyncEngine
+    :param debug: Включает SQL-отладку, по умолчанию False.
+    :type debug: bool
+    :return: Асинхронный SQLAlchemy engine для чтения.
+    :rtype: AsyncEngine
+    """
+    isolation_level = db_settings.read_isolation_level or db_settings.isolation_level
+
+    if not db_settings.read_host:
+        if isolation_level == db_settings.isolation_level:
+            return primary
+        return primary.execution_options(isolation_level=isolation_level)
+
+    replica_settings = db_settings.model_copy(update={
+        "host": db_settings.read_host,
+        "port": db_settings.read_port or db_settings.port,
+        "isolation_level": isolation_level,
+    })
+    return create_db_engine(db_settings=replica_settings, debug=debug)
 
 
 def create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
@@ -3,7 +3,9 @@ from datetime import datetime, timezone
 from typing import Optional
 from sqlalchemy import UniqueConstraint
 
-from sqlalchemy import JSON, Boolean, DateTime, Float, ForeignKey, Integer, String, Text, func, Index
+from sqlalchemy import JSON, Boolean, Computed, DateTime, Float, ForeignKey, Integer, String, Text, func, Index
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 class Base(DeclarativeBase):
@@ -12,6 +14,32 @@ class Base(DeclarativeBase):
     """
     pass
 
+
+class JsonValue(ColumnElement):
+    """
+    Значение из JSON-колонки `payload` для генерируемых колонок: в MySQL —
+    `JSON_VALUE(payload, path RETURNING ...)`, как в миграции b5e8a1c4d702 (SQL NULL для JSON null),
+    в SQLite (тесты) — `json_extract`, у которого та же семантика для JSON null.
+
+    :ivar path: JSON-путь значения.
+    :ivar returning: Тип результата JSON_VALUE (например, SIGNED или DOUBLE).
+    """
+    inherit_cache = True
+
+    def __init__(self, path: str, returning: str):
+        self.path = path
+        self.returning = returning
+
+
+@compiles(JsonValue)
+def _compile_json_value(element: JsonValue, compiler, **kw) -> str:
+    return f"JSON_VALUE(payload, '{element.path}' RETURNING {element.returning})"
+
+
+@compiles(JsonValue, "sqlite")
+def _compile_json_value_sqlite(element: JsonValue, compiler, **kw) -> str:
+    return f"json_extract(payload, '{element.path}')"
+
 class Parcel(Base):
     """
     Модель посылки.
@@ -98,6 +126,8 @@ class OutboxEvent(Base):
     :ivar applied: Было ли событие уже обработано.
     :ivar created_at: Дата создания события.
     :ivar published_at: Дата публикации события во внешний брокер (если применимо).
+    :ivar type_id: Тип посылки из payload (хранимая генерируемая колонка).
+    :ivar delivery_price_rub: Стоимость доставки из payload (хранимая генерируемая колонка).
     """
     __tablename__ = "outbox_events"
 
@@ -109,3 +139,48 @@ class OutboxEvent(Base):
     applied: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     published_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    type_id: Mapped[Optional[int]] = mapped_column(
+        Integer, Computed(JsonValue("$.type_id", "SIGNED"), persisted=True), nullable=True
+    )
+    delivery_price_rub: Mapped[Optional[float]] = mapped_column(
+        Float, Computed(JsonValue("$.delivery_price_rub", "DOUBLE"), persisted=True), nullable=True
+    )
+
+class ParcelView(Base):
+    """
+    Read-модель посылок сессии для списочных запросов.
+
+    Заполняется при регистрации посылки в одной транзакции с outbox-событием и обновляется
+    воркером расчёта при установке стоимости доставки. Заменяет объединение `parcels`
+    и `outbox_events` с извлечением полей из JSON.
+
+    :ivar parcel_id: Уникальный идентификатор посылки (UUID).
+    :ivar session_id: Идентификатор пользовательской сессии.
+    :ivar name: Название посылки.
+    :ivar weight_kg: Вес в килограммах.
+    :ivar type_id: Идентификатор типа посылки.
+    :ivar cost_adjustment_usd: Стоимость содержимого в долларах.
+    :ivar delivery_price_rub: Рассчитанная стоимость доставки в рублях (если рассчитана).
+    :ivar has_price: Рассчитана ли стоимость доставки.
+    :ivar created_at: Дата регистрации посылки.
+    :ivar updated_at: Дата последнего изменения.
+
+    :index ix_parcel_view_session_created: Индекс по session_id, created_at, parcel_id, type_id и has_price.
+    """
+    __tablename__ = "parcel_view"
+
+    parcel_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    session_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    weight_kg: Mapped[float] = mapped_column(Float, nullable=False)
+    type_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    cost_adjustment_usd: Mapped[float] = mapped_column(Float, nullable=False)
+    delivery_price_rub: Mapped[Optional[float]] = mapped_column(Float, nullable=True, default=None)
+    has_price: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                                                 onupdate=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("ix_parcel_view_session_created", "session_id", "created_at", "parcel_id", "type_id", "has_price"),
+    )
@@ -0,0 +1,66 @@
+from typing import Callable, Dict, Hashable, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.parcel_service.core.metrics.metrics import SQL_COMPILED_CACHE, SQL_STATEMENT_CACHE
+
+TStatement = TypeVar("TStatement")
+
+
+class StatementCache:
+    """
+    Кеш заранее построенных параметризованных SQL-выражений.
+
+    Выражение строится один раз на «форму» запроса (набор применённых фильтров, режим
+    пагинации, выбранные поля), значения подставляются при выполнении через bindparam.
+    Повторное использование того же объекта выражения экономит построение дерева
+    `select()` и вычисление ключа кеша компиляции SQLAlchemy (он запоминается на объекте),
+    а скомпилированный SQL берётся из кеша компиляции engine.
+
+    Число форм конечно и мало, поэтому вытеснение не требуется.
+    """
+
+    def __init__(self) -> None:
+        self._statements: Dict[Tuple[str, Hashable], object] = {}
+
+    def get(self, name: str, shape: Hashable, build: Callable[[], TStatement]) -> TStatement:
+        """
+        Возвращает выражение для формы запроса, строя его при первом обращении.
+
+        :param name: Название запроса (метка метрик).
+        :type name: str
+        :param shape: Форма запроса: всё, что меняет структуру SQL, но не значения параметров.
+        :type shape: Hashable
+        :param build: Построение выражения для этой формы.
+        :type build: Callable[[], TStatement]
+        :return: Параметризованное выражение.
+        :rtype: TStatement
+        """
+        key = (name, shape)
+        statement = self._statements.get(key)
+        if statement is None:
+            statement = self._statements[key] = build()
+            SQL_STATEMENT_CACHE.labels(name, "miss").inc()
+        else:
+            SQL_STATEMENT_CACHE.labels(name, "hit").inc()
+        return statement
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+
+def instrument_compiled_cache(engine: AsyncEngine) -> None:
+    """
+    Считает обращения к кешу компиляции SQLAlchemy (метрика sql_compiled_cache_total)
+    для каждого запроса engine.
+
+    :param engine: Асинхронный SQLAlchemy engine.
+    :type engine: AsyncEngine
+    """
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count_cache_hit(conn, cursor, statement, parameters, context, executemany) -> None:
+        cache_hit = getattr(context, "cache_hit", None)
+        if isinstance(cache_hit, CacheStats):
+            SQL_COMPILED_CACHE.labels(cache_hit.name.lower()).inc()
@@ -1,4 +1,5 @@
 from .parcel import ParcelRepository
 from .outbox import OutboxEventRepository
 from .parcel_combine import ParcelCombinedRepository
+from .parcel_view import ParcelViewRepository
 from .parcel_type import ParcelTypeRepository
@@ -1,10 +1,11 @@
-from typing import Optional
+from typing import Any, Dict, Optional, Sequence
 from loguru import logger
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.parcel_service.domain.constants.events import EventType
 from src.parcel_service.infrastructure.db.sql.models import OutboxEvent
 from src.parcel_service.domain.interfaces.repository import IOutboxEventRepository
 
@@ -46,22 +47,48 @@ class OutboxEventRepository(IOutboxEventRepository):
             logger.error("Failed to add OutboxEvent | id={} type={} | error={}", event.id, event.event_type, str(e))
             raise OutboxPersistenceError()
 
+    async def add_many(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """
+        Вставляет пачку событий в таблицу outbox сразу, минуя unit of work сессии:
+        SQLAlchemy отправляет строки многострочным INSERT ... VALUES (insertmanyvalues).
+
+        :param rows: Значения колонок событий (id, parcel_id, session_id, event_type, payload, created_at).
+        :type rows: Sequence[Dict[str, Any]]
+        """
+        if not rows:
+            return
+        try:
+            logger.debug("Adding OutboxEvent batch | count={}", len(rows))
+            await self._session.execute(insert(OutboxEvent), list(rows))
+        except IntegrityError as e:
+            logger.warning("Duplicate OutboxEvent ID detected in batch | count={} | error={}", len(rows), str(e))
+            raise OutboxDuplicateError()
+        except Exception as e:
+            logger.error("Failed to add OutboxEvent batch | count={} | error={}", len(rows), str(e))
+            raise OutboxPersistenceError()
+
     async def get_by_id(self, parcel_id: str) -> Optional[OutboxEvent]:
         """
-        Получает запись из таблицы outbox по его идентификатору.
+        Получает событие регистрации посылки из таблицы outbox по идентификатору посылки.
+
+        Поиск идёт по индексированной колонке parcel_id (ix_outbox_events_parcel_id),
+        а не по первичному ключу события.
 
-        :param parcel_id: Идентификатор события.
+        :param parcel_id: Идентификатор посылки.
         :type parcel_id: str
         :return: Найденное событие или None.
         :rtype: Optional[OutboxEvent]
         """
         try:
-            logger.debug("Fetching OutboxEvent by | id={}", parcel_id)
-            stmt = select(OutboxEvent).where(OutboxEvent.id == parcel_id)
+            logger.debug("Fetching OutboxEvent by | parcel_id={}", parcel_id)
+            stmt = select(OutboxEvent).where(
+                OutboxEvent.parcel_id == parcel_id,
+                OutboxEvent.event_type == EventType.PARCEL_REGISTERED.value
+            ).limit(1)
             result = await self._session.execute(stmt)
             return result.scalar_one_or_none()
         except Exception as e:
-            logger.error("Непредвиденная ошибка в OutboxEvent | id={} | error={}", parcel_id, str(e))
+            logger.error("Непредвиденная ошибка в OutboxEvent | parcel_id={} | error={}", parcel_id, str(e))
             raise
 
     async def _log_identity_debug(self) -> int:
@@ -1,10 +1,17 @@
-from typing import List, Tuple, Optional
+import asyncio
+from typing import AsyncIterator, Dict, List, Sequence, Tuple, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text, literal, union_all, func, desc
+from sqlalchemy import ColumnElement, Row, Select, and_, bindparam, literal, null, or_, select, func, union_all
 
 from .registry import RepositoryRegistry
+from src.parcel_service.domain.constants.events import EventType
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelCursor
 from src.parcel_service.domain.interfaces.repository import IParcelCombinedRepository
-from src.parcel_service.infrastructure.db.sql.models import Parcel, OutboxEvent
+from src.parcel_service.infrastructure.db.sql.models import Parcel, OutboxEvent, ParcelView
+from src.parcel_service.infrastructure.db.sql.statements import StatementCache
+
+# Выражения запросов репозитория, построенные один раз на форму запроса
+_STATEMENTS = StatementCache()
 
 
 @RepositoryRegistry.register(IParcelCombinedRepository)
@@ -14,9 +21,14 @@ class ParcelCombinedRepository(IParcelCombinedRepository):
     и связанных outbox-событиях.
 
     Используется для:
-    - получения актуального списка посылок, включая неподтверждённые события;
-    - фильтрации, пагинации, подсчёта количества;
-    - объединения информации из таблиц `parcels` и `outbox_events`.
+    - получения актуального списка посылок, включая ещё не обработанные воркером;
+    - фильтрации, пагинации, подсчёта количества по read-модели `parcel_view`;
+    - потоковой выгрузки всех посылок сессии через серверный курсор;
+    - получения карточек посылок из `parcels` и `outbox_events` по идентификаторам
+      (только нужные колонки, без загрузки ORM-сущностей).
+
+    Выражения запросов строятся один раз на форму запроса (`StatementCache`) с bindparam
+    вместо значений: на каждый вызов меняются только параметры.
 
     :param session: Асинхронная SQLAlchemy-сессия.
     :type session: AsyncSession
@@ -34,53 +46,200 @@ class ParcelCombinedRepository(IParcelCombinedRepository):
         """
         return id(self)
 
-    def _json_extract_expr(self) -> str:
+    @staticmethod
+    def _parcel_detail_columns() -> List[ColumnElement]:
         """
-        Возвращает корректное выражение SQL для извлечения `parcel_id` из JSON `payload`
-        в зависимости от используемого диалекта (SQLite, MySQL).
+        Колонки карточки посылки из `parcels` в порядке
+        (parcel_id, session_id, name, weight_kg, type_id, cost_adjustment_usd, delivery_price_rub).
 
-        :raises NotImplementedError: Если диалект не поддерживается.
-        :return: SQL-выражение для извлечения parcel_id из JSON.
-        :rtype: str
+        :return: Список колонок.
+        :rtype: List[ColumnElement]
         """
+        return [
+            Parcel.id.label("parcel_id"),
+            Parcel.session_id.label("session_id"),
+            Parcel.name.label("name"),
+            Parcel.weight_kg.label("weight_kg"),
+            Parcel.type_id.label("type_id"),
+            Parcel.cost_adjustment_usd.label("cost_adjustment_usd"),
+            Parcel.delivery_price_rub.label("delivery_price_rub"),
+        ]
 
-        dialect = self._session.bind.dialect.name
-        if dialect == "sqlite":
-            return "json_extract(payload, '$.parcel_id')"
-        elif dialect == "mysql":
-            return "JSON_UNQUOTE(JSON_EXTRACT(payload, '$.parcel_id'))"
-        else:
-            raise NotImplementedError(f"Unsupported DB dialect: {dialect}")
+    @staticmethod
+    def _outbox_detail_columns() -> List[ColumnElement]:
+        """
+        Те же колонки карточки посылки из события регистрации в `outbox_events`:
+        type_id и delivery_price_rub — генерируемые колонки, остальное — из payload.
 
-    async def get_parcels_by_ids(self, ids: List[str]) -> List[Parcel]:
+        :return: Список колонок.
+        :rtype: List[ColumnElement]
+        """
+        return [
+            OutboxEvent.parcel_id.label("parcel_id"),
+            OutboxEvent.session_id.label("session_id"),
+            OutboxEvent.payload["name"].as_string().label("name"),
+            OutboxEvent.payload["weight_kg"].as_float().label("weight_kg"),
+            OutboxEvent.type_id.label("type_id"),
+            OutboxEvent.payload["cost_adjustment_usd"].as_float().label("cost_adjustment_usd"),
+            OutboxEvent.delivery_price_rub.label("delivery_price_rub"),
+        ]
+
+    async def get_parcel_details_by_ids(self, ids: List[str]) -> List[Row]:
         """
-        Получает список посылок по их идентификаторам.
+        Получает карточки посылок из `parcels` по списку идентификаторов.
+
+        Выбираются только нужные колонки: строки не попадают в identity map сессии,
+        не отслеживаются и не тянут связи, `updated_at` и `company`.
 
         :param ids: Список parcel_id.
         :type ids: List[str]
-        :return: Список объектов Parcel.
-        :rtype: List[Parcel]
+        :return: Строки (parcel_id, session_id, name, weight_kg, type_id, cost_adjustment_usd, delivery_price_rub).
+        :rtype: List[Row]
         """
         if not ids:
             return []
-        stmt = select(Parcel).where(Parcel.id.in_(ids))
-        result = await self._session.execute(stmt)
-        return result.scalars().all()
+        stmt = _STATEMENTS.get("parcel_details", None, lambda: select(*self._parcel_detail_columns()).where(
+            Parcel.id.in_(bindparam("ids", expanding=True))
+        ))
+        result = await self._session.execute(stmt, {"ids": ids})
+        return result.all()
 
-    async def get_outbox_by_parcel_ids(self, ids: List[str]) -> List[OutboxEvent]:
+    async def get_outbox_details_by_parcel_ids(self, ids: List[str]) -> List[Row]:
         """
-        Получает список OutboxEvent по `parcel_id`.
+        Получает карточки ещё не обработанных посылок из событий `parcel.registered` по `parcel_id`.
 
         :param ids: Список parcel_id.
         :type ids: List[str]
-        :return: Список объектов OutboxEvent.
-        :rtype: List[OutboxEvent]
+        :return: Строки (parcel_id, session_id, name, weight_kg, type_id, cost_adjustment_usd, delivery_price_rub).
+        :rtype: List[Row]
         """
         if not ids:
             return []
-        stmt = select(OutboxEvent).where(OutboxEvent.parcel_id.in_(ids))
-        result = await self._session.execute(stmt)
-        return result.scalars().all()
+        stmt = _STATEMENTS.get("outbox_details", None, lambda: select(*self._outbox_detail_columns()).where(
+            OutboxEvent.parcel_id.in_(bindparam("ids", expanding=True)),
+            OutboxEvent.event_type == EventType.PARCEL_REGISTERED.value
+        ))
+        result = await self._session.execute(stmt, {"ids": ids})
+        return result.all()
+
+    async def get_detail(self, parcel_id: str, session_id: str) -> Optional[Row]:
+        """
+        Находит посылку по parcel_id одним запросом `UNION ALL` с приоритетом источника:
+        сначала `parcels` (поиск по первичному ключу), затем событие `parcel.registered`
+        в `outbox_events` (индекс ix_outbox_events_parcel_id). Так свежая, ещё не обработанная
+        воркером посылка находится за один round trip.
+
+        Колонка `owned` — результат сравнения session_id в SQL: по ней вызывающий код
+        отличает чужую посылку от отсутствующей.
+
+        :param parcel_id: Идентификатор посылки.
+        :type parcel_id: str
+        :param session_id: Идентификатор сессии, запрашивающей посылку.
+        :type session_id: str
+        :return: Строка (priority, owned, parcel_id, session_id, name, weight_kg, type_id,
+            cost_adjustment_usd, delivery_price_rub) или None.
+        :rtype: Optional[Row]
+        """
+        stmt = _STATEMENTS.get("detail", None, self._build_detail)
+        result = await self._session.execute(stmt, {"parcel_id": parcel_id, "session_id": session_id})
+        return result.first()
+
+    @classmethod
+    def _build_detail(cls) -> Select:
+        """
+        Строит выражение поиска карточки для `get_detail` с параметрами `parcel_id` и `session_id`.
+
+        :return: Параметризованное выражение.
+        :rtype: Select
+        """
+        from_parcels = select(
+            literal(1).label("priority"),
+            (Parcel.session_id == bindparam("session_id")).label("owned"),
+            *cls._parcel_detail_columns()
+        ).where(Parcel.id == bindparam("parcel_id"))
+
+        from_outbox = select(
+            literal(2).label("priority"),
+            (OutboxEvent.session_id == bindparam("session_id")).label("owned"),
+            *cls._outbox_detail_columns()
+        ).where(
+            OutboxEvent.parcel_id == bindparam("parcel_id"),
+            OutboxEvent.event_type == EventType.PARCEL_REGISTERED.value
+        )
+
+        return union_all(from_parcels, from_outbox).order_by("priority").limit(1)
+
+    @staticmethod
+    def _filters(by_type: bool = False, has_delivery_price: bool = False) -> List[ColumnElement]:
+        """
+        Условия выборки из `parcel_view` по сессии, типу и наличию цены доставки.
+        Значения передаются при выполнении параметрами `session_id` и `type_id` (см. `_filter_params`).
+
+        Все условия покрываются индексом (session_id, created_at, parcel_id, type_id, has_price).
+
+        :param by_type: Фильтровать ли по типу посылки.
+        :param has_delivery_price: Если True — только записи с рассчитанной delivery_price_rub.
+        :return: Список SQL-условий.
+        :rtype: List[ColumnElement]
+        """
+        filters = [ParcelView.session_id == bindparam("session_id")]
+        if by_type:
+            filters.append(ParcelView.type_id == bindparam("type_id"))
+        if has_delivery_price:
+            filters.append(ParcelView.has_price == True)
+        return filters
+
+    @staticmethod
+    def _filter_params(session_id: str, type_id: Optional[int] = None) -> Dict[str, object]:
+        """
+        Значения параметров условий `_filters`.
+
+        :param session_id: Идентификатор пользовательской сессии.
+        :param type_id: Фильтрация по типу посылки.
+        :return: Параметры запроса.
+        :rtype: Dict[str, object]
+        """
+        params: Dict[str, object] = {"session_id": session_id}
+        if type_id is not None:
+            params["type_id"] = type_id
+        return params
+
+    @staticmethod
+    def _after_cursor(created_at: ColumnElement, parcel_id: ColumnElement) -> ColumnElement:
+        """
+        Условие keyset-пагинации `(created_at, parcel_id) > (:after_created_at, :after_parcel_id)`.
+
+        Записано через OR, а не через row-value сравнение, чтобы MySQL строил range-доступ
+        по индексу (session_id, created_at, ...).
+
+        :param created_at: Колонка даты создания.
+        :param parcel_id: Колонка идентификатора посылки.
+        :return: SQL-условие.
+        :rtype: ColumnElement
+        """
+        return or_(
+            created_at > bindparam("after_created_at"),
+            and_(created_at == bindparam("after_created_at"), parcel_id > bindparam("after_parcel_id")),
+        )
+
+    @staticmethod
+    def _list_columns(fields: Optional[Tuple[str, ...]] = None) -> List[ColumnElement]:
+        """
+        Колонки страницы из `parcel_view` в порядке (parcel_id, created_at, name, weight_kg,
+        type_id, cost_adjustment_usd, delivery_price_rub). Поля, не вошедшие в `fields`,
+        заменяются на NULL с тем же именем.
+
+        :param fields: Поля карточки для выборки (None — все).
+        :return: Список колонок.
+        :rtype: List[ColumnElement]
+        """
+        columns = [ParcelView.parcel_id, ParcelView.created_at]
+        for name in ("name", "weight_kg", "type_id", "cost_adjustment_usd", "delivery_price_rub"):
+            if fields is None or name in fields:
+                columns.append(getattr(ParcelView, name))
+            else:
+                columns.append(null().label(name))
+        return columns
 
     async def count(
             self,
@@ -90,8 +249,8 @@ class ParcelCombinedRepository(IParcelCombinedRepository):
     ) -> int:
 
         """
-        Подсчитывает количество уникальных parcel_id (из таблиц `parcels` и `outbox_events`),
-        соответствующих фильтру по session_id, типу и флагу наличия цены доставки.
+        Подсчитывает количество посылок сессии в `parcel_view`,
+        соответствующих фильтру по типу и флагу наличия цены доставки.
 
         :param session_id: Идентификатор пользовательской сессии.
         :param has_delivery_price: Если True — учитываются только записи с ненулевой delivery_price_rub.
@@ -99,217 +258,134 @@ class ParcelCombinedRepository(IParcelCombinedRepository):
         :return: Количество подходящих parcel_id.
         :rtype: int
         """
-        parcels_query = select(
-            Parcel.id.label("parcel_id"),
-            Parcel.delivery_price_rub.label("delivery_price_rub"),
-            Parcel.type_id.label("type_id"),
-            literal("parcel").label("source")
-        ).where(Parcel.session_id == session_id)
-
-        if type_id is not None:
-            parcels_query = parcels_query.where(Parcel.type_id == type_id)
-
-        outbox_query = select(
-            OutboxEvent.payload["parcel_id"].as_string().label("parcel_id"),
-            OutboxEvent.payload["delivery_price_rub"].as_float().label("delivery_price_rub"),
-            OutboxEvent.payload["type_id"].as_integer().label("type_id"),
-            literal("outbox").label("source")
-        ).where(
-            OutboxEvent.session_id == session_id,
-            OutboxEvent.event_type == "registry_parcel",
-            OutboxEvent.applied == False
-        )
-
-        if type_id is not None:
-            outbox_query = outbox_query.where(
-                OutboxEvent.payload["type_id"].as_integer() == type_id
-            )
-
-        unified = union_all(parcels_query, outbox_query).subquery("unified")
-
-        ranked = select(
-            unified.c.parcel_id,
-            unified.c.delivery_price_rub,
-            func.row_number()
-            .over(partition_by=unified.c.parcel_id,
-                  order_by=desc(unified.c.source == "parcel"))
-            .label("rn")
-        ).subquery("ranked")
-
-        stmt = select(func.count()).where(ranked.c.rn == 1)
-
-        if has_delivery_price:
-            stmt = stmt.where(ranked.c.delivery_price_rub.isnot(None))
-
-        result = await self._session.execute(stmt)
+        by_type = type_id is not None
+        stmt = _STATEMENTS.get("count", (by_type, has_delivery_price), lambda: select(func.count()).select_from(ParcelView).where(
+            *self._filters(by_type, has_delivery_price)
+        ))
+        result = await self._session.execute(stmt, self._filter_params(session_id, type_id))
         return result.scalar_one()
 
-    async def list_paginated(
+    async def list_page(
             self,
             session_id: str,
             limit: int,
             offset: int,
-            type_id: Optional[int] = None
-    ) -> List[Tuple[str, str]]:
+            type_id: Optional[int] = None,
+            has_delivery_price: bool = False,
+            after: Optional[ParcelCursor] = None,
+            fields: Optional[Tuple[str, ...]] = None
+    ) -> List[Row]:
         """
-        Возвращает постраничный список parcel_id и source ("parcel" или "outbox"),
-        отфильтрованный по session_id и type_id.
+        Возвращает страницу посылок со всеми полями одним запросом в стабильном
+        порядке (created_at, parcel_id), отфильтрованную по session_id, типу и цене.
+        Общее количество считает отдельный запрос `count`.
+
+        Читает только read-модель `parcel_view`: страница — один range-скан индекса
+        (session_id, created_at, parcel_id, ...), без JSON-функций и объединения таблиц.
 
-        Объединяет данные из таблиц `parcels` и `outbox_events`,
-        удаляя дубликаты с приоритетом записей из `parcels`.
+        Запрашивается `limit + 1` строк: лишняя строка лишь сигнализирует, что есть
+        следующая страница, и вызывающий код её отбрасывает.
+
+        Без курсора работает прежний режим limit/offset.
+
+        При переданном `fields` читаются только эти колонки (и всегда parcel_id, created_at
+        для курсора), вместо остальных в строке стоит NULL — порядок колонок не меняется.
 
         :param session_id: Идентификатор пользовательской сессии.
         :param limit: Лимит записей.
-        :param offset: Смещение.
+        :param offset: Смещение (только без курсора).
         :param type_id: Фильтр по типу посылки.
-        :return: Список кортежей (parcel_id, source).
-        :rtype: List[Tuple[str, str]]
+        :param has_delivery_price: Если True — только записи с рассчитанной delivery_price_rub.
+        :param after: Позиция keyset-пагинации.
+        :param fields: Поля карточки для выборки (None — все).
+        :return: Строки страницы с колонками parcel_id, created_at, name, weight_kg, type_id,
+            cost_adjustment_usd, delivery_price_rub.
+        :rtype: List[Row]
         """
-        parcels_query = select(
-            Parcel.id.label("parcel_id"),
-            Parcel.created_at.label("created_at"),
-            Parcel.type_id.label("type_id"),
-            literal("parcel").label("source")
-        ).where(Parcel.session_id == session_id)
+        shape = (type_id is not None, has_delivery_price, after is not None, fields)
+        stmt = _STATEMENTS.get("list_page", shape, lambda: self._build_list_page(*shape))
+
+        params = self._filter_params(session_id, type_id)
+        params["limit"] = limit + 1
+        if after is not None:
+            params["after_created_at"] = after.created_at
+            params["after_parcel_id"] = after.parcel_id
+        else:
+            params["offset"] = offset
+
+        return (await self._session.execute(stmt, params)).all()
+
+    @classmethod
+    def _build_list_page(
+            cls,
+            by_type: bool,
+            has_delivery_price: bool,
+            keyset: bool,
+            fields: Optional[Tuple[str, ...]]
+    ) -> Select:
+        """
+        Строит выражение страницы списка для формы запроса. Параметры: `session_id`,
+        `type_id`, `limit`, а также `after_created_at`/`after_parcel_id` (keyset) или `offset`.
+
+        :param by_type: Фильтровать ли по типу посылки.
+        :param has_delivery_price: Только записи с рассчитанной ценой.
+        :param keyset: Keyset-пагинация по курсору вместо offset.
+        :param fields: Поля карточки для выборки (None — все).
+        :return: Параметризованное выражение.
+        :rtype: Select
+        """
+        stmt = select(*cls._list_columns(fields)).where(*cls._filters(by_type, has_delivery_price))
+        stmt = stmt.order_by(ParcelView.created_at, ParcelView.parcel_id).limit(bindparam("limit"))
+        if keyset:
+            return stmt.where(cls._after_cursor(ParcelView.created_at, ParcelView.parcel_id))
+        return stmt.offset(bindparam("offset"))
 
-        if type_id is not None:
-            parcels_query = parcels_query.where(Parcel.type_id == type_id)
+    async def stream_rows(
+            self,
+            session_id: str,
+            chunk_size: int,
+            type_id: Optional[int] = None,
+            has_delivery_price: bool = False
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Потоково читает все посылки сессии из `parcel_view` порциями по `chunk_size` строк
+        в порядке (created_at, parcel_id).
+
+        `parcel_view` уже объединяет обработанные посылки и ещё не обработанные события
+        регистрации, поэтому отдельный UNION с `outbox_events` не нужен.
+
+        Запрос выполняется через `AsyncSession.stream()` (серверный курсор, `yield_per`):
+        в памяти одновременно находится не больше одной порции. Если чтение прервано
+        (отмена задачи, отключение клиента), соединение инвалидируется: закрытие
+        недочитанного серверного курсора иначе дочитывало бы всю выборку.
 
-        outbox_query = select(
-            OutboxEvent.payload["parcel_id"].as_string().label("parcel_id"),
-            OutboxEvent.created_at.label("created_at"),
-            OutboxEvent.payload["type_id"].as_integer().label("type_id"),
-            literal("outbox").label("source")
+        :param session_id: Идентификатор пользовательской сессии.
+        :param chunk_size: Размер порции (строк).
+        :param type_id: Фильтр по типу посылки.
+        :param has_delivery_price: Если True — только записи с рассчитанной delivery_price_rub.
+        :return: Асинхронный итератор порций строк с колонками parcel_id, created_at, name,
+            weight_kg, type_id, cost_adjustment_usd, delivery_price_rub.
+        :rtype: AsyncIterator[Sequence[Row]]
+        """
+        by_type = type_id is not None
+        stmt = _STATEMENTS.get("stream", (by_type, has_delivery_price), lambda: select(
+            *self._list_columns()
         ).where(
-            OutboxEvent.session_id == session_id,
-            OutboxEvent.event_type == "registry_parcel",
-            OutboxEvent.applied == False
-        )
+            *self._filters(by_type, has_delivery_price)
+        ).order_by(
+            ParcelView.created_at, ParcelView.parcel_id
+        ))
 
-        if type_id is not None:
-            outbox_query = outbox_query.where(OutboxEvent.payload["type_id"].as_integer() == type_id)
-
-        unified_query = union_all(parcels_query, outbox_query).subquery("unified")
-
-        ranked = select(
-            unified_query.c.parcel_id,
-            unified_query.c.source,
-            func.row_number()
-            .over(partition_by=unified_query.c.parcel_id,
-                  order_by=desc(unified_query.c.source == "parcel"))
-            .label("rn")
-        ).subquery("ranked")
-
-        final_stmt = (
-            select(ranked.c.parcel_id, ranked.c.source)
-            .where(ranked.c.rn == 1)
-            .limit(limit)
-            .offset(offset)
+        result = await self._session.stream(
+            stmt, self._filter_params(session_id, type_id), execution_options={"yield_per": chunk_size}
         )
-
-        result = await self._session.execute(final_stmt)
-        return [(row.parcel_id, row.source) for row in result.all()]
-
-    # async def count(self, session_id: str, has_delivery_price: bool = False) -> int:
-    #     """
-    #     Подсчитывает количество уникальных parcel_id, либо только с рассчитанной стоимостью доставки.
-    #
-    #     :param session_id: Идентификатор сессии пользователя.
-    #     :type session_id: str
-    #     :param has_delivery_price: Флаг фильтрации только посылок с рассчитанной delivery_price.
-    #     :type has_delivery_price: bool
-    #     :return: Количество посылок, удовлетворяющих условиям.
-    #     :rtype: int
-    #     """
-    #     json_expr = self._json_extract_expr()
-    #     condition = "WHERE rn = 1"
-    #     if has_delivery_price:
-    #         # Добавим условие фильтрации по delivery_price
-    #         condition += " AND delivery_price_rub IS NOT NULL"
-    #
-    #     stmt = text(f"""
-    #         SELECT COUNT(*) FROM (
-    #             SELECT parcel_id, delivery_price_rub FROM (
-    #                 SELECT *,
-    #                        ROW_NUMBER() OVER (
-    #                            PARTITION BY parcel_id
-    #                            ORDER BY source = 'parcel' DESC, created_at DESC
-    #                        ) as rn
-    #                 FROM (
-    #                     SELECT id AS parcel_id, created_at, 'parcel' AS source, delivery_price_rub
-    #                     FROM parcels
-    #                     WHERE session_id = :session_id
-    #                     AND (
-    #                       :type_id IS NULL OR
-    #                       JSON_EXTRACT(payload, '$.type_id') = :type_id
-    #                     )
-    #                     UNION ALL
-    #
-    #                     SELECT {json_expr} AS parcel_id, created_at, 'outbox' AS source,
-    #                            json_extract(payload, '$.delivery_price_rub') AS delivery_price_rub
-    #                     FROM outbox_events
-    #                     WHERE session_id = :session_id
-    #                       AND event_type = 'registry_parcel'
-    #                       AND applied = false
-    #                 ) unified
-    #             ) filtered
-    #             {condition}
-    #         ) final
-    #     """).bindparams(session_id=session_id)
-    #
-    #     result = await self._session.execute(stmt)
-    #     return result.scalar_one()
-
-    # async def list_paginated(self, session_id: str, limit: int, offset: int, type_id:Optional[int]=None) -> List[Tuple[str, str]]:
-    #     """
-    #      Возвращает постраничный список актуальных посылок (Parcel или Outbox),
-    #      сгруппированных по `parcel_id` с приоритетом `Parcel > Outbox`.
-    #
-    #      :param session_id: Идентификатор пользовательской сессии.
-    #      :type session_id: str
-    #      :param limit: Количество записей на странице.
-    #      :type limit: int
-    #      :param offset: Смещение (offset) от начала списка.
-    #      :type offset: int
-    #      :param type_id: Необязательный фильтр по типу посылки.
-    #      :type type_id: Optional[int]
-    #      :return: Список кортежей (parcel_id, source), где source = 'parcel' или 'outbox'.
-    #      :rtype: List[Tuple[str, str]]
-    #      """
-    #     json_expr = self._json_extract_expr()
-    #     stmt = text(f"""
-    #         SELECT parcel_id, created_at, source FROM (
-    #             SELECT *,
-    #                    ROW_NUMBER() OVER (
-    #                        PARTITION BY parcel_id
-    #                        ORDER BY
-    #                            source = 'parcel' DESC,
-    #                            created_at DESC
-    #                    ) as rn
-    #             FROM (
-    #                 SELECT id AS parcel_id, created_at, 'parcel' AS source
-    #                 FROM parcels
-    #                 WHERE session_id = :session_id
-    #                 AND (:type_id IS NULL OR type_id = :type_id)
-    #
-    #                 UNION ALL
-    #
-    #                 SELECT {json_expr} AS parcel_id, created_at, 'outbox' AS source
-    #                 FROM outbox_events
-    #                 WHERE session_id = :session_id
-    #                   AND event_type = 'registry_parcel'
-    #                   AND applied = false
-    #             ) unified
-    #         ) filtered
-    #         WHERE rn = 1
-    #         ORDER BY parcel_id
-    #         LIMIT :limit OFFSET :offset
-    #     """).bindparams(
-    #         session_id=session_id,
-    #         type_id=type_id,
-    #         limit=limit,
-    #         offset=offset
-    #     )
-    #
-    #     result = await self._session.execute(stmt)
-    #     return [(row[0], row[2]) for row in result.all()]
\ No newline at end of file
+        completed = False
+        try:
+            async for partition in result.partitions(chunk_size):
+                yield partition
+            completed = True
+        finally:
+            if completed:
+                await result.close()
+            else:
+                await asyncio.shield(self._session.invalidate())
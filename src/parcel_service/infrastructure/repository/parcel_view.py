@@ -0,0 +1,91 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.parcel_service.domain.interfaces.repository import IParcelViewRepository
+from src.parcel_service.infrastructure.db.sql.models import ParcelView
+
+from .registry import RepositoryRegistry
+
+
+@RepositoryRegistry.register(IParcelViewRepository)
+class ParcelViewRepository(IParcelViewRepository):
+    """
+    Репозиторий read-модели `parcel_view`.
+
+    Запись добавляется в той же транзакции, что и outbox-событие регистрации,
+    поэтому список посылок видит новую посылку сразу после ответа API.
+
+    :param session: Асинхронная сессия SQLAlchemy.
+    :type session: AsyncSession
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session)
+
+    async def _log_identity_debug(self) -> int:
+        """
+        Отладочный метод, возвращающий внутренний ID объекта репозитория.
+
+        :return: Уникальный идентификатор экземпляра (id(self)).
+        :rtype: int
+        """
+        return id(self)
+
+    async def add(self, view: ParcelView) -> None:
+        """
+        Добавляет запись read-модели в текущую сессию БД.
+
+        :param view: Запись read-модели.
+        :type view: ParcelView
+        """
+        logger.debug("Добавляется запись parcel_view | parcel_id={}", view.parcel_id)
+        self._session.add(view)
+
+    async def add_many(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """
+        Вставляет записи read-модели пачкой одним многострочным INSERT.
+
+        :param rows: Значения колонок записей.
+        :type rows: Sequence[Dict[str, Any]]
+        """
+        if not rows:
+            return
+        logger.debug("Добавляется пачка parcel_view | count={}", len(rows))
+        await self._session.execute(insert(ParcelView), list(rows))
+
+    async def exists(self, parcel_id: str) -> bool:
+        """
+        Проверяет, есть ли запись read-модели посылки (поиск по первичному ключу).
+
+        :param parcel_id: Идентификатор посылки.
+        :type parcel_id: str
+        :return: True, если запись есть.
+        :rtype: bool
+        """
+        stmt = select(ParcelView.parcel_id).where(ParcelView.parcel_id == parcel_id)
+        result = await self._session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def ids_after(self, after: Optional[str], limit: int) -> List[str]:
+        """
+        Возвращает порцию parcel_id по первичному ключу, начиная после `after`.
+
+        Read-модель содержит и обработанные воркером посылки, и ещё лежащие в outbox,
+        поэтому обход даёт все известные идентификаторы.
+
+        :param after: Последний parcel_id предыдущей порции (None — с начала).
+        :type after: Optional[str]
+        :param limit: Размер порции.
+        :type limit: int
+        :return: Идентификаторы посылок.
+        :rtype: List[str]
+        """
+        stmt = select(ParcelView.parcel_id).order_by(ParcelView.parcel_id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(ParcelView.parcel_id > after)
+        result = await self._session.execute(stmt)
+        return list(result.scalars().all())
@@ -0,0 +1,198 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from src.parcel_service.core.metrics.metrics import GROUP_COMMIT_BATCH_SIZE, GROUP_COMMIT_FLUSH_DURATION, GROUP_COMMIT_WAIT
+from src.parcel_service.domain.constants.db import IsolationLevel
+from src.parcel_service.domain.interfaces.repository import IOutboxEventRepository, IParcelViewRepository
+from src.parcel_service.domain.interfaces.uow import IGroupCommit, IUnitOfWork
+
+
+@dataclass(slots=True)
+class _Pending:
+    outbox_row: Dict[str, Any]
+    view_row: Dict[str, Any]
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class GroupCommitWriter(IGroupCommit):
+    """
+    Групповая фиксация регистраций посылок в одном процессе.
+
+    Регистрации конкурентных запросов складываются в очередь; фоновая задача забирает
+    до `max_batch` записей, ожидая не дольше `max_delay` секунд после первой, и пишет
+    их многострочными INSERT в outbox_events и parcel_view в одной транзакции.
+    Каждый вызывающий ждёт фиксации своей транзакции, поэтому ответ API по-прежнему
+    отправляется только после коммита. Пока идёт запись пачки, очередь копит следующую.
+
+    Если транзакция пачки не удалась (например, повтор parcel_id), её записи повторяются
+    по одной, и ошибку получает только вызывающий с проблемной записью. Записи
+    вызывающих, отменённых до начала записи пачки, не пишутся.
+
+    :param uow_factory: Фабрика Unit of Work основного сервера.
+    :type uow_factory: Callable[[], IUnitOfWork]
+    :param max_batch: Максимум регистраций в одной транзакции.
+    :type max_batch: int
+    :param max_delay: Максимальное ожидание пополнения пачки после первой записи (сек).
+    :type max_delay: float
+    :param isolation_level: Уровень изоляции транзакций пачек.
+    :type isolation_level: Optional[IsolationLevel]
+    """
+
+    def __init__(
+            self,
+            uow_factory: Callable[[], IUnitOfWork],
+            max_batch: int = 100,
+            max_delay: float = 0.005,
+            isolation_level: Optional[IsolationLevel] = None
+    ) -> None:
+        self._uow_factory = uow_factory
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._isolation_level = isolation_level
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """
+        Запускает фоновую задачу записи пачек в текущем event loop.
+        """
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name="group-commit-writer")
+
+    async def stop(self) -> None:
+        """
+        Перестаёт принимать регистрации, дописывает уже поставленные в очередь
+        и останавливает фоновую задачу.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._queue.put_nowait(None)
+        self._full.set()
+        await self._task
+        self._task = None
+
+    async def submit(self, outbox_row: Dict[str, Any], view_row: Dict[str, Any]) -> None:
+        """
+        Ставит регистрацию в очередь и ждёт фиксации транзакции, в которую она попала.
+
+        :param outbox_row: Значения колонок outbox-события регистрации.
+        :type outbox_row: Dict[str, Any]
+        :param view_row: Значения колонок записи read-модели `parcel_view`.
+        :type view_row: Dict[str, Any]
+        :raises RuntimeError: Если запись пачек не запущена или останавливается.
+        :raises Exception: Ошибка записи этой регистрации (транзакция откатана).
+        """
+        if self._task is None or self._stopping:
+            raise RuntimeError("Group commit writer is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Pending(outbox_row, view_row, future, time.perf_counter()))
+        if self._queue.qsize() >= self._max_batch - 1:
+            self._full.set()
+        await future
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch: List[_Pending] = [first]
+            if not self._stopping and self._queue.qsize() < self._max_batch - 1:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), self._max_delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            stop = False
+            while len(batch) < self._max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+            if stop:
+                # Маркер остановки ставится последним: всё, что было до него, уже записано
+                return
+
+    async def _flush(self, batch: List[_Pending]) -> None:
+        """
+        Пишет пачку одной транзакцией и сообщает результат вызывающим; при ошибке
+        повторяет записи пачки по одной.
+
+        :param batch: Ожидающие регистрации.
+        :type batch: List[_Pending]
+        """
+        batch = [item for item in batch if not item.future.done()]
+        if not batch:
+            return
+
+        try:
+            await self._write(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                self._resolve(batch[0], e)
+                return
+            logger.warning("Ошибка групповой фиксации, запись по одной | size={} error={}", len(batch), str(e))
+            for item in batch:
+                try:
+                    await self._write([item])
+                except Exception as item_error:
+                    self._resolve(item, item_error)
+                else:
+                    self._resolve(item)
+            return
+
+        for item in batch:
+            self._resolve(item)
+
+    async def _write(self, batch: List[_Pending]) -> None:
+        """
+        Вставляет записи пачки в outbox_events и parcel_view и фиксирует транзакцию.
+
+        :param batch: Ожидающие регистрации.
+        :type batch: List[_Pending]
+        """
+        started = time.perf_counter()
+        result = "error"
+        try:
+            async with self._uow_factory().isolation(self._isolation_level) as uow:
+                repo_outbox = await uow.get_repo(IOutboxEventRepository)
+                await repo_outbox.add_many([item.outbox_row for item in batch])
+
+                repo_view = await uow.get_repo(IParcelViewRepository)
+                await repo_view.add_many([item.view_row for item in batch])
+            result = "ok"
+        finally:
+            GROUP_COMMIT_BATCH_SIZE.observe(len(batch))
+            GROUP_COMMIT_FLUSH_DURATION.labels(result=result).observe(time.perf_counter() - started)
+        logger.debug("Групповая фиксация регистраций | size={}", len(batch))
+
+    @staticmethod
+    def _resolve(item: _Pending, error: Optional[Exception] = None) -> None:
+        """
+        Сообщает вызывающему результат записи, если он ещё ждёт.
+
+        :param item: Ожидающая регистрация.
+        :type item: _Pending
+        :param error: Ошибка записи (None — запись зафиксирована).
+        :type error: Optional[Exception]
+        """
+        if error is None:
+            GROUP_COMMIT_WAIT.observe(time.perf_counter() - item.enqueued_at)
+        if item.future.done():
+            return
+        if error is None:
+            item.future.set_result(None)
+        else:
+            item.future.set_exception(error)
@@ -0,0 +1,440 @@
+import asyncio
+import json
+import os
+import socket
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import redis.asyncio as redis
+from loguru import logger
+from redis.exceptions import ResponseError
+
+from src.parcel_service.core.metrics.metrics import (
+    REGISTRATION_STREAM_APPENDS, REGISTRATION_STREAM_BATCH_SIZE, REGISTRATION_STREAM_LAG
+)
+from src.parcel_service.domain.constants.cache import CacheNamespace
+from src.parcel_service.domain.constants.db import IsolationLevel
+from src.parcel_service.domain.exceptions.domain_error import RegistrationBufferFull
+from src.parcel_service.domain.interfaces.cache import ICacheGeneration, IRecentWrites
+from src.parcel_service.domain.interfaces.repository import IOutboxEventRepository, IParcelViewRepository
+from src.parcel_service.domain.interfaces.uow import IRegistrationBuffer, IUnitOfWork
+from src.parcel_service.infrastructure.cache.entity import build_missing_key
+from src.parcel_service.infrastructure.cache.tiered import TieredCache
+
+# Поля строк с датами: в потоке хранятся в ISO 8601
+_DATETIME_FIELDS = ("created_at", "updated_at")
+
+# Длина потока проверяется вместе с XADD: перенесённые записи удаляются,
+# поэтому длина потока равна числу ещё не перенесённых в БД регистраций
+_APPEND_SCRIPT = """
+if redis.call("xlen", KEYS[1]) >= tonumber(ARGV[1]) then
+    return false
+end
+return redis.call("xadd", KEYS[1], "MAXLEN", "~", ARGV[1], "*", "data", ARGV[2])
+"""
+
+
+def encode_registration(outbox_row: Dict[str, Any], view_row: Dict[str, Any]) -> str:
+    """
+    Кодирует строки регистрации в JSON-строку записи потока.
+
+    :param outbox_row: Значения колонок outbox-события регистрации.
+    :type outbox_row: Dict[str, Any]
+    :param view_row: Значения колонок записи read-модели `parcel_view`.
+    :type view_row: Dict[str, Any]
+    :return: JSON-строка.
+    :rtype: str
+    """
+    return json.dumps({"outbox": _dump_row(outbox_row), "view": _dump_row(view_row)}, separators=(",", ":"))
+
+
+def decode_registration(raw: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Восстанавливает строки регистрации из записи потока.
+
+    :param raw: JSON-строка записи потока.
+    :type raw: str
+    :return: Строки outbox-события и read-модели.
+    :rtype: Tuple[Dict[str, Any], Dict[str, Any]]
+    """
+    data = json.loads(raw)
+    return _load_row(data["outbox"]), _load_row(data["view"])
+
+
+def _dump_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        name: value.isoformat() if name in _DATETIME_FIELDS and value is not None else value
+        for name, value in row.items()
+    }
+
+
+def _load_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        name: datetime.fromisoformat(value) if name in _DATETIME_FIELDS and value is not None else value
+        for name, value in row.items()
+    }
+
+
+def default_consumer_name() -> str:
+    """
+    Имя потребителя процесса в группе: после перезапуска процесс получает новое имя,
+    а его неподтверждённые записи забирают другие потребители.
+
+    :return: Имя в формате "<hostname>-<pid>".
+    :rtype: str
+    """
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class RedisRegistrationStream(IRegistrationBuffer):
+    """
+    Буфер регистраций в Redis Stream.
+
+    Регистрация добавляется одним вызовом скрипта (XLEN + XADD с MAXLEN): перенесённые
+    в БД записи удаляются из потока, поэтому его длина — это отставание переноса.
+    Когда отставание достигает `maxlen`, буфер отказывает, и регистрация пишется в БД
+    напрямую: MAXLEN остаётся лишь страховкой памяти Redis и не срезает
+    ещё не перенесённые записи.
+
+    :param client: Redis-клиент.
+    :type client: redis.Redis
+    :param key: Ключ потока.
+    :type key: str
+    :param maxlen: Максимум не перенесённых в БД регистраций.
+    :type maxlen: int
+    """
+
+    def __init__(self, client: redis.Redis, key: str, maxlen: int) -> None:
+        self._client = client
+        self._key = key
+        self._maxlen = maxlen
+
+    async def append(self, outbox_row: Dict[str, Any], view_row: Dict[str, Any]) -> None:
+        try:
+            entry_id = await self._client.eval(
+                _APPEND_SCRIPT, 1, self._key, self._maxlen, encode_registration(outbox_row, view_row)
+            )
+        except Exception:
+            REGISTRATION_STREAM_APPENDS.labels(result="error").inc()
+            raise
+        if not entry_id:
+            REGISTRATION_STREAM_APPENDS.labels(result="full").inc()
+            raise RegistrationBufferFull()
+        REGISTRATION_STREAM_APPENDS.labels(result="buffered").inc()
+
+
+@dataclass(slots=True)
+class _Entry:
+    entry_id: str
+    outbox_row: Dict[str, Any]
+    view_row: Dict[str, Any]
+
+
+class RegistrationStreamDrainer:
+    """
+    Перенос регистраций из Redis Stream в БД.
+
+    Фоновая задача читает поток в группе потребителей (XREADGROUP, до `batch_size` записей)
+    и пишет outbox-события и записи `parcel_view` многострочными INSERT в одной транзакции.
+    Записи подтверждаются (XACK) и удаляются из потока только после коммита; затем
+    с посылок пачки снимается отрицательный кеш (пока регистрация была в потоке, запрос
+    карточки мог запомнить её отсутствие), сессии пачки помечаются как недавно
+    записывавшие, и их поколение кеша увеличивается.
+
+    Если транзакция пачки не удалась, записи повторяются по одной. Если запись не удалась
+    и по одной, подтверждается она только тогда, когда её outbox-событие (с тем же id)
+    и запись `parcel_view` уже есть в БД (повторная доставка после коммита без XACK).
+    Остальные записи остаются неподтверждёнными: их, как и записи упавших процессов,
+    забирает XAUTOCLAIM после `claim_idle_ms` простоя. Неподтверждённые записи
+    обходятся по курсору XAUTOCLAIM, пока он не вернётся к началу списка ожидания.
+
+    :param client: Redis-клиент (XREADGROUP с BLOCK держит соединение до `block_ms`).
+    :type client: redis.Redis
+    :param key: Ключ потока.
+    :type key: str
+    :param group: Группа потребителей.
+    :type group: str
+    :param consumer: Имя потребителя процесса.
+    :type consumer: str
+    :param uow_factory: Фабрика Unit of Work основного сервера.
+    :type uow_factory: Callable[[], IUnitOfWork]
+    :param batch_size: Максимум регистраций в одной транзакции.
+    :type batch_size: int
+    :param block_ms: Ожидание новых записей одним XREADGROUP (мс).
+    :type block_ms: int
+    :param claim_idle_ms: Простой неподтверждённой записи, после которого её забирает XAUTOCLAIM (мс).
+    :type claim_idle_ms: int
+    :param isolation_level: Уровень изоляции транзакций переноса.
+    :type isolation_level: Optional[IsolationLevel]
+    :param generation: Счётчик поколений кеша сессий.
+    :type generation: Optional[ICacheGeneration]
+    :param recent_writes: Маркеры недавних записей сессий.
+    :type recent_writes: Optional[IRecentWrites]
+    :param cache: Двухуровневый кеш (отрицательный кеш отсутствующих посылок).
+    :type cache: Optional[TieredCache]
+    :param retry_delay: Пауза после ошибки Redis перед следующей попыткой (сек).
+    :type retry_delay: float
+    """
+
+    def __init__(
+            self,
+            client: redis.Redis,
+            key: str,
+            group: str,
+            consumer: str,
+            uow_factory: Callable[[], IUnitOfWork],
+            batch_size: int = 500,
+            block_ms: int = 200,
+            claim_idle_ms: int = 30_000,
+            isolation_level: Optional[IsolationLevel] = None,
+            generation: Optional[ICacheGeneration] = None,
+            recent_writes: Optional[IRecentWrites] = None,
+            cache: Optional[TieredCache] = None,
+            retry_delay: float = 1.0
+    ) -> None:
+        self._client = client
+        self._key = key
+        self._group = group
+        self._consumer = consumer
+        self._uow_factory = uow_factory
+        self._batch_size = batch_size
+        self._block_ms = block_ms
+        self._claim_idle_ms = claim_idle_ms
+        self._isolation_level = isolation_level
+        self._generation = generation
+        self._recent_writes = recent_writes
+        self._cache = cache
+        self._retry_delay = retry_delay
+        self._group_ready = False
+        self._claim_cursor = "0-0"
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """
+        Запускает фоновую задачу переноса в текущем event loop.
+        """
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name="registration-stream-drainer")
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновую задачу после текущей пачки. Непрочитанные записи остаются
+        в потоке, неподтверждённые — в списке ожидания группы.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        await self._task
+        self._task = None
+
+    async def drain_once(self, block_ms: Optional[int] = None) -> int:
+        """
+        Читает и переносит в БД одну пачку новых записей потока.
+
+        :param block_ms: Ожидание новых записей (мс), None — `block_ms` переноса.
+        :type block_ms: Optional[int]
+        :return: Количество перенесённых регистраций.
+        :rtype: int
+        """
+        await self._ensure_group()
+        response = await self._client.xreadgroup(
+            self._group, self._consumer, {self._key: ">"},
+            count=self._batch_size, block=self._block_ms if block_ms is None else block_ms
+        )
+        return await self._process(response[0][1] if response else [])
+
+    async def claim_stale(self) -> int:
+        """
+        Забирает и переносит в БД следующую порцию записей, неподтверждённых дольше
+        `claim_idle_ms` (упавшие процессы и записи, которые не удалось записать).
+        Обход продолжается с курсора предыдущего вызова.
+
+        :return: Количество перенесённых регистраций.
+        :rtype: int
+        """
+        await self._ensure_group()
+        response = await self._client.xautoclaim(
+            self._key, self._group, self._consumer,
+            min_idle_time=self._claim_idle_ms, start_id=self._claim_cursor, count=self._batch_size
+        )
+        self._claim_cursor = response[0]
+        return await self._process(response[1])
+
+    @property
+    def claim_pass_finished(self) -> bool:
+        """
+        Обошёл ли XAUTOCLAIM весь список ожидания группы (курсор вернулся к началу).
+        """
+        return self._claim_cursor == "0-0"
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_claim = loop.time()
+        while not self._stopping:
+            try:
+                if loop.time() >= next_claim:
+                    await self.claim_stale()
+                    # Следующая порция списка ожидания забирается сразу, новый обход — через claim_idle_ms
+                    if self.claim_pass_finished:
+                        next_claim = loop.time() + self._claim_idle_ms / 1000
+                await self.drain_once()
+            except Exception as e:
+                logger.warning("Ошибка переноса регистраций из потока | key={} error={}", self._key, str(e))
+                await asyncio.sleep(self._retry_delay)
+
+    async def _ensure_group(self) -> None:
+        """
+        Создаёт группу потребителей (и поток), если их ещё нет.
+        """
+        if self._group_ready:
+            return
+        try:
+            await self._client.xgroup_create(self._key, self._group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def _process(self, messages: Sequence[Tuple[str, Optional[Dict[str, str]]]]) -> int:
+        """
+        Переносит прочитанные записи в БД и подтверждает перенесённые.
+
+        :param messages: Записи потока: идентификатор и поля.
+        :type messages: Sequence[Tuple[str, Optional[Dict[str, str]]]]
+        :return: Количество перенесённых регистраций.
+        :rtype: int
+        """
+        entries: List[_Entry] = []
+        done: List[str] = []
+        for entry_id, fields in messages:
+            try:
+                outbox_row, view_row = decode_registration(fields["data"])
+            except Exception as e:
+                # Записи не восстановить: повторная доставка ничего не изменит
+                logger.error("Некорректная запись потока регистраций | id={} error={}", entry_id, str(e))
+                done.append(entry_id)
+                continue
+            entries.append(_Entry(entry_id, outbox_row, view_row))
+
+        written = await self._write_entries(entries) if entries else []
+        done.extend(entry.entry_id for entry in written)
+        if done:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.xack(self._key, self._group, *done)
+                pipe.xdel(self._key, *done)
+                await pipe.execute()
+
+        if written:
+            now = time.time()
+            for entry in written:
+                REGISTRATION_STREAM_LAG.observe(max(0.0, now - int(entry.entry_id.split("-")[0]) / 1000))
+            await self._after_commit(
+                {entry.view_row["session_id"] for entry in written},
+                [entry.view_row["parcel_id"] for entry in written]
+            )
+        return len(written)
+
+    async def _write_entries(self, entries: List[_Entry]) -> List[_Entry]:
+        """
+        Пишет записи одной транзакцией; при ошибке — по одной.
+
+        :param entries: Записи потока.
+        :type entries: List[_Entry]
+        :return: Записи, которые есть в БД после переноса.
+        :rtype: List[_Entry]
+        """
+        if len(entries) > 1:
+            try:
+                await self._write(entries)
+                return entries
+            except Exception as e:
+                logger.warning("Ошибка переноса пачки регистраций, запись по одной | size={} error={}", len(entries), str(e))
+
+        written = []
+        for entry in entries:
+            try:
+                await self._write([entry])
+            except Exception as e:
+                # Ошибка ограничения не означает повтор: подтверждается только то, что есть в БД
+                if await self._is_written(entry):
+                    logger.info("Регистрация уже перенесена | parcel_id={}", entry.outbox_row["parcel_id"])
+                    written.append(entry)
+                else:
+                    logger.error(
+                        "Не удалось перенести регистрацию, запись остаётся неподтверждённой | id={} parcel_id={} error={}",
+                        entry.entry_id, entry.outbox_row["parcel_id"], str(e)
+                    )
+            else:
+                written.append(entry)
+        return written
+
+    async def _is_written(self, entry: _Entry) -> bool:
+        """
+        Проверяет, что регистрация уже есть в БД: outbox-событие с тем же id и запись `parcel_view`.
+
+        :param entry: Запись потока.
+        :type entry: _Entry
+        :return: True, если обе строки регистрации записаны.
+        :rtype: bool
+        """
+        parcel_id = entry.outbox_row["parcel_id"]
+        try:
+            async with self._uow_factory() as uow:
+                repo_outbox = await uow.get_repo(IOutboxEventRepository)
+                event = await repo_outbox.get_by_id(parcel_id)
+                if event is None or event.id != entry.outbox_row["id"]:
+                    return False
+
+                repo_view = await uow.get_repo(IParcelViewRepository)
+                return await repo_view.exists(parcel_id)
+        except Exception as e:
+            logger.warning("Не удалось проверить перенос регистрации | parcel_id={} error={}", parcel_id, str(e))
+            return False
+
+    async def _write(self, entries: List[_Entry]) -> None:
+        """
+        Вставляет записи в outbox_events и parcel_view и фиксирует транзакцию.
+
+        :param entries: Записи потока.
+        :type entries: List[_Entry]
+        """
+        async with self._uow_factory().isolation(self._isolation_level) as uow:
+            repo_outbox = await uow.get_repo(IOutboxEventRepository)
+            await repo_outbox.add_many([entry.outbox_row for entry in entries])
+
+            repo_view = await uow.get_repo(IParcelViewRepository)
+            await repo_view.add_many([entry.view_row for entry in entries])
+        REGISTRATION_STREAM_BATCH_SIZE.observe(len(entries))
+        logger.debug("Регистрации перенесены из потока | size={}", len(entries))
+
+    async def _after_commit(self, session_ids: Set[str], parcel_ids: List[str]) -> None:
+        """
+        Снимает отрицательный кеш с перенесённых посылок (в Redis и в L1 всех процессов),
+        помечает сессии как недавно записывавшие и увеличивает их поколение кеша.
+        Ошибки Redis только логируются.
+
+        :param session_ids: Идентификаторы сессий перенесённых регистраций.
+        :type session_ids: Set[str]
+        :param parcel_ids: Идентификаторы перенесённых посылок.
+        :type parcel_ids: List[str]
+        """
+        if self._cache is not None:
+            try:
+                await self._cache.invalidate_many(
+                    CacheNamespace.PARCEL_MISSING.value, [build_missing_key(parcel_id) for parcel_id in parcel_ids]
+                )
+            except Exception as e:
+                logger.warning("Не удалось снять отрицательный кеш после переноса | count={} error={}", len(parcel_ids), str(e))
+        for session_id in session_ids:
+            try:
+                # Маркер ставится до увеличения поколения, как при одиночной регистрации
+                if self._recent_writes is not None:
+                    await self._recent_writes.mark(session_id)
+                if self._generation is not None:
+                    await self._generation.bump(session_id)
+            except Exception as e:
+                logger.warning("Не удалось обновить кеш сессии после переноса | session_id={} error={}", session_id, str(e))
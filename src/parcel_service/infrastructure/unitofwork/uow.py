@@ -1,10 +1,18 @@
-from typing import Callable, Type
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional, Type
 
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.parcel_service.domain.constants.db import IsolationLevel
+from src.parcel_service.domain.interfaces.cache import IRecentWrites
 from src.parcel_service.domain.interfaces.repository import IRepositoryFactory, TRepo
 from src.parcel_service.domain.interfaces.uow import IUnitOfWork
 
+# Диалекты без уровней изоляции READ COMMITTED/REPEATABLE READ (SQLite в тестах):
+# запрошенный уровень для них не применяется
+_ISOLATION_UNSUPPORTED_DIALECTS = frozenset({"sqlite"})
+
 
 class UnitOfWork(IUnitOfWork):
     """
@@ -18,12 +26,25 @@ class UnitOfWork(IUnitOfWork):
     :type repository_factory: IRepositoryFactory
     """
 
-    __slots__ = ("_cache", "_repository_factory", "_session", "_session_factory")
+    __slots__ = ("_cache", "_isolation_level", "_repository_factory", "_session", "_session_factory")
 
     def __init__(self, session_factory: Callable[[], AsyncSession], repository_factory: IRepositoryFactory) -> None:
         super().__init__(session_factory, repository_factory)
         self._session: AsyncSession | None = None
         self._cache = {}
+        self._isolation_level: Optional[IsolationLevel] = None
+
+    def isolation(self, level: Optional[IsolationLevel]) -> "UnitOfWork":
+        """
+        Задаёт уровень изоляции для следующей транзакции.
+
+        :param level: Уровень изоляции (None — уровень engine по умолчанию).
+        :type level: Optional[IsolationLevel]
+        :return: Текущий экземпляр Unit of Work.
+        :rtype: UnitOfWork
+        """
+        self._isolation_level = level
+        return self
 
     async def get_repo(self, repo_type: Type[TRepo]) -> TRepo:
         """
@@ -38,6 +59,25 @@ class UnitOfWork(IUnitOfWork):
             self._cache[repo_type] = await self._repository_factory.get(repo_type, self._session)
         return self._cache[repo_type]
 
+    @asynccontextmanager
+    async def read_only(self, repo_type: Type[TRepo]) -> AsyncIterator[TRepo]:
+        """
+        Выдаёт репозиторий на собственной сессии для независимого чтения.
+
+        Сессия берёт отдельное соединение из пула и закрывается без коммита
+        (транзакция откатывается), поэтому такие запросы можно выполнять
+        конкурентно с основной сессией.
+
+        :param repo_type: Тип запрашиваемого репозитория.
+        :type repo_type: Type[TRepo]
+        :return: Экземпляр репозитория на отдельной сессии.
+        :rtype: AsyncIterator[TRepo]
+        """
+        session_factory = await self._resolve_session_factory()
+        async with session_factory() as session:
+            await self._apply_isolation(session)
+            yield await self._repository_factory.get(repo_type, session)
+
     async def __aenter__(self) -> "UnitOfWork":
         """
         Вход в асинхронный контекст Unit of Work (инициализирует сессию).
@@ -45,7 +85,8 @@ class UnitOfWork(IUnitOfWork):
         :return: Текущий экземпляр Unit of Work.
         :rtype: UnitOfWork
         """
-        self._session = self._session_factory()
+        self._session = (await self._resolve_session_factory())()
+        await self._apply_isolation(self._session)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
@@ -58,10 +99,36 @@ class UnitOfWork(IUnitOfWork):
         :param exc_val: Значение исключения.
         :param exc_tb: Трассировка исключения.
         """
-        if exc_type:
-            await self._rollback()
-        else:
-            await self._commit()
+        try:
+            if exc_type:
+                await self._rollback()
+            else:
+                await self._commit()
+        finally:
+            self._isolation_level = None
+
+    async def _apply_isolation(self, session: AsyncSession) -> None:
+        """
+        Открывает соединение сессии с запрошенным уровнем изоляции. Уровень действует
+        до конца транзакции и сбрасывается при возврате соединения в пул.
+
+        :param session: Сессия, ещё не выполнявшая запросов.
+        :type session: AsyncSession
+        """
+        if self._isolation_level is None:
+            return
+        if session.get_bind().dialect.name in _ISOLATION_UNSUPPORTED_DIALECTS:
+            return
+        await session.connection(execution_options={"isolation_level": self._isolation_level.value})
+
+    async def _resolve_session_factory(self) -> Callable[[], AsyncSession]:
+        """
+        Возвращает фабрику сессий, на которой работает Unit of Work.
+
+        :return: Фабрика сессий.
+        :rtype: Callable[[], AsyncSession]
+        """
+        return self._session_factory
 
     async def _commit(self) -> None:
         """
@@ -73,4 +140,84 @@ class UnitOfWork(IUnitOfWork):
         """
         Выполняет откат текущей транзакции.
         """
-        await self._session.rollback()
\ No newline at end of file
+        await self._session.rollback()
+
+
+class ReadOnlyUnitOfWork(UnitOfWork):
+    """
+    Unit of Work только для чтения.
+
+    Не фиксирует транзакцию: при выходе из контекста она всегда откатывается.
+    Сессии создаются фабрикой чтения (реплика и/или облегчённый уровень изоляции).
+    Если сессия пользователя только что записывала данные (маркер недавней записи),
+    чтение направляется на основной сервер, чтобы не отдать данные до записи,
+    пока реплика не догнала основной сервер. При ошибке проверки маркера также
+    используется основной сервер.
+
+    :param session_factory: Фабрика сессий для чтения.
+    :type session_factory: Callable[[], AsyncSession]
+    :param repository_factory: Фабрика для создания репозиториев.
+    :type repository_factory: IRepositoryFactory
+    :param primary_session_factory: Фабрика сессий основного сервера (None — маршрутизация не нужна).
+    :type primary_session_factory: Optional[Callable[[], AsyncSession]]
+    :param recent_writes: Маркеры недавних записей сессий.
+    :type recent_writes: Optional[IRecentWrites]
+    :param session_id: Идентификатор сессии пользователя.
+    :type session_id: Optional[str]
+    """
+
+    __slots__ = ("_primary_session_factory", "_recent_writes", "_routed", "_session_id")
+
+    def __init__(
+            self,
+            session_factory: Callable[[], AsyncSession],
+            repository_factory: IRepositoryFactory,
+            primary_session_factory: Optional[Callable[[], AsyncSession]] = None,
+            recent_writes: Optional[IRecentWrites] = None,
+            session_id: Optional[str] = None
+    ) -> None:
+        super().__init__(session_factory, repository_factory)
+        self._primary_session_factory = primary_session_factory
+        self._recent_writes = recent_writes
+        self._session_id = session_id
+        self._routed: Optional[Callable[[], AsyncSession]] = None
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """
+        Выход из асинхронного контекста: транзакция чтения всегда откатывается.
+
+        :param exc_type: Тип исключения (если было).
+        :param exc_val: Значение исключения.
+        :param exc_tb: Трассировка исключения.
+        """
+        try:
+            await self._rollback()
+        finally:
+            self._isolation_level = None
+
+    async def _resolve_session_factory(self) -> Callable[[], AsyncSession]:
+        """
+        Выбирает фабрику сессий один раз за время жизни Unit of Work:
+        основной сервер для сессии с недавней записью, иначе — фабрику чтения.
+
+        :return: Фабрика сессий.
+        :rtype: Callable[[], AsyncSession]
+        """
+        if self._routed is None:
+            self._routed = await self._route()
+        return self._routed
+
+    async def _route(self) -> Callable[[], AsyncSession]:
+        if self._primary_session_factory is None or self._recent_writes is None or not self._session_id:
+            return self._session_factory
+
+        try:
+            recent = await self._recent_writes.is_recent(self._session_id)
+        except Exception as e:
+            logger.warning("Не удалось проверить недавние записи, чтение с основного сервера | session_id={} error={}", self._session_id, str(e))
+            return self._primary_session_factory
+
+        if recent:
+            logger.debug("Сессия недавно записывала данные, чтение с основного сервера | session_id={}", self._session_id)
+            return self._primary_session_factory
+        return self._session_factory
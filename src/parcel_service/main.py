@@ -1,11 +1,28 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
 from src.parcel_service.api import register_routers
+from src.parcel_service.api.middleware import register_middlewares
 from src.parcel_service.core.config import Settings
-from src.parcel_service.core.container import register_container
+from src.parcel_service.core.container import AppContainer, register_container
 from src.parcel_service.core.exceptions import register_exceptions
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Жизненный цикл приложения: запуск фоновых задач контейнера и освобождение ресурсов.
+
+    :param app: FastAPI-приложение.
+    :type app: FastAPI
+    """
+    await AppContainer.startup()
+    yield
+    await AppContainer.shutdown()
+
+
 def create_app() -> FastAPI:
     """
     Создаёт и настраивает экземпляр FastAPI-приложения.
@@ -14,6 +31,7 @@ def create_app() -> FastAPI:
     - Загрузку настроек из класса `Settings`
     - Регистрацию контейнера зависимостей (DI)
     - Регистрацию глобальных обработчиков исключений
+    - Регистрацию middleware (Idempotency-Key)
     - Регистрацию маршрутов по версии API
 
     :return: Настроенное FastAPI-приложение.
@@ -30,10 +48,12 @@ def create_app() -> FastAPI:
         redoc_url=settings.meta.redoc_url_app,
         openapi_url=settings.meta.openapi_url_app,
         debug=settings.app.debug,
+        lifespan=lifespan,
     )
 
     register_container(app=app, settings=settings)
     register_exceptions(app=app)
+    register_middlewares(app=app, settings=settings)
     register_routers(app=app, api_ver=settings.app.api_version)
     return app
 
@@ -3,7 +3,7 @@ import pytest
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timedelta, timezone
-from src.parcel_service.infrastructure.db.sql.models import Base, Parcel, OutboxEvent
+from src.parcel_service.infrastructure.db.sql.models import Base, Parcel, OutboxEvent, ParcelView
 
 
 @pytest.fixture(scope="session")
@@ -97,7 +97,36 @@ async def filled_db_session(db_session):
         }
     )
 
-    db_session.add_all(parcels + outboxes + [parcel_dupe, outbox_dupe])
+    # Read-модель: актуальное состояние каждой посылки, для shared-id — версия из Parcel
+    views = [
+        ParcelView(
+            parcel_id=p.id,
+            session_id=p.session_id,
+            name=p.name,
+            weight_kg=p.weight_kg,
+            type_id=p.type_id,
+            cost_adjustment_usd=p.cost_adjustment_usd,
+            delivery_price_rub=p.delivery_price_rub,
+            has_price=p.delivery_price_rub is not None,
+            created_at=p.created_at,
+            updated_at=p.updated_at,
+        ) for p in parcels + [parcel_dupe]
+    ] + [
+        ParcelView(
+            parcel_id=o.parcel_id,
+            session_id=o.session_id,
+            name=o.payload["name"],
+            weight_kg=o.payload["weight_kg"],
+            type_id=o.payload["type_id"],
+            cost_adjustment_usd=o.payload["cost_adjustment_usd"],
+            delivery_price_rub=o.payload["delivery_price_rub"],
+            has_price=o.payload["delivery_price_rub"] is not None,
+            created_at=o.created_at,
+            updated_at=o.created_at,
+        ) for o in outboxes
+    ]
+
+    db_session.add_all(parcels + outboxes + [parcel_dupe, outbox_dupe] + views)
     await db_session.commit()
     return db_session, session_id
 
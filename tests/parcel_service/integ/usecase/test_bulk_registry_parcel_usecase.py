@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.parcel_service.application.use_cases.parcels.bulk_registry_parcel import BulkRegistryParcelUseCase
+from src.parcel_service.domain.dto.dto_create_parcel import ParcelBulkData, ParcelData, RegistryParcelDeps
+from src.parcel_service.infrastructure.db.sql.models import OutboxEvent, ParcelView
+from src.parcel_service.infrastructure.repository.factory import RepositoryFactory
+from src.parcel_service.infrastructure.repository.registry import RepositoryRegistry
+import src.parcel_service.infrastructure.repository  # noqa: F401 — регистрация репозиториев
+from src.parcel_service.infrastructure.unitofwork.uow import UnitOfWork
+
+from tests.parcel_service.integ.usecase.test_registry_parcel_usecase import (
+    FakeParcelFilter, FakeRecentWrites, FakeUsdRate, OrderedGeneration
+)
+
+
+@pytest.fixture
+def make_uow(db_engine):
+    session_factory = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    return lambda: UnitOfWork(session_factory=session_factory, repository_factory=RepositoryFactory(RepositoryRegistry.get()))
+
+
+@pytest.fixture
+def uow(make_uow):
+    return make_uow()
+
+
+def make_bulk(count, session_id="s1"):
+    return ParcelBulkData(session_id=session_id, items=tuple(
+        ParcelData(
+            parcel_id=f"p-{i}",
+            session_id=session_id,
+            name=f"Parcel {i}",
+            weight_kg=1.0 + i,
+            type_id=1,
+            cost_adjustment_usd=10.0
+        ) for i in range(count)
+    ))
+
+
+@pytest.mark.anyio
+async def test_bulk_registry_writes_rows_with_one_insert_per_table(uow, db_engine, db_session):
+    """Пачка пишется одним INSERT в outbox_events и одним в parcel_view, результаты — в порядке запроса"""
+    inserts = []
+    listener = lambda conn, cursor, statement, *args: inserts.append(statement) if statement.startswith("INSERT") else None
+    event.listen(db_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        result = await BulkRegistryParcelUseCase()(make_bulk(50), uow)
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", listener)
+
+    assert [item.parcel_id for item in result.items] == [f"p-{i}" for i in range(50)]
+    assert len(inserts) == 2
+    assert (await db_session.execute(select(func.count()).select_from(OutboxEvent))).scalar_one() == 50
+    view = await db_session.get(ParcelView, "p-7")
+    assert view.weight_kg == 8.0
+    assert view.has_price is False
+    outbox = (await db_session.execute(select(OutboxEvent).where(OutboxEvent.parcel_id == "p-7"))).scalar_one()
+    assert outbox.event_type == "parcel.registered"
+    assert outbox.payload["name"] == "Parcel 7"
+
+
+@pytest.mark.anyio
+async def test_bulk_registry_updates_caches_once(uow):
+    """Маркер записи и поколение кеша обновляются один раз на пачку, все id попадают в фильтр"""
+    events = []
+    parcel_filter = FakeParcelFilter()
+    deps = RegistryParcelDeps(
+        generation=OrderedGeneration(events), parcel_filter=parcel_filter, recent_writes=FakeRecentWrites(events)
+    )
+    await BulkRegistryParcelUseCase()(make_bulk(3), uow, deps)
+
+    assert events == [("mark", "s1"), ("bump", "s1")]
+    assert parcel_filter.known == {"p-0", "p-1", "p-2"}
+
+
+@pytest.mark.anyio
+async def test_bulk_registry_is_all_or_nothing(make_uow, db_session):
+    """Повтор parcel_id откатывает всю пачку, включая уже вставленные outbox-события"""
+    await BulkRegistryParcelUseCase()(make_bulk(1), make_uow())
+    duplicate = make_bulk(3)
+    items = (duplicate.items[1], duplicate.items[2], duplicate.items[1])
+    with pytest.raises(IntegrityError):
+        await BulkRegistryParcelUseCase()(ParcelBulkData(session_id="s1", items=items), make_uow())
+
+    assert (await db_session.execute(select(func.count()).select_from(ParcelView))).scalar_one() == 1
+    assert (await db_session.execute(select(func.count()).select_from(OutboxEvent))).scalar_one() == 1
+
+
+@pytest.mark.anyio
+async def test_bulk_registry_reads_rate_once_per_batch(uow, db_session):
+    """Курс читается один раз на пачку, стоимость рассчитывается для каждой посылки"""
+    usd_rate = FakeUsdRate(100.0)
+    result = await BulkRegistryParcelUseCase()(make_bulk(3), uow, RegistryParcelDeps(usd_rate=usd_rate))
+
+    assert usd_rate.calls == 1
+    # (weight * 0.5 + 10.0 * 0.01) * 100.0
+    assert [item.delivery_price_rub for item in result.items] == pytest.approx([60.0, 110.0, 160.0])
+    view = await db_session.get(ParcelView, "p-2")
+    assert view.has_price is True
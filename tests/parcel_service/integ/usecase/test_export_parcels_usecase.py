@@ -0,0 +1,84 @@
+import pytest
+
+from src.parcel_service.api.encoders.parcel import CSV_COLUMNS, encode_parcel_csv, encode_parcel_ndjson
+from src.parcel_service.application.use_cases.parcels.export_parcels import ExportParcelsUseCase
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelExportQuery
+from src.parcel_service.infrastructure.repository.parcel_combine import ParcelCombinedRepository
+
+
+class DummyUoW:
+    def __init__(self, repo):
+        self.repo = repo
+        self.exited = False
+
+    def isolation(self, level):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.exited = True
+
+    async def get_repo(self, repo_type):
+        return self.repo
+
+
+@pytest.mark.anyio
+async def test_export_streams_all_parcels_in_chunks(filled_db_session):
+    """Выгрузка отдаёт все посылки сессии порциями заданного размера в порядке списка"""
+    db_session, session_id = filled_db_session
+    uow = DummyUoW(ParcelCombinedRepository(db_session))
+
+    chunks = await ExportParcelsUseCase()(ParcelExportQuery(session_id=session_id, chunk_size=5), uow)
+    sizes, ids = [], []
+    async for items in chunks:
+        sizes.append(len(items))
+        ids.extend(item.parcel_id for item in items)
+
+    assert sizes == [5, 5, 3]
+    assert len(set(ids)) == 13
+    assert uow.exited
+
+
+@pytest.mark.anyio
+async def test_export_respects_price_filter(filled_db_session):
+    """Фильтр по наличию цены применяется к выгрузке"""
+    db_session, session_id = filled_db_session
+    uow = DummyUoW(ParcelCombinedRepository(db_session))
+
+    chunks = await ExportParcelsUseCase()(ParcelExportQuery(session_id=session_id, has_delivery_price=True), uow)
+    items = [item async for chunk in chunks for item in chunk]
+
+    assert items
+    assert all(item.delivery_price_rub is not None for item in items)
+
+
+@pytest.mark.anyio
+async def test_closed_export_releases_uow(filled_db_session):
+    """Прерванная выгрузка (отключение клиента) закрывает Unit of Work"""
+    db_session, session_id = filled_db_session
+    uow = DummyUoW(ParcelCombinedRepository(db_session))
+
+    chunks = await ExportParcelsUseCase()(ParcelExportQuery(session_id=session_id, chunk_size=2), uow)
+    first = await chunks.__anext__()
+    await chunks.aclose()
+
+    assert len(first) == 2
+    assert uow.exited
+
+
+@pytest.mark.anyio
+async def test_export_encoders(filled_db_session):
+    """Порция кодируется в NDJSON (строка на посылку) и CSV с заголовком"""
+    db_session, session_id = filled_db_session
+    uow = DummyUoW(ParcelCombinedRepository(db_session))
+
+    chunks = await ExportParcelsUseCase()(ParcelExportQuery(session_id=session_id, chunk_size=100), uow)
+    items = await chunks.__anext__()
+    await chunks.aclose()
+
+    assert encode_parcel_ndjson(items).count(b"\n") == len(items)
+    lines = encode_parcel_csv(items, header=True).decode().splitlines()
+    assert lines[0] == ",".join(CSV_COLUMNS)
+    assert len(lines) == len(items) + 1
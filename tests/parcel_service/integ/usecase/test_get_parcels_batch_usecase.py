@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.parcel_service.application.use_cases.parcels.get_parcels_batch import GetParcelsBatchUseCase
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelBatchQuery
+from src.parcel_service.infrastructure.db.sql.models import OutboxEvent, Parcel
+from src.parcel_service.infrastructure.repository.factory import RepositoryFactory
+from src.parcel_service.infrastructure.repository.registry import RepositoryRegistry
+import src.parcel_service.infrastructure.repository  # noqa: F401 — регистрация репозиториев
+from src.parcel_service.infrastructure.unitofwork.uow import UnitOfWork
+
+CREATED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def uow(db_engine):
+    session_factory = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    return UnitOfWork(session_factory=session_factory, repository_factory=RepositoryFactory(RepositoryRegistry.get()))
+
+
+@pytest.fixture
+async def batch_db(db_session):
+    def parcel(parcel_id, session_id, price):
+        return Parcel(
+            id=parcel_id, session_id=session_id, name=f"Parcel {parcel_id}", weight_kg=1.0, type_id=1,
+            cost_adjustment_usd=2.0, delivery_price_rub=price, company_id=None, created_at=CREATED, updated_at=CREATED,
+        )
+
+    def outbox(event_id, parcel_id, session_id, event_type="parcel.registered"):
+        return OutboxEvent(
+            id=event_id, parcel_id=parcel_id, session_id=session_id, event_type=event_type, applied=False, created_at=CREATED,
+            payload={"parcel_id": parcel_id, "name": f"Outbox {parcel_id}", "weight_kg": 3.0, "type_id": 2,
+                     "cost_adjustment_usd": 4.0, "delivery_price_rub": None},
+        )
+
+    db_session.add_all([
+        parcel("p1", "s1", 150.0),
+        parcel("p2", "s2", None),
+        outbox("e1", "o1", "s1"),
+        outbox("e2", "o2", "s2"),
+        outbox("e3", "p1", "s1", event_type="parcel.recalculate"),
+    ])
+    await db_session.commit()
+
+
+@pytest.mark.anyio
+async def test_batch_resolves_parcels_outbox_and_denials(uow, batch_db):
+    """Посылки и outbox-события в порядке запроса, чужие и отсутствующие — отдельными списками"""
+    result = await GetParcelsBatchUseCase()(ParcelBatchQuery(parcel_ids=["o1", "missing", "p2", "p1", "o2"], session_id="s1"), uow)
+
+    assert [item.parcel_id for item in result.items] == ["o1", "p1"]
+    assert result.items[0].name == "Outbox o1"
+    assert result.items[0].type_id == 2
+    assert result.items[0].delivery_price_rub == "Not calculated"
+    assert result.items[1].delivery_price_rub == 150.0
+    assert result.not_found == ["missing"]
+    assert result.access_denied == ["p2", "o2"]
+
+
+@pytest.mark.anyio
+async def test_batch_uses_constant_number_of_queries(uow, batch_db, db_engine):
+    """Независимо от числа ID выполняется один запрос к parcels и один к outbox_events"""
+    statements = []
+
+    def _count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        ids = ["p1", "o1"] + [f"missing-{i}" for i in range(50)]
+        result = await GetParcelsBatchUseCase()(ParcelBatchQuery(parcel_ids=ids, session_id="s1"), uow)
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", _count)
+
+    assert len(result.items) == 2
+    assert len(result.not_found) == 50
+    assert len(statements) == 2
@@ -0,0 +1,88 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.parcel_service.application.use_cases.parcels.get_parcels_for_id import GetParcelsForIdUseCase
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelDetailQuery
+from src.parcel_service.domain.exceptions.domain_error import AccessDeniedError, ParcelNotFoundError
+from src.parcel_service.infrastructure.db.sql.models import OutboxEvent, Parcel
+from src.parcel_service.infrastructure.repository.factory import RepositoryFactory
+from src.parcel_service.infrastructure.repository.registry import RepositoryRegistry
+import src.parcel_service.infrastructure.repository  # noqa: F401 — регистрация репозиториев
+from src.parcel_service.infrastructure.unitofwork.uow import UnitOfWork
+
+CREATED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def uow(db_engine):
+    session_factory = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    return UnitOfWork(session_factory=session_factory, repository_factory=RepositoryFactory(RepositoryRegistry.get()))
+
+
+@pytest.fixture
+async def detail_db(db_session):
+    def outbox(event_id, parcel_id, session_id, name):
+        return OutboxEvent(
+            id=event_id, parcel_id=parcel_id, session_id=session_id, event_type="parcel.registered", applied=False,
+            created_at=CREATED,
+            payload={"parcel_id": parcel_id, "name": name, "weight_kg": 3.5, "type_id": 2,
+                     "cost_adjustment_usd": 4.0, "delivery_price_rub": None},
+        )
+
+    db_session.add_all([
+        Parcel(id="p1", session_id="s1", name="Parcel p1", weight_kg=1.0, type_id=1, cost_adjustment_usd=2.0,
+               delivery_price_rub=150.0, company_id=None, created_at=CREATED, updated_at=CREATED),
+        # Событие регистрации уже обработанной посылки: приоритет у parcels
+        outbox("e1", "p1", "s1", "Outbox p1"),
+        # Свежая посылка: есть только событие, id события не совпадает с parcel_id
+        outbox("e2", "o1", "s1", "Outbox o1"),
+    ])
+    await db_session.commit()
+
+
+@pytest.mark.anyio
+async def test_detail_prefers_parcels_table(uow, detail_db):
+    """Если посылка есть в parcels, событие outbox не используется"""
+    result = await GetParcelsForIdUseCase()(ParcelDetailQuery(parcel_id="p1", session_id="s1"), uow)
+
+    assert result.name == "Parcel p1"
+    assert result.delivery_price_rub == 150.0
+
+
+@pytest.mark.anyio
+async def test_detail_finds_fresh_parcel_in_one_query(uow, detail_db, db_engine):
+    """Свежая посылка находится по parcel_id события outbox одним запросом"""
+    statements = []
+
+    def _count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        result = await GetParcelsForIdUseCase()(ParcelDetailQuery(parcel_id="o1", session_id="s1"), uow)
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", _count)
+
+    assert (result.parcel_id, result.name, result.weight_kg, result.type_id) == ("o1", "Outbox o1", 3.5, 2)
+    assert result.delivery_price_rub == "Not calculated"
+    assert len(statements) == 1
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("parcel_id", ["p1", "o1"])
+async def test_detail_denies_foreign_session(uow, detail_db, parcel_id):
+    """Посылка другой сессии недоступна из обоих источников"""
+    with pytest.raises(AccessDeniedError):
+        await GetParcelsForIdUseCase()(ParcelDetailQuery(parcel_id=parcel_id, session_id="s2"), uow)
+
+
+@pytest.mark.anyio
+async def test_detail_not_found(uow, detail_db):
+    """Отсутствующая посылка — ParcelNotFoundError"""
+    with pytest.raises(ParcelNotFoundError):
+        await GetParcelsForIdUseCase()(ParcelDetailQuery(parcel_id="missing", session_id="s1"), uow)
@@ -1,13 +1,24 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.parcel_service.infrastructure.repository.parcel_combine import ParcelCombinedRepository
 from src.parcel_service.application.use_cases.parcels.get_parcels_list import GetParcelsListUseCase
+from src.parcel_service.domain.constants.parcel import NOT_CALCULATED
 from src.parcel_service.domain.dto.dto_parcel_query import ParcelQueryList
+from src.parcel_service.domain.exceptions.domain_error import InvalidCursorError
+from src.parcel_service.infrastructure.db.sql.models import ParcelView
 
 
 class DummyUoW:
     def __init__(self, repo):
         self.repo = repo
 
+    def isolation(self, level):
+        return self
+
     async def __aenter__(self):
         return self
 
@@ -17,6 +28,12 @@ class DummyUoW:
     async def get_repo(self, repo_type):
         return self.repo
 
+    @asynccontextmanager
+    async def read_only(self, repo_type):
+        # Отдельная сессия на том же движке, как у UnitOfWork.read_only
+        async with AsyncSession(self.repo._session.bind) as session:
+            yield ParcelCombinedRepository(session)
+
 
 @pytest.mark.anyio
 async def test_no_duplicates_when_id_in_both_tables(filled_db_session):
@@ -99,9 +116,10 @@ async def test_replace_none_with_label(filled_db_session):
     repo = ParcelCombinedRepository(db_session)
     uow = DummyUoW(repo)
 
-    # Вручную занулим одно значение
-    parcel = (await repo.get_parcels_by_ids(["p1"]))[0]
-    parcel.delivery_price_rub = None
+    # Вручную занулим одно значение в read-модели
+    view = await db_session.get(ParcelView, "p1")
+    view.delivery_price_rub = None
+    view.has_price = False
     await db_session.commit()
 
     dto = ParcelQueryList(session_id=session_id, limit=100, offset=0, has_delivery_price=False, type_id=None)
@@ -111,7 +129,7 @@ async def test_replace_none_with_label(filled_db_session):
     # Ищем p1
     p1 = next((item for item in result.items if item.parcel_id == "p1"), None)
     assert p1 is not None
-    assert p1.delivery_price_rub == "Не рассчитано"
+    assert p1.delivery_price_rub == NOT_CALCULATED
 
 @pytest.mark.anyio
 async def test_filter_by_type_id_in_parcel_only(filled_db_session):
@@ -180,3 +198,194 @@ async def test_filter_by_type_id_prefers_parcel_over_outbox(filled_db_session):
 
 
 
+@pytest.mark.anyio
+async def test_cursor_pagination_walks_all_pages(filled_db_session):
+    """Проход по всем страницам через next_cursor даёт тот же набор и порядок, что и одна большая страница"""
+    db_session, session_id = filled_db_session
+    repo = ParcelCombinedRepository(db_session)
+    uow = DummyUoW(repo)
+    usecase = GetParcelsListUseCase()
+
+    full = await usecase(ParcelQueryList(session_id=session_id, limit=100, offset=0, type_id=None), uow)
+    assert full.next_cursor is None
+
+    walked, cursor = [], None
+    while True:
+        dto = ParcelQueryList(session_id=session_id, limit=4, offset=0, type_id=None, cursor=cursor)
+        page = await usecase(dto, uow)
+        walked.extend(item.parcel_id for item in page.items)
+        assert page.total == 13
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+
+    assert walked == [item.parcel_id for item in full.items]
+    assert len(walked) == 13
+
+
+@pytest.mark.anyio
+async def test_cursor_pagination_with_price_filter_fills_pages(filled_db_session):
+    """Фильтр по цене применяется в SQL, поэтому страницы курсора полные"""
+    db_session, session_id = filled_db_session
+    repo = ParcelCombinedRepository(db_session)
+    uow = DummyUoW(repo)
+    usecase = GetParcelsListUseCase()
+
+    dto = ParcelQueryList(session_id=session_id, limit=5, offset=0, has_delivery_price=True, type_id=None)
+    first = await usecase(dto, uow)
+    assert len(first.items) == 5
+    assert first.next_cursor is not None
+
+    dto = ParcelQueryList(session_id=session_id, limit=5, offset=0, has_delivery_price=True, type_id=None, cursor=first.next_cursor)
+    second = await usecase(dto, uow)
+    assert len(second.items) == 4
+    assert not {i.parcel_id for i in first.items} & {i.parcel_id for i in second.items}
+
+
+@pytest.mark.anyio
+async def test_invalid_cursor_raises(filled_db_session):
+    """Повреждённый курсор приводит к InvalidCursorError"""
+    db_session, session_id = filled_db_session
+    repo = ParcelCombinedRepository(db_session)
+    uow = DummyUoW(repo)
+
+    dto = ParcelQueryList(session_id=session_id, limit=5, offset=0, type_id=None, cursor="not-a-cursor")
+    with pytest.raises(InvalidCursorError):
+        await GetParcelsListUseCase()(dto, uow)
+
+
+@pytest.mark.anyio
+async def test_without_total_reports_has_more(filled_db_session):
+    """Режим with_total=False: total не считается, has_more определяется выборкой limit + 1"""
+    db_session, session_id = filled_db_session
+    repo = ParcelCombinedRepository(db_session)
+    uow = DummyUoW(repo)
+    usecase = GetParcelsListUseCase()
+
+    dto = ParcelQueryList(session_id=session_id, limit=10, offset=0, type_id=None, with_total=False)
+    first = await usecase(dto, uow)
+    assert first.total is None
+    assert first.has_more is True
+    assert len(first.items) == 10
+
+    dto = ParcelQueryList(session_id=session_id, limit=10, offset=0, type_id=None, with_total=False, cursor=first.next_cursor)
+    second = await usecase(dto, uow)
+    assert second.total is None
+    assert second.has_more is False
+    assert second.next_cursor is None
+    assert len(second.items) == 3
+
+
+@pytest.mark.anyio
+async def test_exact_last_page_has_no_next_cursor(filled_db_session):
+    """Страница, заканчивающаяся ровно на последней записи, не отдаёт next_cursor"""
+    db_session, session_id = filled_db_session
+    repo = ParcelCombinedRepository(db_session)
+    uow = DummyUoW(repo)
+
+    dto = ParcelQueryList(session_id=session_id, limit=13, offset=0, type_id=None)
+    result = await GetParcelsListUseCase()(dto, uow)
+    assert result.total == 13
+    assert result.has_more is False
+    assert result.next_cursor is None
+
+
+@pytest.mark.anyio
+async def test_list_reads_only_parcel_view(filled_db_session):
+    """Список строится только по parcel_view: запись без строки в read-модели не попадает в выдачу"""
+    db_session, session_id = filled_db_session
+    repo = ParcelCombinedRepository(db_session)
+    uow = DummyUoW(repo)
+
+    view = await db_session.get(ParcelView, "o1")
+    await db_session.delete(view)
+    await db_session.commit()
+
+    dto = ParcelQueryList(session_id=session_id, limit=100, offset=0, type_id=None)
+    result = await GetParcelsListUseCase()(dto, uow)
+    assert "o1" not in {item.parcel_id for item in result.items}
+    assert result.total == 12
+
+
+@pytest.mark.anyio
+async def test_sparse_fields_select_only_requested_columns(filled_db_session):
+    """При заданном fields из БД читаются только эти колонки, остальные поля пустые"""
+    db_session, session_id = filled_db_session
+    repo = ParcelCombinedRepository(db_session)
+    uow = DummyUoW(repo)
+    statements = []
+
+    def remember(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db_session.bind.sync_engine, "before_cursor_execute", remember)
+    try:
+        dto = ParcelQueryList(session_id=session_id, limit=100, offset=0, type_id=None, fields=("parcel_id", "delivery_price_rub"))
+        result = await GetParcelsListUseCase()(dto, uow)
+    finally:
+        event.remove(db_session.bind.sync_engine, "before_cursor_execute", remember)
+
+    assert result.total == 13
+    assert all(item.name is None and item.cost_adjustment_usd is None for item in result.items)
+    assert any(item.delivery_price_rub is not None for item in result.items)
+    page_statement = next(statement for statement in statements if "ORDER BY" in statement)
+    select_list = page_statement.split("FROM")[0]
+    assert "delivery_price_rub" in select_list
+    assert "parcel_view.name" not in select_list
+
+
+@pytest.mark.anyio
+async def test_page_and_total_run_concurrently(filled_db_session, monkeypatch):
+    """Страница и подсчёт выполняются конкурентно: подсчёт стартует до завершения страницы"""
+    db_session, session_id = filled_db_session
+    repo = ParcelCombinedRepository(db_session)
+    uow = DummyUoW(repo)
+    events = []
+
+    original_page, original_count = repo.list_page, ParcelCombinedRepository.count
+
+    async def slow_page(**kwargs):
+        events.append("page:start")
+        await asyncio.sleep(0.05)
+        result = await original_page(**kwargs)
+        events.append("page:end")
+        return result
+
+    async def tracked_count(self, **kwargs):
+        events.append("count:start")
+        return await original_count(self, **kwargs)
+
+    monkeypatch.setattr(repo, "list_page", slow_page)
+    monkeypatch.setattr(ParcelCombinedRepository, "count", tracked_count)
+    dto = ParcelQueryList(session_id=session_id, limit=5, offset=0, type_id=None)
+    result = await GetParcelsListUseCase()(dto, uow)
+
+    assert result.total == 13
+    assert len(result.items) == 5
+    assert events.index("count:start") < events.index("page:end")
+
+
+@pytest.mark.anyio
+async def test_failed_count_cancels_page(filled_db_session, monkeypatch):
+    """Ошибка подсчёта отменяет запрос страницы и пробрасывается как есть"""
+    db_session, session_id = filled_db_session
+    repo = ParcelCombinedRepository(db_session)
+    uow = DummyUoW(repo)
+    cancelled = []
+
+    async def hanging_page(**kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def failing_count(self, **kwargs):
+        raise RuntimeError("count failed")
+
+    monkeypatch.setattr(repo, "list_page", hanging_page)
+    monkeypatch.setattr(ParcelCombinedRepository, "count", failing_count)
+    with pytest.raises(RuntimeError, match="count failed"):
+        await GetParcelsListUseCase()(ParcelQueryList(session_id=session_id, limit=5, offset=0, type_id=None), uow)
+
+    assert cancelled == [True]
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.parcel_service.application.use_cases.parcels.registry_parcel import RegistryParcelUseCase
+from src.parcel_service.domain.dto.dto_create_parcel import RegistryParcelDeps
+from src.parcel_service.infrastructure.db.sql.models import OutboxEvent, ParcelView
+from src.parcel_service.infrastructure.repository.factory import RepositoryFactory
+from src.parcel_service.infrastructure.repository.registry import RepositoryRegistry
+import src.parcel_service.infrastructure.repository  # noqa: F401 — регистрация репозиториев
+from src.parcel_service.infrastructure.unitofwork.group_commit import GroupCommitWriter
+from src.parcel_service.infrastructure.unitofwork.uow import UnitOfWork
+
+from tests.parcel_service.integ.usecase.test_registry_parcel_usecase import make_parcel
+
+
+@pytest.fixture
+def make_uow(db_engine):
+    session_factory = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    return lambda: UnitOfWork(session_factory=session_factory, repository_factory=RepositoryFactory(RepositoryRegistry.get()))
+
+
+@pytest.fixture
+async def writer(make_uow):
+    writer = GroupCommitWriter(uow_factory=make_uow, max_batch=10, max_delay=0.05)
+    writer.start()
+    yield writer
+    await writer.stop()
+
+
+def count_commits(db_engine, commits):
+    listener = lambda conn: commits.append(1)
+    event.listen(db_engine.sync_engine, "commit", listener)
+    return listener
+
+
+@pytest.mark.anyio
+async def test_concurrent_registrations_share_transactions(writer, make_uow, db_engine, db_session):
+    """25 конкурентных регистраций фиксируются тремя транзакциями по max_batch=10"""
+    commits = []
+    listener = count_commits(db_engine, commits)
+    deps = RegistryParcelDeps(group_commit=writer)
+    try:
+        results = await asyncio.gather(*(
+            RegistryParcelUseCase()(make_parcel(f"p-{i}"), make_uow(), deps) for i in range(25)
+        ))
+    finally:
+        event.remove(db_engine.sync_engine, "commit", listener)
+
+    assert [result.parcel_id for result in results] == [f"p-{i}" for i in range(25)]
+    assert len(commits) == 3
+    assert (await db_session.execute(select(func.count()).select_from(OutboxEvent))).scalar_one() == 25
+    assert (await db_session.execute(select(func.count()).select_from(ParcelView))).scalar_one() == 25
+
+
+@pytest.mark.anyio
+async def test_failed_batch_is_retried_one_by_one(writer, make_uow, db_session):
+    """Ошибка одной записи не отменяет регистрации остальных в той же пачке"""
+    await RegistryParcelUseCase()(make_parcel("p-taken"), make_uow())
+    deps = RegistryParcelDeps(group_commit=writer)
+
+    results = await asyncio.gather(
+        *(RegistryParcelUseCase()(make_parcel(parcel_id), make_uow(), deps) for parcel_id in ("p-a", "p-taken", "p-b")),
+        return_exceptions=True
+    )
+
+    assert results[0].parcel_id == "p-a"
+    assert isinstance(results[1], IntegrityError)
+    assert results[2].parcel_id == "p-b"
+    views = (await db_session.execute(select(ParcelView.parcel_id).order_by(ParcelView.parcel_id))).scalars().all()
+    assert views == ["p-a", "p-b", "p-taken"]
+
+
+@pytest.mark.anyio
+async def test_stop_flushes_queued_registrations(make_uow, db_session):
+    """Остановка дописывает поставленные в очередь регистрации и отклоняет новые"""
+    writer = GroupCommitWriter(uow_factory=make_uow, max_batch=100, max_delay=10)
+    writer.start()
+    pending = [asyncio.ensure_future(RegistryParcelUseCase()(make_parcel(f"p-{i}"), make_uow(), RegistryParcelDeps(group_commit=writer))) for i in range(3)]
+    await asyncio.sleep(0)
+
+    await writer.stop()
+
+    assert [task.result().parcel_id for task in pending] == ["p-0", "p-1", "p-2"]
+    assert (await db_session.execute(select(func.count()).select_from(ParcelView))).scalar_one() == 3
+    with pytest.raises(RuntimeError):
+        await writer.submit({}, {})
@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.parcel_service.domain.interfaces.cache import IRecentWrites
+from src.parcel_service.domain.interfaces.repository import IParcelViewRepository
+from src.parcel_service.infrastructure.db.sql.models import ParcelView
+from src.parcel_service.infrastructure.repository.factory import RepositoryFactory
+from src.parcel_service.infrastructure.repository.registry import RepositoryRegistry
+import src.parcel_service.infrastructure.repository  # noqa: F401 — регистрация репозиториев
+from src.parcel_service.infrastructure.unitofwork.uow import ReadOnlyUnitOfWork
+
+
+class FakeRecentWrites(IRecentWrites):
+    def __init__(self, sessions=(), fail=False):
+        self.sessions = set(sessions)
+        self.fail = fail
+        self.checks = 0
+
+    async def mark(self, session_id):
+        self.sessions.add(session_id)
+
+    async def is_recent(self, session_id):
+        self.checks += 1
+        if self.fail:
+            raise ConnectionError("redis is down")
+        return session_id in self.sessions
+
+
+class CountingFactory:
+    def __init__(self, engine):
+        self.factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.factory()
+
+
+def make_uow(replica, primary=None, recent_writes=None, session_id="s1"):
+    return ReadOnlyUnitOfWork(
+        session_factory=replica,
+        repository_factory=RepositoryFactory(RepositoryRegistry.get()),
+        primary_session_factory=primary,
+        recent_writes=recent_writes,
+        session_id=session_id
+    )
+
+
+@pytest.mark.anyio
+async def test_read_only_uow_never_commits(db_engine, db_session):
+    """Изменения внутри read-only Unit of Work откатываются при выходе"""
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    async with make_uow(CountingFactory(db_engine)) as uow:
+        repo = await uow.get_repo(IParcelViewRepository)
+        await repo.add(ParcelView(
+            parcel_id="p-ro", session_id="s1", name="Parcel", weight_kg=1.0, type_id=1,
+            cost_adjustment_usd=0.0, delivery_price_rub=None, has_price=False, created_at=now, updated_at=now
+        ))
+
+    rows = (await db_session.execute(select(ParcelView).where(ParcelView.parcel_id == "p-ro"))).all()
+    assert rows == []
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    ("recent_writes", "expected"),
+    [
+        (FakeRecentWrites(), "replica"),
+        (FakeRecentWrites(sessions={"s1"}), "primary"),
+        (FakeRecentWrites(fail=True), "primary"),
+    ],
+    ids=["no-writes", "recent-write", "marker-unavailable"],
+)
+async def test_read_only_uow_routes_by_recent_writes(db_engine, recent_writes, expected):
+    """Сессия с недавней записью (или при недоступном маркере) читает с основного сервера"""
+    replica, primary = CountingFactory(db_engine), CountingFactory(db_engine)
+    uow = make_uow(replica, primary, recent_writes)
+
+    async with uow:
+        async with uow.read_only(IParcelViewRepository):
+            pass
+    async with uow:
+        pass
+
+    used = {"replica": replica, "primary": primary}
+    assert used[expected].calls == 3
+    assert sum(factory.calls for factory in used.values()) == 3
+    assert recent_writes.checks == 1
+
+
+@pytest.mark.anyio
+async def test_read_only_uow_without_replica_skips_marker_check(db_engine):
+    """Без реплики (или без session_id) маркер не проверяется"""
+    replica = CountingFactory(db_engine)
+    recent_writes = FakeRecentWrites(sessions={"s1"})
+
+    async with make_uow(replica, primary=None, recent_writes=recent_writes):
+        pass
+    async with make_uow(replica, CountingFactory(db_engine), recent_writes, session_id=None):
+        pass
+
+    assert replica.calls == 2
+    assert recent_writes.checks == 0
@@ -0,0 +1,250 @@
+import time
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.parcel_service.application.use_cases.parcels.registry_parcel import RegistryParcelUseCase
+from src.parcel_service.domain.constants.cache import CacheNamespace
+from src.parcel_service.domain.dto.dto_create_parcel import RegistryParcelDeps
+from src.parcel_service.infrastructure.cache.entity import build_missing_key
+from src.parcel_service.infrastructure.cache.local import LocalCache, LocalCachePolicy
+from src.parcel_service.infrastructure.cache.tiered import TieredCache
+from src.parcel_service.infrastructure.db.sql.models import OutboxEvent, ParcelView
+from src.parcel_service.infrastructure.repository.factory import RepositoryFactory
+from src.parcel_service.infrastructure.repository.registry import RepositoryRegistry
+import src.parcel_service.infrastructure.repository  # noqa: F401 — регистрация репозиториев
+from src.parcel_service.infrastructure.unitofwork.registration_stream import (
+    RedisRegistrationStream, RegistrationStreamDrainer, decode_registration, encode_registration
+)
+from src.parcel_service.infrastructure.unitofwork.uow import UnitOfWork
+
+from tests.parcel_service.integ.usecase.test_registry_parcel_usecase import FakeGeneration, make_parcel
+from tests.parcel_service.unit.test_parcel_entities import FakeRedis
+
+
+class FakeStreamRedis:
+    """Redis Streams в памяти: скрипт XLEN + XADD, группы потребителей, XACK, XDEL и XAUTOCLAIM"""
+
+    def __init__(self):
+        self.entries = {}
+        self.last_delivered = {}
+        self.pending = {}
+        self.claim_calls = []
+        self._seq = 0
+
+    async def eval(self, script, numkeys, key, maxlen, data):
+        if len(self.entries) >= int(maxlen):
+            return None
+        self._seq += 1
+        entry_id = f"{int(time.time() * 1000)}-{self._seq}"
+        self.entries[entry_id] = {"data": data}
+        return entry_id
+
+    async def xgroup_create(self, key, group, id="$", mkstream=False):
+        self.last_delivered.setdefault(group, 0)
+        self.pending.setdefault(group, {})
+
+    async def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        (key, _), = streams.items()
+        fresh = [
+            (entry_id, fields) for entry_id, fields in self.entries.items()
+            if int(entry_id.split("-")[1]) > self.last_delivered[group]
+        ][:count]
+        if not fresh:
+            return []
+        self.last_delivered[group] = int(fresh[-1][0].split("-")[1])
+        for entry_id, _ in fresh:
+            self.pending[group][entry_id] = consumer
+        return [[key, fresh]]
+
+    async def xautoclaim(self, key, group, consumer, min_idle_time, start_id="0-0", count=None):
+        # Простой записей не отслеживается: забираются все неподтверждённые, начиная с курсора
+        seq = lambda entry_id: int(entry_id.split("-")[1])
+        candidates = sorted((entry_id for entry_id in self.pending[group] if seq(entry_id) >= seq(start_id)), key=seq)
+        claimed, rest = candidates[:count], candidates[count:]
+        for entry_id in claimed:
+            self.pending[group][entry_id] = consumer
+        self.claim_calls.append(start_id)
+        return [rest[0] if rest else "0-0", [(entry_id, self.entries.get(entry_id)) for entry_id in claimed], []]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def xack(self, key, group, *ids):
+        self.commands.append(lambda: [self.redis.pending[group].pop(entry_id, None) for entry_id in ids])
+
+    def xdel(self, key, *ids):
+        self.commands.append(lambda: [self.redis.entries.pop(entry_id, None) for entry_id in ids])
+
+    async def execute(self):
+        return [command() for command in self.commands]
+
+
+@pytest.fixture
+def make_uow(db_engine):
+    session_factory = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    return lambda: UnitOfWork(session_factory=session_factory, repository_factory=RepositoryFactory(RepositoryRegistry.get()))
+
+
+def make_drainer(redis, make_uow, generation=None, batch_size=100, cache=None):
+    return RegistrationStreamDrainer(
+        client=redis, key="stream:registrations", group="outbox-writers", consumer="c1",
+        uow_factory=make_uow, batch_size=batch_size, generation=generation, cache=cache
+    )
+
+
+async def count_rows(db_session, model):
+    return (await db_session.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+@pytest.mark.anyio
+async def test_buffered_registration_is_drained_in_one_batch(make_uow, db_session):
+    """Регистрация возвращается до записи в БД; перенос пишет пачку и подтверждает записи после коммита"""
+    redis, generation = FakeStreamRedis(), FakeGeneration()
+    deps = RegistryParcelDeps(
+        generation=generation,
+        registration_buffer=RedisRegistrationStream(client=redis, key="stream:registrations", maxlen=100)
+    )
+    for i in range(5):
+        await RegistryParcelUseCase()(make_parcel(f"p-{i}"), make_uow(), deps)
+
+    assert await count_rows(db_session, OutboxEvent) == 0
+    assert await generation.get("s1") == 0
+
+    drained = await make_drainer(redis, make_uow, generation).drain_once(block_ms=0)
+
+    assert drained == 5
+    assert await count_rows(db_session, OutboxEvent) == 5
+    assert (await db_session.get(ParcelView, "p-3")).session_id == "s1"
+    assert redis.entries == {} and redis.pending["outbox-writers"] == {}
+    assert await generation.get("s1") == 1
+
+
+@pytest.mark.anyio
+async def test_full_buffer_falls_back_to_direct_write(make_uow, db_session):
+    """При заполненном буфере регистрация записывается в БД до ответа"""
+    redis = FakeStreamRedis()
+    buffer = RedisRegistrationStream(client=redis, key="stream:registrations", maxlen=1)
+    deps = RegistryParcelDeps(registration_buffer=buffer)
+    await RegistryParcelUseCase()(make_parcel("p-a"), make_uow(), deps)
+    await RegistryParcelUseCase()(make_parcel("p-b"), make_uow(), deps)
+
+    assert len(redis.entries) == 1
+    assert await db_session.get(ParcelView, "p-b") is not None
+    assert await db_session.get(ParcelView, "p-a") is None
+
+
+@pytest.mark.anyio
+async def test_redelivered_registration_is_acked_without_duplicate(make_uow, db_session):
+    """Повторная доставка уже записанной регистрации подтверждается, соседние записи пачки переносятся"""
+    redis = FakeStreamRedis()
+    buffer = RedisRegistrationStream(client=redis, key="stream:registrations", maxlen=100)
+    deps = RegistryParcelDeps(registration_buffer=buffer)
+    drainer = make_drainer(redis, make_uow)
+
+    await RegistryParcelUseCase()(make_parcel("p-a"), make_uow(), deps)
+    raw = next(iter(redis.entries.values()))["data"]
+    await drainer.drain_once(block_ms=0)
+
+    # Коммит прошёл, но XACK не дошёл: запись снова в потоке вместе с новой регистрацией
+    await redis.eval(None, 1, "stream:registrations", 100, raw)
+    await RegistryParcelUseCase()(make_parcel("p-b"), make_uow(), deps)
+    drained = await drainer.drain_once(block_ms=0)
+
+    assert drained == 2
+    assert await count_rows(db_session, OutboxEvent) == 2
+    assert redis.entries == {} and redis.pending["outbox-writers"] == {}
+
+
+@pytest.mark.anyio
+async def test_unwritten_entries_stay_pending_until_claimed(make_uow, db_session):
+    """Записи, которые не удалось записать, остаются неподтверждёнными и переносятся через XAUTOCLAIM"""
+    redis = FakeStreamRedis()
+    deps = RegistryParcelDeps(registration_buffer=RedisRegistrationStream(client=redis, key="stream:registrations", maxlen=100))
+    await RegistryParcelUseCase()(make_parcel("p-a"), make_uow(), deps)
+
+    def broken_uow():
+        raise ConnectionError("db down")
+
+    assert await make_drainer(redis, broken_uow).drain_once(block_ms=0) == 0
+    assert len(redis.pending["outbox-writers"]) == 1
+
+    assert await make_drainer(redis, make_uow).claim_stale() == 1
+    assert await db_session.get(ParcelView, "p-a") is not None
+    assert redis.pending["outbox-writers"] == {}
+
+
+@pytest.mark.anyio
+async def test_constraint_failure_is_not_acked(make_uow, db_session):
+    """Запись, нарушившая ограничение (не повтор), не подтверждается и остаётся в списке ожидания"""
+    redis = FakeStreamRedis()
+    deps = RegistryParcelDeps(registration_buffer=RedisRegistrationStream(client=redis, key="stream:registrations", maxlen=100))
+    await RegistryParcelUseCase()(make_parcel("p-a"), make_uow(), deps)
+    (entry_id, fields), = redis.entries.items()
+    outbox_row, view_row = decode_registration(fields["data"])
+    redis.entries[entry_id] = {"data": encode_registration(outbox_row, {**view_row, "name": None})}
+    await RegistryParcelUseCase()(make_parcel("p-b"), make_uow(), deps)
+
+    drained = await make_drainer(redis, make_uow).drain_once(block_ms=0)
+
+    assert drained == 1
+    assert await db_session.get(ParcelView, "p-b") is not None
+    assert await db_session.get(ParcelView, "p-a") is None
+    assert list(redis.pending["outbox-writers"]) == [entry_id]
+    assert entry_id in redis.entries
+
+
+@pytest.mark.anyio
+async def test_claim_stale_follows_cursor(make_uow, db_session):
+    """XAUTOCLAIM продолжает обход с курсора, а не забирает каждый раз начало списка ожидания"""
+    redis = FakeStreamRedis()
+    deps = RegistryParcelDeps(registration_buffer=RedisRegistrationStream(client=redis, key="stream:registrations", maxlen=100))
+    for i in range(5):
+        await RegistryParcelUseCase()(make_parcel(f"p-{i}"), make_uow(), deps)
+
+    def broken_uow():
+        raise ConnectionError("db down")
+
+    await make_drainer(redis, broken_uow).drain_once(block_ms=0)
+    drainer = make_drainer(redis, make_uow, batch_size=2)
+
+    claimed = [await drainer.claim_stale() for _ in range(3)]
+
+    assert claimed == [2, 2, 1]
+    assert drainer.claim_pass_finished
+    assert redis.claim_calls[0] == "0-0" and len(set(redis.claim_calls)) == 3
+    assert await count_rows(db_session, OutboxEvent) == 5
+
+
+@pytest.mark.anyio
+async def test_drain_clears_negative_cache(make_uow, db_session):
+    """Отрицательный кеш, записанный, пока регистрация была в потоке, снимается после переноса"""
+    redis, cache_redis = FakeStreamRedis(), FakeRedis()
+    local = LocalCache(policies={}, default=LocalCachePolicy(ttl=10, max_size=100))
+    cache = TieredCache(client=cache_redis, local=local, channel="cache:invalidate")
+    deps = RegistryParcelDeps(registration_buffer=RedisRegistrationStream(client=redis, key="stream:registrations", maxlen=100))
+    await RegistryParcelUseCase()(make_parcel("p-a"), make_uow(), deps)
+    namespace, key = CacheNamespace.PARCEL_MISSING.value, build_missing_key("p-a")
+    await cache.set(namespace, key, "1", ttl=30)
+
+    await make_drainer(redis, make_uow, cache=cache).drain_once(block_ms=0)
+
+    assert await cache.get(namespace, key) is None
+    assert key not in cache_redis.data
+    assert [message for _, message in cache_redis.published] == [
+        '{"namespace": "parcel_missing", "key": "%s"}' % key
+    ]
@@ -0,0 +1,157 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.parcel_service.application.use_cases.parcels.registry_parcel import RegistryParcelUseCase
+from src.parcel_service.domain.dto.dto_create_parcel import ParcelData, RegistryParcelDeps
+from src.parcel_service.domain.interfaces.cache import ICacheGeneration, IParcelFilter, IRecentWrites, IUsdRate
+from src.parcel_service.infrastructure.db.sql.models import OutboxEvent, ParcelView
+from src.parcel_service.infrastructure.repository.factory import RepositoryFactory
+from src.parcel_service.infrastructure.repository.registry import RepositoryRegistry
+import src.parcel_service.infrastructure.repository  # noqa: F401 — регистрация репозиториев
+from src.parcel_service.infrastructure.unitofwork.uow import UnitOfWork
+
+
+class FakeGeneration(ICacheGeneration):
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, session_id):
+        return self.values.get(session_id, 0)
+
+    async def bump(self, session_id):
+        self.values[session_id] = self.values.get(session_id, 0) + 1
+        return self.values[session_id]
+
+
+class FakeParcelFilter(IParcelFilter):
+    def __init__(self):
+        self.known = set()
+
+    async def add_many(self, parcel_ids):
+        self.known.update(parcel_ids)
+
+    async def might_contain_many(self, parcel_ids):
+        return [parcel_id in self.known for parcel_id in parcel_ids]
+
+
+class FakeRecentWrites(IRecentWrites):
+    def __init__(self, events):
+        self.events = events
+
+    async def mark(self, session_id):
+        self.events.append(("mark", session_id))
+
+    async def is_recent(self, session_id):
+        return ("mark", session_id) in self.events
+
+
+class OrderedGeneration(FakeGeneration):
+    def __init__(self, events):
+        super().__init__()
+        self.events = events
+
+    async def bump(self, session_id):
+        self.events.append(("bump", session_id))
+        return await super().bump(session_id)
+
+
+class FakeUsdRate(IUsdRate):
+    def __init__(self, rate=None, error=None):
+        self.rate = rate
+        self.error = error
+        self.calls = 0
+
+    async def get(self):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.rate
+
+
+@pytest.fixture
+def uow(db_engine):
+    session_factory = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    return UnitOfWork(session_factory=session_factory, repository_factory=RepositoryFactory(RepositoryRegistry.get()))
+
+
+def make_parcel(parcel_id="p-new", session_id="s1"):
+    return ParcelData(
+        parcel_id=parcel_id,
+        session_id=session_id,
+        name="Parcel",
+        weight_kg=1.5,
+        type_id=2,
+        cost_adjustment_usd=10.0
+    )
+
+
+@pytest.mark.anyio
+async def test_registry_writes_outbox_and_view(uow, db_session):
+    """Регистрация пишет outbox-событие и строку parcel_view в одной транзакции"""
+    result = await RegistryParcelUseCase()(make_parcel(), uow)
+    assert result.parcel_id == "p-new"
+
+    event = (await db_session.execute(select(OutboxEvent).where(OutboxEvent.parcel_id == "p-new"))).scalar_one()
+    view = await db_session.get(ParcelView, "p-new")
+    assert view is not None
+    assert view.session_id == "s1"
+    assert view.has_price is False
+    assert view.created_at.replace(tzinfo=None) == event.created_at.replace(tzinfo=None)
+
+
+@pytest.mark.anyio
+async def test_registry_bumps_session_generation(uow):
+    """После регистрации поколение кеша сессии увеличивается"""
+    generation = FakeGeneration()
+    await RegistryParcelUseCase()(make_parcel("p-a"), uow, RegistryParcelDeps(generation=generation))
+    await RegistryParcelUseCase()(make_parcel("p-b"), uow, RegistryParcelDeps(generation=generation))
+
+    assert await generation.get("s1") == 2
+    assert await generation.get("other") == 0
+
+
+@pytest.mark.anyio
+async def test_registry_adds_parcel_to_filter(uow):
+    """Зарегистрированная посылка попадает в фильтр известных parcel_id"""
+    parcel_filter = FakeParcelFilter()
+    await RegistryParcelUseCase()(make_parcel("p-a"), uow, RegistryParcelDeps(parcel_filter=parcel_filter))
+
+    assert await parcel_filter.might_contain("p-a")
+    assert not await parcel_filter.might_contain("p-unknown")
+
+
+@pytest.mark.anyio
+async def test_registry_marks_session_before_bumping_generation(uow):
+    """Сессия помечается как записывавшая до увеличения поколения кеша"""
+    events = []
+    deps = RegistryParcelDeps(generation=OrderedGeneration(events), recent_writes=FakeRecentWrites(events))
+    await RegistryParcelUseCase()(make_parcel("p-a"), uow, deps)
+
+    assert events == [("mark", "s1"), ("bump", "s1")]
+
+
+@pytest.mark.anyio
+async def test_registry_prices_parcel_with_cached_rate(uow, db_session):
+    """При закешированном курсе стоимость рассчитывается сразу: в payload, read-модели и результате"""
+    result = await RegistryParcelUseCase()(make_parcel(), uow, RegistryParcelDeps(usd_rate=FakeUsdRate(90.0)))
+
+    # (1.5 * 0.5 + 10.0 * 0.01) * 90.0
+    assert result.delivery_price_rub == pytest.approx(76.5)
+    event = (await db_session.execute(select(OutboxEvent).where(OutboxEvent.parcel_id == "p-new"))).scalar_one()
+    assert event.payload["delivery_price_rub"] == pytest.approx(76.5)
+    view = await db_session.get(ParcelView, "p-new")
+    assert view.has_price is True
+    assert view.delivery_price_rub == pytest.approx(76.5)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("usd_rate", [FakeUsdRate(None), FakeUsdRate(error=ConnectionError("redis down"))])
+async def test_registry_leaves_price_to_worker_without_rate(uow, db_session, usd_rate):
+    """Без курса (или при ошибке Redis) посылка регистрируется без стоимости"""
+    result = await RegistryParcelUseCase()(make_parcel(), uow, RegistryParcelDeps(usd_rate=usd_rate))
+
+    assert result.delivery_price_rub is None
+    view = await db_session.get(ParcelView, "p-new")
+    assert view.has_price is False
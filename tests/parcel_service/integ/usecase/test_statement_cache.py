@@ -0,0 +1,60 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import event
+from sqlalchemy.engine.interfaces import CacheStats
+
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelCursor
+from src.parcel_service.infrastructure.db.sql.statements import StatementCache, instrument_compiled_cache
+from src.parcel_service.infrastructure.repository.parcel_combine import ParcelCombinedRepository
+
+
+def _sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_statement_is_built_once_per_shape():
+    """Выражение строится один раз на форму, повторные обращения — попадания"""
+    cache = StatementCache()
+    builds = []
+    labels = {"statement": "test_shape", "result": "hit"}
+    hits_before = _sample("sql_statement_cache_total", labels)
+
+    first = cache.get("test_shape", (True, False), lambda: builds.append(1) or object())
+    second = cache.get("test_shape", (True, False), lambda: builds.append(1) or object())
+    other = cache.get("test_shape", (False, False), lambda: builds.append(1) or object())
+
+    assert first is second
+    assert other is not first
+    assert len(builds) == 2
+    assert _sample("sql_statement_cache_total", labels) - hits_before == 1
+
+
+@pytest.mark.anyio
+async def test_list_queries_reuse_compiled_sql(filled_db_session, db_engine):
+    """Страницы и подсчёт с разными значениями параметров берут SQL из кеша компиляции"""
+    db_session, session_id = filled_db_session
+    repo = ParcelCombinedRepository(db_session)
+    instrument_compiled_cache(db_engine)
+
+    seen = []
+
+    @event.listens_for(db_engine.sync_engine, "before_cursor_execute")
+    def _remember(conn, cursor, statement, parameters, context, executemany):
+        seen.append(context.cache_hit)
+
+    hits_before = _sample("sql_compiled_cache_total", {"result": "cache_hit"})
+
+    first = await repo.list_page(session_id=session_id, limit=2, offset=0, type_id=3)
+    second = await repo.list_page(session_id="other-session", limit=5, offset=1, type_id=1)
+    assert [row.parcel_id for row in first] == ["p3", "o3"]
+    assert second == []
+
+    after = ParcelCursor(created_at=first[0].created_at, parcel_id=first[0].parcel_id)
+    keyset = await repo.list_page(session_id=session_id, limit=2, offset=0, type_id=3, after=after)
+    assert [row.parcel_id for row in keyset] == ["o3"]
+
+    assert await repo.count(session_id=session_id, type_id=3) == 2
+    assert await repo.count(session_id=session_id, type_id=1) == 2
+
+    assert seen == [CacheStats.CACHE_MISS, CacheStats.CACHE_HIT, CacheStats.CACHE_MISS, CacheStats.CACHE_MISS, CacheStats.CACHE_HIT]
+    assert _sample("sql_compiled_cache_total", {"result": "cache_hit"}) - hits_before == 2
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+import src.parcel_service.infrastructure.unitofwork.uow as uow_module
+from src.parcel_service.application.use_cases.parcels.bind_company import BindCompanyUseCase
+from src.parcel_service.application.use_cases.parcels.get_parcels_list import GetParcelsListUseCase
+from src.parcel_service.application.use_cases.parcels.registry_parcel import RegistryParcelUseCase
+from src.parcel_service.domain.constants.db import IsolationLevel
+from src.parcel_service.domain.interfaces.repository import IParcelViewRepository
+from src.parcel_service.infrastructure.repository.factory import RepositoryFactory
+from src.parcel_service.infrastructure.repository.registry import RepositoryRegistry
+import src.parcel_service.infrastructure.repository  # noqa: F401 — регистрация репозиториев
+from src.parcel_service.infrastructure.unitofwork.uow import UnitOfWork
+
+
+@pytest.fixture
+def uow(db_engine):
+    session_factory = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    return UnitOfWork(session_factory=session_factory, repository_factory=RepositoryFactory(RepositoryRegistry.get()))
+
+
+async def _isolation_of(session: AsyncSession):
+    return (await session.connection()).sync_connection.get_execution_options().get("isolation_level")
+
+
+@pytest.mark.anyio
+async def test_isolation_applies_to_one_transaction(uow, monkeypatch):
+    """Уровень изоляции применяется к соединению транзакции и к read_only, затем сбрасывается"""
+    # SQLite поддерживает SERIALIZABLE, поэтому проверяем на нём без исключения диалекта
+    monkeypatch.setattr(uow_module, "_ISOLATION_UNSUPPORTED_DIALECTS", frozenset())
+
+    async with uow.isolation(IsolationLevel.SERIALIZABLE):
+        assert await _isolation_of(uow._session) == "SERIALIZABLE"
+        async with uow.read_only(IParcelViewRepository) as reader:
+            assert await _isolation_of(reader._session) == "SERIALIZABLE"
+
+    async with uow:
+        assert await _isolation_of(uow._session) is None
+
+
+@pytest.mark.anyio
+async def test_unsupported_isolation_is_skipped_on_sqlite(uow):
+    """На SQLite уровни READ COMMITTED/REPEATABLE READ не применяются и не ломают транзакцию"""
+    async with uow.isolation(IsolationLevel.READ_COMMITTED):
+        assert (await uow._session.execute(text("SELECT 1"))).scalar_one() == 1
+
+
+def test_use_cases_declare_isolation():
+    """Чтение и регистрация — READ COMMITTED, привязка компании с блокировкой — REPEATABLE READ"""
+    assert GetParcelsListUseCase.isolation_level is IsolationLevel.READ_COMMITTED
+    assert RegistryParcelUseCase.isolation_level is IsolationLevel.READ_COMMITTED
+    assert BindCompanyUseCase.isolation_level is IsolationLevel.REPEATABLE_READ
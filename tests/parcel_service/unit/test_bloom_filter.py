@@ -0,0 +1,160 @@
+import pytest
+
+from src.delivery_calculation_worker.db.redis.bloom import add_known_parcels, bloom_positions
+from src.parcel_service.infrastructure.cache.bloom import BloomParameters, RedisBloomFilter
+
+
+class FakeBitRedis:
+    """Минимальный Redis в памяти: строки и битовые карты с порядком битов как в SETBIT"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def setbit(self, key, offset, value):
+        bitmap = self.data.setdefault(key, bytearray())
+        byte = offset >> 3
+        if byte >= len(bitmap):
+            bitmap.extend(bytes(byte - len(bitmap) + 1))
+        bitmap[byte] |= 0x80 >> (offset & 7)
+
+    async def getbit(self, key, offset):
+        bitmap = self.data.get(key, bytearray())
+        byte = offset >> 3
+        return int(byte < len(bitmap) and bool(bitmap[byte] & (0x80 >> (offset & 7))))
+
+    async def get(self, key):
+        value = self.data.get(key)
+        return bytes(value) if isinstance(value, bytearray) else value
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def exists(self, *keys):
+        return sum(key in self.data for key in keys)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args) for name, args in self.commands]
+
+
+@pytest.fixture(scope="module")
+def anyio_backend():
+    return "asyncio"
+
+
+def make_filter(redis):
+    return RedisBloomFilter(client=redis, raw_client=redis, key="bloom:parcels", params=BloomParameters.for_capacity(1000, 0.01))
+
+
+def chunks(ids, size=100):
+    ordered = sorted(ids)
+
+    async def load(after):
+        rest = [parcel_id for parcel_id in ordered if after is None or parcel_id > after]
+        return rest[:size]
+
+    return load
+
+
+def test_parameters_have_no_false_negatives_and_bounded_error_rate():
+    """Параметры дают заданную долю ложных срабатываний и не теряют элементы"""
+    params = BloomParameters.for_capacity(1000, 0.01)
+    bits = set()
+    for i in range(1000):
+        bits.update(params.positions(f"known-{i}"))
+
+    assert all(set(params.positions(f"known-{i}")) <= bits for i in range(1000))
+    false_positives = sum(set(params.positions(f"unknown-{i}")) <= bits for i in range(10000))
+    assert false_positives / 10000 < 0.03
+
+
+def test_worker_uses_same_positions():
+    """Воркер и parcel_service вычисляют одинаковые позиции битов"""
+    params = BloomParameters.for_capacity(1_000_000, 0.01)
+    assert params.positions("parcel-1") == bloom_positions("parcel-1")
+
+
+@pytest.mark.anyio
+async def test_unbuilt_filter_allows_everything():
+    """Пока фильтр не построен, точных «нет» не бывает"""
+    bloom = make_filter(FakeBitRedis())
+    assert await bloom.might_contain_many(["a", "b"]) == [True, True]
+
+
+@pytest.mark.anyio
+async def test_built_filter_rejects_unknown_ids():
+    """После построения известные id проходят, неизвестные отсекаются"""
+    redis = FakeBitRedis()
+    bloom = make_filter(redis)
+    known = [f"p-{i:04d}" for i in range(300)]
+
+    assert await bloom.ensure_built(chunks(known))
+    await bloom.refresh()
+
+    assert all(await bloom.might_contain_many(known))
+    rejected = await bloom.might_contain_many([f"x-{i}" for i in range(200)])
+    assert rejected.count(False) > 190
+    assert "bloom:parcels:build" not in redis.data
+
+
+@pytest.mark.anyio
+async def test_stale_snapshot_is_confirmed_in_redis():
+    """Посылка, добавленная другим процессом после снимка, не отсекается"""
+    redis = FakeBitRedis()
+    bloom = make_filter(redis)
+    await bloom.ensure_built(chunks(["p-1"]))
+    await bloom.refresh()
+
+    other = make_filter(redis)
+    await other.add_many(["p-new"])
+
+    assert await bloom.might_contain("p-new")
+
+
+@pytest.mark.anyio
+async def test_lost_bitmap_disables_rejection():
+    """Пропавшая из Redis битовая карта не даёт ложных 404"""
+    redis = FakeBitRedis()
+    bloom = make_filter(redis)
+    await bloom.ensure_built(chunks(["p-1"]))
+    await bloom.refresh()
+    del redis.data["bloom:parcels"]
+
+    assert await bloom.might_contain("p-unknown")
+    assert not bloom.ready
+
+
+@pytest.mark.anyio
+async def test_worker_additions_are_visible():
+    """Посылки, добавленные воркером, видны фильтру parcel_service"""
+    redis = FakeBitRedis()
+    bloom = RedisBloomFilter(client=redis, raw_client=redis, key="bloom:parcels", params=BloomParameters.for_capacity(1_000_000, 0.01))
+    await bloom.ensure_built(chunks([]))
+    await bloom.refresh()
+
+    await add_known_parcels(redis, ["from-worker"])
+
+    assert await bloom.might_contain("from-worker")
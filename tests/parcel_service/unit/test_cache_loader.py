@@ -0,0 +1,176 @@
+import asyncio
+import time
+
+import pytest
+
+from src.parcel_service.infrastructure.cache.loader import CacheEntry, CacheLoader
+from src.parcel_service.infrastructure.cache.local import LocalCache, LocalCachePolicy
+from src.parcel_service.infrastructure.cache.tiered import TieredCache
+
+
+class FakeRedis:
+    """Минимальный асинхронный Redis в памяти для команд, используемых кешем"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttl = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        self.ttl[key] = ex if ex is not None else px
+        return True
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value, ex))
+
+    async def execute(self):
+        for key, value, ex in self.commands:
+            await self.redis.set(key, value, ex=ex)
+
+
+@pytest.fixture(scope="module")
+def anyio_backend():
+    return "asyncio"
+
+
+def make_loader(redis, **kwargs):
+    local = LocalCache(policies={}, default=LocalCachePolicy(ttl=0, max_size=0))
+    cache = TieredCache(client=redis, local=local, channel="cache:invalidate")
+    return CacheLoader(cache=cache, lock_poll_interval=0.01, **kwargs)
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_compute_once():
+    """Конкурентные промахи по одному ключу вычисляются одним вызовом"""
+    redis = FakeRedis()
+    loader = make_loader(redis)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "value"
+
+    results = await asyncio.gather(*[loader.get_or_compute("ns", "k", 60, compute) for _ in range(20)])
+
+    assert results == ["value"] * 20
+    assert calls == 1
+    assert "lock:k" not in redis.data
+    assert CacheEntry.decode(redis.data["k"]).value == "value"
+
+
+@pytest.mark.anyio
+async def test_compute_error_reaches_all_waiters():
+    """Ошибка вычисления получают все ожидающие, значение не кешируется"""
+    redis = FakeRedis()
+    loader = make_loader(redis)
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *[loader.get_or_compute("ns", "k", 60, compute) for _ in range(5)], return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    assert "k" not in redis.data
+
+
+@pytest.mark.anyio
+async def test_waits_for_value_from_other_process():
+    """Если блокировку держит другой процесс, ждём его значение, а не считаем сами"""
+    redis = FakeRedis()
+    loader = make_loader(redis)
+    redis.data["lock:k"] = "other-process"
+
+    async def other_process_fills():
+        await asyncio.sleep(0.05)
+        redis.data["k"] = CacheEntry(value="from-other", expiry=time.time() + 60, delta=0.01).encode()
+        del redis.data["lock:k"]
+
+    async def compute():
+        raise AssertionError("must not be called")
+
+    filler = asyncio.create_task(other_process_fills())
+    assert await loader.get_or_compute("ns", "k", 60, compute) == "from-other"
+    await filler
+
+
+@pytest.mark.anyio
+async def test_early_refresh_serves_current_value():
+    """XFetch: близкая к истечению запись отдаётся сразу, а обновляется в фоне"""
+    redis = FakeRedis()
+    loader = make_loader(redis, xfetch_beta=1000.0)
+    redis.data["k"] = CacheEntry(value="old", expiry=time.time() + 1, delta=1.0).encode()
+
+    async def compute():
+        return "new"
+
+    assert await loader.get_or_compute("ns", "k", 60, compute) == "old"
+    await asyncio.sleep(0.01)
+    assert CacheEntry.decode(redis.data["k"]).value == "new"
+
+
+@pytest.mark.anyio
+async def test_store_applies_ttl_jitter():
+    """TTL уменьшается случайно в пределах ttl_jitter"""
+    redis = FakeRedis()
+    loader = make_loader(redis, ttl_jitter=0.2)
+
+    ttls = set()
+    for i in range(50):
+        await loader.store("ns", f"k{i}", "v", ttl=1000)
+        ttls.add(redis.ttl[f"k{i}"])
+
+    assert all(800 <= ttl <= 1000 for ttl in ttls)
+    assert len(ttls) > 1
+
+
+@pytest.mark.anyio
+async def test_get_many_and_store_many_share_entry_format():
+    """Пакетная запись читается и пакетно, и через get_or_compute; старый формат — промах"""
+    redis = FakeRedis()
+    loader = make_loader(redis)
+
+    await loader.store_many("ns", {"a": "1", "b": "2"}, ttl=60)
+    redis.data["legacy"] = "plain-value"
+
+    assert await loader.get_many("ns", ["a", "b", "legacy", "missing"]) == {"a": "1", "b": "2"}
+
+    async def compute():
+        raise AssertionError("must not be called")
+
+    assert await loader.get_or_compute("ns", "a", 60, compute) == "1"
@@ -0,0 +1,173 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from src.parcel_service.api.middleware.idempotency import IdempotencyMiddleware
+from src.parcel_service.infrastructure.cache.idempotency import RedisIdempotencyStore
+
+
+class FakeRedis:
+    """Минимальный Redis в памяти: GET, SET NX, DEL и скрипт сравнения с удалением"""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = []
+
+    async def get(self, key):
+        self.calls.append("get")
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        self.calls.append("set")
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        self.calls.append("delete")
+        self.data.pop(key, None)
+
+    async def eval(self, script, numkeys, key, expected):
+        self.calls.append("eval")
+        if self.data.get(key) == expected:
+            del self.data[key]
+            return 1
+        return 0
+
+
+@pytest.fixture(scope="module")
+def anyio_backend():
+    return "asyncio"
+
+
+def make_app(redis, handler_calls, release=None, status=201):
+    app = FastAPI()
+
+    @app.post("/v1/parcels/")
+    async def create(payload: dict):
+        handler_calls.append(payload)
+        if release is not None:
+            await release.wait()
+        return JSONResponse({"parcel_id": f"p-{len(handler_calls)}"}, status_code=status)
+
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=RedisIdempotencyStore(client=redis, ttl=3600, lock_ttl=30),
+        wait_timeout=1.0,
+        poll_interval=0.01
+    )
+    return app
+
+
+def make_client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+HEADERS = {"Idempotency-Key": "k-1", "X-Session-Id": "s1"}
+
+
+@pytest.mark.anyio
+async def test_retry_replays_stored_response_with_one_get():
+    """Повтор с тем же ключом получает сохранённый ответ одним GET, обработчик не вызывается"""
+    redis, calls = FakeRedis(), []
+    async with make_client(make_app(redis, calls)) as client:
+        first = await client.post("/v1/parcels/", json={"name": "a"}, headers=HEADERS)
+        redis.calls.clear()
+        retry = await client.post("/v1/parcels/", json={"name": "a"}, headers=HEADERS)
+        other_session = await client.post("/v1/parcels/", json={"name": "a"}, headers={**HEADERS, "X-Session-Id": "s2"})
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json() == {"parcel_id": "p-1"}
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert redis.calls[0] == "get" and redis.calls[1:3] == ["get", "set"]
+    assert other_session.json() == {"parcel_id": "p-2"}
+    assert len(calls) == 2
+
+
+@pytest.mark.anyio
+async def test_concurrent_duplicate_waits_for_first_result():
+    """Конкурентный дубликат ждёт ответа первого запроса вместо повторного выполнения"""
+    redis, calls, release = FakeRedis(), [], asyncio.Event()
+    async with make_client(make_app(redis, calls, release)) as client:
+        first = asyncio.ensure_future(client.post("/v1/parcels/", json={"name": "a"}, headers=HEADERS))
+        while not calls:
+            await asyncio.sleep(0.01)
+        duplicate = asyncio.ensure_future(client.post("/v1/parcels/", json={"name": "a"}, headers=HEADERS))
+        await asyncio.sleep(0.05)
+        release.set()
+        first, duplicate = await first, await duplicate
+
+    assert len(calls) == 1
+    assert duplicate.json() == first.json()
+    assert duplicate.headers["idempotent-replayed"] == "true"
+
+
+@pytest.mark.anyio
+async def test_key_reused_with_different_body_is_rejected():
+    """Ключ, уже использованный с другим телом, отклоняется с 422"""
+    redis, calls = FakeRedis(), []
+    async with make_client(make_app(redis, calls)) as client:
+        await client.post("/v1/parcels/", json={"name": "a"}, headers=HEADERS)
+        reused = await client.post("/v1/parcels/", json={"name": "b"}, headers=HEADERS)
+
+    assert reused.status_code == 422
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_server_error_is_not_stored():
+    """Ответ 5xx не сохраняется: повтор выполняется заново"""
+    redis, calls = FakeRedis(), []
+    async with make_client(make_app(redis, calls, status=503)) as client:
+        await client.post("/v1/parcels/", json={"name": "a"}, headers=HEADERS)
+        retry = await client.post("/v1/parcels/", json={"name": "a"}, headers=HEADERS)
+
+    assert "idempotent-replayed" not in retry.headers
+    assert len(calls) == 2
+    assert redis.data == {}
+
+
+@pytest.mark.anyio
+async def test_release_keeps_reservation_of_next_request():
+    """Резерв, истёкший у долгого обработчика и занятый следующим запросом, не снимается первым"""
+    redis = FakeRedis()
+    store = RedisIdempotencyStore(client=redis, ttl=3600, lock_ttl=30)
+    first = await store.reserve("k", "fp")
+    redis.data.pop("k")  # истёк lock_ttl
+    second = await store.reserve("k", "fp")
+
+    await store.release("k", first)
+
+    assert first.token != second.token
+    assert (await store.get("k")).token == second.token
+    await store.release("k", second)
+    assert await store.get("k") is None
+
+
+class ContendedRedis(FakeRedis):
+    """Ключ не читается, а SET NX не проходит: резерв всё время занят"""
+
+    async def get(self, key):
+        self.calls.append("get")
+        return None
+
+    async def set(self, key, value, nx=False, ex=None):
+        self.calls.append("set")
+        return None
+
+
+@pytest.mark.anyio
+async def test_failed_reserve_waits_until_deadline():
+    """Неудачный резерв ждёт с паузой опроса и завершается 409 по таймауту, а не крутит цикл"""
+    redis, calls = ContendedRedis(), []
+    async with make_client(make_app(redis, calls)) as client:
+        response = await client.post("/v1/parcels/", json={"name": "a"}, headers=HEADERS)
+
+    assert response.status_code == 409
+    assert len(calls) == 0
+    assert redis.calls.count("set") <= 1.0 / 0.01 + 5
@@ -0,0 +1,67 @@
+from src.parcel_service.infrastructure.cache.invalidation import CacheInvalidationListener, encode_invalidation
+from src.parcel_service.infrastructure.cache.local import LocalCache, LocalCachePolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(clock):
+    return LocalCache(
+        policies={"small": LocalCachePolicy(ttl=10, max_size=2), "off": LocalCachePolicy(ttl=0, max_size=10)},
+        default=LocalCachePolicy(ttl=5, max_size=100),
+        clock=clock
+    )
+
+
+def test_entry_expires_by_namespace_ttl():
+    """Запись живёт TTL своего пространства имён"""
+    clock = FakeClock()
+    cache = make_cache(clock)
+    cache.set("small", "k", "v")
+    cache.set("other", "k", "v")
+
+    clock.now = 6
+    assert cache.get("small", "k") == "v"
+    assert cache.get("other", "k") is None
+
+    clock.now = 11
+    assert cache.get("small", "k") is None
+
+
+def test_lru_eviction_keeps_recently_read():
+    """При переполнении вытесняется давно не читавшаяся запись"""
+    cache = make_cache(FakeClock())
+    cache.set("small", "a", 1)
+    cache.set("small", "b", 2)
+    assert cache.get("small", "a") == 1
+
+    cache.set("small", "c", 3)
+    assert cache.get("small", "b") is None
+    assert cache.get("small", "a") == 1
+    assert cache.size("small") == 2
+
+
+def test_zero_ttl_namespace_is_not_cached():
+    """Пространство с нулевым TTL локально не кешируется"""
+    cache = make_cache(FakeClock())
+    cache.set("off", "k", "v")
+    assert cache.get("off", "k") is None
+
+
+def test_invalidation_message_drops_entry():
+    """Сообщение инвалидации удаляет запись только в своём пространстве имён"""
+    cache = make_cache(FakeClock())
+    cache.set("generation", "s1", 3)
+    cache.set("small", "s1", "v")
+    listener = CacheInvalidationListener(client=None, channel="cache:invalidate", local=cache)
+
+    listener.handle(encode_invalidation("generation", "s1"))
+    listener.handle("not-json")
+
+    assert cache.get("generation", "s1") is None
+    assert cache.get("small", "s1") == "v"
@@ -0,0 +1,99 @@
+from decimal import Decimal
+
+import orjson
+import pytest
+
+from src.parcel_service.api.encoders.parcel import (
+    NOT_CALCULATED, body_etag, conditional_json_response, encode_parcel_detail, encode_parcel_list, etag_matches,
+    project_parcel_body
+)
+from src.parcel_service.api.schemas.parcel import PARCEL_FIELDS, ParcelDetailResponse, ParcelListResponse, parse_parcel_fields
+from src.parcel_service.domain.exceptions.domain_error import InvalidFieldsError
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelDetailQueryList, ParcelDetailResult
+
+
+def _item(i: int, price) -> ParcelDetailResult:
+    return ParcelDetailResult(
+        parcel_id=f"p-{i}",
+        name=f"Посылка {i}",
+        weight_kg=Decimal("1.50"),
+        type_id=1,
+        cost_adjustment_usd=Decimal("10.25"),
+        delivery_price_rub=price,
+    )
+
+
+def test_detail_body_matches_response_schema():
+    """Закодированное тело совпадает с сериализацией ParcelDetailResponse"""
+    for price in (Decimal("150.00"), None):
+        item = _item(1, price)
+        expected = ParcelDetailResponse(
+            parcel_id=item.parcel_id,
+            name=item.name,
+            weight_kg=item.weight_kg,
+            type_id=item.type_id,
+            cost_adjustment_usd=item.cost_adjustment_usd,
+            delivery_price_rub=str(price) if price is not None else NOT_CALCULATED,
+        )
+        body = encode_parcel_detail(item)
+        assert orjson.loads(body) == orjson.loads(expected.model_dump_json())
+        assert ParcelDetailResponse.model_validate_json(body) == expected
+
+
+def test_list_body_is_valid_list_response():
+    """Страница кодируется в тело, валидное по схеме ParcelListResponse"""
+    result = ParcelDetailQueryList(
+        items=[_item(i, Decimal("99.90") if i % 2 else None) for i in range(3)],
+        total=3,
+        next_cursor="abc",
+        has_more=True,
+    )
+
+    response = ParcelListResponse.model_validate_json(encode_parcel_list(result))
+
+    assert [item.parcel_id for item in response.items] == ["p-0", "p-1", "p-2"]
+    assert response.items[0].delivery_price_rub == NOT_CALCULATED
+    assert response.items[1].delivery_price_rub == "99.90"
+    assert (response.total, response.next_cursor, response.has_more) == (3, "abc", True)
+
+
+def test_sparse_fields_are_validated_and_projected():
+    """fields проверяется по схеме, parcel_id добавляется всегда, тело содержит только выбранные поля"""
+    fields = parse_parcel_fields("delivery_price_rub, parcel_id,delivery_price_rub")
+    assert fields == ("parcel_id", "delivery_price_rub")
+    assert parse_parcel_fields(None) is None
+    assert parse_parcel_fields(",".join(PARCEL_FIELDS)) is None
+    with pytest.raises(InvalidFieldsError):
+        parse_parcel_fields("parcel_id,session_id")
+
+    item = _item(1, None)
+    sparse = ParcelDetailResult(parcel_id="p-1", name=None, weight_kg=0.0, type_id=None, cost_adjustment_usd=None, delivery_price_rub=None)
+    assert orjson.loads(encode_parcel_detail(sparse, fields)) == {"parcel_id": "p-1", "delivery_price_rub": NOT_CALCULATED}
+    assert project_parcel_body(encode_parcel_detail(item), fields) == encode_parcel_detail(item, fields)
+
+
+def test_conditional_response_returns_304_for_matching_etag():
+    """Совпавший If-None-Match даёт 304 без тела, изменённое тело — новый ETag и 200"""
+    body = encode_parcel_detail(_item(1, None))
+    first = conditional_json_response(body, None)
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    not_modified = conditional_json_response(body, etag)
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+    assert not_modified.headers["etag"] == etag
+
+    priced = conditional_json_response(encode_parcel_detail(_item(1, Decimal("150.00"))), etag)
+    assert priced.status_code == 200
+    assert priced.headers["etag"] != etag
+
+
+def test_if_none_match_lists_weak_tags_and_wildcard():
+    """If-None-Match сравнивается слабо: список через запятую, W/ и * поддерживаются"""
+    etag = body_etag("{}")
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,152 @@
+import pytest
+
+from src.delivery_calculation_worker.db.redis.entity import store_parcel_entities
+from src.delivery_calculation_worker.db.sql.models import Parcel
+from src.parcel_service.api.encoders.parcel import NOT_CALCULATED
+from src.parcel_service.api.routers.v1.parcel.entities import resolve_parcel_bodies
+from src.parcel_service.api.schemas.parcel import ParcelDetailResponse
+from src.parcel_service.domain.dto.dto_parcel_query import ParcelBatchResult, ParcelDetailResult
+from src.parcel_service.infrastructure.cache.entity import ParcelEntityCache, build_entity_key, build_missing_key
+from src.parcel_service.infrastructure.cache.loader import CacheLoader
+from src.parcel_service.infrastructure.cache.local import LocalCache, LocalCachePolicy
+from src.parcel_service.infrastructure.cache.tiered import TieredCache
+
+
+class FakeRedis:
+    """Минимальный асинхронный Redis в памяти: строки, MGET и pipeline с публикациями"""
+
+    def __init__(self):
+        self.data = {}
+        self.published = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.commands.append(self.redis.set(key, value, ex=ex))
+
+    def delete(self, *keys):
+        self.commands.append(self.redis.delete(*keys))
+
+    def publish(self, channel, message):
+        self.commands.append(self.redis.publish(channel, message))
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+
+class FakeBatchUseCase:
+    """Пакетный UseCase: отдаёт посылки из словаря и запоминает запрошенные id"""
+
+    def __init__(self, parcels):
+        self.parcels = parcels
+        self.requested = []
+
+    async def __call__(self, dto, uow, deps=None):
+        self.requested.append(list(dto.parcel_ids))
+        items = [self.parcels[parcel_id] for parcel_id in dto.parcel_ids if parcel_id in self.parcels]
+        not_found = [parcel_id for parcel_id in dto.parcel_ids if parcel_id not in self.parcels]
+        return ParcelBatchResult(items=items, not_found=not_found, access_denied=[])
+
+
+@pytest.fixture(scope="module")
+def anyio_backend():
+    return "asyncio"
+
+
+def make_entities(redis):
+    local = LocalCache(policies={}, default=LocalCachePolicy(ttl=0, max_size=0))
+    cache = TieredCache(client=redis, local=local, channel="cache:invalidate")
+    return ParcelEntityCache(loader=CacheLoader(cache=cache), ttl=60)
+
+
+def _detail(parcel_id):
+    return ParcelDetailResult(parcel_id, f"Посылка {parcel_id}", 1.5, 1, 10.0, NOT_CALCULATED)
+
+
+@pytest.mark.anyio
+async def test_only_missing_entities_are_loaded():
+    """Закешированные карточки не читаются из БД, загруженные сохраняются в кеш"""
+    redis = FakeRedis()
+    entities = make_entities(redis)
+    await entities.store("s1", "p1", '{"parcel_id":"p1"}')
+    use_case = FakeBatchUseCase({"p2": _detail("p2")})
+
+    bodies, not_found, _ = await resolve_parcel_bodies(["p1", "p2", "p3"], "s1", entities, uow=None, use_case=use_case)
+
+    assert use_case.requested == [["p2", "p3"]]
+    assert bodies["p1"] == '{"parcel_id":"p1"}'
+    assert ParcelDetailResponse.model_validate_json(bodies["p2"]).delivery_price_rub == NOT_CALCULATED
+    assert not_found == ["p3"]
+    assert (await entities.get_many("s1", ["p2"])) == {"p2": bodies["p2"]}
+
+
+@pytest.mark.anyio
+async def test_known_bodies_skip_cache_and_db():
+    """Карточки, закодированные в текущем запросе, не запрашиваются повторно"""
+    use_case = FakeBatchUseCase({})
+
+    bodies, _, _ = await resolve_parcel_bodies(["p1"], "s1", make_entities(FakeRedis()), uow=None, use_case=use_case, known={"p1": "{}"})
+
+    assert bodies == {"p1": "{}"}
+    assert use_case.requested == []
+
+
+@pytest.mark.anyio
+async def test_worker_rewrites_single_entity():
+    """Воркер перезаписывает одну карточку в формате кеша parcel_service и сбрасывает её из локальных кешей"""
+    redis = FakeRedis()
+    entities = make_entities(redis)
+    await entities.store("s1", "p1", "stale")
+    await entities.store("s1", "p2", "other")
+    parcel = Parcel(id="p1", session_id="s1", name="Книги", weight_kg=2.0, type_id=3, cost_adjustment_usd=15.0, delivery_price_rub=123.45)
+
+    await store_parcel_entities(redis, [parcel])
+
+    body = (await entities.get_many("s1", ["p1"]))["p1"]
+    assert ParcelDetailResponse.model_validate_json(body) == ParcelDetailResponse(
+        parcel_id="p1", name="Книги", weight_kg=2.0, type_id=3, cost_adjustment_usd=15.0, delivery_price_rub="123.45"
+    )
+    assert (await entities.get_many("s1", ["p2"])) == {"p2": "other"}
+    assert [message for _, message in redis.published] == ['{"namespace": "parcel_detail", "key": "%s"}' % build_entity_key("s1", "p1")]
+
+
+def test_missing_key_does_not_collide_with_entity_keys():
+    """Ключ отрицательного кеша не совпадает с карточкой сессии с произвольным именем"""
+    assert build_missing_key("p1") != build_entity_key("missing", "p1")
+    assert not build_missing_key("p1").startswith("cache:parcels:")